@@ -0,0 +1,133 @@
+"""
+Bounded executors for blocking route work.
+
+The routes use a synchronous SQLAlchemy Session and do blocking file, PDF
+and AWS work, which must not run on the event loop: one slow diff render
+there stalls every other request on the worker. Each route declares how it
+behaves with one of:
+
+- @blocking(pool): the handler is a plain def and runs in the named pool
+- @nonblocking: the handler is async and never blocks
+
+Pools:
+- "db": database queries, file reads, template rendering
+- "render": PDF page renders and visual diffs (CPU-heavy, few threads)
+- "external": AWS calls and monitoring runs (slow, mostly waiting)
+
+A handler that must await something (e.g. a multipart form) stays
+@nonblocking and hands its blocking part to run_blocking().
+"""
+
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+import structlog
+
+from config import settings
+
+logger = structlog.get_logger()
+
+
+POOL_SIZES = {
+    "db": settings.API_DB_THREADS,
+    "render": settings.API_RENDER_THREADS,
+    "external": settings.API_EXTERNAL_THREADS,
+}
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+
+
+def get_executor(pool: str) -> ThreadPoolExecutor:
+    """Return the named pool, creating it on first use."""
+    executor = _executors.get(pool)
+    if executor is None:
+        if pool not in POOL_SIZES:
+            raise ValueError(f"Unknown executor pool: {pool}")
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, POOL_SIZES[pool]),
+            thread_name_prefix=f"api-{pool}"
+        )
+        _executors[pool] = executor
+    return executor
+
+
+async def run_blocking(pool: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a blocking call in the named pool and await its result.
+    
+    Context variables (e.g. structlog's bound request context) are carried
+    into the worker thread.
+    
+    Args:
+        pool: Pool name ("db", "render" or "external")
+        func: Blocking callable
+        *args, **kwargs: Passed to func
+    
+    Returns:
+        func's return value (its exceptions propagate)
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, func, *args, **kwargs)
+    return await loop.run_in_executor(get_executor(pool), call)
+
+
+def blocking(pool: str) -> Callable:
+    """
+    Declare a route handler blocking and run it in the named pool.
+    
+    The handler is written as a plain def; FastAPI sees an async endpoint
+    with the handler's signature.
+    
+    Args:
+        pool: Pool name ("db", "render" or "external")
+    """
+    if pool not in POOL_SIZES:
+        raise ValueError(f"Unknown executor pool: {pool}")
+    
+    def decorator(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+            raise TypeError(f"@blocking handler {func.__name__} must be a plain def")
+        
+        @functools.wraps(func)
+        async def endpoint(*args, **kwargs):
+            return await run_blocking(pool, func, *args, **kwargs)
+        
+        endpoint.blocking = pool
+        return endpoint
+    
+    return decorator
+
+
+def nonblocking(func: Callable) -> Callable:
+    """Declare an async route handler that never blocks the event loop."""
+    if not asyncio.iscoroutinefunction(func):
+        raise TypeError(f"@nonblocking handler {func.__name__} must be async")
+    func.blocking = None
+    return func
+
+
+def route_pool(endpoint: Callable) -> Optional[str]:
+    """
+    The pool a route handler declared.
+    
+    Returns:
+        Pool name, or None for @nonblocking handlers
+    
+    Raises:
+        LookupError: If the handler declared neither
+    """
+    if not hasattr(endpoint, "blocking"):
+        raise LookupError(f"Route handler {endpoint.__name__} declares neither @blocking nor @nonblocking")
+    return endpoint.blocking
+
+
+def shutdown_executors() -> None:
+    """Wait for running work and stop every pool (application shutdown)."""
+    for pool, executor in list(_executors.items()):
+        executor.shutdown(wait=True, cancel_futures=True)
+        del _executors[pool]
+    logger.info("API executors shut down")
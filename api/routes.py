@@ -2,31 +2,42 @@
 FastAPI routes for PDF Monitor.
 
 Thin routes that delegate to service layer.
+
+Every route declares whether it blocks (see api/executors.py): blocking
+handlers are plain defs run in a bounded thread pool, so database, file
+and render work never runs on the event loop.
 """
 
 from datetime import datetime
-from pathlib import Path
-from typing import Optional
+from typing import List, Optional
+import asyncio
+import html
+import json
 import re
 
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request, Form
-from fastapi.responses import FileResponse, HTMLResponse, RedirectResponse
+import structlog
+from fastapi import APIRouter, Depends, HTTPException, Request, Form
+from fastapi.responses import FileResponse, HTMLResponse, RedirectResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 
 from config import settings
 from db.database import get_db
-from db.models import MonitoredURL, PDFVersion, ChangeLog
+from db.models import MonitoredURL, PDFVersion, ChangeLog, MonitoringJob
+from api.executors import blocking, nonblocking, run_blocking
 from api.schemas import (
     MonitoredURLCreate,
     MonitoredURLResponse,
     MonitoredURLUpdate,
     MonitoredURLFullResponse,
+    URLListItem,
+    URLPageResponse,
     PDFVersionResponse,
     ChangeLogResponse,
     ChangeFullResponse,
     MonitoringRunRequest,
-    MonitoringRunResponse,
+    MonitoringJobResponse,
+    RelocationTaskResponse,
     StatusResponse,
     ReviewRequest,
     ReviewResponse,
@@ -52,8 +63,18 @@ from storage.version_manager import VersionManager
 from services.action_recommender import action_recommender, ActionType
 from services.metrics_tracker import metrics_tracker
 from services.kendra_search import kendra_search_service
+from services.local_search import local_search_service
 from services.kendra_indexer import kendra_indexer
 from services.kendra_client import kendra_client
+from services.page_raster_cache import page_raster_cache
+from services.url_state import url_state_tracker
+from services.form_fingerprints import form_fingerprint_index
+from services.job_runner import job_runner, job_to_dict, JobStateError, FINISHED_STATUSES
+from services.relocation_queue import relocation_queue, task_to_dict, RelocationStateError
+from services.url_listing import url_listing, URLFilters, InvalidCursorError
+from services.change_listing import change_listing
+
+logger = structlog.get_logger()
 
 router = APIRouter()
 
@@ -68,7 +89,7 @@ def highlight_search_terms(text: str, query: str) -> str:
     Args:
         text: The text to highlight
         query: The search query (will be split into individual words)
-        
+    
     Returns:
         Text with search terms highlighted
     """
@@ -92,20 +113,38 @@ def highlight_search_terms(text: str, query: str) -> str:
     return highlighted
 
 
-def load_relocation_near_misses(url_id: int) -> Optional[dict]:
+def highlight_spans(text: str, spans: List[List[int]]) -> str:
+    """
+    Escape text and wrap the given [start, end) spans in <mark> tags.
+    
+    Args:
+        text: The text to highlight
+        spans: Character offsets of the matched terms, in order
+    
+    Returns:
+        HTML with the spans highlighted
+    """
+    parts = []
+    position = 0
+    for start, end in spans:
+        if start < position:
+            continue
+        parts.append(html.escape(text[position:start]))
+        parts.append(
+            '<mark style="background-color: #ffeb3b; padding: 2px 4px; border-radius: 3px;">'
+            f'{html.escape(text[start:end])}</mark>'
+        )
+        position = end
+    parts.append(html.escape(text[position:]))
+    return "".join(parts)
+
+
+def load_relocation_near_misses(db: Session, url_id: int) -> Optional[dict]:
     """
     Load relocation near-misses for a monitored URL (404, relocation failed).
-    Returns the JSON payload from data/relocation_near_misses/url_{id}.json if present.
+    Returns the payload stored on the URL's current state, if any.
     """
-    import json
-    rel_path = Path("data") / "relocation_near_misses" / f"url_{url_id}.json"
-    if not rel_path.exists():
-        return None
-    try:
-        with open(rel_path, "r") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, OSError):
-        return None
+    return url_state_tracker.get_near_misses(db, url_id)
 
 
 # Initialize services
@@ -118,90 +157,30 @@ version_manager = VersionManager(file_store)
 # ============================================================================
 
 @router.get("/", response_class=HTMLResponse)
-async def dashboard(
+@blocking("db")
+def dashboard(
     request: Request,
     state: Optional[str] = None,
     domain: Optional[str] = None,
+    search: Optional[str] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    """Dashboard showing all enabled monitored URLs with optional filtering."""
-    from sqlalchemy import func, desc
-    
-    # Build query with filters
-    query = db.query(MonitoredURL).filter(MonitoredURL.enabled == True)
-    
-    if state:
-        query = query.filter(MonitoredURL.state == state)
-    
-    if domain:
-        query = query.filter(MonitoredURL.domain_category == domain)
+    """
+    Dashboard showing enabled monitored URLs with optional filtering.
     
-    urls = query.order_by(MonitoredURL.name).all()
+    Renders the first keyset page; the template loads further pages from
+    /api/urls/page.
+    """
+    from sqlalchemy import func, desc
     
-    if not urls:
-        url_data = []
-    else:
-        # Optimize: Use bulk queries instead of N+1 queries
-        url_ids = [url.id for url in urls]
-        
-        # Get version counts for all URLs in one query
-        version_counts = db.query(
-            PDFVersion.monitored_url_id,
-            func.count(PDFVersion.id).label('count')
-        ).filter(
-            PDFVersion.monitored_url_id.in_(url_ids)
-        ).group_by(PDFVersion.monitored_url_id).all()
-        
-        version_count_map = {url_id: count for url_id, count in version_counts}
-        
-        # Get latest versions for all URLs using subquery approach (more compatible)
-        # For each URL, get the max version_number, then join to get the full record
-        max_versions_subq = db.query(
-            PDFVersion.monitored_url_id,
-            func.max(PDFVersion.version_number).label('max_version')
-        ).filter(
-            PDFVersion.monitored_url_id.in_(url_ids)
-        ).group_by(PDFVersion.monitored_url_id).subquery()
-        
-        latest_versions = db.query(PDFVersion).join(
-            max_versions_subq,
-            (PDFVersion.monitored_url_id == max_versions_subq.c.monitored_url_id) &
-            (PDFVersion.version_number == max_versions_subq.c.max_version)
-        ).all()
-        
-        latest_version_map = {v.monitored_url_id: v for v in latest_versions}
-        
-        # Get most recent changes for all URLs using subquery approach
-        max_changes_subq = db.query(
-            ChangeLog.monitored_url_id,
-            func.max(ChangeLog.detected_at).label('max_detected_at')
-        ).filter(
-            ChangeLog.monitored_url_id.in_(url_ids)
-        ).group_by(ChangeLog.monitored_url_id).subquery()
-        
-        recent_changes = db.query(ChangeLog).join(
-            max_changes_subq,
-            (ChangeLog.monitored_url_id == max_changes_subq.c.monitored_url_id) &
-            (ChangeLog.detected_at == max_changes_subq.c.max_detected_at)
-        ).all()
-        
-        recent_change_map = {c.monitored_url_id: c for c in recent_changes}
-        
-        # Build url_data list
-        url_data = []
-        for url in urls:
-            recent_change = recent_change_map.get(url.id)
-            item = {
-                "url": url,
-                "version_count": version_count_map.get(url.id, 0),
-                "latest_version": latest_version_map.get(url.id),
-                "recent_change": recent_change
-            }
-            if recent_change and recent_change.change_type == "relocation_failed":
-                item["relocation_near_misses"] = load_relocation_near_misses(url.id)
-            else:
-                item["relocation_near_misses"] = None
-            url_data.append(item)
+    filters = URLFilters(state=state, domain=domain, search=search, enabled_only=True)
+    try:
+        page = url_listing.get_page(db, filters, cursor=cursor)
+    except InvalidCursorError:
+        page = url_listing.get_page(db, filters)
+    url_data = page.items
+    summary = url_listing.summarize(db, filters)
     
     # Get state counts for tabs
     state_counts = db.query(
@@ -252,9 +231,12 @@ async def dashboard(
             "message_type": message_type,
             "current_state": state,
             "current_domain": domain,
+            "search_query": search,
             "state_counts": state_counts,
             "domain_counts": domain_counts,
-            "total_count": total_count
+            "total_count": total_count,
+            "summary": summary,
+            "next_cursor": page.next_cursor
         }
     )
     # Prevent caching
@@ -265,7 +247,8 @@ async def dashboard(
 
 
 @router.get("/url/{url_id}", response_class=HTMLResponse)
-async def url_detail(request: Request, url_id: int, db: Session = Depends(get_db)):
+@blocking("db")
+def url_detail(request: Request, url_id: int, db: Session = Depends(get_db)):
     """Detail page for a specific URL."""
     url = db.query(MonitoredURL).filter(MonitoredURL.id == url_id).first()
     
@@ -274,8 +257,8 @@ async def url_detail(request: Request, url_id: int, db: Session = Depends(get_db
     
     versions = version_manager.get_version_history(db, url_id, limit=50)
     changes = version_manager.get_url_changes(db, url_id, limit=20)
-    relocation_near_misses = load_relocation_near_misses(url_id)
-
+    relocation_near_misses = load_relocation_near_misses(db, url_id)
+    
     return templates.TemplateResponse(
         "url_detail.html",
         {
@@ -290,32 +273,16 @@ async def url_detail(request: Request, url_id: int, db: Session = Depends(get_db
 
 
 @router.get("/changes", response_class=HTMLResponse)
-async def changes_page(request: Request, db: Session = Depends(get_db)):
+@blocking("db")
+def changes_page(request: Request, db: Session = Depends(get_db)):
     """Page showing recent changes across all enabled URLs."""
-    changes = version_manager.get_recent_changes(db, limit=50)
-    
-    # Enrich with URL names, filtering out disabled URLs
+    # Recent changes for enabled URLs, with URL names eager-loaded
     change_data = []
-    for change in changes:
-        url = db.query(MonitoredURL).filter(
-            MonitoredURL.id == change.monitored_url_id
-        ).first()
-        
-        # Skip changes for disabled URLs
-        if url and not url.enabled:
-            continue
-        
-        item = {
-            "change": change,
-            "url_name": url.name if url else "Unknown",
-            "url_url": url.url if url else ""
-        }
-        if change.change_type == "relocation_failed":
-            item["relocation_near_misses"] = load_relocation_near_misses(change.monitored_url_id)
-        else:
-            item["relocation_near_misses"] = None
+    for item in change_listing.list_changes(db, limit=50):
+        item["url_name"] = item["url"].name
+        item["url_url"] = item["url"].url
         change_data.append(item)
-
+    
     return templates.TemplateResponse(
         "changes.html",
         {
@@ -327,7 +294,8 @@ async def changes_page(request: Request, db: Session = Depends(get_db)):
 
 
 @router.get("/triage", response_class=HTMLResponse)
-async def triage_dashboard(
+@blocking("db")
+def triage_dashboard(
     request: Request,
     status: str = "all",
     action: Optional[str] = None,
@@ -337,22 +305,6 @@ async def triage_dashboard(
     AI Triage Dashboard - Screen 1 from PoC.
     Shows changes with AI recommendations and allows bulk approval/rejection.
     """
-    # Build query
-    query = db.query(ChangeLog).join(
-        MonitoredURL, ChangeLog.monitored_url_id == MonitoredURL.id
-    ).filter(MonitoredURL.enabled == True)
-    
-    # Filter by review status
-    if status != "all":
-        query = query.filter(ChangeLog.review_status == status)
-    
-    # Filter by recommended action
-    if action:
-        query = query.filter(ChangeLog.recommended_action == action)
-    
-    # Order by priority (manual_required first, then new_form, etc.)
-    changes = query.order_by(ChangeLog.detected_at.desc()).limit(100).all()
-    
     # Calculate priority based on recommended action
     priority_map = {
         "manual_required": 1,
@@ -362,68 +314,26 @@ async def triage_dashboard(
         "false_positive": 5,
     }
     
-    # Enrich with URL names and priorities
-    change_data = []
-    for change in changes:
-        url = db.query(MonitoredURL).filter(
-            MonitoredURL.id == change.monitored_url_id
-        ).first()
-        
-        item = {
-            "change": change,
-            "url_name": url.name if url else "Unknown",
-            "url_url": url.url if url else "",
-            "priority": priority_map.get(change.recommended_action, 3)
-        }
-        if change.change_type == "relocation_failed":
-            item["relocation_near_misses"] = load_relocation_near_misses(change.monitored_url_id)
-        else:
-            item["relocation_near_misses"] = None
-        change_data.append(item)
+    # Changes with URL and version eager-loaded
+    change_data = change_listing.list_changes(db, limit=100, status=status, action=action)
+    for item in change_data:
+        item["url_name"] = item["url"].name
+        item["url_url"] = item["url"].url
+        item["priority"] = priority_map.get(item["change"].recommended_action, 3)
     
-    # Sort by priority
+    # Sort by priority (manual_required first, then new_form, etc.)
     change_data.sort(key=lambda x: (x["priority"], x["change"].detected_at), reverse=False)
     
     # Calculate stats
-    total_changes = db.query(ChangeLog).join(
-        MonitoredURL, ChangeLog.monitored_url_id == MonitoredURL.id
-    ).filter(MonitoredURL.enabled == True).count()
-    
-    pending_count = db.query(ChangeLog).join(
-        MonitoredURL, ChangeLog.monitored_url_id == MonitoredURL.id
-    ).filter(
-        MonitoredURL.enabled == True,
-        ChangeLog.review_status == "pending"
-    ).count()
-    
-    approved_count = db.query(ChangeLog).join(
-        MonitoredURL, ChangeLog.monitored_url_id == MonitoredURL.id
-    ).filter(
-        MonitoredURL.enabled == True,
-        ChangeLog.review_status.in_(["approved", "auto_approved"])
-    ).count()
-    
-    auto_approved_count = db.query(ChangeLog).join(
-        MonitoredURL, ChangeLog.monitored_url_id == MonitoredURL.id
-    ).filter(
-        MonitoredURL.enabled == True,
-        ChangeLog.recommended_action.in_(["auto_approve", "false_positive"])
-    ).count()
-    
-    manual_required_count = db.query(ChangeLog).join(
-        MonitoredURL, ChangeLog.monitored_url_id == MonitoredURL.id
-    ).filter(
-        MonitoredURL.enabled == True,
-        ChangeLog.recommended_action.in_(["manual_required", "new_form"])
-    ).count()
-    
-    automation_rate = auto_approved_count / total_changes if total_changes > 0 else 0
-    review_rate = manual_required_count / total_changes if total_changes > 0 else 0
+    counts = change_listing.status_counts(db)
+    total_changes = counts["total"]
+    automation_rate = counts["automated"] / total_changes if total_changes > 0 else 0
+    review_rate = counts["manual"] / total_changes if total_changes > 0 else 0
     
     stats = {
         "total": total_changes,
-        "pending": pending_count,
-        "approved": approved_count,
+        "pending": counts["pending"],
+        "approved": counts["approved"],
         "automation_rate": automation_rate,
         "review_rate": review_rate,
     }
@@ -442,7 +352,8 @@ async def triage_dashboard(
 
 
 @router.get("/search", response_class=HTMLResponse)
-async def search_page(
+@blocking("external")
+def search_page(
     request: Request,
     q: Optional[str] = None,
     state: Optional[str] = None,
@@ -453,9 +364,11 @@ async def search_page(
     error = None
     results = None
     total_results = 0
+    facets = None
     
     if q:
-        response = kendra_search_service.search(
+        search_service = kendra_search_service if kendra_search_service.is_enabled() else local_search_service
+        response = search_service.search(
             db=db,
             query=q,
             state=state,
@@ -473,8 +386,11 @@ async def search_page(
                 if result.excerpt and len(result.excerpt) > 300:
                     excerpt_to_highlight += "..."
                 
-                # Highlight search terms in excerpt and title
-                highlighted_excerpt = highlight_search_terms(excerpt_to_highlight, q) if excerpt_to_highlight else None
+                # Highlight search terms in excerpt and title (local search marks the matched terms itself)
+                if result.highlights is not None:
+                    highlighted_excerpt = highlight_spans(result.excerpt or "", result.highlights)
+                else:
+                    highlighted_excerpt = highlight_search_terms(excerpt_to_highlight, q) if excerpt_to_highlight else None
                 highlighted_title = highlight_search_terms(result.title or "", q) if result.title else None
                 
                 results.append({
@@ -492,6 +408,7 @@ async def search_page(
                     "domain_category": result.domain_category
                 })
             total_results = response.total_results
+            facets = response.facets
     
     return templates.TemplateResponse(
         "search.html",
@@ -502,6 +419,7 @@ async def search_page(
             "domain": domain,
             "results": results,
             "total_results": total_results,
+            "facets": facets,
             "error": error,
             "now": datetime.utcnow()
         }
@@ -509,7 +427,8 @@ async def search_page(
 
 
 @router.get("/metrics", response_class=HTMLResponse)
-async def metrics_dashboard(request: Request, db: Session = Depends(get_db)):
+@blocking("db")
+def metrics_dashboard(request: Request, db: Session = Depends(get_db)):
     """
     Metrics Dashboard - Shows KPIs and trends.
     Replaces manual spreadsheet tracking per PoC Section 5.
@@ -532,25 +451,19 @@ async def metrics_dashboard(request: Request, db: Session = Depends(get_db)):
 
 
 @router.post("/monitor/run", response_class=HTMLResponse)
-async def run_monitoring_form(
+@blocking("db")
+def run_monitoring_form(
     request: Request,
     url_id: Optional[int] = Form(None),
     db: Session = Depends(get_db)
 ):
     """
     HTML form handler for triggering monitoring run.
-    Redirects back to dashboard after completion with cache-busting.
+    Queues the run and redirects to the dashboard, which follows its progress.
     """
-    from cli import MonitoringOrchestrator
-    from datetime import datetime
-    
     try:
-        orchestrator = MonitoringOrchestrator()
-        results = orchestrator.run_cycle(db, url_id, max_workers=None)  # Uses config default
-        
-        # Redirect back to dashboard with timestamp to force refresh
-        timestamp = int(datetime.utcnow().timestamp())
-        return RedirectResponse(url=f"/?refresh={timestamp}", status_code=303)
+        job = job_runner.enqueue(db, triggered_by="manual", url_id=url_id)
+        return RedirectResponse(url=f"/?job={job.id}", status_code=303)
     except Exception as e:
         # On error, redirect with error message
         import urllib.parse
@@ -563,7 +476,8 @@ async def run_monitoring_form(
 # ============================================================================
 
 @router.get("/api/urls", response_model=list[MonitoredURLResponse])
-async def list_urls(
+@blocking("db")
+def list_urls(
     state: Optional[str] = None,
     domain: Optional[str] = None,
     enabled_only: bool = True,
@@ -613,8 +527,94 @@ async def list_urls(
     return result
 
 
+@router.get("/api/urls/page", response_model=URLPageResponse)
+@blocking("db")
+def list_urls_page(
+    view: str = "dashboard",
+    state: Optional[str] = None,
+    domain: Optional[str] = None,
+    search: Optional[str] = None,
+    enabled_only: Optional[bool] = None,
+    sort: str = "name",
+    order: str = "asc",
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    include_html: bool = False,
+    db: Session = Depends(get_db)
+):
+    """
+    Keyset-paginated URL list used by the dashboard and URL management views.
+    
+    Args:
+        view: "dashboard" or "management" (selects row template and defaults)
+        state: Filter by state
+        domain: Filter by domain category
+        search: Case-insensitive match on name, URL, state or domain
+        enabled_only: Only enabled URLs (default: True for dashboard, False for management)
+        sort: name, url, state, domain, last_checked or last_change
+        order: asc or desc
+        cursor: next_cursor from the previous page
+        limit: Page size (capped by URL_LIST_MAX_PAGE_SIZE)
+        include_html: Also return the rendered table rows for the view
+    """
+    if view not in ("dashboard", "management"):
+        raise HTTPException(status_code=400, detail="Invalid view. Must be 'dashboard' or 'management'")
+    
+    if enabled_only is None:
+        enabled_only = view == "dashboard"
+    
+    filters = URLFilters(state=state, domain=domain, search=search, enabled_only=enabled_only)
+    try:
+        page = url_listing.get_page(
+            db, filters, sort=sort, order=order, cursor=cursor, limit=limit,
+            with_latest=view == "dashboard"
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    items = []
+    for item in page.items:
+        url = item["url"]
+        latest_version = item["latest_version"]
+        recent_change = item["recent_change"]
+        items.append(URLListItem(
+            id=url.id,
+            name=url.name,
+            url=url.url,
+            enabled=url.enabled,
+            state=url.state,
+            domain_category=url.domain_category,
+            last_checked_at=url.last_checked_at,
+            last_change_at=url.last_change_at,
+            version_count=item["version_count"],
+            pending_changes=item["pending_changes"],
+            latest_version_id=latest_version.id if latest_version else None,
+            formatted_title=latest_version.formatted_title if latest_version else None,
+            form_number=latest_version.form_number if latest_version else None,
+            recent_change_id=recent_change.id if recent_change else None,
+            recent_change_type=recent_change.change_type if recent_change else None,
+            recent_change_reviewed=recent_change.reviewed if recent_change else None,
+            relocation_near_misses=item["relocation_near_misses"]
+        ))
+    
+    html = None
+    if include_html:
+        template_name = "partials/dashboard_rows.html" if view == "dashboard" else "partials/url_management_rows.html"
+        html = templates.get_template(template_name).render(urls=page.items, current_state=state)
+    
+    return URLPageResponse(
+        items=items,
+        next_cursor=page.next_cursor,
+        limit=page.limit,
+        sort=page.sort,
+        order=page.order,
+        html=html
+    )
+
+
 @router.get("/api/url-filters")
-async def get_url_filters(db: Session = Depends(get_db)):
+@blocking("db")
+def get_url_filters(db: Session = Depends(get_db)):
     """
     Get available filters for URLs (states and domain categories).
     
@@ -648,7 +648,8 @@ async def get_url_filters(db: Session = Depends(get_db)):
 
 
 @router.post("/api/urls", response_model=MonitoredURLResponse)
-async def create_url(url_data: MonitoredURLCreate, db: Session = Depends(get_db)):
+@blocking("db")
+def create_url(url_data: MonitoredURLCreate, db: Session = Depends(get_db)):
     """Create a new monitored URL."""
     # Check for duplicate
     existing = db.query(MonitoredURL).filter(
@@ -681,8 +682,46 @@ async def create_url(url_data: MonitoredURLCreate, db: Session = Depends(get_db)
     )
 
 
+@router.get("/api/urls/duplicates")
+@blocking("db")
+def list_duplicate_forms(
+    batch_id: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    URLs whose latest version is the same form as another monitored URL's.
+    
+    Flagged by the form fingerprint index as versions are created, so after a
+    bulk import the same form under several URLs shows up once each is checked.
+    
+    Args:
+        batch_id: Only URLs from this bulk import batch
+    
+    Returns:
+        JSON with the flagged URLs
+    """
+    duplicates = form_fingerprint_index.duplicates(db, import_batch_id=batch_id)
+    return {
+        "success": True,
+        "batch_id": batch_id,
+        "total_results": len(duplicates),
+        "results": [
+            {
+                "url_id": d.monitored_url_id,
+                "url": d.url,
+                "duplicate_of_url_id": d.duplicate_of_url_id,
+                "duplicate_of_url": d.duplicate_of_url,
+                "similarity": d.similarity,
+                "import_batch_id": d.import_batch_id
+            }
+            for d in duplicates
+        ]
+    }
+
+
 @router.get("/api/urls/{url_id}", response_model=MonitoredURLResponse)
-async def get_url(url_id: int, db: Session = Depends(get_db)):
+@blocking("db")
+def get_url(url_id: int, db: Session = Depends(get_db)):
     """Get a specific monitored URL."""
     url = db.query(MonitoredURL).filter(MonitoredURL.id == url_id).first()
     
@@ -709,7 +748,8 @@ async def get_url(url_id: int, db: Session = Depends(get_db)):
 
 
 @router.delete("/api/urls/{url_id}")
-async def delete_url(url_id: int, db: Session = Depends(get_db)):
+@blocking("db")
+def delete_url(url_id: int, db: Session = Depends(get_db)):
     """Delete a monitored URL and all its versions."""
     url = db.query(MonitoredURL).filter(MonitoredURL.id == url_id).first()
     
@@ -721,22 +761,27 @@ async def delete_url(url_id: int, db: Session = Depends(get_db)):
     for version_id in versions:
         file_store.delete_version(url_id, version_id)
     
-    # Delete database records (cascades to versions and changes)
+    # Delete database records (cascades to versions and changes); the rollup
+    # refresh can't find days of deleted changes, so collect them first
+    change_days = metrics_tracker.change_days(db, [url_id])
     db.delete(url)
     db.commit()
+    metrics_tracker.refresh_rollup_days(db, change_days)
     
     return {"status": "deleted", "url_id": url_id}
 
 
 @router.get("/api/urls/{url_id}/versions", response_model=list[PDFVersionResponse])
-async def list_versions(url_id: int, db: Session = Depends(get_db)):
+@blocking("db")
+def list_versions(url_id: int, db: Session = Depends(get_db)):
     """List all versions for a URL."""
     versions = version_manager.get_version_history(db, url_id)
     return [PDFVersionResponse.model_validate(v) for v in versions]
 
 
 @router.get("/api/urls/{url_id}/versions/{version_id}/pdf")
-async def get_version_pdf(
+@blocking("db")
+def get_version_pdf(
     url_id: int,
     version_id: int,
     normalized: bool = False,
@@ -758,7 +803,8 @@ async def get_version_pdf(
 
 
 @router.get("/api/urls/{url_id}/versions/{version_id}/text")
-async def get_version_text(
+@blocking("db")
+def get_version_text(
     url_id: int,
     version_id: int,
     db: Session = Depends(get_db)
@@ -773,7 +819,8 @@ async def get_version_text(
 
 
 @router.get("/api/urls/{url_id}/versions/{version_id}/preview")
-async def get_version_preview(
+@blocking("render")
+def get_version_preview(
     url_id: int,
     version_id: int,
     db: Session = Depends(get_db)
@@ -789,20 +836,19 @@ async def get_version_preview(
             filename=f"preview_{version_id}.png"
         )
     
-    # If no preview exists, generate it on the fly
-    pdf_path = version_manager.get_original_pdf_path(db, version_id)
-    if not pdf_path or not pdf_path.exists():
+    # If no preview exists, generate it on the fly (from the shared raster cache)
+    version = version_manager.get_version(db, version_id)
+    pdf_path = file_store.get_original_pdf(version.monitored_url_id, version.id) if version else None
+    if not pdf_path:
         raise HTTPException(status_code=404, detail="PDF not found")
     
     try:
-        from services.title_extractor import TitleExtractor
-        extractor = TitleExtractor()
-        
-        # Generate preview
-        preview_output = file_store.get_preview_image_path(url_id, version_id)
-        image_bytes = extractor.convert_pdf_to_image(pdf_path, preview_output)
+        image_bytes = page_raster_cache.render_png(
+            pdf_path, page_num=0, dpi=150, pdf_hash=version.pdf_hash
+        )
         
-        if image_bytes and preview_output.exists():
+        if image_bytes:
+            preview_output = file_store.store_preview_image(url_id, version_id, image_bytes)
             return FileResponse(
                 preview_output,
                 media_type="image/png",
@@ -815,7 +861,8 @@ async def get_version_preview(
 
 
 @router.get("/api/urls/{url_id}/versions/{version_id}/diff-preview")
-async def get_diff_preview(
+@blocking("render")
+def get_diff_preview(
     url_id: int,
     version_id: int,
     page: int = 0,
@@ -910,16 +957,20 @@ async def get_diff_preview(
                 old_pdf_path=prev_pdf,
                 new_pdf_path=curr_pdf,
                 output_path=diff_output,
-                page_num=page
+                page_num=page,
+                old_pdf_hash=prev_version.pdf_hash,
+                new_pdf_hash=version.pdf_hash
             )
         else:
             # Generate overlay diff
             diff_output = file_store.get_diff_image_path(url_id, version_id, page)
-            result = differ.generate_diff(
+            result = differ.generate_page_diff(
                 old_pdf_path=prev_pdf,
                 new_pdf_path=curr_pdf,
                 output_path=diff_output,
-                page_num=page
+                page_num=page,
+                old_pdf_hash=prev_version.pdf_hash,
+                new_pdf_hash=version.pdf_hash
             )
         
         if result.success and result.diff_image_path.exists():
@@ -930,13 +981,14 @@ async def get_diff_preview(
             )
         else:
             raise HTTPException(status_code=500, detail=f"Failed to generate diff: {result.error}")
-            
+    
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating diff: {str(e)}")
 
 
 @router.get("/api/urls/{url_id}/versions/{version_id}/diff-info")
-async def get_diff_info(
+@blocking("db")
+def get_diff_info(
     url_id: int,
     version_id: int,
     db: Session = Depends(get_db)
@@ -971,7 +1023,8 @@ async def get_diff_info(
 
 
 @router.post("/api/urls/{url_id}/versions/{version_id}/extract-title")
-async def extract_title_for_version(
+@blocking("external")
+def extract_title_for_version(
     url_id: int,
     version_id: int,
     db: Session = Depends(get_db)
@@ -1013,6 +1066,12 @@ async def extract_title_for_version(
     version.form_number = result.form_number
     version.title_confidence = result.combined_confidence
     version.title_extraction_method = result.extraction_method
+    if settings.LOCAL_SEARCH_ENABLED:
+        try:
+            local_search_service.update_title(db, version)
+        except Exception as e:
+            # The search table can be rebuilt later
+            logger.warning("Local search title update failed", version_id=version.id, error=str(e))
     db.commit()
     
     return {
@@ -1025,7 +1084,8 @@ async def extract_title_for_version(
 
 
 @router.post("/api/changes/{change_id}/approve")
-async def approve_change(
+@blocking("db")
+def approve_change(
     change_id: int,
     notes: str = None,
     db: Session = Depends(get_db)
@@ -1053,7 +1113,8 @@ async def approve_change(
 
 
 @router.post("/api/changes/{change_id}/unapprove")
-async def unapprove_change(
+@blocking("db")
+def unapprove_change(
     change_id: int,
     db: Session = Depends(get_db)
 ):
@@ -1068,8 +1129,13 @@ async def unapprove_change(
     change.reviewed_at = None
     change.review_notes = None
     change.review_status = "pending"
+    url_state_tracker.refresh_pending(db, [change.monitored_url_id])
     db.commit()
     
+    # Un-reviewing clears reviewed_at, so the rollup refresh can't spot it
+    if change.detected_at:
+        metrics_tracker.refresh_rollup_days(db, [change.detected_at.date()])
+    
     return {
         "success": True,
         "change_id": change_id,
@@ -1082,7 +1148,8 @@ async def unapprove_change(
 # ============================================================================
 
 @router.post("/api/triage/review/{change_id}", response_model=ReviewResponse)
-async def review_change(
+@blocking("db")
+def review_change(
     change_id: int,
     review: ReviewRequest,
     db: Session = Depends(get_db)
@@ -1109,6 +1176,7 @@ async def review_change(
     change.reviewed_at = datetime.utcnow()
     change.reviewed_by = review.reviewed_by or "system"
     change.review_notes = review.notes
+    url_state_tracker.refresh_pending(db, [change.monitored_url_id])
     db.commit()
     
     return ReviewResponse(
@@ -1121,7 +1189,8 @@ async def review_change(
 
 
 @router.post("/api/triage/bulk-review", response_model=BulkReviewResponse)
-async def bulk_review_changes(
+@blocking("db")
+def bulk_review_changes(
     request: BulkReviewRequest,
     db: Session = Depends(get_db)
 ):
@@ -1140,6 +1209,7 @@ async def bulk_review_changes(
     processed = 0
     failed = 0
     details = []
+    touched_url_ids = set()
     
     for change_id in request.change_ids:
         change = db.query(ChangeLog).filter(ChangeLog.id == change_id).first()
@@ -1159,6 +1229,7 @@ async def bulk_review_changes(
             change.reviewed_at = datetime.utcnow()
             change.reviewed_by = request.reviewed_by or "bulk_action"
             change.review_notes = request.notes
+            touched_url_ids.add(change.monitored_url_id)
             
             processed += 1
             details.append({
@@ -1174,6 +1245,7 @@ async def bulk_review_changes(
                 "error": str(e)
             })
     
+    url_state_tracker.refresh_pending(db, touched_url_ids)
     db.commit()
     
     return BulkReviewResponse(
@@ -1185,7 +1257,8 @@ async def bulk_review_changes(
 
 
 @router.post("/api/triage/override/{change_id}")
-async def override_classification(
+@blocking("db")
+def override_classification(
     change_id: int,
     override: ClassificationOverrideRequest,
     db: Session = Depends(get_db)
@@ -1230,7 +1303,8 @@ async def override_classification(
 
 
 @router.post("/api/triage/auto-approve-eligible")
-async def auto_approve_eligible(db: Session = Depends(get_db)):
+@blocking("db")
+def auto_approve_eligible(db: Session = Depends(get_db)):
     """
     Auto-approve all changes that meet the auto-approve threshold.
     Used for batch processing of high-confidence changes.
@@ -1252,6 +1326,7 @@ async def auto_approve_eligible(db: Session = Depends(get_db)):
         change.review_notes = f"Automatically approved (confidence >= {settings.AUTO_APPROVE_THRESHOLD})"
         approved_count += 1
     
+    url_state_tracker.refresh_pending(db, {change.monitored_url_id for change in eligible})
     db.commit()
     
     return {
@@ -1262,7 +1337,8 @@ async def auto_approve_eligible(db: Session = Depends(get_db)):
 
 
 @router.post("/api/triage/approve-all-pending")
-async def approve_all_pending(db: Session = Depends(get_db)):
+@blocking("db")
+def approve_all_pending(db: Session = Depends(get_db)):
     """
     Approve all pending changes.
     """
@@ -1280,6 +1356,7 @@ async def approve_all_pending(db: Session = Depends(get_db)):
         change.review_notes = "Bulk approved all pending changes"
         approved_count += 1
     
+    url_state_tracker.refresh_pending(db, {change.monitored_url_id for change in pending})
     db.commit()
     
     return {
@@ -1290,7 +1367,8 @@ async def approve_all_pending(db: Session = Depends(get_db)):
 
 
 @router.post("/api/triage/dismiss-false-positives")
-async def dismiss_false_positives(db: Session = Depends(get_db)):
+@blocking("db")
+def dismiss_false_positives(db: Session = Depends(get_db)):
     """
     Auto-dismiss all format-only changes (false positives).
     """
@@ -1310,6 +1388,7 @@ async def dismiss_false_positives(db: Session = Depends(get_db)):
         change.recommended_action = "false_positive"
         dismissed_count += 1
     
+    url_state_tracker.refresh_pending(db, {change.monitored_url_id for change in false_positives})
     db.commit()
     
     return {
@@ -1320,16 +1399,14 @@ async def dismiss_false_positives(db: Session = Depends(get_db)):
 
 
 @router.get("/api/changes", response_model=list[ChangeLogResponse])
-async def list_changes(limit: int = 50, db: Session = Depends(get_db)):
+@blocking("db")
+def list_changes(limit: int = 50, db: Session = Depends(get_db)):
     """List recent changes across all URLs."""
-    changes = version_manager.get_recent_changes(db, limit=limit)
+    items = change_listing.list_changes(db, limit=limit, enabled_only=False, with_details=True)
     
     result = []
-    for change in changes:
-        url = db.query(MonitoredURL).filter(
-            MonitoredURL.id == change.monitored_url_id
-        ).first()
-        
+    for item in items:
+        change, url = item["change"], item["url"]
         result.append(ChangeLogResponse(
             id=change.id,
             monitored_url_id=change.monitored_url_id,
@@ -1347,44 +1424,192 @@ async def list_changes(limit: int = 50, db: Session = Depends(get_db)):
     return result
 
 
-@router.post("/api/monitor/run", response_model=MonitoringRunResponse)
-async def run_monitoring(
+@router.post("/api/monitor/run", response_model=MonitoringJobResponse, status_code=202)
+@blocking("db")
+def run_monitoring(
     request: MonitoringRunRequest,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """
     Trigger a monitoring run.
     
-    Runs synchronously for now. In production, use background tasks.
+    Returns the queued job at once; follow it with /api/jobs/{id} or
+    /api/jobs/{id}/events.
+    """
+    if request.url_id is not None and not db.get(MonitoredURL, request.url_id):
+        raise HTTPException(status_code=404, detail="URL not found")
+    
+    job = job_runner.enqueue(
+        db, triggered_by="api", url_id=request.url_id, max_workers=request.max_workers
+    )
+    return MonitoringJobResponse(**job_to_dict(job))
+
+
+@router.get("/api/jobs", response_model=list[MonitoringJobResponse])
+@blocking("db")
+def list_monitoring_jobs(
+    status: Optional[str] = None,
+    limit: int = 50,
+    db: Session = Depends(get_db)
+):
+    """List monitoring jobs, most recent first."""
+    jobs = job_runner.list_jobs(db, limit=min(max(limit, 1), 500), status=status)
+    return [MonitoringJobResponse(**job_to_dict(job)) for job in jobs]
+
+
+@router.get("/api/jobs/{job_id}", response_model=MonitoringJobResponse)
+@blocking("db")
+def get_monitoring_job(job_id: int, db: Session = Depends(get_db)):
+    """Get a monitoring job's status and progress."""
+    job = db.get(MonitoringJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return MonitoringJobResponse(**job_to_dict(job))
+
+
+@router.post("/api/jobs/{job_id}/cancel", response_model=MonitoringJobResponse)
+@blocking("db")
+def cancel_monitoring_job(job_id: int, db: Session = Depends(get_db)):
+    """
+    Cancel a monitoring job.
+    
+    A queued job is cancelled at once; a running job stops starting new URLs
+    and finishes as cancelled (its cycle is recorded as partial).
+    """
+    try:
+        job = job_runner.cancel(db, job_id)
+    except JobStateError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return MonitoringJobResponse(**job_to_dict(job))
+
+
+@router.post("/api/jobs/{job_id}/resume", response_model=MonitoringJobResponse, status_code=202)
+@blocking("db")
+def resume_monitoring_job(job_id: int, db: Session = Depends(get_db)):
+    """Resume a cancelled, failed or interrupted job, skipping URLs it already checked."""
+    try:
+        job = job_runner.resume(db, job_id)
+    except JobStateError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return MonitoringJobResponse(**job_to_dict(job))
+
+
+@router.get("/api/relocations", response_model=list[RelocationTaskResponse])
+@blocking("db")
+def list_relocation_tasks(
+    status: Optional[str] = None,
+    limit: int = 50,
+    db: Session = Depends(get_db)
+):
+    """List relocation searches queued for URLs that returned 404, most recent first."""
+    tasks = relocation_queue.list_tasks(db, limit=min(max(limit, 1), 500), status=status)
+    return [RelocationTaskResponse(**task_to_dict(task)) for task in tasks]
+
+
+@router.post("/api/relocations/{task_id}/cancel", response_model=RelocationTaskResponse)
+@blocking("db")
+def cancel_relocation_task(task_id: int, db: Session = Depends(get_db)):
+    """Cancel a queued relocation search."""
+    try:
+        task = relocation_queue.cancel(db, task_id)
+    except RelocationStateError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if not task:
+        raise HTTPException(status_code=404, detail="Relocation task not found")
+    return RelocationTaskResponse(**task_to_dict(task))
+
+
+def _sse(seq: Optional[int], event: str, data: dict) -> str:
+    """Format one server-sent event."""
+    lines = [f"id: {seq}"] if seq is not None else []
+    lines += [f"event: {event}", f"data: {json.dumps(data)}"]
+    return "\n".join(lines) + "\n\n"
+
+
+@router.get("/api/jobs/{job_id}/events")
+@nonblocking
+async def stream_monitoring_job(job_id: int, request: Request):
     """
-    from cli import MonitoringOrchestrator
+    Stream a job's progress as server-sent events.
     
-    orchestrator = MonitoringOrchestrator()
-    results = orchestrator.run_cycle(db, request.url_id, max_workers=None)  # Uses config default
+    Events: "status" (job dict on every state change), "progress" (counts)
+    and "outcome" (one per checked URL, with the running counts). The
+    stream ends once the job finishes. Reconnecting clients send
+    Last-Event-ID and receive only the events they missed.
     
-    return MonitoringRunResponse(**results)
+    A job running in another process (e.g. the CLI) is followed by polling
+    its stored counts, which are saved every JOB_PROGRESS_PERSIST_SECONDS.
+    """
+    snapshot = await run_blocking("db", job_runner.snapshot, job_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    try:
+        last_seq = int(request.headers.get("last-event-id", 0))
+    except ValueError:
+        last_seq = 0
+    poll_seconds = settings.JOB_EVENTS_POLL_MS / 1000
+    
+    async def events():
+        nonlocal last_seq, snapshot
+        yield _sse(None, "status", snapshot)
+        last_sent = snapshot
+        
+        while True:
+            buffered = job_runner.events_since(job_id, last_seq)
+            for seq, event, data in buffered:
+                last_seq = seq
+                yield _sse(seq, event, data)
+                if event == "status":
+                    last_sent = data
+            
+            if last_sent["status"] in FINISHED_STATUSES:
+                return
+            if await request.is_disconnected():
+                return
+            
+            await asyncio.sleep(poll_seconds)
+            
+            if not buffered and not job_runner.is_active(job_id):
+                # Not running here: follow the stored job instead
+                snapshot = await run_blocking("db", job_runner.snapshot, job_id)
+                if snapshot is None:
+                    return
+                if snapshot != last_sent:
+                    last_sent = snapshot
+                    yield _sse(None, "status", snapshot)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.get("/api/status", response_model=StatusResponse)
-async def get_status(db: Session = Depends(get_db)):
+@blocking("db")
+def get_status(db: Session = Depends(get_db)):
     """Get system status."""
     total_urls = db.query(MonitoredURL).count()
     enabled_urls = db.query(MonitoredURL).filter(MonitoredURL.enabled == True).count()
-    total_versions = db.query(PDFVersion).count()
-    total_changes = db.query(ChangeLog).count()
+    totals = url_state_tracker.get_totals(db)
     storage_size = file_store.get_storage_size()
     
     return StatusResponse(
         total_urls=total_urls,
         enabled_urls=enabled_urls,
-        total_versions=total_versions,
-        total_changes=total_changes,
+        total_versions=totals["total_versions"],
+        total_changes=totals["total_changes"],
         storage_size_bytes=storage_size
     )
 
 
 @router.get("/api/aws-calls")
+@nonblocking
 async def get_aws_calls():
     """Get AWS API call counts."""
     from services.api_counter import api_counter
@@ -1396,7 +1621,8 @@ async def get_aws_calls():
 # ============================================================================
 
 @router.get("/api/metrics")
-async def get_metrics(
+@blocking("db")
+def get_metrics(
     period: str = "monthly",
     year: Optional[int] = None,
     month: Optional[int] = None,
@@ -1433,7 +1659,8 @@ async def get_metrics(
 
 
 @router.get("/api/metrics/accuracy")
-async def get_accuracy_metrics(
+@blocking("db")
+def get_accuracy_metrics(
     days: int = 30,
     db: Session = Depends(get_db)
 ):
@@ -1443,7 +1670,8 @@ async def get_accuracy_metrics(
 
 
 @router.get("/api/metrics/jurisdiction")
-async def get_jurisdiction_metrics(
+@blocking("db")
+def get_jurisdiction_metrics(
     year: Optional[int] = None,
     month: Optional[int] = None,
     db: Session = Depends(get_db)
@@ -1468,32 +1696,51 @@ async def get_jurisdiction_metrics(
 # ============================================================================
 
 @router.get("/api/search")
-async def search_forms(
+@blocking("external")
+def search_forms(
     q: str,
     state: Optional[str] = None,
     domain: Optional[str] = None,
     max_results: int = 20,
+    source: str = "auto",
     db: Session = Depends(get_db)
 ):
     """
-    Semantic search across all monitored forms using AWS Kendra.
+    Search across all monitored forms.
+    
+    Uses AWS Kendra semantic search when it is enabled; otherwise (or with
+    source=local) the local full-text index, which also returns state and
+    domain facet counts and the matched terms' offsets in each excerpt.
     
     Args:
         q: Natural language search query
         state: Optional state filter
         domain: Optional domain category filter
         max_results: Maximum number of results (default: 20)
-        
+        source: "auto", "kendra" or "local"
+    
     Returns:
         JSON with search results
     """
-    if not kendra_search_service.is_enabled():
+    if source not in ("auto", "kendra", "local"):
+        raise HTTPException(status_code=400, detail="source must be auto, kendra or local")
+    
+    if source == "local" or (source == "auto" and not kendra_search_service.is_enabled()):
+        search_service = local_search_service
+        if not local_search_service.is_enabled(db):
+            raise HTTPException(
+                status_code=503,
+                detail="Neither Kendra nor local search is available. Check the KENDRA_SEARCH_ENABLED and LOCAL_SEARCH_ENABLED settings."
+            )
+    elif not kendra_search_service.is_enabled():
         raise HTTPException(
             status_code=503,
             detail="Kendra search is not enabled or not available. Check AWS credentials and KENDRA_SEARCH_ENABLED setting."
         )
+    else:
+        search_service = kendra_search_service
     
-    response = kendra_search_service.search(
+    response = search_service.search(
         db=db,
         query=q,
         state=state,
@@ -1510,7 +1757,7 @@ async def search_forms(
     # Convert results to dict format
     results = []
     for result in response.results:
-        results.append({
+        item = {
             "url_id": result.url_id,
             "version_id": result.version_id,
             "url_name": result.url_name,
@@ -1521,34 +1768,53 @@ async def search_forms(
             "relevance_score": result.relevance_score,
             "state": result.state,
             "domain_category": result.domain_category
-        })
+        }
+        if result.highlights is not None:
+            item["highlights"] = result.highlights
+        results.append(item)
     
-    return {
+    payload = {
         "success": True,
         "query": q,
+        "source": "local" if search_service is local_search_service else "kendra",
         "total_results": response.total_results,
         "results": results
     }
+    if response.facets is not None:
+        payload["facets"] = response.facets
+    return payload
 
 
 @router.get("/api/urls/{url_id}/similar")
-async def get_similar_forms(
+@blocking("external")
+def get_similar_forms(
     url_id: int,
     version_id: Optional[int] = None,
     max_results: int = 10,
+    source: str = "auto",
     db: Session = Depends(get_db)
 ):
     """
-    Find similar forms to a given form using Kendra.
+    Find similar forms to a given form.
+    
+    Uses Kendra when it is enabled; otherwise (or with source=local) the
+    local form fingerprint index, which needs no network calls.
     
     Args:
         url_id: Monitored URL ID
         version_id: Optional version ID (uses latest if not provided)
         max_results: Maximum number of similar forms to return
-        
+        source: "auto", "kendra" or "local"
+    
     Returns:
         JSON with similar forms
     """
+    if source not in ("auto", "kendra", "local"):
+        raise HTTPException(status_code=400, detail="source must be auto, kendra or local")
+    
+    if source == "local" or (source == "auto" and not kendra_search_service.is_enabled()):
+        return _similar_forms_local(db, url_id, version_id, max_results)
+    
     if not kendra_search_service.is_enabled():
         raise HTTPException(
             status_code=503,
@@ -1593,8 +1859,67 @@ async def get_similar_forms(
     }
 
 
+def _similar_forms_local(db: Session, url_id: int, version_id: Optional[int], max_results: int) -> dict:
+    """Similar forms from the form fingerprint index, in the Kendra response format."""
+    if version_id:
+        version = db.query(PDFVersion).filter(
+            PDFVersion.id == version_id,
+            PDFVersion.monitored_url_id == url_id
+        ).first()
+        text = file_store.get_extracted_text(url_id, version_id) if version else None
+        if text is None:
+            raise HTTPException(status_code=404, detail=f"Version {version_id} not found for URL {url_id}")
+        matches = form_fingerprint_index.query(
+            db,
+            text=text,
+            min_similarity=settings.FORM_FINGERPRINT_SIMILAR_THRESHOLD,
+            limit=max_results,
+            exclude_url_id=url_id
+        )
+    else:
+        matches = form_fingerprint_index.similar_to_url(db, url_id, limit=max_results)
+    
+    urls_by_id = {
+        url.id: url for url in
+        db.query(MonitoredURL).filter(MonitoredURL.id.in_([m.monitored_url_id for m in matches])).all()
+    } if matches else {}
+    versions_by_id = {
+        version.id: version for version in
+        db.query(PDFVersion).filter(PDFVersion.id.in_([m.version_id for m in matches])).all()
+    } if matches else {}
+    
+    results = []
+    for match in matches:
+        url = urls_by_id.get(match.monitored_url_id)
+        if not url or not url.enabled:
+            continue
+        version = versions_by_id.get(match.version_id)
+        results.append({
+            "url_id": url.id,
+            "version_id": match.version_id,
+            "url_name": url.name,
+            "url": url.url,
+            "form_number": version.form_number if version else None,
+            "title": (version.display_title if version else None) or url.name,
+            "excerpt": None,
+            "relevance_score": round(match.similarity * 100, 1),
+            "state": url.state,
+            "domain_category": url.domain_category
+        })
+    
+    return {
+        "success": True,
+        "url_id": url_id,
+        "version_id": version_id,
+        "source": "local",
+        "total_results": len(results),
+        "results": results
+    }
+
+
 @router.post("/api/kendra/index/{version_id}")
-async def index_version(
+@blocking("external")
+def index_version(
     version_id: int,
     force: bool = False,
     db: Session = Depends(get_db)
@@ -1605,7 +1930,7 @@ async def index_version(
     Args:
         version_id: PDF version ID to index
         force: If True, re-index even if already indexed
-        
+    
     Returns:
         JSON with indexing result
     """
@@ -1631,7 +1956,8 @@ async def index_version(
 
 
 @router.get("/api/kendra/status")
-async def get_kendra_status():
+@blocking("external")
+def get_kendra_status():
     """
     Get Kendra index status and configuration.
     
@@ -1653,14 +1979,16 @@ async def get_kendra_status():
 # ============================================================================
 
 @router.get("/api/schedule", response_model=SchedulerStatusResponse)
-async def get_schedule_status():
+@blocking("db")
+def get_schedule_status():
     """Get current scheduler status and configuration."""
     from services.scheduler import get_scheduler_status
     return get_scheduler_status()
 
 
 @router.put("/api/schedule", response_model=ScheduleConfigResponse)
-async def update_schedule(
+@blocking("db")
+def update_schedule(
     config: ScheduleConfigUpdate,
     db: Session = Depends(get_db)
 ):
@@ -1693,16 +2021,26 @@ async def update_schedule(
 
 
 @router.post("/api/monitor/run-now")
-async def trigger_manual_cycle(db: Session = Depends(get_db)):
-    """Trigger a manual monitoring cycle."""
+@blocking("db")
+def trigger_manual_cycle(db: Session = Depends(get_db)):
+    """
+    Trigger a manual monitoring cycle.
+    
+    The cycle runs as a monitoring job; its cycle row is created when the job
+    starts, so cycle_id is null while the job is still queued. Follow the job
+    at /api/jobs/{job_id}.
+    """
     from services.scheduler import trigger_manual_cycle
+    from db.models import MonitoringJob
     
-    cycle_id = trigger_manual_cycle(triggered_by="api")
+    job_id = trigger_manual_cycle(triggered_by="api")
+    job = db.get(MonitoringJob, job_id)
     
     return {
         "success": True,
-        "cycle_id": cycle_id,
-        "message": "Monitoring cycle started in background"
+        "job_id": job_id,
+        "cycle_id": job.cycle_id if job else None,
+        "message": "Monitoring cycle queued"
     }
 
 
@@ -1711,7 +2049,8 @@ async def trigger_manual_cycle(db: Session = Depends(get_db)):
 # ============================================================================
 
 @router.put("/api/urls/{url_id}", response_model=MonitoredURLFullResponse)
-async def update_url(
+@blocking("db")
+def update_url(
     url_id: int,
     update: MonitoredURLUpdate,
     db: Session = Depends(get_db)
@@ -1780,7 +2119,8 @@ async def update_url(
 
 
 @router.post("/api/urls/bulk-delete", response_model=BulkDeleteResponse)
-async def bulk_delete_urls(
+@blocking("db")
+def bulk_delete_urls(
     request: BulkDeleteRequest,
     db: Session = Depends(get_db)
 ):
@@ -1790,6 +2130,8 @@ async def bulk_delete_urls(
     deleted = 0
     failed = 0
     details = []
+    # The rollup refresh can't find days of deleted changes, so collect them first
+    change_days = metrics_tracker.change_days(db, request.url_ids)
     
     for url_id in request.url_ids:
         url = db.query(MonitoredURL).filter(MonitoredURL.id == url_id).first()
@@ -1812,6 +2154,7 @@ async def bulk_delete_urls(
             details.append({"url_id": url_id, "success": False, "error": str(e)})
     
     db.commit()
+    metrics_tracker.refresh_rollup_days(db, change_days)
     
     return BulkDeleteResponse(
         success=failed == 0,
@@ -1822,6 +2165,7 @@ async def bulk_delete_urls(
 
 
 @router.post("/api/urls/bulk-upload", response_model=BulkUploadResponse)
+@nonblocking
 async def bulk_upload_urls(
     request: Request,
     db: Session = Depends(get_db)
@@ -1856,8 +2200,10 @@ async def bulk_upload_urls(
             detail="Unsupported file type. Use .csv or .txt"
         )
     
-    # Import URLs
-    result = bulk_importer.import_from_content(content_str, file_type, db, source="upload")
+    # Import URLs (DB writes and optional accessibility checks block)
+    result = await run_blocking(
+        "external", bulk_importer.import_from_content, content_str, file_type, db, source="upload"
+    )
     
     return BulkUploadResponse(
         success=result.success,
@@ -1878,6 +2224,7 @@ async def bulk_upload_urls(
 
 
 @router.get("/api/urls/upload-template")
+@nonblocking
 async def get_upload_template():
     """Get CSV template for bulk upload."""
     from services.bulk_importer import bulk_importer
@@ -1895,6 +2242,7 @@ async def get_upload_template():
 
 
 @router.get("/api/urls/upload-guide")
+@nonblocking
 async def get_upload_guide():
     """Get format guide for bulk uploads."""
     from services.bulk_importer import bulk_importer
@@ -1914,7 +2262,8 @@ async def get_upload_guide():
 # ============================================================================
 
 @router.get("/api/changes/{change_id}/download")
-async def download_change_pdf(
+@blocking("db")
+def download_change_pdf(
     change_id: int,
     db: Session = Depends(get_db)
 ):
@@ -1978,7 +2327,8 @@ async def download_change_pdf(
 
 
 @router.post("/api/changes/{change_id}/approve", response_model=ChangeApprovalResponse)
-async def approve_change_with_workflow(
+@blocking("db")
+def approve_change_with_workflow(
     change_id: int,
     approval: ChangeApprovalRequest = None,
     db: Session = Depends(get_db)
@@ -2019,6 +2369,7 @@ async def approve_change_with_workflow(
         if cycle:
             cycle.downloads_automated = (cycle.downloads_automated or 0) + 1
     
+    url_state_tracker.refresh_pending(db, [change.monitored_url_id])
     db.commit()
     
     return ChangeApprovalResponse(
@@ -2032,7 +2383,8 @@ async def approve_change_with_workflow(
 
 
 @router.post("/api/changes/{change_id}/intervention")
-async def record_manual_intervention(
+@blocking("db")
+def record_manual_intervention(
     change_id: int,
     intervention: ManualInterventionRequest,
     db: Session = Depends(get_db)
@@ -2073,7 +2425,8 @@ async def record_manual_intervention(
 
 
 @router.get("/api/changes-full", response_model=list[ChangeFullResponse])
-async def list_changes_full(
+@blocking("db")
+def list_changes_full(
     status: Optional[str] = None,
     change_type: Optional[str] = None,
     state: Optional[str] = None,
@@ -2085,33 +2438,18 @@ async def list_changes_full(
     
     Used by the Change Review page.
     """
-    from db.models import ChangeLog, MonitoredURL, PDFVersion
-    
-    query = db.query(ChangeLog).join(
-        MonitoredURL, ChangeLog.monitored_url_id == MonitoredURL.id
-    ).filter(MonitoredURL.enabled == True)
-    
-    if status and status != "all":
-        query = query.filter(ChangeLog.review_status == status)
-    
-    if change_type:
-        query = query.filter(ChangeLog.change_type == change_type)
-    
-    if state:
-        query = query.filter(MonitoredURL.state == state)
-    
-    changes = query.order_by(ChangeLog.detected_at.desc()).limit(limit).all()
+    items = change_listing.list_changes(
+        db,
+        limit=limit,
+        status=status,
+        change_type=change_type,
+        state=state,
+        with_details=True
+    )
     
     result = []
-    for change in changes:
-        url = db.query(MonitoredURL).filter(
-            MonitoredURL.id == change.monitored_url_id
-        ).first()
-        
-        version = db.query(PDFVersion).filter(
-            PDFVersion.id == change.new_version_id
-        ).first()
-        
+    for item in items:
+        change, url, version = item["change"], item["url"], item["version"]
         result.append(ChangeFullResponse(
             id=change.id,
             monitored_url_id=change.monitored_url_id,
@@ -2149,7 +2487,8 @@ async def list_changes_full(
 # ============================================================================
 
 @router.get("/api/audit/cycles", response_model=list[MonitoringCycleResponse])
-async def list_monitoring_cycles(
+@blocking("db")
+def list_monitoring_cycles(
     limit: int = 50,
     offset: int = 0,
     status: Optional[str] = None,
@@ -2185,12 +2524,14 @@ async def list_monitoring_cycles(
         downloads_automated=c.downloads_automated or 0,
         manual_interventions=c.manual_interventions or 0,
         triggered_by=c.triggered_by or "unknown",
-        error_count=c.error_count or 0
+        error_count=c.error_count or 0,
+        results_compacted_at=c.results_compacted_at
     ) for c in cycles]
 
 
 @router.get("/api/audit/cycles/{cycle_id}", response_model=MonitoringCycleResponse)
-async def get_monitoring_cycle(
+@blocking("db")
+def get_monitoring_cycle(
     cycle_id: int,
     db: Session = Depends(get_db)
 ):
@@ -2215,12 +2556,14 @@ async def get_monitoring_cycle(
         downloads_automated=cycle.downloads_automated or 0,
         manual_interventions=cycle.manual_interventions or 0,
         triggered_by=cycle.triggered_by or "unknown",
-        error_count=cycle.error_count or 0
+        error_count=cycle.error_count or 0,
+        results_compacted_at=cycle.results_compacted_at
     )
 
 
 @router.get("/api/audit/cycles/{cycle_id}/results", response_model=list[CycleURLResultResponse])
-async def get_cycle_results(
+@blocking("db")
+def get_cycle_results(
     cycle_id: int,
     db: Session = Depends(get_db)
 ):
@@ -2249,14 +2592,18 @@ async def get_cycle_results(
             duration_ms=r.duration_ms,
             tier_reached=r.tier_reached,
             change_detected=r.change_detected or False,
-            change_log_id=r.change_log_id
+            change_log_id=r.change_log_id,
+            skip_reason=r.skip_reason,
+            bytes_fetched=r.bytes_fetched,
+            stage_timings=r.stage_timings
         ))
     
     return response
 
 
 @router.get("/api/audit/stats", response_model=AuditStatsResponse)
-async def get_audit_stats(db: Session = Depends(get_db)):
+@blocking("db")
+def get_audit_stats(db: Session = Depends(get_db)):
     """Get overall audit statistics."""
     from db.models import MonitoringCycle, ChangeLog
     from sqlalchemy import func
@@ -2308,7 +2655,8 @@ async def get_audit_stats(db: Session = Depends(get_db)):
 
 
 @router.get("/api/audit/trends")
-async def get_audit_trends(
+@blocking("db")
+def get_audit_trends(
     period: str = "daily",
     days: int = 30,
     db: Session = Depends(get_db)
@@ -2360,12 +2708,36 @@ async def get_audit_trends(
     }
 
 
+@router.get("/api/audit/results/daily")
+@blocking("db")
+def get_audit_daily_results(
+    days: int = 30,
+    db: Session = Depends(get_db)
+):
+    """
+    Per-day, per-state URL check totals.
+    
+    Spans the retention boundary: compacted days come from the rollups,
+    recent days from the per-URL results.
+    """
+    from datetime import timedelta
+    from services.audit_retention import audit_retention
+    
+    end_date = datetime.utcnow()
+    return {
+        "start_date": (end_date - timedelta(days=days)).isoformat(),
+        "end_date": end_date.isoformat(),
+        "data": audit_retention.get_daily_results(db, days=days)
+    }
+
+
 # ============================================================================
 # New HTML Pages for Workflow
 # ============================================================================
 
 @router.get("/url-management", response_class=HTMLResponse)
-async def url_management_page(
+@blocking("db")
+def url_management_page(
     request: Request,
     state: Optional[str] = None,
     domain: Optional[str] = None,
@@ -2379,40 +2751,11 @@ async def url_management_page(
     # Get scheduler status
     scheduler_status = get_scheduler_status()
     
-    # Build query with filters
-    query = db.query(MonitoredURL)
-    
-    if state:
-        query = query.filter(MonitoredURL.state == state)
-    
-    if domain:
-        query = query.filter(MonitoredURL.domain_category == domain)
-    
-    if search:
-        query = query.filter(
-            (MonitoredURL.name.ilike(f"%{search}%")) |
-            (MonitoredURL.url.ilike(f"%{search}%"))
-        )
-    
-    urls = query.order_by(MonitoredURL.name).all()
-    
-    # Get stats for each URL
-    url_data = []
-    for url in urls:
-        version_count = db.query(PDFVersion).filter(
-            PDFVersion.monitored_url_id == url.id
-        ).count()
-        
-        pending_changes = db.query(ChangeLog).filter(
-            ChangeLog.monitored_url_id == url.id,
-            ChangeLog.review_status == "pending"
-        ).count()
-        
-        url_data.append({
-            "url": url,
-            "version_count": version_count,
-            "pending_changes": pending_changes
-        })
+    # First keyset page; the template loads further pages from /api/urls/page
+    filters = URLFilters(state=state, domain=domain, search=search)
+    page = url_listing.get_page(db, filters, with_latest=False)
+    url_data = page.items
+    total_count = url_listing.filtered_query(db, filters).count()
     
     # Get filter options
     state_counts = db.query(
@@ -2440,13 +2783,16 @@ async def url_management_page(
             "search_query": search,
             "state_counts": state_counts,
             "domain_counts": domain_counts,
+            "total_count": total_count,
+            "next_cursor": page.next_cursor,
             "now": datetime.utcnow()
         }
     )
 
 
 @router.get("/change-review", response_class=HTMLResponse)
-async def change_review_page(
+@blocking("db")
+def change_review_page(
     request: Request,
     status: str = "pending",
     change_type: Optional[str] = None,
@@ -2454,66 +2800,22 @@ async def change_review_page(
     db: Session = Depends(get_db)
 ):
     """Change Review page - Page 2 of new workflow."""
-    from sqlalchemy import func
-    
-    # Build query
-    query = db.query(ChangeLog).join(
-        MonitoredURL, ChangeLog.monitored_url_id == MonitoredURL.id
-    ).filter(MonitoredURL.enabled == True)
-    
-    if status and status != "all":
-        query = query.filter(ChangeLog.review_status == status)
-    
-    if change_type:
-        query = query.filter(ChangeLog.change_type == change_type)
-    
-    if state:
-        query = query.filter(MonitoredURL.state == state)
-    
-    changes = query.order_by(ChangeLog.detected_at.desc()).limit(100).all()
-    
-    # Enrich with URL and version data
-    change_data = []
-    for change in changes:
-        url = db.query(MonitoredURL).filter(
-            MonitoredURL.id == change.monitored_url_id
-        ).first()
-        
-        version = db.query(PDFVersion).filter(
-            PDFVersion.id == change.new_version_id
-        ).first()
-        
-        # Load relocation near-misses for relocation_failed changes
-        item = {
-            "change": change,
-            "url": url,
-            "version": version
-        }
-        if change.change_type == "relocation_failed":
-            item["relocation_near_misses"] = load_relocation_near_misses(change.monitored_url_id)
-        else:
-            item["relocation_near_misses"] = None
-        
-        change_data.append(item)
+    # Changes with URL, version and near-misses eager-loaded
+    change_data = change_listing.list_changes(
+        db,
+        limit=100,
+        status=status,
+        change_type=change_type,
+        state=state
+    )
     
     # Get filter options
-    state_counts = db.query(
-        MonitoredURL.state,
-        func.count(ChangeLog.id).label('count')
-    ).join(
-        ChangeLog, MonitoredURL.id == ChangeLog.monitored_url_id
-    ).filter(
-        MonitoredURL.state.isnot(None)
-    ).group_by(MonitoredURL.state).all()
+    state_counts = change_listing.state_counts(db)
     
     # Stats
-    total_pending = db.query(ChangeLog).filter(
-        ChangeLog.review_status == "pending"
-    ).count()
-    
-    total_approved = db.query(ChangeLog).filter(
-        ChangeLog.review_status.in_(["approved", "auto_approved"])
-    ).count()
+    counts = change_listing.status_counts(db, enabled_only=False)
+    total_pending = counts["pending"]
+    total_approved = counts["approved"]
     
     return templates.TemplateResponse(
         "change_review.html",
@@ -2532,7 +2834,8 @@ async def change_review_page(
 
 
 @router.get("/audit", response_class=HTMLResponse)
-async def audit_page(
+@blocking("db")
+def audit_page(
     request: Request,
     db: Session = Depends(get_db)
 ):
@@ -135,14 +135,47 @@ class BulkReviewResponse(BaseModel):
 class MonitoringRunRequest(BaseModel):
     """Schema for triggering a monitoring run."""
     url_id: Optional[int] = None
+    max_workers: Optional[int] = None  # Parallel URL workers (default: MAX_WORKERS)
 
 
-class MonitoringRunResponse(BaseModel):
-    """Schema for monitoring run result."""
-    processed: int
-    success: int
-    failed: int
-    details: list[dict]
+class MonitoringJobResponse(BaseModel):
+    """Schema for a background monitoring job."""
+    id: int
+    status: str  # queued, running, completed, cancelled, failed, interrupted
+    triggered_by: Optional[str] = None
+    url_id: Optional[int] = None
+    cycle_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    cancel_requested: bool = False
+    attempts: int = 0
+    error: Optional[str] = None
+    total_urls: int = 0
+    processed_urls: int = 0
+    successful: int = 0
+    failed: int = 0
+    changes: int = 0
+    skipped: int = 0
+    errors: int = 0
+
+
+class RelocationTaskResponse(BaseModel):
+    """Schema for a queued relocation search."""
+    id: int
+    monitored_url_id: int
+    status: str  # queued, running, relocated, failed, cancelled
+    failed_url: str
+    domain: Optional[str] = None
+    new_url: Optional[str] = None
+    change_log_id: Optional[int] = None
+    pages_crawled: int = 0
+    attempts: int = 0
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    not_before: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
 
 
 class StatusResponse(BaseModel):
@@ -233,6 +266,37 @@ class MonitoredURLFullResponse(BaseModel):
         from_attributes = True
 
 
+class URLListItem(BaseModel):
+    """One row of a paginated URL list."""
+    id: int
+    name: str
+    url: str
+    enabled: bool
+    state: Optional[str] = None
+    domain_category: Optional[str] = None
+    last_checked_at: Optional[datetime] = None
+    last_change_at: Optional[datetime] = None
+    version_count: int = 0
+    pending_changes: int = 0
+    latest_version_id: Optional[int] = None
+    formatted_title: Optional[str] = None
+    form_number: Optional[str] = None
+    recent_change_id: Optional[int] = None
+    recent_change_type: Optional[str] = None
+    recent_change_reviewed: Optional[bool] = None
+    relocation_near_misses: Optional[dict] = None
+
+
+class URLPageResponse(BaseModel):
+    """Keyset-paginated URL list page."""
+    items: list[URLListItem]
+    next_cursor: Optional[str] = None
+    limit: int
+    sort: str
+    order: str
+    html: Optional[str] = None  # Rendered table rows when include_html=true
+
+
 class BulkDeleteRequest(BaseModel):
     """Schema for bulk delete request."""
     url_ids: list[int]
@@ -347,6 +411,7 @@ class MonitoringCycleResponse(BaseModel):
     manual_interventions: int = 0
     triggered_by: str
     error_count: int = 0
+    results_compacted_at: Optional[datetime] = None  # Per-URL results folded into daily rollups
     
     class Config:
         from_attributes = True
@@ -366,6 +431,9 @@ class CycleURLResultResponse(BaseModel):
     tier_reached: Optional[int] = None
     change_detected: bool = False
     change_log_id: Optional[int] = None
+    skip_reason: Optional[str] = None
+    bytes_fetched: Optional[int] = None
+    stage_timings: Optional[dict] = None
     
     class Config:
         from_attributes = True
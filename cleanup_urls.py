@@ -23,6 +23,7 @@ from config import settings
 from db.database import SessionLocal
 from db.migrations import run_migrations
 from db.models import MonitoredURL, PDFVersion, ChangeLog
+from services.metrics_tracker import metrics_tracker
 
 
 def cleanup_to_test_only():
@@ -39,6 +40,9 @@ def cleanup_to_test_only():
         
         print(f"\n=== Found {len(non_test_urls)} non-test URLs to remove ===\n")
         
+        # Days of the changes about to be deleted, for the metrics rollups
+        change_days = metrics_tracker.change_days(db, [url.id for url in non_test_urls])
+        
         removed_count = 0
         for url in non_test_urls:
             # Delete associated change logs first
@@ -57,6 +61,7 @@ def cleanup_to_test_only():
             removed_count += 1
         
         db.commit()
+        metrics_tracker.refresh_rollup_days(db, change_days)
         
         print(f"\n✓ Removed {removed_count} URLs\n")
         
@@ -17,13 +17,15 @@ Usage:
 """
 
 import argparse
-import json
 import sys
 import tempfile
+import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, Dict, Iterable, List, Optional
 from urllib.parse import urlparse
 
 import structlog
@@ -40,8 +42,10 @@ structlog.configure(
 logger = structlog.get_logger()
 
 from config import settings
-from db.database import get_db, init_db, SessionLocal
-from db.models import MonitoredURL, PDFVersion, ChangeLog, MonitoringCycle, CycleURLResult
+from db.database import get_db, init_db, SessionLocal, engine
+from db.write_queue import write_queue
+from db.upsert import upsert
+from db.models import MonitoredURL, PDFVersion, ChangeLog, CycleURLResult
 from db.migrations import run_migrations, seed_sample_urls
 from fetcher.aws_web_scraper import AWSWebScraper
 from fetcher.pdf_downloader import PDFDownloader
@@ -51,6 +55,15 @@ from diffing.hasher import Hasher
 from diffing.change_detector import ChangeDetector, ChangeResult
 from storage.version_manager import VersionManager
 from services.title_extractor import TitleExtractor
+from services.url_state import url_state_tracker
+from services.metrics_tracker import metrics_tracker
+from services.audit_retention import audit_retention
+from services.job_runner import job_runner, JobStateError
+from services.site_inventory import site_inventory
+from services.form_fingerprints import form_fingerprint_index
+from services.local_search import local_search_service
+from services.landing_pages import landing_page_cache
+from services.relocation_queue import relocation_queue, relocation_search_options, RelocationStateError
 from services.link_crawler import LinkCrawler
 from services.form_matcher import FormMatcher, MatchType
 from services.visual_diff import VisualDiff
@@ -65,7 +78,7 @@ def verify_aws_features() -> List[str]:
     """
     Verify all configured AWS features are reachable and working.
     Run before a monitoring cycle to avoid bad runs when AWS is down.
-
+    
     Returns:
         List of error messages. Empty means all checks passed.
     """
@@ -77,10 +90,10 @@ def verify_aws_features() -> List[str]:
     )
     if not aws_configured:
         return []
-
+    
     import boto3
     from botocore.exceptions import BotoCoreError, ClientError
-
+    
     # 1. AWS credentials / connectivity (STS)
     try:
         sts_kwargs = {"region_name": settings.AWS_REGION}
@@ -93,7 +106,7 @@ def verify_aws_features() -> List[str]:
         errors.append(f"AWS credentials/connectivity failed: {e}")
         # If we can't reach AWS at all, skip per-service checks to avoid duplicate noise
         return errors
-
+    
     # 2. Lambda scraper (if configured)
     if settings.AWS_LAMBDA_SCRAPER_FUNCTION:
         try:
@@ -105,7 +118,7 @@ def verify_aws_features() -> List[str]:
             lam.get_function(FunctionName=settings.AWS_LAMBDA_SCRAPER_FUNCTION)
         except (BotoCoreError, ClientError, Exception) as e:
             errors.append(f"AWS Lambda scraper not reachable ({settings.AWS_LAMBDA_SCRAPER_FUNCTION}): {e}")
-
+    
     # 3. Kendra (if indexing enabled)
     if settings.KENDRA_INDEXING_ENABLED:
         if not kendra_client.is_available():
@@ -119,10 +132,76 @@ def verify_aws_features() -> List[str]:
                 errors.append(
                     f"Kendra index not available: {status.get('error', 'Unknown error')}"
                 )
-
+    
     return errors
 
 
+@dataclass
+class URLOutcome:
+    """
+    Structured result of processing one monitored URL.
+    
+    Truthy when processing succeeded, so callers that only need
+    success/failure can keep treating it as a bool.
+    """
+    url_id: int
+    success: bool = False
+    tier_reached: Optional[int] = None  # 1=headers, 2=quick_hash, 3=full_download
+    change_log_id: Optional[int] = None
+    bytes_fetched: int = 0
+    stage_timings: Dict[str, int] = field(default_factory=dict)  # stage -> ms
+    skip_reason: Optional[str] = None  # headers_match, quick_hash_match
+    error: Optional[str] = None
+    started_at: datetime = field(default_factory=datetime.utcnow)
+    completed_at: Optional[datetime] = None
+    
+    def __bool__(self) -> bool:
+        return self.success
+    
+    @property
+    def change_detected(self) -> bool:
+        return self.change_log_id is not None
+    
+    @property
+    def skipped_unchanged(self) -> bool:
+        """True if a fast tier proved the file unchanged (no full download)."""
+        return self.skip_reason is not None
+    
+    @property
+    def duration_ms(self) -> Optional[int]:
+        if self.completed_at is None:
+            return None
+        return int((self.completed_at - self.started_at).total_seconds() * 1000)
+    
+    @contextmanager
+    def timed(self, stage: str):
+        """Accumulate wall time (ms) spent in a pipeline stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = int((time.perf_counter() - start) * 1000)
+            self.stage_timings[stage] = self.stage_timings.get(stage, 0) + elapsed
+    
+    def to_cycle_result(self, cycle_id: int) -> dict:
+        """Row values for CycleURLResult."""
+        return {
+            "cycle_id": cycle_id,
+            "monitored_url_id": self.url_id,
+            "status": "success" if self.success else "failed",
+            "error_message": self.error,
+            "started_at": self.started_at,
+            "completed_at": self.completed_at,
+            "duration_ms": self.duration_ms,
+            "tier_reached": self.tier_reached,
+            "change_detected": self.change_detected,
+            "change_log_id": self.change_log_id,
+            "bytes_fetched": self.bytes_fetched,
+            "skip_reason": self.skip_reason,
+            "stage_timings": self.stage_timings or None
+        }
+
+
 class MonitoringOrchestrator:
     """
     Orchestrates the PDF monitoring pipeline.
@@ -164,17 +243,109 @@ class MonitoringOrchestrator:
             self.aws_scraper = AWSWebScraper()
         return self.aws_scraper
     
-    def process_url(self, db, monitored_url: MonitoredURL) -> bool:
+    def record_relocation_failure(
+        self,
+        db,
+        monitored_url: MonitoredURL,
+        previous_version: PDFVersion,
+        failed_url: str,
+        matches: list
+    ) -> ChangeLog:
+        """
+        Record a relocation search that found no identical form (committed):
+        candidates >=85% are kept on the URL state for manual review, and a
+        'relocation_failed' change is logged.
+        
+        Args:
+            db: Database session
+            monitored_url: URL whose PDF returned 404
+            previous_version: Latest stored version (the search reference)
+            failed_url: The PDF URL that returned 404
+            matches: Similarity search matches, best first
+        
+        Returns:
+            The relocation_failed ChangeLog
+        """
+        # Store up to 3 candidates >=85% on the URL state (for manual review)
+        candidates = matches[:3]
+        if candidates:
+            payload = {
+                "monitored_url_id": monitored_url.id,
+                "original_url": failed_url,
+                "timestamp": datetime.utcnow().isoformat() + "Z",
+                "candidates": [
+                    {"pdf_url": m.pdf_url, "similarity_score": m.similarity_score}
+                    for m in candidates
+                ],
+            }
+            url_state_tracker.record_near_misses(db, monitored_url.id, payload)
+            db.commit()
+            logger.info(
+                "Recorded relocation near-misses",
+                candidate_count=len(candidates),
+                url_id=monitored_url.id
+            )
+        
+        relocation_failed_log = ChangeLog(
+            monitored_url_id=monitored_url.id,
+            previous_version_id=previous_version.id,
+            new_version_id=previous_version.id,
+            change_type="relocation_failed",
+            diff_summary=(
+                f"Form became inaccessible at {failed_url}. "
+                f"Similarity search: {len(matches)} candidate(s) >=85%%; "
+                f"{'saved for review' if candidates else 'no candidates found'}."
+            ),
+            pdf_hash_changed=False,
+            text_hash_changed=False,
+            review_status="pending",
+            reviewed=False
+        )
+        db.add(relocation_failed_log)
+        db.flush()
+        url_state_tracker.record_change(db, relocation_failed_log)
+        monitored_url.last_change_at = datetime.utcnow()
+        db.commit()
+        logger.info(
+            "Relocation failure logged",
+            change_log_id=relocation_failed_log.id,
+            url_id=monitored_url.id
+        )
+        return relocation_failed_log
+    
+    def process_url(
+        self,
+        db,
+        monitored_url: MonitoredURL,
+        relocated_from_url: Optional[str] = None
+    ) -> URLOutcome:
         """
         Process a single monitored URL.
         
         Args:
             db: Database session
             monitored_url: MonitoredURL to process
-            
+            relocated_from_url: Previous URL of the form, when monitored_url.url was
+                just set to where a relocation search found it (always fully
+                processed, and recorded as a relocation)
+        
         Returns:
-            True if successful, False otherwise
+            URLOutcome (truthy if successful) with tier reached, change log id,
+            bytes fetched, stage timings and skip reason
         """
+        outcome = URLOutcome(url_id=monitored_url.id)
+        outcome.success = self._process_url(db, monitored_url, outcome, relocated_from_url)
+        outcome.completed_at = datetime.utcnow()
+        return outcome
+    
+    def _process_url(
+        self,
+        db,
+        monitored_url: MonitoredURL,
+        outcome: URLOutcome,
+        relocated_from_url: Optional[str] = None  # Track if form was found at different URL
+    ) -> bool:
+        """Run the pipeline for one URL, recording progress on outcome."""
         logger.info(
             "Processing URL",
             url_id=monitored_url.id,
@@ -182,17 +353,18 @@ class MonitoringOrchestrator:
             url=monitored_url.url
         )
         
-        relocated_from_url = None  # Track if form was found at different URL
-        
         try:
             # Step 1: Fetch PDF
             pdf_url = monitored_url.url
+            landing_page_url = None
             
             # If URL is not a direct PDF, use AWS web scraper to find PDF link
+            # (cached per landing page; only pages that changed are scraped)
             if not pdf_url.lower().endswith('.pdf'):
-                logger.info("URL is not direct PDF, scraping for PDF link")
-                aws_scraper = self._get_aws_scraper()
-                scrape_result = aws_scraper.scrape_url(monitored_url.url)
+                logger.info("URL is not direct PDF, resolving PDF link")
+                landing_page_url = monitored_url.url
+                with outcome.timed("scrape"):
+                    scrape_result = landing_page_cache.resolve(db, landing_page_url, self._get_aws_scraper())
                 
                 if not scrape_result.success:
                     logger.error(
@@ -200,10 +372,12 @@ class MonitoringOrchestrator:
                         url=monitored_url.url,
                         error=scrape_result.error
                     )
+                    outcome.error = f"Scrape failed: {scrape_result.error}"
                     return False
                 
                 if not scrape_result.pdf_url:
                     logger.error("No PDF link found in page", url=monitored_url.url)
+                    outcome.error = "No PDF link found in page"
                     return False
                 
                 pdf_url = scrape_result.pdf_url
@@ -211,12 +385,15 @@ class MonitoringOrchestrator:
             # ========================================================================
             # TIER 1: Fast HTTP Header Check (skip download if headers match)
             # ========================================================================
-            header_result = self.header_checker.check_headers(
-                url=pdf_url,
-                previous_last_modified=monitored_url.last_modified_header,
-                previous_etag=monitored_url.etag_header,
-                previous_content_length=monitored_url.content_length_header
-            )
+            outcome.tier_reached = 1
+            with outcome.timed("headers"):
+                # A relocated form's stored headers belong to its old URL
+                header_result = self.header_checker.check_headers(
+                    url=pdf_url,
+                    previous_last_modified=None if relocated_from_url else monitored_url.last_modified_header,
+                    previous_etag=None if relocated_from_url else monitored_url.etag_header,
+                    previous_content_length=None if relocated_from_url else monitored_url.content_length_header
+                )
             
             if header_result.success and self.header_checker.can_skip_download(header_result):
                 # Headers match - high confidence no change, skip processing
@@ -226,10 +403,12 @@ class MonitoringOrchestrator:
                     url=pdf_url
                 )
                 print(f"\n  ✓ No change detected (HTTP headers match)")
+                outcome.skip_reason = "headers_match"
                 
-                # Update last checked timestamp
-                monitored_url.last_checked_at = datetime.utcnow()
-                db.commit()
+                # Update last checked timestamp (batched by the writer thread)
+                write_queue.update(MonitoredURL, monitored_url.id, {
+                    "last_checked_at": datetime.utcnow()
+                })
                 return True
             
             # ========================================================================
@@ -240,11 +419,14 @@ class MonitoringOrchestrator:
                 # Headers unavailable or inconclusive - try quick hash
                 logger.info("Headers inconclusive, checking quick hash", url=pdf_url)
                 
-                quick_hash_result = self.quick_hasher.compute_quick_hash(pdf_url)
+                outcome.tier_reached = 2
+                with outcome.timed("quick_hash"):
+                    quick_hash_result = self.quick_hasher.compute_quick_hash(pdf_url)
+                outcome.bytes_fetched += quick_hash_result.bytes_downloaded or 0
                 
                 if quick_hash_result.success and quick_hash_result.quick_hash:
                     # Compare with stored quick hash
-                    stored_hash = monitored_url.quick_hash
+                    stored_hash = None if relocated_from_url else monitored_url.quick_hash
                     current_hash = quick_hash_result.quick_hash
                     
                     logger.debug(
@@ -262,19 +444,24 @@ class MonitoringOrchestrator:
                             url=pdf_url
                         )
                         print(f"\n  ✓ No change detected (quick hash matches)")
+                        outcome.skip_reason = "quick_hash_match"
+                        
+                        # Store quick hash for next time (in case it wasn't stored before)
+                        # and update last checked timestamp (batched by the writer thread)
+                        url_updates = {
+                            "quick_hash": current_hash,
+                            "last_checked_at": datetime.utcnow()
+                        }
                         
                         # Update header metadata from quick hash check if available
                         if header_result.success:
-                            monitored_url.last_modified_header = header_result.last_modified
-                            monitored_url.etag_header = header_result.etag
-                            monitored_url.content_length_header = header_result.content_length
-                        
-                        # Store quick hash for next time (in case it wasn't stored before)
-                        monitored_url.quick_hash = current_hash
+                            url_updates.update(
+                                last_modified_header=header_result.last_modified,
+                                etag_header=header_result.etag,
+                                content_length_header=header_result.content_length
+                            )
                         
-                        # Update last checked timestamp
-                        monitored_url.last_checked_at = datetime.utcnow()
-                        db.commit()
+                        write_queue.update(MonitoredURL, monitored_url.id, url_updates)
                         return True
                     else:
                         # Quick hash differs - proceed to full processing
@@ -300,7 +487,9 @@ class MonitoringOrchestrator:
                 temp_path = Path(temp_dir)
                 original_pdf = temp_path / "original.pdf"
                 
-                download_result = self.downloader.download(pdf_url, original_pdf)
+                outcome.tier_reached = 3
+                with outcome.timed("download"):
+                    download_result = self.downloader.download(pdf_url, original_pdf)
                 
                 # Step 1b: If download fails, check if it's a new form first
                 if not download_result.success:
@@ -313,6 +502,15 @@ class MonitoringOrchestrator:
                     
                     print(f"\n  ⚠️  Download failed: {download_result.error}")
                     
+                    # The cached link may be outdated: scrape the landing page next time
+                    if landing_page_url:
+                        landing_page_cache.invalidate(landing_page_url)
+                    
+                    # Checking a relocation the queue found: the new URL failed too
+                    if relocated_from_url:
+                        outcome.error = f"Download failed at relocated URL: {download_result.error}"
+                        return False
+                    
                     # Only trigger relocation search for 404 errors (URL not found)
                     # Other errors (timeout, 403, etc.) might be temporary or server-side issues
                     is_404 = download_result.status_code == 404
@@ -326,6 +524,7 @@ class MonitoringOrchestrator:
                         )
                         print(f"  ⚠️  Download failed with status {download_result.status_code} (not 404) - skipping relocation search")
                         print(f"     This may be a temporary server issue. The URL will be retried on the next check.")
+                        outcome.error = f"Download failed: {download_result.error}"
                         return False
                     
                     # Check if this is a new form (no versions exist) BEFORE trying relocation
@@ -350,6 +549,7 @@ class MonitoringOrchestrator:
                             monitored_url.enabled = False
                             db.commit()
                             
+                            outcome.error = "New form inaccessible; disabled"
                             return False
                         else:
                             # Toggle is off, but still skip relocation for new forms
@@ -359,34 +559,80 @@ class MonitoringOrchestrator:
                                 url=pdf_url
                             )
                             print(f"  ❌ New form inaccessible (relocation search skipped for new forms)")
+                            outcome.error = f"Download failed: {download_result.error}"
                             return False
                     
                     # Relocation via PDF similarity search (404: find same form by content)
                     failed_url = pdf_url
+                    
+                    # The crawl can take minutes: hand it to the relocation queue,
+                    # which records 'relocated' or 'relocation_failed' when done
+                    if settings.RELOCATION_QUEUE_ENABLED:
+                        task = relocation_queue.enqueue(db, monitored_url, failed_url)
+                        logger.info(
+                            "Download failed (404), relocation search queued",
+                            url=failed_url,
+                            url_id=monitored_url.id,
+                            task_id=task.id
+                        )
+                        print(f"  🔎 Relocation search queued (task {task.id})")
+                        outcome.error = f"Not found (404); relocation search queued (task {task.id})"
+                        return False
+                    
                     logger.info(
                         "Download failed (404), running similarity search for relocated form",
                         url=failed_url,
                         url_id=monitored_url.id
                     )
                     logger.info("Searching for relocated form (similarity search)", url_id=monitored_url.id)
-
+                    
                     reference_pdf_path = self.version_manager.get_original_pdf_path(db, previous_version.id)
                     # Use the URL that returned 404 as the crawl start (crawler also seeds from domain root)
                     website_url = failed_url
-
+                    
+                    # Site inventory first: a fingerprint match on the site's index
+                    # pages relocates the form without a crawl (weaker matches are
+                    # only recorded as near-misses)
+                    if settings.SITE_INVENTORY_ENABLED:
+                        inventory_match = None
+                        try:
+                            with outcome.timed("relocation"):
+                                inventory_match = site_inventory.find_relocated(db, monitored_url)
+                        except Exception as e:
+                            db.rollback()
+                            logger.warning(
+                                "Site inventory lookup failed",
+                                url_id=monitored_url.id,
+                                error=str(e)
+                            )
+                        if inventory_match:
+                            with outcome.timed("download"):
+                                inventory_download = self.downloader.download(inventory_match.pdf_url, original_pdf)
+                            if inventory_download.success:
+                                pdf_url = inventory_match.pdf_url
+                                download_result = inventory_download
+                                relocated_from_url = failed_url
+                                monitored_url.url = pdf_url
+                                logger.info(
+                                    "Found relocated form in site inventory",
+                                    new_url=pdf_url,
+                                    match=inventory_match.match,
+                                    url_id=monitored_url.id
+                                )
+                    
                     matches: list = []
-                    if reference_pdf_path and reference_pdf_path.exists():
+                    if download_result.success:
+                        pass  # Relocated from the site inventory
+                    elif reference_pdf_path and reference_pdf_path.exists():
                         try:
                             from pdf_similarity_search import search_pdf
                             logger.info("SEARCHING PDF") 
-                            matches, _near_misses, _search_stats = search_pdf(
-                                website_url,
-                                str(reference_pdf_path),
-                                similarity_threshold=85.0,
-                                max_results=3,
-                                max_pages=250,
-                                max_depth=10,
-                            )
+                            with outcome.timed("relocation"):
+                                matches, _near_misses, _search_stats = search_pdf(
+                                    website_url,
+                                    str(reference_pdf_path),
+                                    **relocation_search_options(db, monitored_url, previous_version)
+                                )
                         except Exception as e:
                             logger.warning(
                                 "Similarity search failed",
@@ -399,12 +645,13 @@ class MonitoringOrchestrator:
                             "No reference PDF path for similarity search",
                             url_id=monitored_url.id
                         )
-
+                    
                     # 100% similar (identical): update stored URL and continue
                     exact_match = next((m for m in matches if m.similarity_score == 100), None)
                     if exact_match:
                         pdf_url = exact_match.pdf_url
-                        download_result = self.downloader.download(pdf_url, original_pdf)
+                        with outcome.timed("download"):
+                            download_result = self.downloader.download(pdf_url, original_pdf)
                         if download_result.success:
                             relocated_from_url = failed_url
                             monitored_url.url = pdf_url
@@ -425,61 +672,18 @@ class MonitoringOrchestrator:
                                 url=pdf_url,
                                 error=download_result.error
                             )
-
+                    
                     if not download_result.success:
-                        # Store up to 3 candidates >=85% in local JSON (for manual review)
-                        candidates = matches[:3]
-                        if candidates:
-                            rel_dir = Path("data") / "relocation_near_misses"
-                            rel_dir.mkdir(parents=True, exist_ok=True)
-                            out_path = rel_dir / f"url_{monitored_url.id}.json"
-                            payload = {
-                                "monitored_url_id": monitored_url.id,
-                                "original_url": failed_url,
-                                "timestamp": datetime.utcnow().isoformat() + "Z",
-                                "candidates": [
-                                    {"pdf_url": m.pdf_url, "similarity_score": m.similarity_score}
-                                    for m in candidates
-                                ],
-                            }
-                            with open(out_path, "w") as f:
-                                json.dump(payload, f, indent=2)
-                            logger.info(
-                                "Wrote relocation near-misses",
-                                path=str(out_path),
-                                candidate_count=len(candidates),
-                                url_id=monitored_url.id
-                            )
-
                         logger.error(
                             "Failed to download PDF after relocation search",
                             url=pdf_url,
                             error=download_result.error
                         )
-                        if previous_version:
-                            relocation_failed_log = ChangeLog(
-                                monitored_url_id=monitored_url.id,
-                                previous_version_id=previous_version.id,
-                                new_version_id=previous_version.id,
-                                change_type="relocation_failed",
-                                diff_summary=(
-                                    f"Form became inaccessible at {failed_url}. "
-                                    f"Similarity search: {len(matches)} candidate(s) >=85%%; "
-                                    f"{'saved to JSON' if candidates else 'no candidates found'}."
-                                ),
-                                pdf_hash_changed=False,
-                                text_hash_changed=False,
-                                review_status="pending",
-                                reviewed=False
-                            )
-                            db.add(relocation_failed_log)
-                            monitored_url.last_change_at = datetime.utcnow()
-                            db.commit()
-                            logger.info(
-                                "Relocation failure logged",
-                                change_log_id=relocation_failed_log.id,
-                                url_id=monitored_url.id
-                            )
+                        relocation_failed_log = self.record_relocation_failure(
+                            db, monitored_url, previous_version, failed_url, matches
+                        )
+                        outcome.change_log_id = relocation_failed_log.id
+                        outcome.error = f"Download failed after relocation search: {download_result.error}"
                         return False
                 
                 logger.info(
@@ -487,9 +691,11 @@ class MonitoringOrchestrator:
                     size=download_result.file_size,
                     retries=download_result.retries_used
                 )
+                outcome.bytes_fetched += download_result.file_size or 0
                 
                 # Step 2: Extract text (using original PDF directly)
-                extraction_result = self.text_extractor.extract(original_pdf)
+                with outcome.timed("extract"):
+                    extraction_result = self.text_extractor.extract(original_pdf)
                 
                 extracted_text = extraction_result.full_text
                 page_texts = extraction_result.page_texts
@@ -526,22 +732,24 @@ class MonitoringOrchestrator:
                     ) or ""
                 
                 # Step 5: Detect changes (with early termination)
-                change_result = self.change_detector.compare(
-                    hashes,
-                    previous_hashes,
-                    extracted_text,
-                    previous_text
-                )
+                with outcome.timed("compare"):
+                    change_result = self.change_detector.compare(
+                        hashes,
+                        previous_hashes,
+                        extracted_text,
+                        previous_text
+                    )
                 
                 # Step 5b: OCR fallback ONLY if change detected AND text insufficient
                 if change_result.changed and extraction_result.needs_ocr:
                     logger.info("Change detected and text insufficient, attempting OCR")
                     
                     if self.ocr_fallback.is_available():
-                        ocr_result = self.ocr_fallback.process_pdf(
-                            original_pdf,
-                            url=monitored_url.url
-                        )
+                        with outcome.timed("ocr"):
+                            ocr_result = self.ocr_fallback.process_pdf(
+                                original_pdf,
+                                url=monitored_url.url
+                            )
                         
                         if ocr_result.success:
                             extracted_text = ocr_result.full_text
@@ -633,10 +841,11 @@ class MonitoringOrchestrator:
                         preview_path = self.version_manager.file_store.get_preview_image_path(
                             monitored_url.id, new_version.id
                         )
-                        title_result = self.title_extractor.extract_title(
-                            original_pdf, 
-                            preview_path
-                        )
+                        with outcome.timed("title"):
+                            title_result = self.title_extractor.extract_title(
+                                original_pdf, 
+                                preview_path
+                            )
                         
                         if title_result.success:
                             new_version.formatted_title = title_result.formatted_title
@@ -644,6 +853,13 @@ class MonitoringOrchestrator:
                             new_version.title_confidence = title_result.combined_confidence
                             new_version.title_extraction_method = title_result.extraction_method
                             new_version.revision_date = title_result.revision_date
+                            if settings.LOCAL_SEARCH_ENABLED:
+                                try:
+                                    local_search_service.update_title(db, new_version)
+                                except Exception as e:
+                                    # The search table can be rebuilt later
+                                    logger.warning("Local search title update failed",
+                                                   version_id=new_version.id, error=str(e))
                             db.commit()
                             
                             logger.info(
@@ -704,27 +920,45 @@ class MonitoringOrchestrator:
                         )
                         
                         if prev_original:
-                            diff_output = self.version_manager.file_store.get_diff_image_path(
-                                monitored_url.id, new_version.id
-                            )
+                            # Diff exactly the affected pages (1-indexed) so reviewers
+                            # never wait on rendering; fall back to the first page
+                            page_count = len(hashes.page_hashes) or 1
+                            diff_pages = sorted({
+                                p - 1 for p in (change_result.affected_pages or [])
+                                if 1 <= p <= page_count
+                            }) or [0]
                             
-                            diff_result = self.visual_diff.generate_diff(
-                                old_pdf_path=prev_original,
-                                new_pdf_path=original_pdf,
-                                output_path=diff_output
-                            )
+                            file_store = self.version_manager.file_store
+                            with outcome.timed("diff"):
+                                diff_results = self.visual_diff.generate_page_diffs(
+                                    old_pdf_path=prev_original,
+                                    new_pdf_path=original_pdf,
+                                    pages=diff_pages,
+                                    output_path_for=lambda page: file_store.get_diff_image_path(
+                                        monitored_url.id, new_version.id, page
+                                    ),
+                                    old_pdf_hash=previous_version.pdf_hash,
+                                    new_pdf_hash=hashes.pdf_hash
+                                )
                             
-                            if diff_result.success:
+                            succeeded = {
+                                page: result for page, result in diff_results.items()
+                                if result.success
+                            }
+                            if succeeded:
+                                diff_result = succeeded[min(succeeded)]
                                 diff_image_path = str(diff_result.diff_image_path)
                                 logger.info(
                                     "Visual diff generated",
+                                    pages=sorted(succeeded),
                                     change_pct=f"{diff_result.change_percentage:.1%}",
-                                    regions=len(diff_result.changed_regions or [])
+                                    regions=sum(len(r.changed_regions or []) for r in succeeded.values())
                                 )
                             else:
                                 logger.warning(
                                     "Visual diff generation failed",
-                                    error=diff_result.error
+                                    pages=diff_pages,
+                                    errors=[r.error for r in diff_results.values()]
                                 )
                     
                     # If URL relocated but content unchanged, create a special change result
@@ -824,7 +1058,7 @@ class MonitoringOrchestrator:
                                 change_id=change_log.id,
                                 confidence=recommendation.confidence
                             )
-                        
+                    
                     if change_log and relocated_from_url:
                         change_log.relocated_from_url = relocated_from_url
                         logger.info(
@@ -833,12 +1067,19 @@ class MonitoringOrchestrator:
                             old_url=relocated_from_url,
                             new_url=pdf_url
                         )
-                        
+                    
                     if change_log and diff_image_path:
                         change_log.diff_image_path = diff_image_path
-                        
+                    
+                    if change_log:
+                        # Auto-approval above may have cleared the pending review
+                        url_state_tracker.refresh_pending(db, [monitored_url.id])
+                    
                     db.commit()
                     
+                    if change_log:
+                        outcome.change_log_id = change_log.id
+                    
                     # Step 7: Index in Kendra (if enabled)
                     if kendra_indexer.is_enabled() and should_create_version:
                         try:
@@ -931,17 +1172,21 @@ class MonitoringOrchestrator:
                 
                 # Store header metadata and quick hash for future fast checks
                 # (even if no change detected, we want to update headers for next check)
+                # These are batched by the writer thread along with the timestamp
+                url_updates = {}
                 if header_result.success:
-                    monitored_url.last_modified_header = header_result.last_modified
-                    monitored_url.etag_header = header_result.etag
-                    monitored_url.content_length_header = header_result.content_length
+                    url_updates.update(
+                        last_modified_header=header_result.last_modified,
+                        etag_header=header_result.etag,
+                        content_length_header=header_result.content_length
+                    )
                     logger.debug("Stored header metadata", url_id=monitored_url.id)
                 
                 # Store quick hash for future checks
                 # Priority: Use Tier 2 result if available (most accurate), otherwise compute from file
                 if quick_hash_result and quick_hash_result.success:
                     # Use the quick hash from Tier 2 check (computed from URL via Range request)
-                    monitored_url.quick_hash = quick_hash_result.quick_hash
+                    url_updates["quick_hash"] = quick_hash_result.quick_hash
                     logger.debug(
                         "Stored quick hash from Tier 2 check",
                         url_id=monitored_url.id,
@@ -967,7 +1212,7 @@ class MonitoringOrchestrator:
                                 bytes_read += len(chunk)
                         
                         quick_hash = sha256.hexdigest()
-                        monitored_url.quick_hash = quick_hash
+                        url_updates["quick_hash"] = quick_hash
                         logger.debug(
                             "Computed and stored quick hash from original PDF",
                             url_id=monitored_url.id,
@@ -978,20 +1223,34 @@ class MonitoringOrchestrator:
                         logger.warning("Failed to compute quick hash from original PDF", error=str(e))
                 
                 # Update last checked timestamp
-                monitored_url.last_checked_at = datetime.utcnow()
+                url_updates["last_checked_at"] = datetime.utcnow()
+                write_queue.update(MonitoredURL, monitored_url.id, url_updates)
+                
+                # Commit what the check changed on the session itself (e.g. the
+                # new URL of a relocated form whose change was auto-dismissed)
                 db.commit()
                 
                 return True
-                
+        
         except Exception as e:
             logger.exception(
                 "Error processing URL",
                 url_id=monitored_url.id,
                 error=str(e)
             )
+            outcome.error = str(e)
             return False
     
-    def run_cycle(self, db=None, url_id: Optional[int] = None, max_workers: Optional[int] = None, cycle_id: Optional[int] = None) -> dict:
+    def run_cycle(
+        self,
+        db=None,
+        url_id: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        cycle_id: Optional[int] = None,
+        skip_url_ids: Optional[Iterable[int]] = None,
+        progress: Optional[Callable[[str, dict], None]] = None,
+        should_cancel: Optional[Callable[[], bool]] = None
+    ) -> dict:
         """
         Run a monitoring cycle with optional parallel processing.
         
@@ -1000,9 +1259,13 @@ class MonitoringOrchestrator:
             url_id: Optional specific URL ID to process
             max_workers: Number of parallel workers (default: min(10, number of URLs))
             cycle_id: Optional monitoring cycle ID for tracking (if not provided, will be created)
-            
+            skip_url_ids: URLs to leave out (already checked by an earlier run of a resumed job)
+            progress: Called with ("start", {"total"}) and then ("outcome", detail) per URL
+            should_cancel: Polled before each URL starts; once True, remaining URLs are skipped
+        
         Returns:
             Dictionary with results summary compatible with scheduler tracking
+            ("cancelled" is True if should_cancel stopped the cycle early)
         """
         # Create db session if not provided
         owns_db = db is None
@@ -1018,12 +1281,18 @@ class MonitoringOrchestrator:
                 query = query.filter(MonitoredURL.id == url_id)
             
             urls = query.all()
+            if skip_url_ids:
+                skip = set(skip_url_ids)
+                urls = [url for url in urls if url.id not in skip]
+            
+            if progress:
+                progress("start", {"total": len(urls)})
             
             if not urls:
                 logger.warning("No URLs to process")
                 return {
                     "total": 0, "successful": 0, "failed": 0, "changes": 0, 
-                    "skipped": 0, "errors": 0, "error_log": None
+                    "skipped": 0, "errors": 0, "error_log": None, "cancelled": False
                 }
             
             # Determine number of workers (default to config setting or number of URLs, whichever is smaller)
@@ -1038,75 +1307,102 @@ class MonitoringOrchestrator:
                 "skipped": 0,
                 "errors": 0,
                 "error_log": "",
-                "details": []
+                "details": [],
+                "cancelled": False
             }
             
+            def cancelled() -> bool:
+                if not results["cancelled"] and should_cancel and should_cancel():
+                    results["cancelled"] = True
+                    logger.info("Monitoring cycle cancelled", cycle_id=cycle_id)
+                return results["cancelled"]
+            
+            # Cycle results and URL state are written in bulk through the writer thread
+            pending_results: List[dict] = []
+            pending_outcomes: List[URLOutcome] = []
+            
+            def record_outcome(outcome: URLOutcome, name: str) -> None:
+                """Fold one URL outcome into the cycle totals and queue its result row."""
+                if outcome.success:
+                    results["successful"] += 1
+                else:
+                    results["failed"] += 1
+                if outcome.change_detected:
+                    results["changes"] += 1
+                if outcome.skipped_unchanged:
+                    results["skipped"] += 1
+                if outcome.error:
+                    results["errors"] += 1
+                    results["error_log"] += f"URL {outcome.url_id}: {outcome.error}\n"
+                
+                results["details"].append({
+                    "url_id": outcome.url_id,
+                    "name": name,
+                    "success": outcome.success,
+                    "error": outcome.error,
+                    "change_detected": outcome.change_detected,
+                    "change_log_id": outcome.change_log_id,
+                    "tier_reached": outcome.tier_reached,
+                    "skip_reason": outcome.skip_reason,
+                    "bytes_fetched": outcome.bytes_fetched,
+                    "stage_timings": outcome.stage_timings
+                })
+                if progress:
+                    progress("outcome", results["details"][-1])
+                
+                pending_outcomes.append(outcome)
+                if cycle_id:
+                    pending_results.append(outcome.to_cycle_result(cycle_id))
+                if len(pending_outcomes) >= settings.DB_WRITE_BATCH_SIZE:
+                    flush_results()
+            
+            def flush_results() -> None:
+                if not pending_outcomes:
+                    return
+                rows = list(pending_results)
+                outcomes = list(pending_outcomes)
+                pending_results.clear()
+                pending_outcomes.clear()
+                
+                def write(session) -> None:
+                    # Upsert so a retried batch replaces its rows instead of duplicating them
+                    upsert(session, CycleURLResult, rows, index_elements=["cycle_id", "monitored_url_id"])
+                    url_state_tracker.record_outcomes(session, [
+                        {
+                            "monitored_url_id": o.url_id,
+                            "success": o.success,
+                            "tier_reached": o.tier_reached,
+                            "skip_reason": o.skip_reason
+                        }
+                        for o in outcomes
+                    ])
+                
+                write_queue.submit(write)
+            
+            def failed_outcome(url_id_inner: int, error: str) -> URLOutcome:
+                outcome = URLOutcome(url_id=url_id_inner, error=error)
+                outcome.completed_at = datetime.utcnow()
+                return outcome
+            
             # Helper function to process a single URL with its own database session
-            def process_url_with_session(url_data):
+            def process_url_with_session(url_data) -> URLOutcome:
                 """Process a URL with a fresh database session for thread safety."""
                 url_id_inner, url_name, url_url = url_data
+                if cancelled():
+                    return None
                 thread_db = SessionLocal()
-                start_time = datetime.utcnow()
-                result_detail = {
-                    "url_id": url_id_inner, 
-                    "name": url_name, 
-                    "success": False,
-                    "error": None,
-                    "change_detected": False,
-                    "change_log_id": None
-                }
                 
                 try:
                     # Re-fetch the URL in this thread's session
                     url = thread_db.query(MonitoredURL).filter(MonitoredURL.id == url_id_inner).first()
                     if not url:
                         logger.warning("URL not found in thread session", url_id=url_id_inner)
-                        result_detail["error"] = "URL not found"
-                        return result_detail
-                    
-                    # Check for recent changes before processing to track change detection
-                    changes_before = thread_db.query(ChangeLog).filter(
-                        ChangeLog.monitored_url_id == url_id_inner
-                    ).count()
+                        return failed_outcome(url_id_inner, "URL not found")
                     
-                    success = self.process_url(thread_db, url)
+                    outcome = self.process_url(thread_db, url)
                     thread_db.commit()
-                    
-                    # Check for new changes after processing
-                    changes_after = thread_db.query(ChangeLog).filter(
-                        ChangeLog.monitored_url_id == url_id_inner
-                    ).count()
-                    
-                    result_detail["success"] = success
-                    if changes_after > changes_before:
-                        result_detail["change_detected"] = True
-                        # Get the latest change log ID
-                        latest_change = thread_db.query(ChangeLog).filter(
-                            ChangeLog.monitored_url_id == url_id_inner
-                        ).order_by(ChangeLog.id.desc()).first()
-                        if latest_change:
-                            result_detail["change_log_id"] = latest_change.id
-                    
-                    # Track URL result in the cycle if cycle_id provided
-                    if cycle_id:
-                        end_time = datetime.utcnow()
-                        duration_ms = int((end_time - start_time).total_seconds() * 1000)
-                        
-                        url_result = CycleURLResult(
-                            cycle_id=cycle_id,
-                            monitored_url_id=url_id_inner,
-                            status="success" if success else "failed",
-                            started_at=start_time,
-                            completed_at=end_time,
-                            duration_ms=duration_ms,
-                            change_detected=result_detail["change_detected"],
-                            change_log_id=result_detail["change_log_id"]
-                        )
-                        thread_db.add(url_result)
-                        thread_db.commit()
-                    
-                    return result_detail
-                    
+                    return outcome
+                
                 except Exception as e:
                     logger.error(
                         "Error processing URL in thread",
@@ -1115,30 +1411,7 @@ class MonitoringOrchestrator:
                         exc_info=True
                     )
                     thread_db.rollback()
-                    result_detail["error"] = str(e)
-                    
-                    # Track failed URL result in the cycle
-                    if cycle_id:
-                        try:
-                            end_time = datetime.utcnow()
-                            duration_ms = int((end_time - start_time).total_seconds() * 1000)
-                            
-                            url_result = CycleURLResult(
-                                cycle_id=cycle_id,
-                                monitored_url_id=url_id_inner,
-                                status="failed",
-                                error_message=str(e),
-                                started_at=start_time,
-                                completed_at=end_time,
-                                duration_ms=duration_ms,
-                                change_detected=False
-                            )
-                            thread_db.add(url_result)
-                            thread_db.commit()
-                        except Exception:
-                            pass  # Don't fail on tracking error
-                    
-                    return result_detail
+                    return failed_outcome(url_id_inner, str(e))
                 finally:
                     thread_db.close()
             
@@ -1152,6 +1425,7 @@ class MonitoringOrchestrator:
                 
                 # Prepare URL data for parallel processing
                 url_data_list = [(url.id, url.name, url.url) for url in urls]
+                url_names = {url.id: url.name for url in urls}
                 
                 # Process in parallel
                 with ThreadPoolExecutor(max_workers=max_workers) as executor:
@@ -1162,96 +1436,32 @@ class MonitoringOrchestrator:
                     
                     for future in as_completed(future_to_url):
                         url_id_key = future_to_url[future]
+                        if future.cancelled():
+                            continue
+                        if cancelled():
+                            # Drop URLs that haven't started; running ones finish
+                            for pending in future_to_url:
+                                pending.cancel()
                         try:
-                            detail = future.result()
-                            if detail["success"]:
-                                results["successful"] += 1
-                            else:
-                                results["failed"] += 1
-                            
-                            if detail.get("change_detected"):
-                                results["changes"] += 1
-                            
-                            if detail.get("error"):
-                                results["errors"] += 1
-                                results["error_log"] += f"URL {url_id_key}: {detail['error']}\n"
-                            
-                            results["details"].append(detail)
+                            outcome = future.result()
+                            if outcome is None:
+                                continue  # Skipped after cancel
                         except Exception as e:
                             logger.error(
                                 "Error getting result from thread",
                                 url_id=url_id_key,
                                 error=str(e)
                             )
-                            results["failed"] += 1
-                            results["errors"] += 1
-                            results["error_log"] += f"URL {url_id_key}: {str(e)}\n"
-                            results["details"].append({
-                                "url_id": url_id_key,
-                                "name": "Unknown",
-                                "success": False,
-                                "error": str(e)
-                            })
+                            outcome = failed_outcome(url_id_key, str(e))
+                        record_outcome(outcome, url_names.get(url_id_key, "Unknown"))
             else:
                 # Process sequentially (single URL or max_workers = 1)
                 logger.info("Processing URLs sequentially", total=len(urls))
                 for url in urls:
-                    start_time = datetime.utcnow()
-                    
-                    # Check for recent changes before processing
-                    changes_before = db.query(ChangeLog).filter(
-                        ChangeLog.monitored_url_id == url.id
-                    ).count()
-                    
+                    if cancelled():
+                        break
                     try:
-                        success = self.process_url(db, url)
-                        
-                        # Check for new changes after processing
-                        changes_after = db.query(ChangeLog).filter(
-                            ChangeLog.monitored_url_id == url.id
-                        ).count()
-                        
-                        change_detected = changes_after > changes_before
-                        change_log_id = None
-                        
-                        if change_detected:
-                            results["changes"] += 1
-                            latest_change = db.query(ChangeLog).filter(
-                                ChangeLog.monitored_url_id == url.id
-                            ).order_by(ChangeLog.id.desc()).first()
-                            if latest_change:
-                                change_log_id = latest_change.id
-                        
-                        if success:
-                            results["successful"] += 1
-                        else:
-                            results["failed"] += 1
-                        
-                        # Track URL result in the cycle if cycle_id provided
-                        if cycle_id:
-                            end_time = datetime.utcnow()
-                            duration_ms = int((end_time - start_time).total_seconds() * 1000)
-                            
-                            url_result = CycleURLResult(
-                                cycle_id=cycle_id,
-                                monitored_url_id=url.id,
-                                status="success" if success else "failed",
-                                started_at=start_time,
-                                completed_at=end_time,
-                                duration_ms=duration_ms,
-                                change_detected=change_detected,
-                                change_log_id=change_log_id
-                            )
-                            db.add(url_result)
-                            db.commit()
-                        
-                        results["details"].append({
-                            "url_id": url.id,
-                            "name": url.name,
-                            "success": success,
-                            "change_detected": change_detected
-                        })
-                        
+                        outcome = self.process_url(db, url)
                     except Exception as e:
                         logger.error(
                             "Error processing URL",
@@ -1259,34 +1469,28 @@ class MonitoringOrchestrator:
                             error=str(e),
                             exc_info=True
                         )
-                        results["failed"] += 1
-                        results["errors"] += 1
-                        results["error_log"] += f"URL {url.id}: {str(e)}\n"
-                        
-                        # Track failed URL result in the cycle
-                        if cycle_id:
-                            end_time = datetime.utcnow()
-                            duration_ms = int((end_time - start_time).total_seconds() * 1000)
-                            
-                            url_result = CycleURLResult(
-                                cycle_id=cycle_id,
-                                monitored_url_id=url.id,
-                                status="failed",
-                                error_message=str(e),
-                                started_at=start_time,
-                                completed_at=end_time,
-                                duration_ms=duration_ms,
-                                change_detected=False
-                            )
-                            db.add(url_result)
-                            db.commit()
-                        
-                        results["details"].append({
-                            "url_id": url.id,
-                            "name": url.name,
-                            "success": False,
-                            "error": str(e)
-                        })
+                        outcome = failed_outcome(url.id, str(e))
+                    record_outcome(outcome, url.name)
+            
+            flush_results()
+            
+            # Make sure every queued write (timestamps, cycle results) is committed
+            # before callers read the cycle back
+            write_queue.flush()
+            
+            # Fold this cycle's changes into the daily metrics rollups
+            try:
+                metrics_tracker.refresh_rollups(db)
+            except Exception as e:
+                db.rollback()
+                logger.warning("Metrics rollup refresh failed", error=str(e))
+            
+            # Compact per-URL results of cycles past the retention window
+            try:
+                audit_retention.compact(db)
+            except Exception as e:
+                db.rollback()
+                logger.warning("Audit detail compaction failed", error=str(e))
             
             # Clean up error_log if empty
             if not results["error_log"]:
@@ -1301,7 +1505,7 @@ class MonitoringOrchestrator:
             )
             
             return results
-            
+        
         finally:
             if owns_db:
                 db.close()
@@ -1323,7 +1527,7 @@ def cmd_run(url_id: Optional[int] = None, max_workers: Optional[int] = None):
     logger.info("Running monitoring cycle", url_id=url_id, max_workers=max_workers)
     settings.ensure_directories()
     run_migrations()
-
+    
     # Ensure all configured AWS features are working before starting
     aws_errors = verify_aws_features()
     if aws_errors:
@@ -1342,49 +1546,289 @@ def cmd_run(url_id: Optional[int] = None, max_workers: Optional[int] = None):
     
     db = SessionLocal()
     try:
-        # Create a monitoring cycle record for tracking
-        cycle = MonitoringCycle(
-            started_at=datetime.utcnow(),
-            status="running",
-            triggered_by="cli"
+        # Runs as a monitoring job (like API and scheduled cycles), in the foreground
+        job = job_runner.enqueue(db, triggered_by="cli", url_id=url_id, max_workers=max_workers, start=False)
+    finally:
+        db.close()
+    
+    _run_job_in_foreground(job.id)
+    
+    # Relocation searches for the cycle's 404s run after it, off the cycle
+    if settings.RELOCATION_QUEUE_ENABLED:
+        _drain_relocations()
+
+
+def _run_job_in_foreground(job_id: int) -> None:
+    """Execute a queued job on this process and print its results."""
+    details = []
+    
+    def listener(event: str, data: dict) -> None:
+        if event == "outcome":
+            details.append(data)
+    
+    final = job_runner.execute(job_id, listener=listener)
+    if final is None:
+        print(f"Job {job_id} is not queued")
+        return
+    
+    print("\n=== Monitoring Results ===")
+    print(f"Job ID: {final['id']} ({final['status']})")
+    print(f"Cycle ID: {final['cycle_id']}")
+    if final["started_at"] and final["completed_at"]:
+        duration = datetime.fromisoformat(final["completed_at"]) - datetime.fromisoformat(final["started_at"])
+        print(f"Duration: {duration.total_seconds():.1f}s")
+    print(f"Processed: {final['processed_urls']} of {final['total_urls']}")
+    print(f"Success: {final['successful']}")
+    print(f"Failed: {final['failed']}")
+    print(f"Changes Detected: {final['changes']}")
+    if final["error"]:
+        print(f"Error: {final['error']}")
+    
+    if details:
+        print("\nDetails:")
+        for detail in details:
+            status = "✓" if detail["success"] else "✗"
+            change_indicator = " 📋" if detail.get("change_detected") else ""
+            print(f"  {status} [{detail['url_id']}] {detail['name']}{change_indicator}")
+
+
+def cmd_jobs_list(limit: int = 20):
+    """List recent monitoring jobs."""
+    db = SessionLocal()
+    try:
+        jobs = job_runner.list_jobs(db, limit=limit)
+        if not jobs:
+            print("No monitoring jobs")
+            return
+        print(f"{'ID':>6}  {'Status':<12} {'Trigger':<10} {'Cycle':>6}  {'Progress':>11}  Created")
+        for job in jobs:
+            progress = f"{job.processed_urls or 0}/{job.total_urls or 0}"
+            print(
+                f"{job.id:>6}  {job.status:<12} {job.triggered_by or '':<10} "
+                f"{job.cycle_id or '-':>6}  {progress:>11}  {job.created_at:%Y-%m-%d %H:%M:%S}"
+            )
+    finally:
+        db.close()
+
+
+def cmd_jobs_cancel(job_id: int):
+    """Cancel a queued or running monitoring job (in this or another process)."""
+    db = SessionLocal()
+    try:
+        job = job_runner.cancel(db, job_id)
+        if job is None:
+            print(f"Job {job_id} not found")
+            return
+        print(f"Job {job_id}: {'cancel requested' if job.status == 'running' else job.status}")
+    except JobStateError as e:
+        print(f"ERROR: {e}")
+    finally:
+        db.close()
+
+
+def cmd_jobs_resume(job_id: int):
+    """Resume a cancelled, failed or interrupted job in the foreground."""
+    settings.ensure_directories()
+    run_migrations()
+    
+    db = SessionLocal()
+    try:
+        job = job_runner.resume(db, job_id, start=False)
+        if job is None:
+            print(f"Job {job_id} not found")
+            return
+    except JobStateError as e:
+        print(f"ERROR: {e}")
+        return
+    finally:
+        db.close()
+    
+    _run_job_in_foreground(job_id)
+
+
+def _drain_relocations() -> None:
+    """Run queued relocation searches on this process and print the outcome."""
+    finished = relocation_queue.drain()
+    if finished:
+        print(f"\nRelocation searches finished: {finished}")
+    db = SessionLocal()
+    try:
+        waiting = len(relocation_queue.list_tasks(db, status="queued"))
+    finally:
+        db.close()
+    if waiting:
+        print(f"Relocation searches waiting on domain budgets: {waiting}")
+
+
+def cmd_relocations_list(limit: int = 20, status: Optional[str] = None):
+    """List recent relocation searches."""
+    db = SessionLocal()
+    try:
+        tasks = relocation_queue.list_tasks(db, limit=limit, status=status)
+        if not tasks:
+            print("No relocation searches")
+            return
+        print(f"{'ID':>6}  {'Status':<10} {'URL ID':>6}  {'Pages':>5}  Created              Result")
+        for task in tasks:
+            result = task.new_url or task.error or ""
+            print(
+                f"{task.id:>6}  {task.status:<10} {task.monitored_url_id:>6}  "
+                f"{task.pages_crawled or 0:>5}  {task.created_at:%Y-%m-%d %H:%M:%S}  {result}"
+            )
+    finally:
+        db.close()
+
+
+def cmd_relocations_run():
+    """Run queued relocation searches in the foreground."""
+    settings.ensure_directories()
+    run_migrations()
+    _drain_relocations()
+
+
+def cmd_relocations_cancel(task_id: int):
+    """Cancel a queued relocation search."""
+    db = SessionLocal()
+    try:
+        task = relocation_queue.cancel(db, task_id)
+        if task is None:
+            print(f"Relocation task {task_id} not found")
+            return
+        print(f"Relocation task {task_id}: {task.status}")
+    except RelocationStateError as e:
+        print(str(e))
+    finally:
+        db.close()
+
+
+def cmd_inventory_refresh():
+    """Refresh the site inventory now (conditional GETs on every index page)."""
+    settings.ensure_directories()
+    run_migrations()
+    
+    db = SessionLocal()
+    try:
+        stats = site_inventory.refresh(db)
+    finally:
+        db.close()
+    
+    print(f"Pages: {stats['pages']} ({stats['changed']} changed, "
+          f"{stats['not_modified']} unchanged, {stats['failed']} failed)")
+    print(f"Links: +{stats['links_added']} / -{stats['links_removed']}, "
+          f"{stats['fingerprinted']} fingerprinted")
+    print(f"Moved URLs flagged: {stats['moves_detected']}")
+
+
+def cmd_inventory_lookup(url_id: int):
+    """Show site inventory relocation candidates for a monitored URL."""
+    db = SessionLocal()
+    try:
+        monitored_url = db.get(MonitoredURL, url_id)
+        if monitored_url is None:
+            print(f"URL {url_id} not found")
+            return
+        candidates = site_inventory.lookup(db, monitored_url)
+        if not candidates:
+            print(f"No inventory candidates for {monitored_url.url}")
+            return
+        print(f"Candidates for {monitored_url.url}:")
+        for candidate in candidates:
+            print(f"  [{candidate.match}] {candidate.pdf_url}")
+            if candidate.page_url:
+                print(f"      on {candidate.page_url}")
+    finally:
+        db.close()
+
+
+def cmd_fingerprints_rebuild():
+    """Fingerprint the latest version of every URL from its stored text."""
+    settings.ensure_directories()
+    run_migrations()
+    
+    db = SessionLocal()
+    try:
+        stats = form_fingerprint_index.rebuild(db)
+    finally:
+        db.close()
+    
+    print(f"Indexed: {stats['indexed']} (skipped {stats['skipped']} without text)")
+    print(f"Duplicates flagged: {stats['duplicates']}")
+
+
+def cmd_fingerprints_similar(url_id: int, limit: int = 10):
+    """Show monitored forms similar to a URL's latest version."""
+    db = SessionLocal()
+    try:
+        monitored_url = db.get(MonitoredURL, url_id)
+        if monitored_url is None:
+            print(f"URL {url_id} not found")
+            return
+        matches = form_fingerprint_index.similar_to_url(db, url_id, limit=limit)
+        if not matches:
+            print(f"No similar forms for {monitored_url.url}")
+            return
+        urls = dict(
+            db.query(MonitoredURL.id, MonitoredURL.url).filter(
+                MonitoredURL.id.in_([m.monitored_url_id for m in matches])
+            ).all()
         )
-        db.add(cycle)
-        db.commit()
-        db.refresh(cycle)
-        
-        orchestrator = MonitoringOrchestrator()
-        results = orchestrator.run_cycle(db, url_id, max_workers=max_workers, cycle_id=cycle.id)
-        
-        # Update cycle with results
-        cycle.completed_at = datetime.utcnow()
-        cycle.duration_seconds = (cycle.completed_at - cycle.started_at).total_seconds()
-        cycle.status = "completed"
-        cycle.total_urls_checked = results.get("total", 0)
-        cycle.successful_checks = results.get("successful", 0)
-        cycle.failed_checks = results.get("failed", 0)
-        cycle.changes_detected = results.get("changes", 0)
-        cycle.error_count = results.get("errors", 0)
-        if results.get("error_log"):
-            cycle.error_log = results["error_log"]
-        db.commit()
-        
-        print("\n=== Monitoring Results ===")
-        print(f"Cycle ID: {cycle.id}")
-        print(f"Duration: {cycle.duration_seconds:.1f}s")
-        print(f"Processed: {results['total']}")
-        print(f"Success: {results['successful']}")
-        print(f"Failed: {results['failed']}")
-        print(f"Changes Detected: {results['changes']}")
-        
-        if results.get("details"):
-            print("\nDetails:")
-            for detail in results["details"]:
-                status = "✓" if detail["success"] else "✗"
-                change_indicator = " 📋" if detail.get("change_detected") else ""
-                print(f"  {status} [{detail['url_id']}] {detail['name']}{change_indicator}")
-        
+        print(f"Similar to {monitored_url.url}:")
+        for match in matches:
+            print(f"  {match.similarity:5.0%}  [{match.monitored_url_id}] {urls.get(match.monitored_url_id)}")
+    finally:
+        db.close()
+
+
+def cmd_fingerprints_duplicates(batch_id: Optional[str] = None):
+    """List URLs holding the same form as another monitored URL."""
+    db = SessionLocal()
+    try:
+        duplicates = form_fingerprint_index.duplicates(db, import_batch_id=batch_id)
+    finally:
+        db.close()
+    
+    if not duplicates:
+        print("No duplicate forms found")
+        return
+    for duplicate in duplicates:
+        print(f"  [{duplicate.monitored_url_id}] {duplicate.url}")
+        print(f"      same form as [{duplicate.duplicate_of_url_id}] {duplicate.duplicate_of_url} "
+              f"({duplicate.similarity:.0%})")
+
+
+def cmd_search_rebuild():
+    """Index the latest version of every URL for local full-text search."""
+    settings.ensure_directories()
+    run_migrations()
+    
+    db = SessionLocal()
+    try:
+        stats = local_search_service.rebuild(db)
+    finally:
+        db.close()
+    
+    print(f"Indexed: {stats['indexed']} (skipped {stats['skipped']} without text)")
+
+
+def cmd_search_query(query: str, state: Optional[str] = None, domain: Optional[str] = None, limit: int = 10):
+    """Search monitored forms with the local full-text index."""
+    db = SessionLocal()
+    try:
+        response = local_search_service.search(db, query, state=state, domain=domain, max_results=limit)
     finally:
         db.close()
+    
+    if not response.success:
+        print(f"Search failed: {response.error}")
+        return
+    print(f"{response.total_results} result(s) for \"{query}\"")
+    for result in response.results:
+        print(f"  {result.relevance_score:4.0%}  [{result.url_id}] {result.title}")
+        if result.excerpt:
+            print(f"      {result.excerpt}")
+    for facet, counts in (response.facets or {}).items():
+        if counts:
+            print(f"  {facet}: " + ", ".join(f"{value} ({count})" for value, count in counts.items()))
 
 
 def cmd_reset():
@@ -1404,6 +1848,8 @@ def cmd_reset():
         change_count = db.query(ChangeLog).delete()
         version_count = db.query(PDFVersion).delete()
         db.commit()
+        url_state_tracker.rebuild(db)
+        metrics_tracker.refresh_rollups(db, full=True)
         
         print(f"\n🧹 Cleared {version_count} versions and {change_count} change logs")
         
@@ -1428,7 +1874,7 @@ def cmd_reset():
         else:
             print(f"⚠️  Warning: Could not revert PDFs: {result.stderr}")
             print("  You may need to run: python test_site/simulate_update.py revert")
-        
+    
     finally:
         db.close()
 
@@ -1450,10 +1896,11 @@ def cmd_status():
         print(f"{'ID':<4} {'Name':<40} {'Status':<10} {'Versions':<10} {'Last Checked':<20} {'Last Change':<20}")
         print("-" * 110)
         
+        states = url_state_tracker.get_states(db, [url.id for url in urls], with_latest=False)
+        
         for url in urls:
-            version_count = db.query(PDFVersion).filter(
-                PDFVersion.monitored_url_id == url.id
-            ).count()
+            state = states.get(url.id)
+            version_count = state.version_count if state else 0
             
             status = "enabled" if url.enabled else "disabled"
             last_checked = url.last_checked_at.strftime("%Y-%m-%d %H:%M") if url.last_checked_at else "never"
@@ -1462,9 +1909,33 @@ def cmd_status():
             print(f"{url.id:<4} {url.name[:40]:<40} {status:<10} {version_count:<10} {last_checked:<20} {last_change:<20}")
         
         print()
-        
+    
+    finally:
+        db.close()
+
+
+def cmd_compact_audit(days: Optional[int] = None, vacuum: bool = False):
+    """Compact old per-URL cycle results into daily per-state rollups."""
+    settings.ensure_directories()
+    run_migrations()
+    
+    db = SessionLocal()
+    try:
+        summary = audit_retention.compact(db, retention_days=days)
     finally:
         db.close()
+    
+    print("\n=== Audit Compaction ===")
+    print(f"Cycles compacted: {summary['cycles_compacted']}")
+    print(f"Results folded into rollups: {summary['results_folded']}")
+    print(f"Result rows deleted: {summary['results_deleted']}")
+    
+    if vacuum and engine.dialect.name == "sqlite":
+        # Return the freed pages to the filesystem (SQLite otherwise only reuses them)
+        print("Vacuuming database...")
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.exec_driver_sql("VACUUM")
+    print()
 
 
 def cmd_kendra_index_all(latest_only: bool = False, max_workers: Optional[int] = None):
@@ -1564,6 +2035,10 @@ Commands:
   run       Run monitoring cycle
   reset     Reset test environment (clear data + revert PDFs)
   status    Show status of all URLs
+  jobs      List, cancel or resume monitoring jobs
+  inventory Refresh the site PDF inventory or look up a URL in it
+  fingerprints Rebuild the form fingerprint index or query it locally
+  search    Rebuild the local full-text search index or query it
 
 Examples:
   python cli.py init          # Initialize database
@@ -1571,6 +2046,10 @@ Examples:
   python cli.py run --url-id 1  # Monitor specific URL
   python cli.py reset         # Clear data and reset test PDFs
   python cli.py status        # Show URL status
+  python cli.py jobs resume 12  # Finish an interrupted cycle
+  python cli.py inventory lookup 3  # Where did URL 3's form move to?
+  python cli.py fingerprints similar 3  # Forms similar to URL 3's
+  python cli.py search query "child custody"  # Search without Kendra
 
 Test workflow:
   1. python cli.py seed       # Add test forms
@@ -1607,6 +2086,83 @@ Test workflow:
     # Status command
     subparsers.add_parser("status", help="Show status of all URLs")
     
+    # Audit compaction command
+    compact_parser = subparsers.add_parser(
+        "compact-audit",
+        help="Compact old per-URL cycle results into daily per-state rollups"
+    )
+    compact_parser.add_argument(
+        "--days",
+        type=int,
+        default=None,
+        help="Days of per-URL results to keep (default: from config)"
+    )
+    compact_parser.add_argument(
+        "--vacuum",
+        action="store_true",
+        help="VACUUM the SQLite database afterwards to shrink the file"
+    )
+    
+    # Monitoring job commands
+    jobs_parser = subparsers.add_parser("jobs", help="Monitoring job management")
+    jobs_subparsers = jobs_parser.add_subparsers(dest="jobs_command", help="Jobs subcommand")
+    
+    jobs_list = jobs_subparsers.add_parser("list", help="List recent monitoring jobs")
+    jobs_list.add_argument("--limit", type=int, default=20, help="Jobs to show")
+    jobs_cancel = jobs_subparsers.add_parser("cancel", help="Cancel a queued or running job")
+    jobs_cancel.add_argument("job_id", type=int)
+    jobs_resume = jobs_subparsers.add_parser("resume", help="Resume a cancelled, failed or interrupted job")
+    jobs_resume.add_argument("job_id", type=int)
+    
+    # Relocation queue commands
+    relocations_parser = subparsers.add_parser("relocations", help="Queued relocation searches for 404s")
+    relocations_subparsers = relocations_parser.add_subparsers(
+        dest="relocations_command", help="Relocations subcommand"
+    )
+    
+    relocations_list = relocations_subparsers.add_parser("list", help="List recent relocation searches")
+    relocations_list.add_argument("--limit", type=int, default=20, help="Searches to show")
+    relocations_list.add_argument(
+        "--status", choices=["queued", "running", "relocated", "failed", "cancelled"], help="Only this status"
+    )
+    relocations_subparsers.add_parser("run", help="Run queued relocation searches now")
+    relocations_cancel = relocations_subparsers.add_parser("cancel", help="Cancel a queued relocation search")
+    relocations_cancel.add_argument("task_id", type=int)
+    
+    # Site inventory commands
+    inventory_parser = subparsers.add_parser("inventory", help="Site PDF inventory")
+    inventory_subparsers = inventory_parser.add_subparsers(dest="inventory_command", help="Inventory subcommand")
+    
+    inventory_subparsers.add_parser("refresh", help="Re-check index pages and flag moved forms")
+    inventory_lookup = inventory_subparsers.add_parser("lookup", help="Relocation candidates for a URL")
+    inventory_lookup.add_argument("url_id", type=int)
+    
+    # Form fingerprint commands
+    fingerprints_parser = subparsers.add_parser("fingerprints", help="Form fingerprint (MinHash LSH) index")
+    fingerprints_subparsers = fingerprints_parser.add_subparsers(
+        dest="fingerprints_command", help="Fingerprints subcommand"
+    )
+    
+    fingerprints_subparsers.add_parser("rebuild", help="Index the latest version of every URL")
+    fingerprints_similar = fingerprints_subparsers.add_parser("similar", help="Forms similar to a URL's")
+    fingerprints_similar.add_argument("url_id", type=int)
+    fingerprints_similar.add_argument("--limit", type=int, default=10, help="Forms to show")
+    fingerprints_duplicates = fingerprints_subparsers.add_parser(
+        "duplicates", help="URLs holding the same form as another URL"
+    )
+    fingerprints_duplicates.add_argument("--batch-id", help="Only URLs from this bulk import batch")
+    
+    # Local search commands
+    search_parser = subparsers.add_parser("search", help="Local full-text search index")
+    search_subparsers = search_parser.add_subparsers(dest="search_command", help="Search subcommand")
+    
+    search_subparsers.add_parser("rebuild", help="Index the latest version of every URL")
+    search_query = search_subparsers.add_parser("query", help="Search monitored forms")
+    search_query.add_argument("query")
+    search_query.add_argument("--state", help="Only forms from this state")
+    search_query.add_argument("--domain", help="Only forms in this domain category")
+    search_query.add_argument("--limit", type=int, default=10, help="Results to show")
+    
     # Kendra commands
     kendra_parser = subparsers.add_parser("kendra", help="Kendra index management")
     kendra_subparsers = kendra_parser.add_subparsers(dest="kendra_command", help="Kendra subcommand")
@@ -1637,6 +2193,49 @@ Test workflow:
         cmd_reset()
     elif args.command == "status":
         cmd_status()
+    elif args.command == "compact-audit":
+        cmd_compact_audit(days=args.days, vacuum=args.vacuum)
+    elif args.command == "jobs":
+        if args.jobs_command == "list":
+            cmd_jobs_list(limit=args.limit)
+        elif args.jobs_command == "cancel":
+            cmd_jobs_cancel(args.job_id)
+        elif args.jobs_command == "resume":
+            cmd_jobs_resume(args.job_id)
+        else:
+            jobs_parser.print_help()
+    elif args.command == "relocations":
+        if args.relocations_command == "list":
+            cmd_relocations_list(limit=args.limit, status=args.status)
+        elif args.relocations_command == "run":
+            cmd_relocations_run()
+        elif args.relocations_command == "cancel":
+            cmd_relocations_cancel(args.task_id)
+        else:
+            relocations_parser.print_help()
+    elif args.command == "inventory":
+        if args.inventory_command == "refresh":
+            cmd_inventory_refresh()
+        elif args.inventory_command == "lookup":
+            cmd_inventory_lookup(args.url_id)
+        else:
+            inventory_parser.print_help()
+    elif args.command == "fingerprints":
+        if args.fingerprints_command == "rebuild":
+            cmd_fingerprints_rebuild()
+        elif args.fingerprints_command == "similar":
+            cmd_fingerprints_similar(args.url_id, limit=args.limit)
+        elif args.fingerprints_command == "duplicates":
+            cmd_fingerprints_duplicates(batch_id=args.batch_id)
+        else:
+            fingerprints_parser.print_help()
+    elif args.command == "search":
+        if args.search_command == "rebuild":
+            cmd_search_rebuild()
+        elif args.search_command == "query":
+            cmd_search_query(args.query, state=args.state, domain=args.domain, limit=args.limit)
+        else:
+            search_parser.print_help()
     elif args.command == "kendra":
         if args.kendra_command == "index-all":
             cmd_kendra_index_all(latest_only=args.latest_only, max_workers=args.max_workers)
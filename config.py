@@ -73,6 +73,24 @@ class Settings:
     
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///data/url_monitor.db")
+    # SQLite tuning: WAL journal lets reads run alongside the single writer
+    SQLITE_WAL_ENABLED: bool = os.getenv("SQLITE_WAL_ENABLED", "True").lower() == "true"
+    # How long a connection waits for a write lock before "database is locked"
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "30000"))
+    # Batched writer for high-volume cycle writes (timestamps, cycle results)
+    DB_WRITE_BATCH_SIZE: int = int(os.getenv("DB_WRITE_BATCH_SIZE", "200"))
+    DB_WRITE_FLUSH_INTERVAL_MS: int = int(os.getenv("DB_WRITE_FLUSH_INTERVAL_MS", "250"))
+    # Connection pool for server databases (PostgreSQL); ignored for SQLite.
+    # 0 sizes the pool to MAX_WORKERS, capped at DB_POOL_SIZE_CAP
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "0"))
+    DB_POOL_SIZE_CAP: int = int(os.getenv("DB_POOL_SIZE_CAP", "40"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    # Seconds to wait for a free pooled connection before failing
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+    # Recycle connections older than this (seconds) to dodge server/proxy idle cuts
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    # PostgreSQL per-statement timeout in ms (0 = server default)
+    DB_STATEMENT_TIMEOUT_MS: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
     
     # Storage
     PDF_STORAGE_PATH: Path = Path(os.getenv("PDF_STORAGE_PATH", "./data/pdfs"))
@@ -80,6 +98,23 @@ class Settings:
     # Processing
     OCR_TEXT_THRESHOLD: int = int(os.getenv("OCR_TEXT_THRESHOLD", "50"))
     
+    # Page raster cache (shared by visual diff, previews and title extraction)
+    # Keyed by (pdf hash, page, dpi); both tiers are LRU-bounded
+    RASTER_CACHE_MEMORY_MB: int = int(os.getenv("RASTER_CACHE_MEMORY_MB", "128"))
+    RASTER_CACHE_DISK_MB: int = int(os.getenv("RASTER_CACHE_DISK_MB", "1024"))
+    RASTER_CACHE_PATH: Path = Path(os.getenv("RASTER_CACHE_PATH", "./data/raster_cache"))
+    
+    # Visual diff at detection time: one image per affected page
+    # Pages are diffed in a process pool; 0 workers diffs in-process
+    VISUAL_DIFF_WORKERS: int = int(os.getenv("VISUAL_DIFF_WORKERS", str(min(4, os.cpu_count() or 1))))
+    # Maximum pages diffed per change (remaining pages render on demand)
+    VISUAL_DIFF_MAX_PAGES: int = int(os.getenv("VISUAL_DIFF_MAX_PAGES", "10"))
+    # Seconds to wait for a change's page diffs before moving on
+    VISUAL_DIFF_TIME_BUDGET_SECONDS: float = float(os.getenv("VISUAL_DIFF_TIME_BUDGET_SECONDS", "60"))
+    # Visual diff mode: "raster" compares rendered pixels; "text" (opt-in)
+    # aligns word boxes, falling back to pixels for scanned pages
+    VISUAL_DIFF_MODE: str = os.getenv("VISUAL_DIFF_MODE", "raster").lower()
+    
     # Logging
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     
@@ -156,6 +191,138 @@ class Settings:
     # Maximum URLs per bulk upload
     BULK_UPLOAD_MAX_URLS: int = int(os.getenv("BULK_UPLOAD_MAX_URLS", "1000"))
     
+    # ==========================================================================
+    # URL List Views
+    # Dashboard and URL management render one keyset page at a time and
+    # load further pages from /api/urls/page
+    # ==========================================================================
+    
+    # Rows per page
+    URL_LIST_PAGE_SIZE: int = int(os.getenv("URL_LIST_PAGE_SIZE", "100"))
+    # Largest page a client may request
+    URL_LIST_MAX_PAGE_SIZE: int = int(os.getenv("URL_LIST_MAX_PAGE_SIZE", "500"))
+    
+    # ==========================================================================
+    # Audit Retention
+    # Per-URL cycle results older than the retention window are compacted
+    # into per-day, per-state totals after each cycle
+    # ==========================================================================
+    
+    # Days of per-URL cycle results to keep (0 keeps everything)
+    AUDIT_DETAIL_RETENTION_DAYS: int = int(os.getenv("AUDIT_DETAIL_RETENTION_DAYS", "90"))
+    # Rows deleted per transaction while compacting
+    AUDIT_RETENTION_BATCH_SIZE: int = int(os.getenv("AUDIT_RETENTION_BATCH_SIZE", "5000"))
+    
+    # ==========================================================================
+    # API Concurrency
+    # Blocking route work runs in bounded thread pools, never on the event
+    # loop; renders and external calls get their own pools so they can't
+    # starve quick database-backed pages
+    # ==========================================================================
+    
+    # Threads for database queries, file reads and template rendering
+    API_DB_THREADS: int = int(os.getenv("API_DB_THREADS", "20"))
+    # Threads for PDF page renders and visual diffs
+    API_RENDER_THREADS: int = int(os.getenv("API_RENDER_THREADS", "4"))
+    # Threads for AWS calls and monitoring runs started from a request
+    API_EXTERNAL_THREADS: int = int(os.getenv("API_EXTERNAL_THREADS", "8"))
+    
+    # ==========================================================================
+    # Monitoring Jobs
+    # Every monitoring cycle (API, scheduler, CLI) runs as a persisted job
+    # ==========================================================================
+    
+    # Jobs run at the same time (each one already fans out to MAX_WORKERS)
+    JOB_RUNNER_CONCURRENCY: int = int(os.getenv("JOB_RUNNER_CONCURRENCY", "1"))
+    # How often a running job's progress counts are saved
+    JOB_PROGRESS_PERSIST_SECONDS: float = float(os.getenv("JOB_PROGRESS_PERSIST_SECONDS", "2"))
+    # How often a running job checks the database for a cancel from another process
+    JOB_CANCEL_POLL_SECONDS: float = float(os.getenv("JOB_CANCEL_POLL_SECONDS", "2"))
+    # Progress events kept in memory per job for the event stream
+    JOB_EVENT_BUFFER: int = int(os.getenv("JOB_EVENT_BUFFER", "1000"))
+    # How often the event stream checks for new events
+    JOB_EVENTS_POLL_MS: int = int(os.getenv("JOB_EVENTS_POLL_MS", "500"))
+    
+    # ==========================================================================
+    # Site Inventory
+    # PDF links on monitored sites' index pages (MonitoredURL.parent_page_url),
+    # refreshed with conditional GETs so relocation is a local lookup
+    # ==========================================================================
+    
+    # Use the inventory for relocation and refresh it on the scheduler
+    SITE_INVENTORY_ENABLED: bool = os.getenv("SITE_INVENTORY_ENABLED", "True").lower() == "true"
+    # Minutes between background refreshes of all index pages
+    SITE_INVENTORY_REFRESH_MINUTES: int = int(os.getenv("SITE_INVENTORY_REFRESH_MINUTES", "360"))
+    # New or changed links fingerprinted (64KB quick hash) per refresh
+    SITE_INVENTORY_FINGERPRINTS_PER_REFRESH: int = int(os.getenv("SITE_INVENTORY_FINGERPRINTS_PER_REFRESH", "50"))
+    # Delay between requests to the same site during a refresh (seconds)
+    SITE_INVENTORY_REQUEST_DELAY: float = float(os.getenv("SITE_INVENTORY_REQUEST_DELAY", "0.5"))
+    
+    # ==========================================================================
+    # Form Fingerprints
+    # MinHash signatures of every URL's latest version text with an LSH index,
+    # for local near-duplicate lookup (duplicates, similar forms, relocation)
+    # ==========================================================================
+    
+    # Fingerprint versions as they are created
+    FORM_FINGERPRINT_ENABLED: bool = os.getenv("FORM_FINGERPRINT_ENABLED", "True").lower() == "true"
+    # Words per shingle (sister forms share many words but few word sequences)
+    FORM_FINGERPRINT_SHINGLE_SIZE: int = int(os.getenv("FORM_FINGERPRINT_SHINGLE_SIZE", "3"))
+    # MinHash permutations per signature; must be a multiple of the band count
+    FORM_FINGERPRINT_PERMUTATIONS: int = int(os.getenv("FORM_FINGERPRINT_PERMUTATIONS", "128"))
+    # LSH bands (more bands finds less similar pairs, with more candidates to check)
+    FORM_FINGERPRINT_BANDS: int = int(os.getenv("FORM_FINGERPRINT_BANDS", "64"))
+    # Estimated Jaccard similarity at which two URLs hold the same form
+    FORM_FINGERPRINT_DUPLICATE_THRESHOLD: float = float(os.getenv("FORM_FINGERPRINT_DUPLICATE_THRESHOLD", "0.9"))
+    # Minimum similarity for similar-form suggestions
+    FORM_FINGERPRINT_SIMILAR_THRESHOLD: float = float(os.getenv("FORM_FINGERPRINT_SIMILAR_THRESHOLD", "0.3"))
+    # Relocation skips PDFs monitored as other forms (similarity below this)
+    FORM_FINGERPRINT_RELOCATION_SKIP_BELOW: float = float(os.getenv("FORM_FINGERPRINT_RELOCATION_SKIP_BELOW", "0.5"))
+    
+    # ==========================================================================
+    # Local Search
+    # SQLite FTS5 full-text index of every URL's latest version, used by the
+    # search page and /api/search when Kendra search is off (or with source=local)
+    # ==========================================================================
+    
+    # Index versions as they are created and serve local search
+    LOCAL_SEARCH_ENABLED: bool = os.getenv("LOCAL_SEARCH_ENABLED", "True").lower() == "true"
+    # Words per result excerpt
+    LOCAL_SEARCH_SNIPPET_TOKENS: int = int(os.getenv("LOCAL_SEARCH_SNIPPET_TOKENS", "32"))
+    
+    # ==========================================================================
+    # Relocation Queue
+    # Similarity searches for forms whose URL returned 404 run in a separate
+    # queue instead of inside the monitoring cycle
+    # ==========================================================================
+    
+    # Queue relocation searches (False: search inline during the cycle, as before)
+    RELOCATION_QUEUE_ENABLED: bool = os.getenv("RELOCATION_QUEUE_ENABLED", "True").lower() == "true"
+    # Relocation searches running at once
+    RELOCATION_QUEUE_CONCURRENCY: int = int(os.getenv("RELOCATION_QUEUE_CONCURRENCY", "2"))
+    # Relocation searches running at once against the same domain
+    RELOCATION_DOMAIN_CONCURRENCY: int = int(os.getenv("RELOCATION_DOMAIN_CONCURRENCY", "1"))
+    # Pages fetched per domain per budget window, across its searches
+    RELOCATION_DOMAIN_PAGE_BUDGET: int = int(os.getenv("RELOCATION_DOMAIN_PAGE_BUDGET", "500"))
+    RELOCATION_BUDGET_WINDOW_MINUTES: int = int(os.getenv("RELOCATION_BUDGET_WINDOW_MINUTES", "60"))
+    # Crawl limits of one search
+    RELOCATION_MAX_PAGES: int = int(os.getenv("RELOCATION_MAX_PAGES", "250"))
+    RELOCATION_MAX_DEPTH: int = int(os.getenv("RELOCATION_MAX_DEPTH", "10"))
+    # How often idle workers look for tasks queued by other processes (seconds)
+    RELOCATION_QUEUE_POLL_SECONDS: int = int(os.getenv("RELOCATION_QUEUE_POLL_SECONDS", "30"))
+    
+    # ==========================================================================
+    # Landing Pages
+    # Monitored URLs that are web pages linking to the PDF: the resolved link is
+    # cached and the page re-checked with a conditional GET, so it is scraped
+    # (Lambda or HTTP) only when it changed
+    # ==========================================================================
+    
+    # Cache resolved PDF links (False: scrape landing pages on every check)
+    LANDING_PAGE_CACHE_ENABLED: bool = os.getenv("LANDING_PAGE_CACHE_ENABLED", "True").lower() == "true"
+    # Scrape unchanged pages again after this many days anyway (0 = never)
+    LANDING_PAGE_RESCRAPE_DAYS: int = int(os.getenv("LANDING_PAGE_RESCRAPE_DAYS", "30"))
+    
     @classmethod
     def ensure_directories(cls) -> None:
         """Create required directories if they don't exist."""
@@ -2,20 +2,90 @@
 Database connection and session management.
 """
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session, declarative_base
-from typing import Generator
+from typing import Any, Dict, Generator
 import structlog
 
 from config import settings
 
 logger = structlog.get_logger()
 
+_is_sqlite = settings.DATABASE_URL.startswith("sqlite")
+
+# Smallest pool handed to a server database, however few workers there are
+MIN_POOL_SIZE = 5
+
+
+def pool_size() -> int:
+    """Pool size for server databases: DB_POOL_SIZE, or one per worker up to DB_POOL_SIZE_CAP."""
+    if settings.DB_POOL_SIZE > 0:
+        return settings.DB_POOL_SIZE
+    return max(MIN_POOL_SIZE, min(settings.MAX_WORKERS, settings.DB_POOL_SIZE_CAP))
+
+
+def engine_options(database_url: str) -> Dict[str, Any]:
+    """
+    create_engine() keyword arguments for the given database URL.
+    
+    SQLite keeps its file-level tuning. Server databases get a sized
+    QueuePool with pre-ping and recycling, so a monitoring cycle's workers
+    don't queue on connections and stale ones are replaced transparently.
+    
+    Args:
+        database_url: SQLAlchemy database URL
+    
+    Returns:
+        Keyword arguments for create_engine()
+    """
+    if database_url.startswith("sqlite"):
+        return {
+            "connect_args": {
+                "check_same_thread": False,  # Needed for SQLite
+                "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000
+            }
+        }
+    
+    options: Dict[str, Any] = {
+        "pool_size": pool_size(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": True
+    }
+    if database_url.startswith("postgresql"):
+        connect_args: Dict[str, Any] = {"application_name": "url_monitor"}
+        if settings.DB_STATEMENT_TIMEOUT_MS > 0:
+            connect_args["options"] = f"-c statement_timeout={int(settings.DB_STATEMENT_TIMEOUT_MS)}"
+        options["connect_args"] = connect_args
+    return options
+
+
 # Create engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False}  # Needed for SQLite
-)
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
+
+
+def _configure_sqlite(dbapi_connection, connection_record):
+    """
+    Tune each SQLite connection for concurrent monitoring cycles.
+    
+    WAL lets readers (API, dashboard) run alongside the writer, and the
+    busy timeout makes a blocked writer wait instead of failing with
+    "database is locked".
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        if settings.SQLITE_WAL_ENABLED:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    finally:
+        cursor.close()
+
+
+if _is_sqlite:
+    event.listen(engine, "connect", _configure_sqlite)
+
 
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -4,18 +4,36 @@ For this prototype, we use simple create_all() migrations.
 In production, use Alembic for proper versioned migrations.
 """
 
+from datetime import datetime
+
 import structlog
-from sqlalchemy import inspect, text
+from sqlalchemy import DateTime, inspect, text
 
+from config import settings
 from db.database import engine, Base, init_db
 from db.models import (  # noqa: F401
     MonitoredURL, PDFVersion, ChangeLog,
-    ScheduleConfig, MonitoringCycle, CycleURLResult
+    ScheduleConfig, MonitoringCycle, CycleURLResult, URLCurrentState,
+    MetricsDailyRollup, CycleResultRollup, MonitoringJob,
+    SiteInventoryPage, SiteInventoryLink, FormFingerprint, FormFingerprintBucket,
+    RelocationTask, LandingPage
 )
 
 logger = structlog.get_logger()
 
 
+def _column_type(col_type: str) -> str:
+    """
+    Adapt a column type used in ALTER TABLE to the engine's backend.
+    
+    The column lists below are written with SQLite's DATETIME; PostgreSQL
+    spells it TIMESTAMP. Other types used here are valid on both.
+    """
+    if col_type.startswith("DATETIME") and engine.dialect.name != "sqlite":
+        return DateTime().compile(dialect=engine.dialect) + col_type[len("DATETIME"):]
+    return col_type
+
+
 def check_tables_exist() -> dict[str, bool]:
     """Check which tables exist in the database."""
     inspector = inspect(engine)
@@ -23,7 +41,11 @@ def check_tables_exist() -> dict[str, bool]:
     
     required_tables = [
         "monitored_urls", "pdf_versions", "change_logs",
-        "schedule_config", "monitoring_cycles", "cycle_url_results"
+        "schedule_config", "monitoring_cycles", "cycle_url_results",
+        "url_current_state", "metrics_daily_rollups", "cycle_result_rollups",
+        "monitoring_jobs", "site_inventory_pages", "site_inventory_links",
+        "form_fingerprints", "form_fingerprint_buckets", "relocation_tasks",
+        "landing_pages"
     ]
     return {table: table in existing_tables for table in required_tables}
 
@@ -53,7 +75,7 @@ def migrate_title_columns() -> None:
         for col_name, col_type in new_columns:
             if col_name not in existing_columns:
                 logger.info(f"Adding column {col_name} to pdf_versions")
-                conn.execute(text(f"ALTER TABLE pdf_versions ADD COLUMN {col_name} {col_type}"))
+                conn.execute(text(f"ALTER TABLE pdf_versions ADD COLUMN {col_name} {_column_type(col_type)}"))
         conn.commit()
 
 
@@ -88,7 +110,7 @@ def migrate_change_detection_columns() -> None:
             for col_name, col_type in new_columns:
                 if col_name not in existing:
                     logger.info(f"Adding column {col_name} to change_logs")
-                    conn.execute(text(f"ALTER TABLE change_logs ADD COLUMN {col_name} {col_type}"))
+                    conn.execute(text(f"ALTER TABLE change_logs ADD COLUMN {col_name} {_column_type(col_type)}"))
         
         conn.commit()
 
@@ -125,7 +147,7 @@ def migrate_review_workflow_columns() -> None:
         for col_name, col_type in new_columns:
             if col_name not in existing:
                 logger.info(f"Adding column {col_name} to change_logs")
-                conn.execute(text(f"ALTER TABLE change_logs ADD COLUMN {col_name} {col_type}"))
+                conn.execute(text(f"ALTER TABLE change_logs ADD COLUMN {col_name} {_column_type(col_type)}"))
         conn.commit()
 
 
@@ -156,7 +178,7 @@ def migrate_fast_detection_columns() -> None:
         for col_name, col_type in new_columns:
             if col_name not in existing:
                 logger.info(f"Adding column {col_name} to monitored_urls")
-                conn.execute(text(f"ALTER TABLE monitored_urls ADD COLUMN {col_name} {col_type}"))
+                conn.execute(text(f"ALTER TABLE monitored_urls ADD COLUMN {col_name} {_column_type(col_type)}"))
         conn.commit()
 
 
@@ -183,7 +205,7 @@ def migrate_state_domain_columns() -> None:
         for col_name, col_type in new_columns:
             if col_name not in existing:
                 logger.info(f"Adding column {col_name} to monitored_urls")
-                conn.execute(text(f"ALTER TABLE monitored_urls ADD COLUMN {col_name} {col_type}"))
+                conn.execute(text(f"ALTER TABLE monitored_urls ADD COLUMN {col_name} {_column_type(col_type)}"))
         
         # Backfill existing Alaska URLs
         conn.execute(text("""
@@ -233,7 +255,7 @@ def migrate_kendra_columns() -> None:
         for col_name, col_type in new_columns:
             if col_name not in existing:
                 logger.info(f"Adding column {col_name} to pdf_versions")
-                conn.execute(text(f"ALTER TABLE pdf_versions ADD COLUMN {col_name} {col_type}"))
+                conn.execute(text(f"ALTER TABLE pdf_versions ADD COLUMN {col_name} {_column_type(col_type)}"))
         conn.commit()
         logger.info("Kendra columns migrated")
 
@@ -289,7 +311,7 @@ def migrate_idp_enrichment_columns() -> None:
         for col_name, col_type in new_columns:
             if col_name not in existing:
                 logger.info(f"Adding IDP enrichment column {col_name} to pdf_versions")
-                conn.execute(text(f"ALTER TABLE pdf_versions ADD COLUMN {col_name} {col_type}"))
+                conn.execute(text(f"ALTER TABLE pdf_versions ADD COLUMN {col_name} {_column_type(col_type)}"))
         conn.commit()
         logger.info("IDP enrichment columns migrated")
 
@@ -316,7 +338,7 @@ def migrate_import_tracking_columns() -> None:
         for col_name, col_type in new_columns:
             if col_name not in existing:
                 logger.info(f"Adding column {col_name} to monitored_urls")
-                conn.execute(text(f"ALTER TABLE monitored_urls ADD COLUMN {col_name} {col_type}"))
+                conn.execute(text(f"ALTER TABLE monitored_urls ADD COLUMN {col_name} {_column_type(col_type)}"))
         conn.commit()
         logger.info("Import tracking columns migrated")
 
@@ -354,7 +376,7 @@ def migrate_download_tracking_columns() -> None:
         for col_name, col_type in new_columns:
             if col_name not in existing:
                 logger.info(f"Adding column {col_name} to change_logs")
-                conn.execute(text(f"ALTER TABLE change_logs ADD COLUMN {col_name} {col_type}"))
+                conn.execute(text(f"ALTER TABLE change_logs ADD COLUMN {col_name} {_column_type(col_type)}"))
         conn.commit()
         logger.info("Download tracking and intervention columns migrated")
 
@@ -367,83 +389,320 @@ def migrate_scheduling_tables() -> None:
     inspector = inspect(engine)
     tables = inspector.get_table_names()
     
-    # Create new tables if they don't exist
+    # Create new tables from the models so the DDL matches the backend
     if "schedule_config" not in tables:
         logger.info("Creating schedule_config table")
+        ScheduleConfig.__table__.create(engine, checkfirst=True)
+        # Insert default configuration
         with engine.connect() as conn:
-            conn.execute(text("""
-                CREATE TABLE schedule_config (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    enabled BOOLEAN DEFAULT TRUE,
-                    schedule_type VARCHAR(50) DEFAULT 'daily',
-                    daily_time VARCHAR(5) DEFAULT '02:00',
-                    weekly_days JSON,
-                    weekly_time VARCHAR(5) DEFAULT '02:00',
-                    cron_expression VARCHAR(100),
-                    timezone VARCHAR(50) DEFAULT 'UTC',
-                    created_at DATETIME,
-                    updated_at DATETIME,
-                    last_run_at DATETIME,
-                    next_run_at DATETIME
-                )
-            """))
-            # Insert default configuration
-            conn.execute(text("""
-                INSERT INTO schedule_config (enabled, schedule_type, daily_time, timezone, created_at)
-                VALUES (TRUE, 'daily', '02:00', 'UTC', datetime('now'))
-            """))
+            conn.execute(ScheduleConfig.__table__.insert().values(
+                enabled=True,
+                schedule_type="daily",
+                daily_time="02:00",
+                timezone="UTC",
+                created_at=datetime.utcnow()
+            ))
             conn.commit()
         logger.info("schedule_config table created with default configuration")
     
     if "monitoring_cycles" not in tables:
         logger.info("Creating monitoring_cycles table")
-        with engine.connect() as conn:
-            conn.execute(text("""
-                CREATE TABLE monitoring_cycles (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    started_at DATETIME NOT NULL,
-                    completed_at DATETIME,
-                    duration_seconds FLOAT,
-                    status VARCHAR(50) DEFAULT 'running',
-                    total_urls_checked INTEGER DEFAULT 0,
-                    successful_checks INTEGER DEFAULT 0,
-                    failed_checks INTEGER DEFAULT 0,
-                    changes_detected INTEGER DEFAULT 0,
-                    skipped_unchanged INTEGER DEFAULT 0,
-                    downloads_automated INTEGER DEFAULT 0,
-                    manual_interventions INTEGER DEFAULT 0,
-                    triggered_by VARCHAR(50) DEFAULT 'manual',
-                    schedule_config_snapshot JSON,
-                    error_log TEXT,
-                    error_count INTEGER DEFAULT 0
-                )
-            """))
-            conn.commit()
+        MonitoringCycle.__table__.create(engine, checkfirst=True)
         logger.info("monitoring_cycles table created")
     
     if "cycle_url_results" not in tables:
         logger.info("Creating cycle_url_results table")
+        CycleURLResult.__table__.create(engine, checkfirst=True)
+        logger.info("cycle_url_results table created")
+
+
+def migrate_cycle_outcome_columns() -> None:
+    """
+    Add per-URL outcome columns (skip reason, bytes, stage timings) to cycle_url_results.
+    """
+    inspector = inspect(engine)
+    
+    if "cycle_url_results" not in inspector.get_table_names():
+        return  # Table will be created with all columns
+    
+    existing = [col["name"] for col in inspector.get_columns("cycle_url_results")]
+    
+    new_columns = [
+        ("skip_reason", "VARCHAR(50)"),
+        ("bytes_fetched", "INTEGER"),
+        ("stage_timings", "JSON"),
+    ]
+    
+    with engine.connect() as conn:
+        for col_name, col_type in new_columns:
+            if col_name not in existing:
+                logger.info(f"Adding column {col_name} to cycle_url_results")
+                conn.execute(text(f"ALTER TABLE cycle_url_results ADD COLUMN {col_name} {_column_type(col_type)}"))
+        conn.commit()
+
+
+def migrate_url_current_state() -> None:
+    """
+    Create the url_current_state table and backfill it from existing history.
+    """
+    inspector = inspect(engine)
+    
+    if "url_current_state" in inspector.get_table_names():
+        return
+    
+    logger.info("Creating url_current_state table")
+    URLCurrentState.__table__.create(engine, checkfirst=True)
+    
+    from db.database import SessionLocal
+    from services.url_state import url_state_tracker
+    
+    db = SessionLocal()
+    try:
+        url_state_tracker.rebuild(db)
+    finally:
+        db.close()
+
+
+def migrate_relocation_near_misses() -> None:
+    """
+    Move relocation near-misses from data/relocation_near_misses/url_{id}.json
+    into url_current_state.relocation_near_misses.
+    """
+    import json
+    from pathlib import Path
+    
+    inspector = inspect(engine)
+    existing = [col["name"] for col in inspector.get_columns("url_current_state")]
+    
+    if "relocation_near_misses" not in existing:
+        logger.info("Adding column relocation_near_misses to url_current_state")
         with engine.connect() as conn:
-            conn.execute(text("""
-                CREATE TABLE cycle_url_results (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    cycle_id INTEGER NOT NULL,
-                    monitored_url_id INTEGER NOT NULL,
-                    status VARCHAR(50) NOT NULL,
-                    error_message TEXT,
-                    started_at DATETIME,
-                    completed_at DATETIME,
-                    duration_ms INTEGER,
-                    tier_reached INTEGER,
-                    change_detected BOOLEAN DEFAULT FALSE,
-                    change_log_id INTEGER,
-                    FOREIGN KEY (cycle_id) REFERENCES monitoring_cycles(id),
-                    FOREIGN KEY (monitored_url_id) REFERENCES monitored_urls(id),
-                    FOREIGN KEY (change_log_id) REFERENCES change_logs(id)
-                )
-            """))
+            conn.execute(text("ALTER TABLE url_current_state ADD COLUMN relocation_near_misses JSON"))
             conn.commit()
-        logger.info("cycle_url_results table created")
+    
+    rel_dir = Path("data") / "relocation_near_misses"
+    if not rel_dir.exists():
+        return
+    
+    from db.database import SessionLocal
+    from services.url_state import url_state_tracker
+    
+    db = SessionLocal()
+    try:
+        known_ids = {url_id for (url_id,) in db.query(MonitoredURL.id).all()}
+        imported = 0
+        for path in sorted(rel_dir.glob("url_*.json")):
+            try:
+                url_id = int(path.stem.split("_", 1)[1])
+                with open(path, "r") as f:
+                    payload = json.load(f)
+            except (ValueError, json.JSONDecodeError, OSError):
+                continue
+            if url_id in known_ids:
+                url_state_tracker.record_near_misses(db, url_id, payload)
+                imported += 1
+            path.unlink()
+        db.commit()
+        if imported:
+            logger.info("Imported relocation near-misses", count=imported)
+    finally:
+        db.close()
+
+
+def migrate_metrics_rollups() -> None:
+    """
+    Create the metrics_daily_rollups table and backfill it from change_logs.
+    """
+    inspector = inspect(engine)
+    
+    if "metrics_daily_rollups" in inspector.get_table_names():
+        return
+    
+    logger.info("Creating metrics_daily_rollups table")
+    MetricsDailyRollup.__table__.create(engine, checkfirst=True)
+    
+    from db.database import SessionLocal
+    from services.metrics_tracker import metrics_tracker
+    
+    db = SessionLocal()
+    try:
+        metrics_tracker.refresh_rollups(db, full=True)
+    finally:
+        db.close()
+
+
+def migrate_audit_retention() -> None:
+    """
+    Add the results_compacted_at column to monitoring_cycles and create the
+    cycle_result_rollups table.
+    """
+    inspector = inspect(engine)
+    
+    if "monitoring_cycles" in inspector.get_table_names():
+        existing = [col["name"] for col in inspector.get_columns("monitoring_cycles")]
+        if "results_compacted_at" not in existing:
+            logger.info("Adding column results_compacted_at to monitoring_cycles")
+            with engine.connect() as conn:
+                conn.execute(text(f"ALTER TABLE monitoring_cycles ADD COLUMN results_compacted_at {_column_type('DATETIME')}"))
+                conn.commit()
+    
+    if "cycle_result_rollups" not in inspector.get_table_names():
+        logger.info("Creating cycle_result_rollups table")
+        CycleResultRollup.__table__.create(engine, checkfirst=True)
+
+
+def migrate_monitoring_jobs() -> None:
+    """
+    Create the monitoring_jobs table.
+    """
+    inspector = inspect(engine)
+    
+    if "monitoring_jobs" not in inspector.get_table_names():
+        logger.info("Creating monitoring_jobs table")
+        MonitoringJob.__table__.create(engine, checkfirst=True)
+
+
+def migrate_site_inventory() -> None:
+    """
+    Create the site inventory tables.
+    """
+    inspector = inspect(engine)
+    existing_tables = inspector.get_table_names()
+    
+    for model in (SiteInventoryPage, SiteInventoryLink):
+        if model.__tablename__ not in existing_tables:
+            logger.info(f"Creating {model.__tablename__} table")
+            model.__table__.create(engine, checkfirst=True)
+
+
+def migrate_form_fingerprints() -> None:
+    """
+    Create the form fingerprint (MinHash LSH) tables and index existing versions.
+    
+    If the backfill fails, run 'cli.py fingerprints rebuild'.
+    """
+    inspector = inspect(engine)
+    existing_tables = inspector.get_table_names()
+    
+    created = False
+    for model in (FormFingerprint, FormFingerprintBucket):
+        if model.__tablename__ not in existing_tables:
+            logger.info(f"Creating {model.__tablename__} table")
+            model.__table__.create(engine, checkfirst=True)
+            created = True
+    if not created:
+        return
+    
+    from db.database import SessionLocal
+    from services.form_fingerprints import form_fingerprint_index
+    
+    db = SessionLocal()
+    try:
+        form_fingerprint_index.rebuild(db)
+    except Exception as e:
+        db.rollback()
+        logger.warning("Form fingerprint backfill failed; run 'cli.py fingerprints rebuild'", error=str(e))
+    finally:
+        db.close()
+
+
+def migrate_relocation_tasks() -> None:
+    """Create the deferred relocation search queue table."""
+    inspector = inspect(engine)
+    
+    if "relocation_tasks" not in inspector.get_table_names():
+        logger.info("Creating relocation_tasks table")
+        RelocationTask.__table__.create(engine, checkfirst=True)
+
+
+def migrate_landing_pages() -> None:
+    """Create the table of PDF links resolved from landing pages."""
+    inspector = inspect(engine)
+    
+    if "landing_pages" not in inspector.get_table_names():
+        logger.info("Creating landing_pages table")
+        LandingPage.__table__.create(engine, checkfirst=True)
+
+
+def migrate_local_search() -> None:
+    """
+    Create the full-text search table (SQLite FTS5) used when Kendra is off,
+    and index existing versions.
+    
+    If the backfill fails, run 'cli.py search rebuild'.
+    """
+    from services.local_search import CREATE_TABLE_SQL, TABLE_NAME
+    
+    if engine.dialect.name != "sqlite" or not settings.LOCAL_SEARCH_ENABLED:
+        return
+    if TABLE_NAME in inspect(engine).get_table_names():
+        return
+    
+    logger.info(f"Creating {TABLE_NAME} table")
+    try:
+        with engine.connect() as conn:
+            conn.execute(text(CREATE_TABLE_SQL))
+            conn.commit()
+    except Exception as e:
+        # SQLite built without FTS5: search stays on Kendra
+        logger.warning("Could not create local search table", error=str(e))
+        return
+    
+    from db.database import SessionLocal
+    from services.local_search import local_search_service
+    
+    db = SessionLocal()
+    try:
+        local_search_service.rebuild(db)
+    except Exception as e:
+        db.rollback()
+        logger.warning("Local search backfill failed; run 'cli.py search rebuild'", error=str(e))
+    finally:
+        db.close()
+
+
+def migrate_cycle_result_uniqueness() -> None:
+    """
+    Drop duplicate (cycle_id, monitored_url_id) rows from cycle_url_results so
+    migrate_indexes() can add the unique index that result upserts rely on.
+    Keeps the latest row of each pair.
+    """
+    inspector = inspect(engine)
+    
+    if "cycle_url_results" not in inspector.get_table_names():
+        return
+    if "uq_cycle_url_results_cycle_url" in {i["name"] for i in inspector.get_indexes("cycle_url_results")}:
+        return
+    
+    with engine.connect() as conn:
+        result = conn.execute(text("""
+            DELETE FROM cycle_url_results
+            WHERE id NOT IN (
+                SELECT MAX(id) FROM cycle_url_results
+                GROUP BY cycle_id, monitored_url_id
+            )
+        """))
+        conn.commit()
+    if result.rowcount:
+        logger.info("Removed duplicate cycle results", count=result.rowcount)
+
+
+def migrate_indexes() -> None:
+    """
+    Create the secondary indexes declared on the models (in __table_args__)
+    that an older database doesn't have yet.
+    """
+    inspector = inspect(engine)
+    existing_tables = inspector.get_table_names()
+    
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                logger.info(f"Creating index {index.name} on {table.name}")
+                index.create(engine)
 
 
 def run_migrations() -> None:
@@ -482,6 +741,39 @@ def run_migrations() -> None:
     # New tracking columns
     migrate_import_tracking_columns()
     migrate_download_tracking_columns()
+    migrate_cycle_outcome_columns()
+    
+    # Denormalized per-URL state for list views
+    migrate_url_current_state()
+    migrate_relocation_near_misses()
+    
+    # Daily metrics rollups
+    migrate_metrics_rollups()
+    
+    # Compacted per-URL cycle results
+    migrate_audit_retention()
+    
+    # Background monitoring jobs
+    migrate_monitoring_jobs()
+    
+    # PDF link inventory of monitored sites
+    migrate_site_inventory()
+    
+    # Near-duplicate index of form texts
+    migrate_form_fingerprints()
+    
+    # Full-text search of form texts
+    migrate_local_search()
+    
+    # Relocation searches deferred from monitoring cycles
+    migrate_relocation_tasks()
+    
+    # PDF links resolved from landing pages
+    migrate_landing_pages()
+    
+    # Secondary indexes for hot filters
+    migrate_cycle_result_uniqueness()
+    migrate_indexes()
     
     logger.info("All migrations completed successfully")
 
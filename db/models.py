@@ -6,13 +6,23 @@ Tables:
 - PDFVersion: Stored versions of PDFs with hashes
 - ChangeLog: Record of detected changes
 - MonitoringCycle: Track monitoring cycle execution for audit
+- MonitoringJob: Queued/running monitoring cycle requests and their progress
 - ScheduleConfig: User-configurable schedule settings
+- URLCurrentState: Denormalized per-URL summary for list views
+- MetricsDailyRollup: Per-day change/review counts for metrics
+- CycleResultRollup: Per-day, per-state totals of compacted cycle results
+- SiteInventoryPage: Index pages of monitored sites, with conditional-GET validators
+- SiteInventoryLink: PDF links found on those pages, for local relocation lookup
+- FormFingerprint: MinHash signature of each URL's latest version text
+- FormFingerprintBucket: LSH band buckets of those signatures, for near-duplicate lookup
+- RelocationTask: Deferred relocation searches for URLs that returned 404
+- LandingPage: PDF link resolved from a non-PDF monitored URL, with conditional-GET validators
 """
 
 from datetime import datetime
 from sqlalchemy import (
-    Column, Integer, String, Text, DateTime, Boolean, 
-    ForeignKey, JSON, Float
+    Column, Integer, String, Text, DateTime, Date, Boolean, 
+    ForeignKey, JSON, Float, Index, LargeBinary, BigInteger
 )
 from sqlalchemy.orm import relationship
 from db.database import Base
@@ -58,12 +68,15 @@ class MonitoringCycle(Base):
     Records when cycles ran, how long they took, and their outcomes.
     """
     __tablename__ = "monitoring_cycles"
+    __table_args__ = (
+        Index("ix_monitoring_cycles_started_at", "started_at"),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     started_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     completed_at = Column(DateTime, nullable=True)
     duration_seconds = Column(Float, nullable=True)
-    status = Column(String(50), default="running")  # running, completed, failed, partial
+    status = Column(String(50), default="running")  # running, completed, failed, partial (cancelled/interrupted)
     
     # Cycle statistics
     total_urls_checked = Column(Integer, default=0)
@@ -84,6 +97,9 @@ class MonitoringCycle(Base):
     error_log = Column(Text, nullable=True)  # Aggregated errors
     error_count = Column(Integer, default=0)
     
+    # Set once per-URL results are folded into cycle_result_rollups and removed
+    results_compacted_at = Column(DateTime, nullable=True)
+    
     # Relationships
     url_results = relationship("CycleURLResult", back_populates="cycle", cascade="all, delete-orphan")
     
@@ -91,12 +107,65 @@ class MonitoringCycle(Base):
         return f"<MonitoringCycle(id={self.id}, status='{self.status}', started={self.started_at})>"
 
 
+class MonitoringJob(Base):
+    """
+    A request to run a monitoring cycle, from the API, scheduler or CLI.
+    Executed by services.job_runner; progress counts are kept up to date
+    while it runs so it can be watched, cancelled and resumed.
+    """
+    __tablename__ = "monitoring_jobs"
+    __table_args__ = (
+        Index("ix_monitoring_jobs_status_created", "status", "created_at"),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    status = Column(String(50), nullable=False, default="queued")  # queued, running, completed, cancelled, failed, interrupted
+    triggered_by = Column(String(50), default="manual")  # scheduled, manual, api, cli
+    
+    # What to run
+    url_id = Column(Integer, ForeignKey("monitored_urls.id"), nullable=True)  # None = all enabled URLs
+    max_workers = Column(Integer, nullable=True)
+    schedule_config_snapshot = Column(JSON, nullable=True)
+    
+    # Cycle the job records into (created on first run, reused on resume)
+    cycle_id = Column(Integer, ForeignKey("monitoring_cycles.id"), nullable=True)
+    
+    # Lifecycle
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+    cancel_requested = Column(Boolean, default=False)
+    attempts = Column(Integer, default=0)  # Runs, including resumes
+    runner_id = Column(String(255), nullable=True)  # host:pid of the process running it
+    error = Column(Text, nullable=True)
+    
+    # Progress (cumulative across resumes)
+    total_urls = Column(Integer, default=0)
+    processed_urls = Column(Integer, default=0)
+    successful = Column(Integer, default=0)
+    failed = Column(Integer, default=0)
+    changes = Column(Integer, default=0)
+    skipped = Column(Integer, default=0)
+    errors = Column(Integer, default=0)
+    
+    # Relationships
+    cycle = relationship("MonitoringCycle")
+    
+    def __repr__(self) -> str:
+        return f"<MonitoringJob(id={self.id}, status='{self.status}', cycle={self.cycle_id})>"
+
+
 class CycleURLResult(Base):
     """
     Individual URL check results within a monitoring cycle.
     Tracks success/failure and any changes detected per URL.
     """
     __tablename__ = "cycle_url_results"
+    __table_args__ = (
+        # One result per URL per cycle; lets result writes upsert on conflict
+        Index("uq_cycle_url_results_cycle_url", "cycle_id", "monitored_url_id", unique=True),
+        Index("ix_cycle_url_results_monitored_url_id", "monitored_url_id"),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     cycle_id = Column(Integer, ForeignKey("monitoring_cycles.id"), nullable=False)
@@ -115,6 +184,9 @@ class CycleURLResult(Base):
     tier_reached = Column(Integer, nullable=True)  # 1=headers, 2=quick_hash, 3=full_download
     change_detected = Column(Boolean, default=False)
     change_log_id = Column(Integer, ForeignKey("change_logs.id"), nullable=True)
+    skip_reason = Column(String(50), nullable=True)  # headers_match, quick_hash_match
+    bytes_fetched = Column(Integer, nullable=True)
+    stage_timings = Column(JSON, nullable=True)  # {"headers": ms, "download": ms, ...}
     
     # Relationships
     cycle = relationship("MonitoringCycle", back_populates="url_results")
@@ -130,6 +202,10 @@ class MonitoredURL(Base):
     Registry of URLs being monitored for changes.
     """
     __tablename__ = "monitored_urls"
+    __table_args__ = (
+        Index("ix_monitored_urls_enabled_state_domain", "enabled", "state", "domain_category"),
+        Index("ix_monitored_urls_state_domain", "state", "domain_category"),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(255), nullable=False)
@@ -165,6 +241,16 @@ class MonitoredURL(Base):
     # Relationships
     versions = relationship("PDFVersion", back_populates="monitored_url", cascade="all, delete-orphan")
     changes = relationship("ChangeLog", back_populates="monitored_url", cascade="all, delete-orphan")
+    current_state = relationship(
+        "URLCurrentState", back_populates="monitored_url", uselist=False, cascade="all, delete-orphan"
+    )
+    fingerprint = relationship(
+        "FormFingerprint", back_populates="monitored_url", uselist=False, cascade="all, delete-orphan",
+        foreign_keys="FormFingerprint.monitored_url_id"
+    )
+    relocation_tasks = relationship(
+        "RelocationTask", back_populates="monitored_url", cascade="all, delete-orphan"
+    )
     
     def __repr__(self) -> str:
         return f"<MonitoredURL(id={self.id}, name='{self.name}', url='{self.url[:50]}...')>"
@@ -176,6 +262,9 @@ class PDFVersion(Base):
     Each version represents a snapshot of the PDF at a point in time.
     """
     __tablename__ = "pdf_versions"
+    __table_args__ = (
+        Index("ix_pdf_versions_url_version", "monitored_url_id", "version_number"),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     monitored_url_id = Column(Integer, ForeignKey("monitored_urls.id"), nullable=False)
@@ -275,6 +364,14 @@ class ChangeLog(Base):
     Record of detected changes between PDF versions.
     """
     __tablename__ = "change_logs"
+    __table_args__ = (
+        Index("ix_change_logs_url_detected", "monitored_url_id", "detected_at"),
+        Index("ix_change_logs_detected_at", "detected_at"),
+        Index("ix_change_logs_reviewed_at", "reviewed_at"),
+        Index("ix_change_logs_status_url", "review_status", "monitored_url_id"),
+        Index("ix_change_logs_new_version_id", "new_version_id"),
+        Index("ix_change_logs_previous_version_id", "previous_version_id"),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     monitored_url_id = Column(Integer, ForeignKey("monitored_urls.id"), nullable=False)
@@ -342,3 +439,289 @@ class ChangeLog(Base):
         return f"<ChangeLog(id={self.id}, url_id={self.monitored_url_id}, type='{self.change_type}')>"
 
 
+class URLCurrentState(Base):
+    """
+    Denormalized per-URL summary for dashboard and list views.
+    
+    Maintained incrementally by services.url_state when versions and
+    changes are recorded, reviews change, and cycles finish a URL, so list
+    views never aggregate over the full version/change history.
+    """
+    __tablename__ = "url_current_state"
+    
+    monitored_url_id = Column(Integer, ForeignKey("monitored_urls.id"), primary_key=True)
+    
+    # Latest records
+    latest_version_id = Column(Integer, ForeignKey("pdf_versions.id"), nullable=True)
+    latest_change_id = Column(Integer, ForeignKey("change_logs.id"), nullable=True)
+    
+    # Counts
+    version_count = Column(Integer, default=0, nullable=False)
+    change_count = Column(Integer, default=0, nullable=False)
+    pending_review_count = Column(Integer, default=0, nullable=False)
+    has_pending_review = Column(Boolean, default=False, nullable=False)
+    
+    # Last monitoring outcome
+    last_tier_reached = Column(Integer, nullable=True)  # 1=headers, 2=quick_hash, 3=full_download
+    last_outcome = Column(String(50), nullable=True)  # success, failed
+    last_skip_reason = Column(String(50), nullable=True)
+    
+    # Similarity-search candidates from the last failed relocation
+    # {"original_url", "timestamp", "candidates": [{"pdf_url", "similarity_score"}]}
+    relocation_near_misses = Column(JSON, nullable=True)
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationships
+    monitored_url = relationship("MonitoredURL", back_populates="current_state")
+    latest_version = relationship("PDFVersion", foreign_keys=[latest_version_id])
+    latest_change = relationship("ChangeLog", foreign_keys=[latest_change_id])
+    
+    def __repr__(self) -> str:
+        return f"<URLCurrentState(url={self.monitored_url_id}, versions={self.version_count}, pending={self.pending_review_count})>"
+
+
+class MetricsDailyRollup(Base):
+    """
+    Change and review counts per day of detection (UTC).
+    
+    Rows are recomputed from change_logs by services.metrics_tracker for
+    days whose changes were detected or reviewed since the last refresh,
+    so monthly and all-time metrics sum a few rows instead of scanning
+    change history. Months are the sum of their days, which keeps month
+    boundaries exact.
+    """
+    __tablename__ = "metrics_daily_rollups"
+    
+    day = Column(Date, primary_key=True)
+    
+    # Volume
+    total_changes = Column(Integer, default=0, nullable=False)
+    updates_detected = Column(Integer, default=0, nullable=False)  # text_changed, format_only, relocated
+    new_forms_added = Column(Integer, default=0, nullable=False)
+    
+    # Review outcomes
+    reviewed = Column(Integer, default=0, nullable=False)
+    pending = Column(Integer, default=0, nullable=False)
+    auto_approved = Column(Integer, default=0, nullable=False)
+    auto_approved_recommended = Column(Integer, default=0, nullable=False)  # auto_approved with auto_approve/false_positive recommendation
+    manual_approved = Column(Integer, default=0, nullable=False)  # approved, not by auto_approve_system
+    manual_reviewed = Column(Integer, default=0, nullable=False)  # approved or rejected, not by auto_approve_system
+    rejected = Column(Integer, default=0, nullable=False)
+    
+    refreshed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self) -> str:
+        return f"<MetricsDailyRollup(day={self.day}, changes={self.total_changes})>"
+
+
+class CycleResultRollup(Base):
+    """
+    Per-URL cycle results compacted into totals per day and state.
+    
+    services.audit_retention folds the cycle_url_results of cycles older
+    than the detail retention window into these rows (keyed by the day the
+    cycle started and the URL's state) and then deletes the detail rows.
+    Cycle-level audit figures stay on monitoring_cycles, which is kept.
+    """
+    __tablename__ = "cycle_result_rollups"
+    
+    day = Column(Date, primary_key=True)
+    state = Column(String(100), primary_key=True)  # "" for URLs without a state
+    
+    url_checks = Column(Integer, default=0, nullable=False)
+    successful_checks = Column(Integer, default=0, nullable=False)
+    failed_checks = Column(Integer, default=0, nullable=False)
+    skipped_unchanged = Column(Integer, default=0, nullable=False)
+    changes_detected = Column(Integer, default=0, nullable=False)
+    bytes_fetched = Column(Integer, default=0, nullable=False)
+    duration_ms = Column(Integer, default=0, nullable=False)  # Sum of per-URL durations
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self) -> str:
+        return f"<CycleResultRollup(day={self.day}, state='{self.state}', checks={self.url_checks})>"
+
+
+class SiteInventoryPage(Base):
+    """
+    An index page of a monitored site (a MonitoredURL.parent_page_url).
+    
+    services.site_inventory re-fetches it with a conditional GET (ETag /
+    Last-Modified), so an unchanged page costs a 304 and no parsing.
+    """
+    __tablename__ = "site_inventory_pages"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    url = Column(String(2048), unique=True, nullable=False)
+    domain = Column(String(255), nullable=False, index=True)
+    
+    # Validators for the next conditional GET
+    etag = Column(String(500), nullable=True)
+    last_modified_header = Column(String(100), nullable=True)
+    content_hash = Column(String(64), nullable=True)  # SHA-256 of the last HTML parsed
+    
+    last_checked_at = Column(DateTime, nullable=True)
+    last_changed_at = Column(DateTime, nullable=True)  # Last time its PDF links changed
+    last_status_code = Column(Integer, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    # Relationships
+    links = relationship("SiteInventoryLink", back_populates="page", cascade="all, delete-orphan")
+    
+    def __repr__(self) -> str:
+        return f"<SiteInventoryPage(id={self.id}, url='{self.url}')>"
+
+
+class SiteInventoryLink(Base):
+    """
+    A PDF link seen on an inventory page.
+    
+    Links that disappear from their page keep their row with removed_at set,
+    which is how a monitored URL's move is noticed before it starts to 404.
+    """
+    __tablename__ = "site_inventory_links"
+    __table_args__ = (
+        Index("uq_site_inventory_links_page_url", "page_id", "pdf_url", unique=True),
+        Index("ix_site_inventory_links_domain_form", "domain", "form_number"),
+        Index("ix_site_inventory_links_domain_filename", "domain", "filename_key"),
+        Index("ix_site_inventory_links_quick_hash", "quick_hash"),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    page_id = Column(Integer, ForeignKey("site_inventory_pages.id"), nullable=False)
+    domain = Column(String(255), nullable=False)
+    pdf_url = Column(String(2048), nullable=False, index=True)
+    
+    # Lookup keys
+    link_text = Column(Text, nullable=True)
+    filename_key = Column(String(500), nullable=True)  # Lowercase file stem without separators
+    form_number = Column(String(100), nullable=True)  # Normalized, e.g. "CIV-775"
+    quick_hash = Column(String(64), nullable=True)  # SHA-256 of the first 64KB (same as MonitoredURL.quick_hash)
+    quick_hashed_at = Column(DateTime, nullable=True)
+    
+    first_seen_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_seen_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    removed_at = Column(DateTime, nullable=True)  # No longer linked from the page
+    
+    # Relationships
+    page = relationship("SiteInventoryPage", back_populates="links")
+    
+    def __repr__(self) -> str:
+        return f"<SiteInventoryLink(id={self.id}, pdf_url='{self.pdf_url}')>"
+
+
+class FormFingerprint(Base):
+    """
+    MinHash signature of the text of a monitored URL's latest version.
+    
+    services.form_fingerprints keeps one row per URL, updated as versions are
+    created, and answers "which stored form is this text?" from the LSH
+    buckets in form_fingerprint_buckets without comparing every signature.
+    """
+    __tablename__ = "form_fingerprints"
+    
+    monitored_url_id = Column(Integer, ForeignKey("monitored_urls.id"), primary_key=True, autoincrement=False)
+    version_id = Column(Integer, ForeignKey("pdf_versions.id"), nullable=False)
+    signature = Column(LargeBinary, nullable=False)  # uint32 MinHash values
+    shingle_count = Column(Integer, nullable=False, default=0)
+    
+    # Best near-duplicate under another URL when the version was indexed
+    duplicate_of_url_id = Column(Integer, ForeignKey("monitored_urls.id"), nullable=True, index=True)
+    duplicate_similarity = Column(Float, nullable=True)  # Estimated Jaccard similarity 0.0-1.0
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationships
+    monitored_url = relationship("MonitoredURL", back_populates="fingerprint", foreign_keys=[monitored_url_id])
+    buckets = relationship("FormFingerprintBucket", cascade="all, delete-orphan")
+    
+    def __repr__(self) -> str:
+        return f"<FormFingerprint(url_id={self.monitored_url_id}, version_id={self.version_id})>"
+
+
+class FormFingerprintBucket(Base):
+    """
+    One LSH band of a form fingerprint: (band number << 32) | hash of the band's rows.
+    
+    Two signatures sharing any bucket are near-duplicate candidates.
+    """
+    __tablename__ = "form_fingerprint_buckets"
+    
+    monitored_url_id = Column(
+        Integer, ForeignKey("form_fingerprints.monitored_url_id"), primary_key=True, autoincrement=False
+    )
+    bucket = Column(BigInteger, primary_key=True, autoincrement=False, index=True)
+    
+    def __repr__(self) -> str:
+        return f"<FormFingerprintBucket(url_id={self.monitored_url_id}, bucket={self.bucket})>"
+
+
+class RelocationTask(Base):
+    """
+    A relocation search for a monitored URL whose PDF returned 404.
+    
+    Monitoring cycles only record the 404 and queue the search;
+    services.relocation_queue runs it on its own workers and records the
+    outcome as the usual 'relocated' or 'relocation_failed' change log.
+    """
+    __tablename__ = "relocation_tasks"
+    __table_args__ = (
+        Index("ix_relocation_tasks_status_created", "status", "created_at"),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    monitored_url_id = Column(Integer, ForeignKey("monitored_urls.id"), nullable=False, index=True)
+    status = Column(String(50), nullable=False, default="queued")  # queued, running, relocated, failed, cancelled
+    
+    # What to search
+    failed_url = Column(String(2048), nullable=False)  # URL that returned 404
+    domain = Column(String(255), nullable=False)  # Host the per-domain limits apply to
+    
+    # Lifecycle
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    not_before = Column(DateTime, nullable=True)  # Deferred until the domain's crawl budget allows
+    started_at = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+    attempts = Column(Integer, default=0)
+    runner_id = Column(String(255), nullable=True)  # host:pid of the process running it
+    
+    # Outcome
+    new_url = Column(String(2048), nullable=True)  # Where the form was found
+    change_log_id = Column(Integer, ForeignKey("change_logs.id"), nullable=True)  # relocated / relocation_failed
+    pages_crawled = Column(Integer, default=0)
+    error = Column(Text, nullable=True)
+    
+    # Relationships
+    monitored_url = relationship("MonitoredURL", back_populates="relocation_tasks")
+    
+    def __repr__(self) -> str:
+        return f"<RelocationTask(id={self.id}, url_id={self.monitored_url_id}, status='{self.status}')>"
+
+
+class LandingPage(Base):
+    """
+    A monitored URL that is a web page linking to its PDF, not the PDF itself.
+    
+    The PDF link scraped from it is kept with the page's validators;
+    services.landing_pages re-checks the page with a conditional GET and
+    scrapes it again only when it changed.
+    """
+    __tablename__ = "landing_pages"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    url = Column(String(2048), unique=True, nullable=False)
+    resolved_pdf_url = Column(String(2048), nullable=True)  # PDF link from the last scrape
+    
+    # Validators for the next conditional GET
+    etag = Column(String(500), nullable=True)
+    last_modified_header = Column(String(100), nullable=True)
+    content_hash = Column(String(64), nullable=True)  # SHA-256 of the HTML the link was scraped from
+    
+    last_checked_at = Column(DateTime, nullable=True)
+    last_scraped_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self) -> str:
+        return f"<LandingPage(id={self.id}, url='{self.url}')>"
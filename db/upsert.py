@@ -0,0 +1,89 @@
+"""
+Backend-portable INSERT ... ON CONFLICT helpers.
+
+SQLite (3.24+) and PostgreSQL share the ON CONFLICT clause, and SQLAlchemy
+exposes it through each dialect's insert(). These helpers pick the right
+one for the session's bind, so bulk writers can insert or upsert many rows
+in one statement instead of checking for each row first. That also makes
+them safe when several processes write at once, since the database (not a
+prior SELECT) decides what already exists.
+"""
+
+from typing import Any, Iterable, List, Optional, Sequence
+
+import structlog
+from sqlalchemy.orm import Session
+
+logger = structlog.get_logger()
+
+
+def dialect_insert(db: Session, model: Any):
+    """Dialect-specific insert() for the model that supports on_conflict_*."""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
+
+
+def insert_ignore(
+    db: Session,
+    model: Any,
+    rows: Sequence[dict],
+    index_elements: List[str],
+    returning: Optional[Iterable[Any]] = None
+) -> list:
+    """
+    INSERT rows, skipping any that conflict on index_elements.
+    
+    Args:
+        db: Database session
+        model: Mapped class to insert into
+        rows: Column values, one dict per row
+        index_elements: Columns of the unique constraint to check
+        returning: Columns to return for the rows actually inserted
+    
+    Returns:
+        Returned rows (only inserted rows; conflicts are skipped), or [] when
+        returning is not given
+    """
+    if not rows:
+        return []
+    
+    stmt = dialect_insert(db, model).on_conflict_do_nothing(index_elements=index_elements)
+    if returning is not None:
+        return db.execute(stmt.returning(*returning), list(rows)).all()
+    db.execute(stmt, list(rows))
+    return []
+
+
+def upsert(
+    db: Session,
+    model: Any,
+    rows: Sequence[dict],
+    index_elements: List[str],
+    update_columns: Optional[Iterable[str]] = None
+) -> None:
+    """
+    INSERT rows, updating the existing row on a conflict on index_elements.
+    
+    Args:
+        db: Database session
+        model: Mapped class to upsert into
+        rows: Column values, one dict per row (all with the same keys)
+        index_elements: Columns of the unique constraint to check
+        update_columns: Columns to overwrite on conflict (defaults to every
+            supplied column outside index_elements)
+    """
+    if not rows:
+        return
+    
+    if update_columns is None:
+        update_columns = [key for key in rows[0] if key not in index_elements]
+    
+    stmt = dialect_insert(db, model)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={column: stmt.excluded[column] for column in update_columns}
+    )
+    db.execute(stmt, list(rows))
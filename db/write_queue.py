@@ -0,0 +1,195 @@
+"""
+Single-writer commit queue.
+
+Monitoring workers produce many small writes per URL (check timestamps,
+header metadata, cycle results). Instead of every thread committing on its
+own session and contending for the SQLite write lock, workers enqueue the
+writes and one background thread applies them in batches, each batch in a
+single short transaction.
+
+Writes that need an ID back immediately (versions, change logs) still go
+through the caller's session.
+"""
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Optional
+
+import structlog
+from sqlalchemy.orm import Session
+
+from config import settings
+
+logger = structlog.get_logger()
+
+# A queued write: receives the writer's session, must not commit
+WriteOp = Callable[[Session], None]
+
+
+class WriteQueue:
+    """
+    Thread-safe queue of database writes applied by a single writer thread.
+    """
+    
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None
+    ):
+        """
+        Initialize the queue (the writer thread starts on first submit).
+        
+        Args:
+            session_factory: Creates writer sessions (default: SessionLocal)
+            batch_size: Maximum writes per transaction
+            flush_interval: Seconds to wait for more writes before committing
+        """
+        self._session_factory = session_factory
+        self.batch_size = batch_size or settings.DB_WRITE_BATCH_SIZE
+        self.flush_interval = (
+            flush_interval if flush_interval is not None
+            else settings.DB_WRITE_FLUSH_INTERVAL_MS / 1000
+        )
+        
+        self._queue: "queue.Queue[WriteOp]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._done = threading.Condition(self._lock)
+        self._thread: Optional[threading.Thread] = None
+        
+        self._submitted = 0
+        self._applied = 0
+        self._failed = 0
+        self._batches = 0
+    
+    # ------------------------------------------------------------------
+    # Producers
+    # ------------------------------------------------------------------
+    
+    def submit(self, op: WriteOp) -> None:
+        """Queue a write. op(session) runs on the writer thread."""
+        with self._lock:
+            self._submitted += 1
+            self._ensure_writer()
+        self._queue.put(op)
+    
+    def add(self, obj: Any) -> None:
+        """Queue the insert of a new (transient) ORM object."""
+        self.submit(lambda session: session.add(obj))
+    
+    def update(self, model: Any, row_id: int, values: dict) -> None:
+        """Queue an UPDATE of one row by primary key."""
+        values = dict(values)
+        self.submit(
+            lambda session: session.query(model).filter(model.id == row_id).update(
+                values, synchronize_session=False
+            )
+        )
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every write submitted so far has been committed.
+        
+        Returns:
+            True if flushed, False on timeout
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._lock:
+            target = self._submitted
+            while self._applied + self._failed < target:
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                self._done.wait(remaining)
+        return True
+    
+    def get_stats(self) -> dict:
+        """Get queue statistics."""
+        with self._lock:
+            return {
+                "submitted": self._submitted,
+                "applied": self._applied,
+                "failed": self._failed,
+                "pending": self._submitted - self._applied - self._failed,
+                "batches": self._batches
+            }
+    
+    # ------------------------------------------------------------------
+    # Writer
+    # ------------------------------------------------------------------
+    
+    def _ensure_writer(self) -> None:
+        """Start the writer thread if needed. Caller holds the lock."""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name="db-writer", daemon=True
+            )
+            self._thread.start()
+    
+    def _new_session(self) -> Session:
+        if self._session_factory is None:
+            from db.database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+    
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, remaining)))
+                except queue.Empty:
+                    break
+            self._apply(batch)
+    
+    def _apply(self, batch: list) -> None:
+        """
+        Apply a batch in one transaction, isolating failures on error.
+        
+        The batch is always counted as done (writes not applied count as
+        failed), so flush() never waits on a batch that errored out.
+        """
+        session = None
+        applied = 0
+        try:
+            session = self._new_session()
+            try:
+                for op in batch:
+                    op(session)
+                session.commit()
+                applied = len(batch)
+            except Exception as e:
+                session.rollback()
+                logger.warning(
+                    "Batched write failed, retrying individually",
+                    batch_size=len(batch),
+                    error=str(e)
+                )
+                for op in batch:
+                    try:
+                        op(session)
+                        session.commit()
+                        applied += 1
+                    except Exception as op_error:
+                        session.rollback()
+                        logger.error("Queued write failed", error=str(op_error))
+        except Exception as e:
+            # No session (e.g. the database can't be opened): the batch is lost
+            logger.error("Write batch failed", batch_size=len(batch), error=str(e))
+        finally:
+            if session is not None:
+                session.close()
+            with self._lock:
+                self._applied += applied
+                self._failed += len(batch) - applied
+                self._batches += 1
+                self._done.notify_all()
+
+
+# Global instance
+write_queue = WriteQueue()
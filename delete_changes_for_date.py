@@ -21,6 +21,8 @@ from sqlalchemy.orm import Session
 
 from db.database import SessionLocal
 from db.models import MonitoredURL, ChangeLog, PDFVersion
+from services.metrics_tracker import metrics_tracker
+from services.url_state import url_state_tracker
 from storage.file_store import FileStore
 
 
@@ -87,8 +89,10 @@ def reset_changes_for_date(target_date: date) -> dict:
         url = db.query(MonitoredURL).filter(MonitoredURL.id == url_id).first()
         if url:
             url.last_change_at = latest
+        url_state_tracker.refresh_url(db, url_id)
 
     db.commit()
+    metrics_tracker.refresh_rollup_days(db, [target_date])
     db.close()
     return {"change_count": change_count, "version_count": version_count}
 
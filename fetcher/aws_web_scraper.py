@@ -237,29 +237,13 @@ class AWSWebScraper:
             response = self.http_client.get(url)
             response.raise_for_status()
             
-            html_content = response.text
-            content_type = response.headers.get('content-type', '')
-            final_url = str(response.url)  # httpx follows redirects
-            
-            # Try to find PDF links in the HTML
-            pdf_url = self._extract_pdf_url(html_content, final_url)
-            
-            scrape_result = ScrapeResult(
-                success=True,
-                url=url,
-                final_url=final_url,
-                content_type=content_type,
-                pdf_url=pdf_url,
-                html_content=html_content
+            return self.scrape_html(
+                url,
+                response.text,
+                final_url=str(response.url),  # httpx follows redirects
+                content_type=response.headers.get('content-type', '')
             )
             
-            if pdf_url:
-                logger.info("Found PDF URL in page", source_url=url, pdf_url=pdf_url)
-            else:
-                logger.warning("No PDF URL found in page", url=url)
-            
-            return scrape_result
-            
         except httpx.HTTPError as e:
             logger.error("HTTP scrape failed", url=url, error=str(e))
             return ScrapeResult(
@@ -275,6 +259,44 @@ class AWSWebScraper:
                 error=str(e)
             )
     
+    def scrape_html(
+        self,
+        url: str,
+        html_content: str,
+        final_url: Optional[str] = None,
+        content_type: Optional[str] = None
+    ) -> ScrapeResult:
+        """
+        Extract the PDF link from a page already fetched over HTTP.
+        
+        Args:
+            url: URL of the page
+            html_content: HTML of the page
+            final_url: URL after redirects (relative links resolve against it)
+            content_type: Content-Type of the response
+            
+        Returns:
+            ScrapeResult with scrape details
+        """
+        final_url = final_url or url
+        
+        # Try to find PDF links in the HTML
+        pdf_url = self._extract_pdf_url(html_content, final_url)
+        
+        if pdf_url:
+            logger.info("Found PDF URL in page", source_url=url, pdf_url=pdf_url)
+        else:
+            logger.warning("No PDF URL found in page", url=url)
+        
+        return ScrapeResult(
+            success=True,
+            url=url,
+            final_url=final_url,
+            content_type=content_type,
+            pdf_url=pdf_url,
+            html_content=html_content
+        )
+    
     def _extract_pdf_url(self, html_content: str, base_url: str) -> Optional[str]:
         """
         Extract PDF URL from HTML content.
@@ -21,9 +21,13 @@ structlog.configure(
 logger = structlog.get_logger()
 
 from config import settings
+from db.database import SessionLocal
 from db.migrations import run_migrations
 from api.routes import router
+from api.executors import shutdown_executors
 from services.scheduler import init_scheduler, shutdown_scheduler
+from services.job_runner import job_runner
+from services.relocation_queue import relocation_queue
 
 
 @asynccontextmanager
@@ -44,6 +48,15 @@ async def lifespan(app: FastAPI):
         for issue in issues:
             logger.warning(f"Configuration issue: {issue}")
     
+    # Requeue jobs a previous process left queued; mark its dead runs interrupted.
+    # Relocation searches it was running are requeued and the queue restarted
+    db = SessionLocal()
+    try:
+        job_runner.recover(db)
+        relocation_queue.recover(db)
+    finally:
+        db.close()
+    
     # Initialize and start the scheduler for automated monitoring cycles
     if settings.SCHEDULER_ENABLED:
         logger.info("Initializing scheduler for automated monitoring")
@@ -58,6 +71,15 @@ async def lifespan(app: FastAPI):
     
     # Shutdown scheduler gracefully
     shutdown_scheduler()
+    
+    # Running monitoring jobs stop starting URLs and finish as interrupted
+    job_runner.shutdown()
+    
+    # Relocation searches in progress go back to the queue for the next start
+    relocation_queue.shutdown()
+    
+    # Let in-flight route work finish
+    shutdown_executors()
 
 
 # Create FastAPI app
@@ -31,6 +31,16 @@ class TextExtractionResult:
     needs_ocr: bool = False  # Flag when text is below threshold
 
 
+@dataclass
+class WordBox:
+    """A word and its bounding box in PDF points (origin top-left)."""
+    text: str
+    x0: float
+    top: float
+    x1: float
+    bottom: float
+
+
 class TextExtractor:
     """
     Extracts text from PDF files using multiple methods.
@@ -260,5 +270,37 @@ class TextExtractor:
                 error=str(e)
             )
         return None
-
-
+    
+    def extract_words(self, pdf_path: Path, page_number: int) -> Optional[list[WordBox]]:
+        """
+        Get the words on a page with their positions.
+        
+        Args:
+            pdf_path: Path to PDF file
+            page_number: Page number (1-indexed)
+            
+        Returns:
+            List of WordBox in reading order, or None if extraction fails
+        """
+        try:
+            with pdfplumber.open(pdf_path) as pdf:
+                if not 1 <= page_number <= len(pdf.pages):
+                    return None
+                page = pdf.pages[page_number - 1]
+                return [
+                    WordBox(
+                        text=word["text"],
+                        x0=word["x0"],
+                        top=word["top"],
+                        x1=word["x1"],
+                        bottom=word["bottom"]
+                    )
+                    for word in page.extract_words()
+                ]
+        except Exception as e:
+            logger.warning(
+                "Failed to extract page words",
+                page=page_number,
+                error=str(e)
+            )
+        return None
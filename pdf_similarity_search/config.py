@@ -20,12 +20,27 @@ class Settings(BaseSettings):
     max_pages: int = 200
     max_depth: int = 5
     request_timeout: float = 30.0
-    rate_limit_delay: float = 1.0
+    # Politeness budget per domain: fetches in flight, and seconds between request starts
+    crawl_concurrency: int = 8
+    rate_limit_delay: float = 0.1
+
+    # Shared per-domain crawl index (reused by searches on the same site)
+    crawl_index_ttl_seconds: float = 1800.0
+    crawl_index_max_domains: int = 32
 
     # PDF processing
     max_pdf_size_mb: float = 50.0
     concurrent_downloads: int = 5
     similarity_threshold: float = 90.0
+    # MinHash prefilter: candidates whose estimated word-set Jaccard similarity to the
+    # reference is below this are not TF-IDF scored (0 disables)
+    similarity_prefilter_min_jaccard: float = 0.15
+    minhash_permutations: int = 64
+    # First-page prefilter: candidates are first fetched up to this many KB (the first-page
+    # section of a linearized PDF is usually smaller) and dropped without a full download
+    # when their first page scores below first_page_min_similarity (0 KB disables)
+    first_page_prefix_kb: int = 256
+    first_page_min_similarity: float = 50.0
 
     # Near-miss reporting (80-89% similarity)
     near_miss_min_similarity: float = 80.0
@@ -0,0 +1,183 @@
+"""Per-domain crawl index shared by searches on the same site.
+
+When a site reorganizes, many monitored URLs on it 404 in the same cycle and
+each one runs a relocation search. Instead of every search crawling the site
+from scratch, the first search on a domain records what it crawls here (page
+graph, discovered PDF URLs with their link text, and the BFS frontier) and
+later searches replay it, only fetching pages beyond what is already indexed.
+Indexes expire after crawl_index_ttl_seconds.
+"""
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from .config import get_settings
+from .url_utils import get_domain_for_filter, get_root_domain, normalize_url
+
+
+@dataclass
+class PageEntry:
+    """One crawled page: its depth, the PDFs it links to and its same-domain page links."""
+
+    url: str
+    depth: int
+    pdf_links: dict[str, str] = field(default_factory=dict)  # pdf url -> link text
+    page_links: list[str] = field(default_factory=list)
+    fetched: bool = True  # False when the fetch or parse failed
+
+
+@dataclass
+class CrawlIndex:
+    """
+    BFS crawl of one domain, extendable by any search that needs more of it.
+
+    entries only ever grows (in fetch completion order), so readers replay it
+    by position. Searches that run past the end pop frontier pages and fetch
+    them concurrently; in_flight and next_request_at are the domain's
+    politeness budget, shared by every search on it. Hold `lock` while
+    touching the frontier or the budget.
+    """
+
+    domain: str  # netloc the crawl is restricted to
+    max_depth: int
+    created_at: float = field(default_factory=time.monotonic)
+    entries: list[PageEntry] = field(default_factory=list)
+    frontier: list[tuple[int, int, str]] = field(default_factory=list)  # heap of (depth, seq, url)
+    visited: set[str] = field(default_factory=set)
+    queued: set[str] = field(default_factory=set)
+    in_flight: int = 0  # Fetches running for this domain, across searches
+    next_request_at: float = 0.0  # Monotonic time the next request may start
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    _seq: itertools.count = field(default_factory=itertools.count, repr=False)
+
+    @property
+    def exhausted(self) -> bool:
+        """True when every reachable page (within max_depth) has been crawled."""
+        return not self.frontier and not self.in_flight
+
+    def seed(self, url: str, depth: int = 0, *, first: bool = False) -> None:
+        """Add a page to the frontier unless it is already crawled or queued."""
+        if url in self.visited or url in self.queued or depth > self.max_depth:
+            return
+        self.queued.add(url)
+        seq = next(self._seq)
+        # BFS order by depth; `first` jumps ahead of its depth
+        heapq.heappush(self.frontier, (depth, -seq if first else seq, url))
+
+    def pop(self, max_depth: int | None = None) -> tuple[str, int] | None:
+        """
+        Next frontier page to crawl (marked visited).
+
+        Returns None when the frontier is empty or its shallowest page is
+        deeper than max_depth.
+        """
+        while self.frontier:
+            depth, _, url = self.frontier[0]
+            if max_depth is not None and depth > max_depth:
+                return None
+            heapq.heappop(self.frontier)
+            self.queued.discard(url)
+            if url in self.visited:
+                continue
+            self.visited.add(url)
+            return url, depth
+        return None
+
+    def requeue(self, url: str, depth: int) -> None:
+        """Put back a popped page whose fetch was abandoned."""
+        self.visited.discard(url)
+        self.seed(url, depth, first=True)
+
+    def reserve_request(self, spacing: float) -> float:
+        """
+        Book the next request slot for the domain.
+
+        Request starts are spaced at least `spacing` seconds apart.
+
+        Returns:
+            Seconds to wait before starting the request.
+        """
+        now = time.monotonic()
+        start = max(now, self.next_request_at)
+        self.next_request_at = start + spacing
+        return start - now
+
+    def add(self, entry: PageEntry) -> None:
+        """Record a crawled page and queue its unseen page links at depth + 1."""
+        self.entries.append(entry)
+        for link in entry.page_links:
+            self.seed(link, entry.depth + 1)
+
+    def pdf_links(self) -> dict[str, set[str]]:
+        """Every PDF URL discovered so far, with all link texts pointing at it."""
+        links: dict[str, set[str]] = {}
+        for entry in list(self.entries):
+            for pdf_url, text in entry.pdf_links.items():
+                texts = links.setdefault(pdf_url, set())
+                if text:
+                    texts.add(text)
+        return links
+
+
+class CrawlIndexCache:
+    """Crawl indexes by domain, with a TTL and a bound on the number of domains kept."""
+
+    def __init__(self, ttl_seconds: float, max_domains: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_domains = max(1, max_domains)
+        self._indexes: OrderedDict[str, CrawlIndex] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, start_url: str, max_depth: int) -> CrawlIndex:
+        """
+        Return the live index for start_url's domain, creating it if needed.
+
+        An index is replaced once it is older than the TTL, or when it was
+        built with a smaller max_depth than this search needs.
+
+        Args:
+            start_url: Normalized URL the search starts from.
+            max_depth: Link depth the search crawls to.
+
+        Returns:
+            The shared CrawlIndex for the domain (seeded with its root).
+        """
+        domain = get_domain_for_filter(start_url)
+        now = time.monotonic()
+        with self._lock:
+            index = self._indexes.get(domain)
+            if index is None or now - index.created_at > self.ttl_seconds or index.max_depth < max_depth:
+                index = CrawlIndex(domain=domain, max_depth=max_depth)
+                index.seed(normalize_url(get_root_domain(start_url)))
+                self._indexes[domain] = index
+            self._indexes.move_to_end(domain)
+            while len(self._indexes) > self.max_domains:
+                self._indexes.popitem(last=False)
+            return index
+
+    def clear(self) -> None:
+        """Drop every index."""
+        with self._lock:
+            self._indexes.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._indexes)
+
+
+# Module-level cache (lazy, sized from settings)
+_cache: CrawlIndexCache | None = None
+
+
+def get_crawl_index_cache() -> CrawlIndexCache:
+    """Return the process-wide crawl index cache (singleton)."""
+    global _cache
+    if _cache is None:
+        settings = get_settings()
+        _cache = CrawlIndexCache(settings.crawl_index_ttl_seconds, settings.crawl_index_max_domains)
+    return _cache
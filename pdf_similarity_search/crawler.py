@@ -1,16 +1,22 @@
-"""BFS website crawler: discover PDF and page links from HTML."""
+"""BFS website crawler: discover PDF and page links from HTML.
+
+Pages are fetched concurrently from a breadth-first frontier, within a
+per-domain politeness budget (concurrent fetches and spacing between request
+starts). HTML is parsed in a worker thread, so parsing one page overlaps with
+fetching the next ones.
+"""
 from __future__ import annotations
 
 import asyncio
+import importlib.util
 import logging
-from collections import deque
-from dataclasses import dataclass, field
 from typing import AsyncIterator
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import httpx
 
 from .config import get_settings
+from .crawl_index import CrawlIndex, PageEntry
 from .url_utils import (
     get_domain_for_filter,
     get_root_domain,
@@ -25,31 +31,29 @@ logger = logging.getLogger(__name__)
 PDF_EXT = ".pdf"
 PDF_MIME = "application/pdf"
 
+# Poll interval while other searches fetch the pages of a shared index
+INDEX_WAIT_SECONDS = 0.05
 
-@dataclass
-class CrawlState:
-    """Mutable state for BFS crawl: queue, visited, discovered PDFs."""
+# lxml is several times faster than the stdlib parser; fall back when it isn't installed
+HTML_PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+if HTML_PARSER != "lxml":
+    logger.warning("lxml is not installed; parsing HTML with the slower html.parser")
 
-    queue: deque[tuple[str, int]] = field(default_factory=lambda: deque())  # (url, depth)
-    visited: set[str] = field(default_factory=set)
-    discovered_pdfs: set[str] = field(default_factory=set)
-    pages_crawled: int = 0
+# Only the tags links are extracted from are built into the tree
+LINK_TAGS = SoupStrainer(["a", "embed", "iframe", "object"])
 
 
-def _extract_pdf_and_page_links(soup: BeautifulSoup, base_url: str) -> tuple[set[str], set[str]]:
+def _extract_links(soup: BeautifulSoup, base_url: str) -> tuple[dict[str, str], set[str]]:
     """
-    Extract PDF URLs and same-page links from HTML.
-
-    Looks at: <a href>, <embed src>, <iframe src>, <object data>.
+    Extract PDF links (with their link text) and page links from HTML.
 
-    Args:
-        soup: Parsed BeautifulSoup document.
-        base_url: Base URL for resolving relative links.
+    Link text is the anchor text for <a>, else the tag's title attribute.
+    When several links point at the same PDF, the first non-empty text wins.
 
     Returns:
-        (pdf_urls, page_urls) - sets of absolute normalized URLs.
+        (pdf_links, page_urls) - {pdf url: link text} and a set of page URLs.
     """
-    pdf_urls: set[str] = set()
+    pdf_links: dict[str, str] = {}
     page_urls: set[str] = set()
 
     def resolve(href: str | None) -> str | None:
@@ -60,45 +64,21 @@ def _extract_pdf_and_page_links(soup: BeautifulSoup, base_url: str) -> tuple[set
         except ValueError:
             return None
 
-    # <a href>
-    for tag in soup.find_all("a", href=True):
-        href = tag["href"]
-        url = resolve(href)
-        if not url:
-            continue
-        if _is_pdf_url(href, tag):
-            pdf_urls.add(url)
-        else:
-            page_urls.add(url)
-
-    # <embed src>
-    for tag in soup.find_all("embed", src=True):
-        url = resolve(tag["src"])
-        if url:
-            if _is_pdf_url(tag.get("src") or "", tag):
-                pdf_urls.add(url)
-            else:
-                page_urls.add(url)
-
-    # <iframe src>
-    for tag in soup.find_all("iframe", src=True):
-        url = resolve(tag["src"])
-        if url:
-            if _is_pdf_url(tag.get("src") or "", tag):
-                pdf_urls.add(url)
-            else:
-                page_urls.add(url)
-
-    # <object data>
-    for tag in soup.find_all("object", data=True):
-        url = resolve(tag["data"])
-        if url:
-            if _is_pdf_url(tag.get("data") or "", tag):
-                pdf_urls.add(url)
+    for tag_name, attr in (("a", "href"), ("embed", "src"), ("iframe", "src"), ("object", "data")):
+        for tag in soup.find_all(tag_name, **{attr: True}):
+            raw = tag.get(attr) or ""
+            url = resolve(raw)
+            if not url:
+                continue
+            if _is_pdf_url(raw, tag):
+                text = tag.get_text(" ", strip=True) if tag_name == "a" else ""
+                text = " ".join((text or tag.get("title") or "").split())
+                if text or url not in pdf_links:
+                    pdf_links[url] = pdf_links.get(url) or text
             else:
                 page_urls.add(url)
 
-    return pdf_urls, page_urls
+    return pdf_links, page_urls
 
 
 def _is_pdf_url(raw_href: str, tag: BeautifulSoup) -> bool:
@@ -116,13 +96,11 @@ async def fetch_page(
     client: httpx.AsyncClient,
     url: str,
     timeout: float,
-    rate_limit_delay: float,
 ) -> str | None:
     """
     Fetch a single page and return its text content.
 
     Handles HTTP errors and timeouts; returns None on failure.
-    Applies rate limit delay after request.
     """
     try:
         resp = await client.get(
@@ -131,7 +109,6 @@ async def fetch_page(
             timeout=timeout,
         )
         resp.raise_for_status()
-        await asyncio.sleep(rate_limit_delay)
         return resp.text
     except httpx.HTTPStatusError as e:
         logger.warning("HTTP error %s for %s: %s", e.response.status_code, url, e)
@@ -145,9 +122,9 @@ async def fetch_page(
 
 
 def _parse_html(html: str) -> BeautifulSoup | None:
-    """Parse HTML with BeautifulSoup; return None on parse error."""
+    """Parse the link tags of an HTML page; return None on parse error."""
     try:
-        return BeautifulSoup(html, "html.parser")
+        return BeautifulSoup(html, HTML_PARSER, parse_only=LINK_TAGS)
     except Exception as e:
         logger.warning("HTML parse error: %s", e)
         return None
@@ -160,19 +137,32 @@ async def crawl_website(
     max_depth: int | None = None,
     timeout: float | None = None,
     rate_limit_delay: float | None = None,
-) -> AsyncIterator[tuple[str, set[str]]]:
+    concurrency: int | None = None,
+    index: CrawlIndex | None = None,
+    counters: dict[str, int] | None = None,
+) -> AsyncIterator[tuple[str, dict[str, str]]]:
     """
     BFS crawl starting from start_url and domain root.
 
-    Yields (page_url, set of pdf_urls found on that page) for each page.
+    Yields (page_url, {pdf_url: link text} for the PDFs on that page) for each page, in
+    the order fetches complete. Up to `concurrency` pages of the domain are
+    fetched at once, with request starts spaced `rate_limit_delay` apart.
     Stops when max_pages or max_depth is reached.
     Only crawls same-domain URLs.
+
+    With a shared index (see crawl_index), pages it already holds are
+    replayed without fetching and the crawl continues from its frontier;
+    pages fetched here are added to it for later searches, and the
+    politeness budget is shared with other searches on the domain. If
+    counters is given, its "pages_fetched" and "pages_from_index" entries
+    are incremented.
     """
     settings = get_settings()
     max_pages = max_pages if max_pages is not None else settings.max_pages
     max_depth = max_depth if max_depth is not None else settings.max_depth
     timeout = timeout if timeout is not None else settings.request_timeout
     rate_limit_delay = rate_limit_delay if rate_limit_delay is not None else settings.rate_limit_delay
+    concurrency = max(1, concurrency if concurrency is not None else settings.crawl_concurrency)
 
     # Normalize and validate start URL
     try:
@@ -181,56 +171,130 @@ async def crawl_website(
         logger.error("Invalid start URL: %s", e)
         return
 
-    root_domain = get_root_domain(start_url)
-    allowed_netloc = get_domain_for_filter(start_url)
-
-    state = CrawlState()
-    # Seed queue: start URL and domain root at depth 0
-    for seed in (start_url, root_domain):
-        if seed not in state.visited:
-            state.queue.append((seed, 0))
+    if index is None:
+        index = CrawlIndex(domain=get_domain_for_filter(start_url), max_depth=max_depth)
+        index.seed(normalize_url(get_root_domain(start_url)))
+    # Seed: start URL ahead of the rest of the frontier (domain root is already seeded)
+    with index.lock:
+        index.seed(start_url, first=True)
 
     headers = {
         "User-Agent": "PDF-Similarity-Search/1.0 (crawl)",
         "Accept": "text/html,application/xhtml+xml",
     }
 
-    async with httpx.AsyncClient(headers=headers) as client:
-        while state.queue and state.pages_crawled < max_pages:
-            url, depth = state.queue.popleft()
-
-            if url in state.visited:
-                continue
-            if depth > max_depth:
-                continue
-            if not is_same_domain(url, allowed_netloc):
-                continue
-
-            state.visited.add(url)
-            state.pages_crawled += 1
-            logger.info("Crawling [%d/%d] depth=%d %s", state.pages_crawled, max_pages, depth, url)
-
-            html = await fetch_page(client, url, timeout, rate_limit_delay)
-            if not html:
-                continue
-
-            soup = _parse_html(html)
-            if not soup:
-                continue
-
-            pdf_urls, page_urls = _extract_pdf_and_page_links(soup, url)
-            state.discovered_pdfs.update(pdf_urls)
-            if pdf_urls:
-                logger.info("Found %d PDF(s) on %s", len(pdf_urls), url)
-
-            yield url, pdf_urls
-
-            # Enqueue same-domain page links at depth + 1
-            for next_url in page_urls:
-                if next_url in state.visited:
+    counters = counters if counters is not None else {}
+    counters.setdefault("pages_fetched", 0)
+    counters.setdefault("pages_from_index", 0)
+    position = 0  # Next index entry to replay
+    pages = 0  # Pages this crawl has used (replayed or fetched)
+    fetched_here: set[str] = set()
+    tasks: dict[asyncio.Task[PageEntry], tuple[str, int]] = {}  # In launch order
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    try:
+        async with httpx.AsyncClient(headers=headers, limits=limits) as client:
+            while pages < max_pages:
+                # Everything goes through the index, so pages fetched here and by
+                # other searches are yielded the same way
+                if position < len(index.entries):
+                    entry = index.entries[position]
+                    position += 1
+                    if entry.depth > max_depth:
+                        continue
+                    pages += 1
+                    if entry.url in fetched_here:
+                        counters["pages_fetched"] += 1
+                        logger.info("Crawled [%d/%d] depth=%d %s", pages, max_pages, entry.depth, entry.url)
+                    else:
+                        counters["pages_from_index"] += 1
+                    if entry.fetched:
+                        if entry.pdf_links:
+                            logger.info("Found %d PDF(s) on %s", len(entry.pdf_links), entry.url)
+                        yield entry.url, dict(entry.pdf_links)
                     continue
-                if not is_same_domain(next_url, allowed_netloc):
+
+                # Start fetches up to the budget
+                with index.lock:
+                    while (
+                        len(tasks) < concurrency
+                        and index.in_flight < concurrency
+                        and pages + len(tasks) < max_pages
+                    ):
+                        next_page = index.pop(max_depth)
+                        if next_page is None:
+                            break
+                        url, depth = next_page
+                        index.in_flight += 1
+                        delay = index.reserve_request(rate_limit_delay)
+                        task = asyncio.create_task(
+                            _crawl_page(client, url, depth, index.domain, timeout, delay)
+                        )
+                        tasks[task] = next_page
+                    others_in_flight = index.in_flight - len(tasks)
+
+                if not tasks:
+                    if not others_in_flight:
+                        break  # Frontier exhausted (within max_depth)
+                    await asyncio.sleep(INDEX_WAIT_SECONDS)  # Other searches are fetching; use their pages
                     continue
-                if (next_url, depth + 1) not in state.queue and depth + 1 <= max_depth:
-                    state.queue.append((next_url, depth + 1))
 
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                with index.lock:
+                    for task in [t for t in tasks if t in done]:
+                        url, depth = tasks.pop(task)
+                        index.in_flight -= 1
+                        fetched_here.add(url)
+                        error = task.exception()
+                        if error is not None:
+                            logger.warning("Crawl of %s failed: %s", url, error)
+                            index.add(PageEntry(url=url, depth=depth, fetched=False))
+                        else:
+                            index.add(task.result())
+    finally:
+        # Keep fetches that already finished; cancel the rest and leave their pages
+        # for the next search (bookkeeping first: a generator closed at loop
+        # shutdown is itself cancelled at the await)
+        with index.lock:
+            for task, (url, depth) in tasks.items():
+                index.in_flight -= 1
+                if task.done() and not task.cancelled() and task.exception() is None:
+                    index.add(task.result())
+                else:
+                    index.requeue(url, depth)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _crawl_page(
+    client: httpx.AsyncClient,
+    url: str,
+    depth: int,
+    allowed_netloc: str,
+    timeout: float,
+    delay: float = 0.0,
+) -> PageEntry:
+    """Wait for the page's request slot, then fetch and parse it into a crawl index entry."""
+    if delay > 0:
+        await asyncio.sleep(delay)
+    html = await fetch_page(client, url, timeout)
+    if not html:
+        return PageEntry(url=url, depth=depth, fetched=False)
+    # Parse off the event loop so other fetches keep going
+    return await asyncio.to_thread(_parse_page, html, url, depth, allowed_netloc)
+
+
+def _parse_page(html: str, url: str, depth: int, allowed_netloc: str) -> PageEntry:
+    """Parse a fetched page into a crawl index entry."""
+    soup = _parse_html(html)
+    if not soup:
+        return PageEntry(url=url, depth=depth, fetched=False)
+
+    pdf_links, page_urls = _extract_links(soup, url)
+    return PageEntry(
+        url=url,
+        depth=depth,
+        pdf_links=pdf_links,
+        page_links=sorted(u for u in page_urls if is_same_domain(u, allowed_netloc)),
+    )
@@ -11,6 +11,7 @@ class MatchResult(BaseModel):
     similarity_score: float
     file_size_mb: float
     discovered_at: str  # ISO 8601
+    content_hash_match: bool = False  # Byte-identical to the reference PDF
 
 
 class NearMiss(BaseModel):
@@ -24,6 +25,11 @@ class SearchStats(BaseModel):
     """Statistics about the search run."""
 
     pages_crawled: int
+    pdfs_discovered: int = 0  # Distinct PDF links found (downloaded best-first)
     pdfs_analyzed: int
+    pdfs_prefiltered: int = 0  # Analyzed PDFs the MinHash prefilter ruled out before TF-IDF scoring
+    pdfs_first_page_rejected: int = 0  # PDFs ruled out from their first page, without a full download
+    pdfs_skipped_known: int = 0  # Discovered PDFs in exclude_urls (known to be other forms), not downloaded
+    pages_fetched: int = 0  # Pages downloaded by this search (the rest came from the shared crawl index)
     time_elapsed_seconds: float
     search_stopped_reason: str
@@ -3,6 +3,10 @@ from __future__ import annotations
 
 import io
 import logging
+import re
+import sys
+from contextvars import ContextVar
+from dataclasses import dataclass
 from pathlib import Path
 
 import httpx
@@ -15,6 +19,60 @@ logger = logging.getLogger(__name__)
 PDF_MAGIC = b"%PDF"
 PDF_MAGIC_LEN = len(PDF_MAGIC)
 
+# A linearized PDF starts with its linearization dictionary: /O is the first
+# page's object number and /E the end offset of the first-page section
+LINEARIZATION_WINDOW = 1024
+LINEARIZED_PATTERN = re.compile(rb"<<\s*/Linearized\b(.*?)>>", re.DOTALL)
+LINEARIZED_KEY_PATTERN = re.compile(rb"/([OE])\s+(\d+)")
+CONTENT_RANGE_PATTERN = re.compile(r"bytes\s+\d+-\d+/(\d+)")
+
+# Appended to a truncated PDF so pypdf (strict=False) rebuilds the cross-reference
+# table from the objects that are present
+TRUNCATED_TRAILER = b"\nstartxref\n0\n%%EOF\n"
+
+# Set while a truncated PDF is read in this context: its repair warnings are expected
+_reading_truncated: ContextVar[bool] = ContextVar("reading_truncated", default=False)
+
+
+class _TruncatedRepairFilter(logging.Filter):
+    """Drops pypdf warnings logged while reading a truncated PDF (other threads and tasks keep theirs)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.ERROR or not _reading_truncated.get()
+
+
+_repair_filter = _TruncatedRepairFilter()
+
+
+def _install_repair_filter() -> None:
+    """
+    Attach the filter to pypdf's loggers.
+
+    pypdf logs to one logger per module, and a logger's filters don't see its
+    children's records, so the filter goes on each loaded module's logger.
+    """
+    for name in [name for name in sys.modules if name == "pypdf" or name.startswith("pypdf.")]:
+        pypdf_logger = logging.getLogger(name)
+        if _repair_filter not in pypdf_logger.filters:
+            pypdf_logger.addFilter(_repair_filter)
+
+
+@dataclass
+class PDFPrefix:
+    """The first bytes of a PDF."""
+
+    data: bytes
+    total_size: int | None  # Size of the whole file, if the server reported it
+    complete: bool  # data is the whole file
+
+
+def linearization_params(data: bytes) -> dict[str, int]:
+    """/O (first page object) and /E (end of first-page section) of a linearized PDF; {} if not linearized."""
+    match = LINEARIZED_PATTERN.search(data[:LINEARIZATION_WINDOW])
+    if not match:
+        return {}
+    return {key.decode(): int(value) for key, value in LINEARIZED_KEY_PATTERN.findall(match.group(1))}
+
 
 async def download_pdf_stream(
     client: httpx.AsyncClient,
@@ -70,6 +128,121 @@ async def download_pdf_stream(
     return body, total
 
 
+async def download_pdf_prefix(
+    client: httpx.AsyncClient,
+    url: str,
+    *,
+    max_bytes: int,
+    timeout: float | None = None,
+    max_size_bytes: int | None = None,
+) -> PDFPrefix:
+    """
+    Download the start of a PDF: its first-page section if it is linearized, else max_bytes.
+
+    Asks for a byte range; servers that ignore it and send the whole file are
+    read only up to the limit.
+
+    Args:
+        client: Async HTTP client.
+        url: PDF URL.
+        max_bytes: Most bytes to read.
+        timeout: Request timeout in seconds.
+        max_size_bytes: Raise ValueError if the whole file is reported larger than this.
+
+    Returns:
+        PDFPrefix (complete if the whole file fit).
+
+    Raises:
+        ValueError: If the response is not a PDF or the file is too large.
+        httpx.HTTPError: On HTTP errors.
+    """
+    validate_url_safe(url)
+    settings = get_settings()
+    timeout = timeout if timeout is not None else settings.request_timeout
+    max_size = max_size_bytes if max_size_bytes is not None else settings.max_pdf_size_bytes
+
+    async with client.stream(
+        "GET",
+        url,
+        headers={"Range": f"bytes=0-{max_bytes - 1}"},
+        follow_redirects=True,
+        timeout=timeout,
+    ) as resp:
+        resp.raise_for_status()
+        total_size = None
+        if resp.status_code == 206:
+            match = CONTENT_RANGE_PATTERN.match(resp.headers.get("content-range", ""))
+            total_size = int(match.group(1)) if match else None
+        elif resp.headers.get("content-length"):
+            total_size = int(resp.headers["content-length"])
+        if total_size is not None and total_size > max_size:
+            raise ValueError(f"PDF too large: {total_size} > {max_size}")
+
+        limit = max_bytes
+        checked_linearization = False
+        body = bytearray()
+        ended = True
+        async for chunk in resp.aiter_bytes():
+            body += chunk
+            if not checked_linearization and len(body) >= LINEARIZATION_WINDOW:
+                checked_linearization = True
+                limit = min(limit, linearization_params(bytes(body)).get("E", limit))
+            if len(body) >= limit:
+                ended = False
+                break
+
+    if len(body) < PDF_MAGIC_LEN or body[:PDF_MAGIC_LEN] != PDF_MAGIC:
+        raise ValueError("Invalid PDF: missing or wrong magic bytes")
+    if total_size is not None:
+        complete = len(body) >= total_size
+    else:
+        complete = ended and resp.status_code == 200
+    data = bytes(body) if complete else bytes(body[:limit])
+    return PDFPrefix(data=data, total_size=total_size, complete=complete)
+
+
+def extract_first_page_text(data: bytes, *, complete: bool = True) -> str | None:
+    """
+    Extract the first page's text from a PDF, or from the start of one.
+
+    A truncated PDF is read from the objects it contains: the first-page
+    section of a linearized PDF holds everything the first page needs; other
+    PDFs work only if their page tree happens to be in the prefix.
+
+    Returns:
+        The text, or None if it cannot be read from data (including encrypted
+        PDFs and pages without text).
+    """
+    from pypdf import PageObject, PdfReader
+    from pypdf.generic import IndirectObject
+
+    reading_truncated = None
+    try:
+        if complete:
+            text = PdfReader(io.BytesIO(data)).pages[0].extract_text()
+        elif b"/Encrypt" in data:
+            return None  # The decryption key is in a trailer we may not have
+        else:
+            _install_repair_filter()
+            reading_truncated = _reading_truncated.set(True)
+            reader = PdfReader(io.BytesIO(data + TRUNCATED_TRAILER), strict=False)
+            first_page = linearization_params(data).get("O")
+            if first_page is None:
+                page = reader.pages[0]
+            else:
+                reference = IndirectObject(first_page, 0, reader)
+                page = PageObject(reader, reference)
+                page.update(reader.get_object(reference))
+            text = page.extract_text()
+    except Exception as e:
+        logger.debug("First page not readable: %s", e)
+        return None
+    finally:
+        if reading_truncated is not None:
+            _reading_truncated.reset(reading_truncated)
+    return text if text and text.strip() else None
+
+
 def extract_text_from_pdf_bytes(data: bytes) -> str:
     """Extract text from PDF bytes using pypdf."""
     from pypdf import PdfReader
@@ -84,6 +257,11 @@ def extract_text_from_pdf_bytes(data: bytes) -> str:
 
 def get_reference_text(reference_pdf_path: str) -> str:
     """Read reference PDF from disk and return extracted text for similarity comparison."""
+    return extract_text_from_pdf_bytes(read_reference_pdf(reference_pdf_path))
+
+
+def read_reference_pdf(reference_pdf_path: str) -> bytes:
+    """Read and validate the reference PDF from disk."""
     path = Path(reference_pdf_path)
     if not path.is_file():
         raise FileNotFoundError(f"Reference PDF not found: {reference_pdf_path}")
@@ -94,4 +272,4 @@ def get_reference_text(reference_pdf_path: str) -> str:
         raise ValueError(f"Reference PDF too large: {len(data)} > {max_size}")
     if len(data) < PDF_MAGIC_LEN or data[:PDF_MAGIC_LEN] != PDF_MAGIC:
         raise ValueError("Reference file is not a valid PDF (wrong magic bytes)")
-    return extract_text_from_pdf_bytes(data)
+    return data
@@ -0,0 +1,154 @@
+"""Cheap ranking of discovered PDFs, so the likeliest relocations are downloaded first.
+
+A candidate is scored from its URL and link text only, against the URL that
+stopped resolving:
+
+- form number: the same form number in the candidate's filename or link text
+- filename: similarity of the file names (case and separators ignored)
+- path: how much of the failed URL's directory the candidate shares
+
+Most relocations keep the file name and move folders, so those score near the
+top and are downloaded as soon as they are discovered.
+"""
+from __future__ import annotations
+
+import difflib
+import heapq
+import itertools
+import re
+from dataclasses import dataclass
+from urllib.parse import unquote, urlparse
+
+# Score weights (total 100)
+FORM_NUMBER_WEIGHT = 50.0
+FILENAME_WEIGHT = 35.0
+PATH_WEIGHT = 15.0
+
+# Candidates at or above this (same form number, or about the same file name) are
+# downloaded while the crawl is still running; the rest once it has finished
+EAGER_SCORE = FILENAME_WEIGHT
+
+# Court form prefixes (kept in line with services.link_crawler.LinkCrawler.extract_form_number)
+FORM_PREFIXES = r"(?:ADM|AP|CIV|CN|CP|CR|DL|DR|DV|HCA|MC|MH|PB|SC|TF|TR|VS)"
+FORM_NUMBER_PATTERNS = [
+    re.compile(rf"[Ff]orm\s*(?:[Nn]o\.?|[Nn]umber:?)\s*({FORM_PREFIXES})-?(\d{{2,4}}[A-Za-z]?)", re.IGNORECASE),
+    re.compile(rf"\b({FORM_PREFIXES})-(\d{{2,4}}[A-Za-z]?)\b", re.IGNORECASE),
+    re.compile(r"\b([A-Za-z]{2,4})-(\d{2,4}[A-Za-z]?)\b", re.IGNORECASE),
+    re.compile(rf"\b({FORM_PREFIXES})(\d{{3,4}}[A-Za-z]?)\b", re.IGNORECASE),
+]
+
+
+def extract_form_number(text: str | None) -> str | None:
+    """
+    Form number in a filename or link text, normalized to "PREFIX-NUMBER".
+
+    Same rules as LinkCrawler.extract_form_number ("Form No. CIV-775",
+    "CIV-775", "civ775", generic "AB-123").
+    """
+    if not text:
+        return None
+    for pattern in FORM_NUMBER_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            prefix, number = match.groups()
+            return f"{prefix.upper()}-{number}".upper()
+    return None
+
+
+def _path_parts(url: str) -> tuple[list[str], str]:
+    """(directory segments, lowercase file stem) of a URL."""
+    segments = [s for s in unquote(urlparse(url).path).split("/") if s]
+    name = segments.pop().lower() if segments else ""
+    if name.endswith(".pdf"):
+        name = name[:-4]
+    return [s.lower() for s in segments], name
+
+
+def _filename_form_number(name: str) -> str | None:
+    """Form number in a file stem ("civ_775_info" reads like "civ-775-info")."""
+    return extract_form_number(name.replace("_", "-"))
+
+
+def _squash(name: str) -> str:
+    return re.sub(r"[-_.\s]", "", name)
+
+
+def filename_similarity(name1: str, name2: str) -> float:
+    """Similarity 0–1 of two file stems, ignoring separators."""
+    name1, name2 = _squash(name1), _squash(name2)
+    if not name1 or not name2:
+        return 0.0
+    if name1 == name2:
+        return 1.0
+    return difflib.SequenceMatcher(None, name1, name2).ratio()
+
+
+def path_proximity(dirs1: list[str], dirs2: list[str]) -> float:
+    """Share 0–1 of directory segments two paths have in common from the root."""
+    if not dirs1 and not dirs2:
+        return 1.0
+    shared = 0
+    for a, b in zip(dirs1, dirs2):
+        if a != b:
+            break
+        shared += 1
+    return shared / max(len(dirs1), len(dirs2))
+
+
+@dataclass(frozen=True)
+class RankedCandidate:
+    """A discovered PDF with its cheap-signal score (0–100)."""
+
+    url: str
+    link_text: str
+    score: float
+
+
+class CandidateQueue:
+    """Discovered PDFs for one search, best score first."""
+
+    def __init__(self, failed_url: str, form_number: str | None = None) -> None:
+        """
+        Args:
+            failed_url: URL the form was last seen at.
+            form_number: Known form number (default: taken from the failed URL's filename).
+        """
+        self._dirs, self._name = _path_parts(failed_url)
+        self.form_number = extract_form_number(form_number) or _filename_form_number(self._name)
+        self._heap: list[tuple[float, int, RankedCandidate]] = []
+        self._seen: set[str] = set()
+        self._seq = itertools.count()
+
+    def score(self, url: str, link_text: str = "") -> float:
+        """Cheap-signal score 0–100 of a candidate URL."""
+        dirs, name = _path_parts(url)
+        score = FILENAME_WEIGHT * filename_similarity(self._name, name)
+        score += PATH_WEIGHT * path_proximity(self._dirs, dirs)
+        if self.form_number:
+            candidate_form = _filename_form_number(name) or extract_form_number(link_text)
+            if candidate_form == self.form_number:
+                score += FORM_NUMBER_WEIGHT
+        return round(score, 1)
+
+    def add(self, url: str, link_text: str = "") -> RankedCandidate | None:
+        """Queue a discovered PDF; returns None if it was already seen."""
+        if url in self._seen:
+            return None
+        self._seen.add(url)
+        candidate = RankedCandidate(url=url, link_text=link_text or "", score=self.score(url, link_text))
+        heapq.heappush(self._heap, (-candidate.score, next(self._seq), candidate))
+        return candidate
+
+    def pop(self, min_score: float = 0.0) -> RankedCandidate | None:
+        """Best queued candidate, or None if there is none scoring at least min_score."""
+        if not self._heap or -self._heap[0][0] < min_score:
+            return None
+        return heapq.heappop(self._heap)[2]
+
+    @property
+    def discovered(self) -> int:
+        """PDFs seen so far (queued or already popped)."""
+        return len(self._seen)
+
+    def __len__(self) -> int:
+        return len(self._heap)
@@ -2,26 +2,34 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import logging
 import time
+from collections.abc import Collection
 from dataclasses import dataclass
 from datetime import datetime, timezone
 
 import httpx
 
 from .config import get_settings
+from .crawl_index import get_crawl_index_cache
 from .crawler import crawl_website
 from .models import MatchResult, NearMiss, SearchStats
 from .pdf_processor import (
+    download_pdf_prefix,
     download_pdf_stream,
+    extract_first_page_text,
     extract_text_from_pdf_bytes,
-    get_reference_text,
+    read_reference_pdf,
 )
-from .similarity import text_similarity_score
+from .ranking import EAGER_SCORE, CandidateQueue
+from .similarity import ReferenceScorer
+from .url_utils import normalize_and_validate, normalize_url
 
 logger = logging.getLogger(__name__)
 
 REASON_MATCH_FOUND = "match_found"
+REASON_EXACT_MATCH = "exact_match"
 REASON_MAX_PAGES = "max_pages_reached"
 REASON_EXHAUSTED = "crawl_exhausted"
 
@@ -32,6 +40,7 @@ class SearchRunState:
 
     pages_crawled: int = 0
     pdfs_analyzed: int = 0
+    pdfs_first_page_rejected: int = 0
     near_misses: list[NearMiss] = None
     start_time: float = 0.0
     stopped_reason: str = REASON_EXHAUSTED
@@ -46,30 +55,80 @@ class SearchRunState:
             self.start_time = time.monotonic()
 
 
-def _build_match_result(pdf_url: str, similarity: float, file_size_bytes: int) -> MatchResult:
+def _normalized(urls: Collection[str]) -> set[str]:
+    """URLs normalized the way the crawler reports them (invalid ones dropped)."""
+    normalized = set()
+    for url in urls:
+        try:
+            normalized.add(normalize_url(url))
+        except ValueError:
+            continue
+    return normalized
+
+
+def _build_match_result(
+    pdf_url: str, similarity: float, file_size_bytes: int, *, content_hash_match: bool = False
+) -> MatchResult:
     """Build a MatchResult from matched PDF info."""
     return MatchResult(
         pdf_url=pdf_url,
         similarity_score=round(similarity, 1),
         file_size_mb=round(file_size_bytes / (1024 * 1024), 2),
         discovered_at=datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        content_hash_match=content_hash_match,
     )
 
 
 async def _process_one_pdf(
     client: httpx.AsyncClient,
     pdf_url: str,
-    reference_text: str,
+    scorer: ReferenceScorer,
+    reference_hash: str,
     threshold: float,
     near_miss_min: float,
     near_miss_max: float,
     state: SearchRunState,
-    semaphore: asyncio.Semaphore,
     timeout: float,
     max_pdf_bytes: int,
+    first_page_scorer: ReferenceScorer | None = None,
+    first_page_min: float = 0.0,
+    prefix_bytes: int = 0,
 ) -> MatchResult | None:
-    """Download one PDF, compare to reference text. Return MatchResult if >= threshold."""
-    async with semaphore:
+    """
+    Download one PDF and compare it to the reference.
+
+    With a first_page_scorer, the start of the PDF is fetched first and a
+    candidate whose first page scores below first_page_min is dropped
+    without a full download. One whose first page cannot be read from the
+    prefix is downloaded in full. A byte-identical PDF is a 100% match
+    without text extraction. Return MatchResult if >= threshold.
+    """
+    data = None
+    if first_page_scorer is not None and prefix_bytes > 0:
+        try:
+            prefix = await download_pdf_prefix(
+                client, pdf_url, max_bytes=prefix_bytes, timeout=timeout, max_size_bytes=max_pdf_bytes
+            )
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 416:  # 416: byte ranges not supported, fetch it whole
+                logger.warning("Failed to download PDF %s: %s", pdf_url, e)
+                return None
+        except Exception as e:
+            logger.warning("Failed to download PDF %s: %s", pdf_url, e)
+            return None
+        else:
+            if prefix.complete:
+                data, size = prefix.data, len(prefix.data)
+            else:
+                first_page_text = extract_first_page_text(prefix.data, complete=False)
+                if first_page_text is not None:
+                    first_page_sim = first_page_scorer.score(first_page_text)
+                    if first_page_sim < first_page_min:
+                        logger.info("PDF %s first page similarity=%.1f, skipped", pdf_url, first_page_sim)
+                        state.pdfs_first_page_rejected += 1
+                        return None
+
+    if data is None:
         try:
             data, size = await download_pdf_stream(
                 client, pdf_url, timeout=timeout, max_size_bytes=max_pdf_bytes
@@ -78,17 +137,20 @@ async def _process_one_pdf(
             logger.warning("Failed to download PDF %s: %s", pdf_url, e)
             return None
 
-        pdf_text = extract_text_from_pdf_bytes(data)
-        sim = text_similarity_score(reference_text, pdf_text)
+    state.pdfs_analyzed += 1
+    if hashlib.sha256(data).hexdigest() == reference_hash:
+        logger.info("PDF %s is identical to the reference", pdf_url)
+        return _build_match_result(pdf_url, 100.0, size, content_hash_match=True)
 
-        state.pdfs_analyzed += 1
-        logger.info("PDF %s similarity=%.1f size=%d", pdf_url, sim, size)
+    pdf_text = extract_text_from_pdf_bytes(data)
+    sim = scorer.score(pdf_text)
+    logger.info("PDF %s similarity=%.1f size=%d", pdf_url, sim, size)
 
-        if sim >= threshold:
-            return _build_match_result(pdf_url, sim, size)
-        if near_miss_min <= sim <= near_miss_max:
-            state.near_misses.append(NearMiss(url=pdf_url, similarity=round(sim, 1)))
-        return None
+    if sim >= threshold:
+        return _build_match_result(pdf_url, sim, size)
+    if near_miss_min <= sim <= near_miss_max:
+        state.near_misses.append(NearMiss(url=pdf_url, similarity=round(sim, 1)))
+    return None
 
 
 async def run_search(
@@ -99,8 +161,24 @@ async def run_search(
     max_pages: int | None = None,
     max_depth: int | None = None,
     max_results: int = 1,
+    shared_index: bool = True,
+    form_number: str | None = None,
+    exclude_urls: Collection[str] | None = None,
 ) -> tuple[list[MatchResult], list[NearMiss], SearchStats]:
-    """Crawl site for PDFs, compare to reference. Collect up to max_results matches (>= threshold), sorted by score descending."""
+    """Crawl site for PDFs, compare to reference. Collect up to max_results matches (>= threshold), sorted by score descending.
+
+    Discovered PDFs are ranked by cheap signals (form number, filename, path;
+    see ranking) and downloaded best-first: strong candidates as soon as the
+    crawl finds them, the rest once it has finished. Each candidate's first
+    page is checked from a partial download before it is downloaded in full.
+    The search stops at the first byte-identical PDF, or once it has
+    max_results matches.
+
+    With shared_index, the crawl goes through the domain's shared crawl index,
+    so pages an earlier search already crawled are not fetched again.
+    form_number is the form's known number (default: from website_url's filename).
+    exclude_urls are PDFs known to be other forms; they are never downloaded.
+    """
     settings = get_settings()
     threshold = similarity_threshold if similarity_threshold is not None else settings.similarity_threshold
     max_pages = max_pages if max_pages is not None else settings.max_pages
@@ -109,45 +187,97 @@ async def run_search(
     near_miss_max = settings.near_miss_max_similarity
     timeout = settings.request_timeout
     max_pdf_bytes = settings.max_pdf_size_bytes
-    concurrent = settings.concurrent_downloads
+    concurrent = max(1, settings.concurrent_downloads)
+    prefix_bytes = settings.first_page_prefix_kb * 1024
+    first_page_min = settings.first_page_min_similarity
 
-    reference_text = get_reference_text(reference_pdf_path)
+    reference_data = read_reference_pdf(reference_pdf_path)
+    scorer = ReferenceScorer(extract_text_from_pdf_bytes(reference_data))
+    reference_hash = hashlib.sha256(reference_data).hexdigest()
+    # No first-page check against a reference whose first page has no text (e.g. scanned)
+    reference_first_page = extract_first_page_text(reference_data) if prefix_bytes > 0 else None
+    first_page_scorer = (
+        ReferenceScorer(reference_first_page, prefilter_min_jaccard=0) if reference_first_page else None
+    )
 
     state = SearchRunState()
-    semaphore = asyncio.Semaphore(concurrent)
-    seen_pdf_urls: set[str] = set()
+    candidates = CandidateQueue(website_url, form_number=form_number)
+    excluded = _normalized(exclude_urls or ())
+    skipped_known: set[str] = set()
+    crawl_counters: dict[str, int] = {}
+    crawl_finished = False
+    done = asyncio.Event()  # Set to stop the search early
+    changed = asyncio.Condition()
+    index = None
+    if shared_index:
+        try:
+            index = get_crawl_index_cache().get(normalize_and_validate(website_url), max_depth)
+        except ValueError:
+            index = None  # crawl_website reports the invalid URL
 
     headers = {"User-Agent": "PDF-Similarity-Search/1.0 (download)", "Accept": "application/pdf,*/*"}
 
-    async with httpx.AsyncClient(headers=headers) as client:
-        async for _page_url, pdf_urls in crawl_website(website_url, max_pages=max_pages, max_depth=max_depth):
-            state.pages_crawled += 1
-            new_pdfs = [u for u in pdf_urls if u not in seen_pdf_urls]
-            seen_pdf_urls.update(new_pdfs)
-
-            tasks = [
-                _process_one_pdf(
-                    client, pdf_url, reference_text,
+    async def crawl() -> None:
+        nonlocal crawl_finished
+        try:
+            async for _page_url, pdf_links in crawl_website(
+                website_url, max_pages=max_pages, max_depth=max_depth, index=index, counters=crawl_counters
+            ):
+                state.pages_crawled += 1
+                skipped_known.update(url for url in pdf_links if url in excluded)
+                added = [candidates.add(url, text) for url, text in pdf_links.items() if url not in excluded]
+                if any(added):
+                    async with changed:
+                        changed.notify_all()
+        finally:
+            crawl_finished = True
+            async with changed:
+                changed.notify_all()
+
+    async def next_candidate():
+        """Best candidate ready to download, or None when there is nothing left."""
+        async with changed:
+            while not done.is_set():
+                candidate = candidates.pop(0.0 if crawl_finished else EAGER_SCORE)
+                if candidate is not None or (crawl_finished and not candidates):
+                    return candidate
+                await changed.wait()
+            return None
+
+    async def download_worker(client: httpx.AsyncClient) -> None:
+        while (candidate := await next_candidate()) is not None:
+            logger.info("Checking candidate %s (score %.1f)", candidate.url, candidate.score)
+            try:
+                result = await _process_one_pdf(
+                    client, candidate.url, scorer, reference_hash,
                     threshold, near_miss_min, near_miss_max,
-                    state, semaphore, timeout, max_pdf_bytes,
+                    state, timeout, max_pdf_bytes,
+                    first_page_scorer, first_page_min, prefix_bytes,
                 )
-                for pdf_url in new_pdfs
-            ]
-            if not tasks:
+            except Exception as e:
+                logger.warning("Task error: %s", e)
                 continue
-
-            task_results = await asyncio.gather(*tasks, return_exceptions=True)
-            for r in task_results:
-                if isinstance(r, Exception):
-                    logger.warning("Task error: %s", r)
-                    continue
-                if r is not None:
-                    state.matches.append(r)
-                    state.stopped_reason = REASON_MATCH_FOUND
-                    if len(state.matches) >= max_results:
-                        break
+            if result is None or len(state.matches) >= max_results:
+                continue
+            state.matches.append(result)
+            state.stopped_reason = REASON_MATCH_FOUND
+            if result.content_hash_match:
+                state.stopped_reason = REASON_EXACT_MATCH
+                done.set()
             if len(state.matches) >= max_results:
-                break
+                done.set()
+
+    async with httpx.AsyncClient(headers=headers) as client:
+        crawl_task = asyncio.create_task(crawl())
+        workers = [asyncio.create_task(download_worker(client)) for _ in range(concurrent)]
+        workers_finished = asyncio.gather(*workers, return_exceptions=True)
+        stopped = asyncio.create_task(done.wait())
+        await asyncio.wait({workers_finished, stopped}, return_when=asyncio.FIRST_COMPLETED)
+
+        # Early stop: abandon the crawl and any downloads still running
+        for task in (crawl_task, *workers, stopped):
+            task.cancel()
+        await asyncio.gather(crawl_task, workers_finished, stopped, return_exceptions=True)
 
         if not state.matches and state.stopped_reason == REASON_EXHAUSTED:
             state.stopped_reason = REASON_MAX_PAGES if state.pages_crawled >= max_pages else REASON_EXHAUSTED
@@ -159,7 +289,12 @@ async def run_search(
     elapsed = time.monotonic() - state.start_time
     search_stats = SearchStats(
         pages_crawled=state.pages_crawled,
+        pdfs_discovered=candidates.discovered,
         pdfs_analyzed=state.pdfs_analyzed,
+        pdfs_prefiltered=scorer.prefiltered,
+        pdfs_first_page_rejected=state.pdfs_first_page_rejected,
+        pdfs_skipped_known=len(skipped_known),
+        pages_fetched=crawl_counters.get("pages_fetched", 0),
         time_elapsed_seconds=round(elapsed, 2),
         search_stopped_reason=state.stopped_reason,
     )
@@ -174,6 +309,9 @@ def search_pdf(
     max_pages: int | None = None,
     max_depth: int | None = None,
     max_results: int = 1,
+    shared_index: bool = True,
+    form_number: str | None = None,
+    exclude_urls: Collection[str] | None = None,
 ) -> tuple[list[MatchResult], list[NearMiss], SearchStats]:
     """Synchronous wrapper for run_search. Use from scripts or non-async code.
 
@@ -187,5 +325,8 @@ def search_pdf(
             max_pages=max_pages,
             max_depth=max_depth,
             max_results=max_results,
+            shared_index=shared_index,
+            form_number=form_number,
+            exclude_urls=exclude_urls,
         )
     )
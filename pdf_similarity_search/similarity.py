@@ -1,22 +1,189 @@
-"""Text-based similarity (TF-IDF + cosine) for PDF comparison."""
+"""Text-based similarity (TF-IDF + cosine) for PDF comparison.
+
+ReferenceScorer prepares the reference text once (TF-IDF terms, word set and
+MinHash signature) and scores any number of candidates against it. A MinHash
+estimate of word-set Jaccard similarity rejects clearly different candidates
+before their TF-IDF terms are built. Scores are the same 0–100 values as a
+TfidfVectorizer fitted on the (reference, candidate) pair.
+"""
 from __future__ import annotations
 
 import logging
+import math
+import re
+import zlib
+from collections import Counter
+from functools import lru_cache
+
+import numpy as np
+
+from .config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# TfidfVectorizer settings the scores are defined by
+MAX_FEATURES = 10_000
+NGRAM_RANGE = (1, 2)
+
+# Smoothed IDF over a two-document corpus: terms in both documents weigh 1
+SINGLE_DOC_IDF = math.log(3 / 2) + 1
+
+WORD_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+
+# MinHash permutations: multiply-shift hashing, h(x) = ((a * x + b) mod 2**64) >> 32,
+# over 32-bit word hashes
+MAX_HASH = (1 << 32) - 1
+MINHASH_SEED = 1
+
+_analyzer = None
+_stop_words: frozenset[str] | None = None
+
+
+def _tfidf_analyzer():
+    """Term extractor of TfidfVectorizer(stop_words="english", ngram_range=(1, 2)) (cached)."""
+    global _analyzer, _stop_words
+    if _analyzer is None:
+        from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS, TfidfVectorizer
+        _analyzer = TfidfVectorizer(stop_words="english", ngram_range=NGRAM_RANGE).build_analyzer()
+        _stop_words = frozenset(ENGLISH_STOP_WORDS)
+    return _analyzer
+
+
+def word_set(text: str) -> set[str]:
+    """Distinct lowercase words of a text, without English stop words."""
+    _tfidf_analyzer()
+    return {w for w in WORD_PATTERN.findall(text.lower()) if w not in _stop_words}
+
+
+@lru_cache(maxsize=4)
+def _permutations(num_perm: int, seed: int = MINHASH_SEED) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.RandomState(seed)
+    a = rng.randint(0, 1 << 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)  # Odd
+    b = rng.randint(0, 1 << 63, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def minhash_signature(words: set[str], num_perm: int) -> np.ndarray:
+    """
+    MinHash signature of a word set.
+
+    Word hashes are CRC32 and permutations come from a fixed seed, so
+    signatures are comparable across processes.
+
+    Returns:
+        uint64 array of num_perm minimums (all MAX_HASH for an empty set).
+    """
+    if not words:
+        return np.full(num_perm, MAX_HASH, dtype=np.uint64)
+    hashes = np.fromiter((zlib.crc32(w.encode("utf-8")) for w in words), dtype=np.uint64, count=len(words))
+    a, b = _permutations(num_perm)
+    permuted = (np.outer(a, hashes) + b[:, None]) >> np.uint64(32)  # uint64 arithmetic wraps mod 2**64
+    return permuted.min(axis=1)
+
+
+def estimate_jaccard(sig1: np.ndarray, sig2: np.ndarray) -> float:
+    """Estimated Jaccard similarity 0–1 of the sets behind two signatures."""
+    return float(np.count_nonzero(sig1 == sig2)) / len(sig1)
+
+
+def _tfidf_cosine(ref: Counter, other: Counter) -> float:
+    """
+    Cosine 0–1 of two documents' TF-IDF vectors, fitted on the pair.
+
+    Matches TfidfVectorizer(max_features=10_000) + cosine_similarity,
+    including which terms max_features keeps.
+    """
+    vocabulary = ref.keys() | other.keys()
+    if not vocabulary:
+        return 0.0
+    if len(vocabulary) > MAX_FEATURES:
+        # Same selection as CountVectorizer._limit_features: alphabetical, then by corpus frequency
+        terms = sorted(vocabulary)
+        frequencies = np.fromiter((ref[t] + other[t] for t in terms), dtype=np.int64, count=len(terms))
+        vocabulary = {terms[i] for i in (-frequencies).argsort()[:MAX_FEATURES]}
+
+    dot = 0.0
+    ref_norm = other_norm = 0.0
+    for term in vocabulary:
+        ref_count, other_count = ref.get(term, 0), other.get(term, 0)
+        if ref_count and other_count:
+            dot += ref_count * other_count
+            ref_norm += ref_count * ref_count
+            other_norm += other_count * other_count
+        elif ref_count:
+            ref_norm += (ref_count * SINGLE_DOC_IDF) ** 2
+        else:
+            other_norm += (other_count * SINGLE_DOC_IDF) ** 2
+    if not ref_norm or not other_norm:
+        return 0.0
+    return dot / math.sqrt(ref_norm * other_norm)
+
+
+class ReferenceScorer:
+    """Scores candidate texts against one reference text, 0–100."""
+
+    def __init__(
+        self,
+        reference_text: str,
+        *,
+        prefilter_min_jaccard: float | None = None,
+        num_perm: int | None = None,
+    ) -> None:
+        """
+        Args:
+            reference_text: Text of the reference PDF.
+            prefilter_min_jaccard: Candidates whose estimated word-set Jaccard
+                similarity is below this skip the TF-IDF score (0 disables).
+                Default: similarity_prefilter_min_jaccard setting.
+            num_perm: MinHash permutations (default: minhash_permutations setting).
+        """
+        settings = get_settings()
+        self.prefilter_min_jaccard = (
+            prefilter_min_jaccard if prefilter_min_jaccard is not None
+            else settings.similarity_prefilter_min_jaccard
+        )
+        self.num_perm = num_perm if num_perm is not None else settings.minhash_permutations
+        self.reference_text = reference_text
+        self.prefiltered = 0  # Candidates rejected by the MinHash estimate
+
+        self._blank = not reference_text.strip()
+        self._terms = Counter(_tfidf_analyzer()(reference_text)) if not self._blank else Counter()
+        self._signature: np.ndarray | None = None
+
+    @property
+    def signature(self) -> np.ndarray:
+        """MinHash signature of the reference's word set (computed on first use)."""
+        if self._signature is None:
+            self._signature = minhash_signature(word_set(self.reference_text), self.num_perm)
+        return self._signature
+
+    def estimate(self, text: str) -> float:
+        """MinHash estimate (0–1) of the word-set Jaccard similarity to the reference."""
+        return estimate_jaccard(self.signature, minhash_signature(word_set(text), self.num_perm))
+
+    def score(self, text: str) -> float:
+        """
+        Similarity 0–100 of a candidate text to the reference.
+
+        A candidate rejected by the prefilter scores its Jaccard estimate
+        (x100), which is below any useful threshold.
+        """
+        if self._blank or not text.strip():
+            return 0.0
+        if self.prefilter_min_jaccard > 0:
+            estimate = self.estimate(text)
+            if estimate < self.prefilter_min_jaccard:
+                self.prefiltered += 1
+                return estimate * 100.0
+        return float(min(100.0, max(0.0, _tfidf_cosine(self._terms, Counter(_tfidf_analyzer()(text))) * 100.0)))
+
 
 def text_similarity_score(ref_text: str, pdf_text: str) -> float:
     """Similarity 0–100 between two text strings (TF-IDF + cosine)."""
     if not ref_text.strip() or not pdf_text.strip():
         return 0.0
     try:
-        from sklearn.feature_extraction.text import TfidfVectorizer
-        from sklearn.metrics.pairwise import cosine_similarity
-        vectorizer = TfidfVectorizer(max_features=10_000, stop_words="english", ngram_range=(1, 2))
-        matrix = vectorizer.fit_transform([ref_text, pdf_text])
-        sim = cosine_similarity(matrix[0:1], matrix[1:2])[0, 0]
-        return float(min(100.0, max(0.0, sim * 100.0)))
+        return ReferenceScorer(ref_text, prefilter_min_jaccard=0).score(pdf_text)
     except Exception as e:
         logger.warning("text similarity failed: %s", e)
         return 0.0
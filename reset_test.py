@@ -28,6 +28,7 @@ structlog.configure(
 
 from db.database import SessionLocal
 from db.models import MonitoredURL, PDFVersion, ChangeLog
+from services.metrics_tracker import metrics_tracker
 
 # #region agent log
 LOG_PATH = "/Users/william.holden/Documents/GitHub/URL_monitor_demo/.cursor/debug.log"
@@ -87,6 +88,7 @@ def reset_test_environment():
         })
         # #endregion
         
+        change_days = set()
         for url in test_urls:
             # #region agent log
             _log("B", "reset_test.py:84", "Processing test URL", {
@@ -117,7 +119,8 @@ def reset_test_environment():
                 print(f"  ⚠ Skipping {url.name} (could not determine target URL)")
                 continue
             
-            # Delete change logs
+            # Delete change logs (noting their days for the metrics rollups)
+            change_days |= metrics_tracker.change_days(db, [url.id])
             changes = db.query(ChangeLog).filter(ChangeLog.monitored_url_id == url.id).delete()
             
             # Delete versions
@@ -141,6 +144,7 @@ def reset_test_environment():
             if existing_url:
                 # If target URL exists on another record, delete the conflicting record first
                 print(f"  ⚠ Target URL {target_url} exists on ID {existing_url.id}, deleting conflict...")
+                change_days |= metrics_tracker.change_days(db, [existing_url.id])
                 db.query(ChangeLog).filter(ChangeLog.monitored_url_id == existing_url.id).delete()
                 db.query(PDFVersion).filter(PDFVersion.monitored_url_id == existing_url.id).delete()
                 db.delete(existing_url)
@@ -187,6 +191,7 @@ def reset_test_environment():
         # #endregion
         
         db.commit()
+        metrics_tracker.refresh_rollup_days(db, change_days)
         
         # #region agent log
         _log("D", "reset_test.py:157", "AFTER commit - commit successful", {})
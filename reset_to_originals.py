@@ -20,6 +20,7 @@ import structlog
 
 from config import settings
 from db.models import MonitoredURL, PDFVersion, ChangeLog
+from services.metrics_tracker import metrics_tracker
 from storage.file_store import FileStore
 
 # Set up logging
@@ -73,8 +74,9 @@ def reset_to_originals():
             print("Aborted.")
             return
         
-        # Step 2: Delete all change logs
+        # Step 2: Delete all change logs (noting their days for the metrics rollups)
         logger.info("Deleting all change logs...")
+        change_days = metrics_tracker.change_days(db)
         deleted_changes = db.query(ChangeLog).delete()
         logger.info("Deleted change logs", count=deleted_changes)
         
@@ -116,6 +118,7 @@ def reset_to_originals():
         
         # Commit all changes
         db.commit()
+        metrics_tracker.refresh_rollup_days(db, change_days)
         
         # Final count
         remaining_versions = db.query(PDFVersion).count()
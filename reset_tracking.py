@@ -23,6 +23,8 @@ from sqlalchemy.orm import Session
 
 from db.database import SessionLocal
 from db.models import MonitoredURL, PDFVersion, ChangeLog
+from services.metrics_tracker import metrics_tracker
+from services.url_state import url_state_tracker
 from storage.file_store import FileStore
 
 # Configure logging
@@ -108,6 +110,8 @@ def reset_tracking(keep_first_version: bool = True):
         
         # Commit all changes
         db.commit()
+        url_state_tracker.rebuild(db)
+        metrics_tracker.refresh_rollups(db, full=True)
         
         print("\n" + "="*60)
         print("✅ Tracking Reset Complete")
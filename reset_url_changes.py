@@ -23,6 +23,8 @@ from sqlalchemy.orm import Session
 
 from db.database import SessionLocal
 from db.models import MonitoredURL, PDFVersion, ChangeLog
+from services.metrics_tracker import metrics_tracker
+from services.url_state import url_state_tracker
 from storage.file_store import FileStore
 
 # Configure logging
@@ -67,6 +69,7 @@ def reset_url_changes(url_id: int, keep_first_version: bool = True):
         ).all()
         
         change_count = len(changes)
+        change_days = {change.detected_at.date() for change in changes if change.detected_at}
         for change in changes:
             db.delete(change)
         
@@ -112,8 +115,11 @@ def reset_url_changes(url_id: int, keep_first_version: bool = True):
         url.last_change_at = None
         url.last_checked_at = None
         
+        url_state_tracker.refresh_url(db, url.id)
+        
         # Commit all changes
         db.commit()
+        metrics_tracker.refresh_rollup_days(db, change_days)
         
         print("\n" + "="*60)
         print("✅ Reset Complete")
@@ -0,0 +1,232 @@
+"""
+Audit Retention Service
+
+Keeps cycle_url_results bounded. Every monitoring cycle writes one row per
+URL, so per-URL detail is kept for AUDIT_DETAIL_RETENTION_DAYS and older
+cycles are compacted into cycle_result_rollups (totals per day and state).
+
+Cycle-level audit figures (counts, durations, triggers) live on
+monitoring_cycles, which is never compacted, so the audit page and
+/api/audit/* numbers are unchanged by compaction.
+
+Compaction is two idempotent steps:
+1. Per cycle: add its results to the rollups and stamp
+   results_compacted_at, in one transaction
+2. Delete the detail rows of stamped cycles in batches of
+   AUDIT_RETENTION_BATCH_SIZE, one transaction per batch
+A crash between the two leaves only detail rows that the next run deletes,
+never results counted twice.
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+import structlog
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from config import settings
+from db.models import CycleResultRollup, CycleURLResult, MonitoredURL, MonitoringCycle
+
+logger = structlog.get_logger()
+
+
+# Rollup count columns, in the order _result_totals() selects them
+ROLLUP_FIELDS = (
+    "url_checks",
+    "successful_checks",
+    "failed_checks",
+    "skipped_unchanged",
+    "changes_detected",
+    "bytes_fetched",
+    "duration_ms",
+)
+
+
+def _as_date(value) -> date:
+    """SQLite returns func.date() as a string; other backends return a date."""
+    if isinstance(value, str):
+        return date.fromisoformat(value)
+    return value
+
+
+class AuditRetention:
+    """
+    Compacts old per-URL cycle results into daily per-state rollups.
+    """
+    
+    def _result_totals(self):
+        """Aggregate columns over CycleURLResult, in ROLLUP_FIELDS order."""
+        return (
+            func.count(CycleURLResult.id),
+            func.coalesce(func.sum(case((CycleURLResult.status == "success", 1), else_=0)), 0),
+            func.coalesce(func.sum(case((CycleURLResult.status == "failed", 1), else_=0)), 0),
+            func.coalesce(func.sum(case((CycleURLResult.skip_reason.isnot(None), 1), else_=0)), 0),
+            func.coalesce(func.sum(case((CycleURLResult.change_detected == True, 1), else_=0)), 0),
+            func.coalesce(func.sum(CycleURLResult.bytes_fetched), 0),
+            func.coalesce(func.sum(CycleURLResult.duration_ms), 0),
+        )
+    
+    def compact_cycle(self, db: Session, cycle: MonitoringCycle) -> int:
+        """
+        Fold one cycle's results into the rollups and mark it compacted.
+        
+        Commits. The detail rows are left for delete_compacted_results().
+        
+        Args:
+            db: Database session
+            cycle: Cycle to compact
+        
+        Returns:
+            Number of result rows folded in
+        """
+        day = cycle.started_at.date()
+        state_expr = func.coalesce(MonitoredURL.state, "")
+        rows = db.query(state_expr, *self._result_totals()).select_from(
+            CycleURLResult
+        ).outerjoin(
+            MonitoredURL, CycleURLResult.monitored_url_id == MonitoredURL.id
+        ).filter(
+            CycleURLResult.cycle_id == cycle.id
+        ).group_by(state_expr).all()
+        
+        folded = 0
+        for state, *totals in rows:
+            rollup = db.get(CycleResultRollup, (day, state))
+            if rollup is None:
+                rollup = CycleResultRollup(day=day, state=state, **{name: 0 for name in ROLLUP_FIELDS})
+                db.add(rollup)
+            for name, value in zip(ROLLUP_FIELDS, totals):
+                setattr(rollup, name, getattr(rollup, name) + int(value))
+            folded += int(totals[0])
+        
+        cycle.results_compacted_at = datetime.utcnow()
+        db.commit()
+        return folded
+    
+    def delete_compacted_results(self, db: Session, batch_size: Optional[int] = None) -> int:
+        """
+        Delete detail rows of compacted cycles, one batch per transaction.
+        
+        Args:
+            db: Database session
+            batch_size: Rows per batch (defaults to AUDIT_RETENTION_BATCH_SIZE)
+        
+        Returns:
+            Number of rows deleted
+        """
+        batch_size = batch_size or settings.AUDIT_RETENTION_BATCH_SIZE
+        deleted = 0
+        
+        while True:
+            ids = [row_id for (row_id,) in db.query(CycleURLResult.id).join(
+                MonitoringCycle, CycleURLResult.cycle_id == MonitoringCycle.id
+            ).filter(
+                MonitoringCycle.results_compacted_at.isnot(None)
+            ).limit(batch_size).all()]
+            if not ids:
+                break
+            
+            db.query(CycleURLResult).filter(
+                CycleURLResult.id.in_(ids)
+            ).delete(synchronize_session=False)
+            db.commit()
+            deleted += len(ids)
+        
+        return deleted
+    
+    def compact(
+        self,
+        db: Session,
+        retention_days: Optional[int] = None,
+        batch_size: Optional[int] = None
+    ) -> Dict[str, int]:
+        """
+        Compact every cycle that started before the retention window.
+        
+        Args:
+            db: Database session
+            retention_days: Days of detail to keep (defaults to AUDIT_DETAIL_RETENTION_DAYS; 0 disables)
+            batch_size: Rows deleted per transaction
+        
+        Returns:
+            Dict with cycles_compacted, results_folded and results_deleted
+        """
+        if retention_days is None:
+            retention_days = settings.AUDIT_DETAIL_RETENTION_DAYS
+        summary = {"cycles_compacted": 0, "results_folded": 0, "results_deleted": 0}
+        if retention_days <= 0:
+            return summary
+        
+        started = datetime.utcnow()
+        cutoff = started - timedelta(days=retention_days)
+        
+        cycles = db.query(MonitoringCycle).filter(
+            MonitoringCycle.started_at < cutoff,
+            MonitoringCycle.results_compacted_at.is_(None)
+        ).order_by(MonitoringCycle.started_at).all()
+        
+        for cycle in cycles:
+            summary["results_folded"] += self.compact_cycle(db, cycle)
+            summary["cycles_compacted"] += 1
+        
+        summary["results_deleted"] = self.delete_compacted_results(db, batch_size)
+        
+        if summary["cycles_compacted"] or summary["results_deleted"]:
+            logger.info(
+                "Audit detail compacted",
+                retention_days=retention_days,
+                duration_ms=int((datetime.utcnow() - started).total_seconds() * 1000),
+                **summary
+            )
+        return summary
+    
+    def get_daily_results(self, db: Session, days: int = 30) -> List[dict]:
+        """
+        Per-day, per-state URL check totals over the last N days.
+        
+        Compacted days come from the rollups and recent days from the detail
+        rows, so the series is continuous across the retention boundary.
+        
+        Args:
+            db: Database session
+            days: Days to include
+        
+        Returns:
+            List of dicts with date, state and the ROLLUP_FIELDS counts, oldest first
+        """
+        start = (datetime.utcnow() - timedelta(days=days)).date()
+        totals = defaultdict(lambda: dict.fromkeys(ROLLUP_FIELDS, 0))
+        
+        for rollup in db.query(CycleResultRollup).filter(CycleResultRollup.day >= start).all():
+            bucket = totals[(rollup.day, rollup.state)]
+            for name in ROLLUP_FIELDS:
+                bucket[name] += getattr(rollup, name)
+        
+        day_expr = func.date(MonitoringCycle.started_at)
+        state_expr = func.coalesce(MonitoredURL.state, "")
+        live = db.query(day_expr, state_expr, *self._result_totals()).select_from(
+            CycleURLResult
+        ).join(
+            MonitoringCycle, CycleURLResult.cycle_id == MonitoringCycle.id
+        ).outerjoin(
+            MonitoredURL, CycleURLResult.monitored_url_id == MonitoredURL.id
+        ).filter(
+            MonitoringCycle.started_at >= datetime.combine(start, datetime.min.time()),
+            MonitoringCycle.results_compacted_at.is_(None)
+        ).group_by(day_expr, state_expr).all()
+        
+        for day, state, *values in live:
+            bucket = totals[(_as_date(day), state)]
+            for name, value in zip(ROLLUP_FIELDS, values):
+                bucket[name] += int(value)
+        
+        return [
+            {"date": day.isoformat(), "state": state or None, **counts}
+            for (day, state), counts in sorted(totals.items())
+        ]
+
+
+# Global instance
+audit_retention = AuditRetention()
@@ -17,9 +17,13 @@ import httpx
 
 from config import settings
 from db.models import MonitoredURL
+from db.upsert import insert_ignore
 
 logger = structlog.get_logger()
 
+# URLs per IN (...) lookup when checking for existing rows
+DUPLICATE_LOOKUP_CHUNK = 500
+
 
 @dataclass
 class ImportResult:
@@ -278,7 +282,7 @@ class BulkImporter:
             file_type: Either 'csv' or 'txt'
             db: Database session
             source: Import source identifier
-            
+        
         Returns:
             BulkImportResult with details of the import
         """
@@ -313,9 +317,8 @@ class BulkImporter:
         
         result.total_rows = len(rows)
         
-        # Process each row
-        for row in rows:
-            import_result = self._process_row(row, db, batch_id, source)
+        # Process all rows, inserting the new URLs in one statement
+        for import_result in self._import_rows(rows, db, batch_id, source):
             result.results.append(import_result)
             
             if import_result.success:
@@ -345,18 +348,9 @@ class BulkImporter:
         
         return result
     
-    def _process_row(
-        self, 
-        row: Dict[str, Any], 
-        db, 
-        batch_id: str,
-        source: str
-    ) -> ImportResult:
-        """Process a single row and create MonitoredURL if valid."""
+    def _validate_row(self, row: Dict[str, Any]) -> Optional[ImportResult]:
+        """Check a row's URL format and required fields; returns the failure, or None if valid."""
         url = row.get('url', '').strip()
-        title = row.get('title', '').strip()
-        state = row.get('state', '').strip()
-        jurisdiction = row.get('jurisdiction', '').strip()
         row_number = row.get('row_number')
         
         # Validate URL format
@@ -370,7 +364,7 @@ class BulkImporter:
             )
         
         # Validate required fields
-        if not state:
+        if not row.get('state', '').strip():
             return ImportResult(
                 url=url,
                 success=False,
@@ -378,7 +372,7 @@ class BulkImporter:
                 row_number=row_number
             )
         
-        if not jurisdiction:
+        if not row.get('jurisdiction', '').strip():
             return ImportResult(
                 url=url,
                 success=False,
@@ -386,68 +380,153 @@ class BulkImporter:
                 row_number=row_number
             )
         
-        # Check for duplicates
-        existing = db.query(MonitoredURL).filter(MonitoredURL.url == url).first()
-        if existing:
-            return ImportResult(
-                url=url,
-                success=False,
-                error=f"URL already exists (ID: {existing.id})",
-                is_duplicate=True,
-                monitored_url_id=existing.id,
-                row_number=row_number
+        return None
+    
+    def _existing_ids(self, db, urls: List[str]) -> Dict[str, int]:
+        """Map each of the URLs already in the database to its MonitoredURL ID."""
+        existing = {}
+        for start in range(0, len(urls), DUPLICATE_LOOKUP_CHUNK):
+            chunk = urls[start:start + DUPLICATE_LOOKUP_CHUNK]
+            existing.update(
+                db.query(MonitoredURL.url, MonitoredURL.id).filter(MonitoredURL.url.in_(chunk)).all()
             )
+        return existing
+    
+    def _import_rows(
+        self,
+        rows: List[Dict[str, Any]],
+        db,
+        batch_id: str,
+        source: str
+    ) -> List[ImportResult]:
+        """
+        Validate rows and create MonitoredURLs for the new ones.
+        
+        Duplicates are found with one lookup per chunk instead of one per row,
+        and new URLs are written with a single INSERT ... ON CONFLICT DO NOTHING,
+        so a URL added concurrently by another import is reported as a
+        duplicate rather than failing the batch.
+        
+        Args:
+            rows: Parsed rows
+            db: Database session (flushed, not committed)
+            batch_id: Import batch identifier
+            source: Import source identifier
+        
+        Returns:
+            One ImportResult per row, in row order
+        """
+        results: List[Optional[ImportResult]] = [self._validate_row(row) for row in rows]
+        pending = [i for i, outcome in enumerate(results) if outcome is None]
         
-        # Optionally validate URL accessibility
-        if self.validate_urls:
-            is_accessible, access_error = self.validate_url_accessible(url)
-            if not is_accessible:
-                return ImportResult(
+        existing = self._existing_ids(db, list({rows[i]['url'].strip() for i in pending}))
+        first_row: Dict[str, Any] = {}
+        to_insert = []
+        
+        for i in pending:
+            row = rows[i]
+            url = row['url'].strip()
+            row_number = row.get('row_number')
+            
+            # Check for duplicates, in the database and earlier in the file
+            if url in existing:
+                results[i] = ImportResult(
                     url=url,
                     success=False,
-                    error=f"URL not accessible: {access_error}",
+                    error=f"URL already exists (ID: {existing[url]})",
+                    is_duplicate=True,
+                    monitored_url_id=existing[url],
                     row_number=row_number
                 )
+                continue
+            if url in first_row:
+                results[i] = ImportResult(
+                    url=url,
+                    success=False,
+                    error=f"Duplicate of row {first_row[url]}",
+                    is_duplicate=True,
+                    row_number=row_number
+                )
+                continue
+            first_row[url] = row_number
+            
+            # Optionally validate URL accessibility
+            if self.validate_urls:
+                is_accessible, access_error = self.validate_url_accessible(url)
+                if not is_accessible:
+                    results[i] = ImportResult(
+                        url=url,
+                        success=False,
+                        error=f"URL not accessible: {access_error}",
+                        row_number=row_number
+                    )
+                    continue
+            
+            to_insert.append(i)
+        
+        values = []
+        for i in to_insert:
+            row = rows[i]
+            url = row['url'].strip()
+            title = row.get('title', '').strip()
+            jurisdiction = row['jurisdiction'].strip()
+            values.append({
+                # Generate name from URL if title not provided
+                "name": title if title else self.generate_name_from_url(url),
+                "url": url,
+                "state": row['state'].strip(),
+                "domain_category": jurisdiction,
+                "enabled": True,
+                "import_batch_id": batch_id,
+                "import_source": source,
+                "imported_at": datetime.utcnow()
+            })
         
-        # Generate name from URL if title not provided
-        name = title if title else self.generate_name_from_url(url)
-        
-        # Extract domain category if jurisdiction not specified properly
-        if not jurisdiction:
-            jurisdiction = self.extract_domain_category(url)
-        
-        # Create MonitoredURL
         try:
-            monitored_url = MonitoredURL(
-                name=name,
-                url=url,
-                state=state,
-                domain_category=jurisdiction,
-                enabled=True,
-                import_batch_id=batch_id,
-                import_source=source,
-                imported_at=datetime.utcnow()
-            )
-            db.add(monitored_url)
-            db.flush()  # Get ID without committing
-            
-            return ImportResult(
-                url=url,
-                success=True,
-                monitored_url_id=monitored_url.id,
-                title=name,
-                state=state,
-                jurisdiction=jurisdiction,
-                row_number=row_number
+            returned = insert_ignore(
+                db, MonitoredURL, values,
+                index_elements=["url"],
+                returning=[MonitoredURL.id, MonitoredURL.url]
             )
-            
+            inserted = {url: url_id for url_id, url in returned}
         except Exception as e:
-            return ImportResult(
-                url=url,
-                success=False,
-                error=f"Failed to create URL: {str(e)}",
-                row_number=row_number
-            )
+            db.rollback()
+            for i in to_insert:
+                results[i] = ImportResult(
+                    url=rows[i]['url'].strip(),
+                    success=False,
+                    error=f"Failed to create URL: {str(e)}",
+                    row_number=rows[i].get('row_number')
+                )
+            return results
+        
+        # URLs skipped by ON CONFLICT were inserted by someone else meanwhile
+        raced = self._existing_ids(db, [v["url"] for v in values if v["url"] not in inserted])
+        
+        for i, value in zip(to_insert, values):
+            url = value["url"]
+            row_number = rows[i].get('row_number')
+            if url in inserted:
+                results[i] = ImportResult(
+                    url=url,
+                    success=True,
+                    monitored_url_id=inserted[url],
+                    title=value["name"],
+                    state=value["state"],
+                    jurisdiction=value["domain_category"],
+                    row_number=row_number
+                )
+            else:
+                results[i] = ImportResult(
+                    url=url,
+                    success=False,
+                    error=f"URL already exists (ID: {raced.get(url)})",
+                    is_duplicate=True,
+                    monitored_url_id=raced.get(url),
+                    row_number=row_number
+                )
+        
+        return results
     
     def import_from_file(
         self,
@@ -462,7 +541,7 @@ class BulkImporter:
             file_path: Path to CSV or TXT file
             db: Database session
             source: Import source identifier
-            
+        
         Returns:
             BulkImportResult with details of the import
         """
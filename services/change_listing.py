@@ -0,0 +1,203 @@
+"""
+Change Listing Service
+
+Shared query layer for the reviewer-facing change lists: the triage
+dashboard, the change review page, the recent changes page and the
+/api/changes and /api/changes-full endpoints.
+
+Each listing is a single query that eager-loads the change's URL and new
+version (only the columns the views read), with relocation near-misses
+bulk-loaded from URL current state. Status counts come from one grouped
+query instead of one count query per status.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import structlog
+from sqlalchemy import func
+from sqlalchemy.orm import Query, Session, contains_eager, defer, joinedload
+
+from db.models import ChangeLog, MonitoredURL, PDFVersion
+from services.url_state import url_state_tracker
+
+logger = structlog.get_logger()
+
+
+# Review statuses counted as approved
+APPROVED_STATUSES = ("approved", "auto_approved")
+
+# Recommended actions counted as automated vs. needing a human
+AUTOMATED_ACTIONS = ("auto_approve", "false_positive")
+MANUAL_ACTIONS = ("manual_required", "new_form")
+
+# URL and version columns the listing views read
+URL_COLUMNS = (
+    MonitoredURL.id,
+    MonitoredURL.name,
+    MonitoredURL.url,
+    MonitoredURL.enabled,
+    MonitoredURL.state,
+    MonitoredURL.domain_category,
+)
+VERSION_COLUMNS = (
+    PDFVersion.id,
+    PDFVersion.monitored_url_id,
+    PDFVersion.form_number,
+    PDFVersion.formatted_title,
+)
+
+# Free-text change columns no listing view shows
+UNLISTED_CHANGE_COLUMNS = (
+    ChangeLog.review_notes,
+    ChangeLog.override_reason,
+    ChangeLog.intervention_notes,
+)
+
+
+class ChangeListing:
+    """
+    Builds eager-loaded change lists and grouped status counts.
+    """
+    
+    def query(
+        self,
+        db: Session,
+        status: Optional[str] = None,
+        action: Optional[str] = None,
+        change_type: Optional[str] = None,
+        state: Optional[str] = None,
+        enabled_only: bool = True,
+        with_details: bool = False
+    ) -> Query:
+        """
+        ChangeLog query joined to its URL, filters applied, newest first.
+        
+        Args:
+            db: Database session
+            status: Review status filter ("all" or None for every status)
+            action: Recommended action filter
+            change_type: Change type filter
+            state: URL state filter
+            enabled_only: Only include changes for enabled URLs
+            with_details: Also load diff_summary and affected_pages
+        
+        Returns:
+            Query yielding ChangeLog rows with monitored_url and new_version loaded
+        """
+        unlisted = UNLISTED_CHANGE_COLUMNS
+        if not with_details:
+            unlisted = unlisted + (ChangeLog.diff_summary, ChangeLog.affected_pages)
+        
+        query = db.query(ChangeLog).join(
+            ChangeLog.monitored_url
+        ).options(
+            contains_eager(ChangeLog.monitored_url).load_only(*URL_COLUMNS),
+            joinedload(ChangeLog.new_version).load_only(*VERSION_COLUMNS),
+            *[defer(column) for column in unlisted]
+        )
+        
+        if enabled_only:
+            query = query.filter(MonitoredURL.enabled == True)
+        
+        if status and status != "all":
+            query = query.filter(ChangeLog.review_status == status)
+        
+        if action:
+            query = query.filter(ChangeLog.recommended_action == action)
+        
+        if change_type:
+            query = query.filter(ChangeLog.change_type == change_type)
+        
+        if state:
+            query = query.filter(MonitoredURL.state == state)
+        
+        return query.order_by(ChangeLog.detected_at.desc(), ChangeLog.id.desc())
+    
+    def list_changes(
+        self,
+        db: Session,
+        limit: int = 100,
+        **filters
+    ) -> List[dict]:
+        """
+        Fetch the newest changes matching the filters.
+        
+        Args:
+            db: Database session
+            limit: Maximum changes to return
+            **filters: Keyword filters accepted by query()
+        
+        Returns:
+            List of dicts with change, url, version and relocation_near_misses
+        """
+        changes = self.query(db, **filters).limit(limit).all()
+        
+        relocation_url_ids = {
+            change.monitored_url_id for change in changes
+            if change.change_type == "relocation_failed"
+        }
+        state_map = url_state_tracker.get_states(db, relocation_url_ids, with_latest=False)
+        
+        items = []
+        for change in changes:
+            near_misses = None
+            if change.change_type == "relocation_failed":
+                url_state = state_map.get(change.monitored_url_id)
+                near_misses = url_state.relocation_near_misses if url_state else None
+            items.append({
+                "change": change,
+                "url": change.monitored_url,
+                "version": change.new_version,
+                "relocation_near_misses": near_misses
+            })
+        
+        return items
+    
+    def status_counts(self, db: Session, enabled_only: bool = True) -> Dict[str, int]:
+        """
+        Change counts by review status and recommendation, in one grouped query.
+        
+        Args:
+            db: Database session
+            enabled_only: Only count changes for enabled URLs
+        
+        Returns:
+            Dict with total, pending, approved, automated and manual counts
+        """
+        query = db.query(
+            ChangeLog.review_status,
+            ChangeLog.recommended_action,
+            func.count(ChangeLog.id)
+        )
+        if enabled_only:
+            query = query.join(ChangeLog.monitored_url).filter(MonitoredURL.enabled == True)
+        rows = query.group_by(ChangeLog.review_status, ChangeLog.recommended_action).all()
+        
+        counts = {"total": 0, "pending": 0, "approved": 0, "automated": 0, "manual": 0}
+        for review_status, action, count in rows:
+            counts["total"] += count
+            if review_status == "pending":
+                counts["pending"] += count
+            elif review_status in APPROVED_STATUSES:
+                counts["approved"] += count
+            if action in AUTOMATED_ACTIONS:
+                counts["automated"] += count
+            elif action in MANUAL_ACTIONS:
+                counts["manual"] += count
+        
+        return counts
+    
+    def state_counts(self, db: Session) -> List[Tuple[str, int]]:
+        """Change counts per URL state (URLs without a state are left out)."""
+        return db.query(
+            MonitoredURL.state,
+            func.count(ChangeLog.id).label('count')
+        ).join(
+            ChangeLog, MonitoredURL.id == ChangeLog.monitored_url_id
+        ).filter(
+            MonitoredURL.state.isnot(None)
+        ).group_by(MonitoredURL.state).all()
+
+
+# Global instance
+change_listing = ChangeListing()
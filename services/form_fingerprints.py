@@ -0,0 +1,413 @@
+"""
+Form Fingerprint Index
+
+Answers "which stored form is this text?" locally: every monitored URL's
+latest version text has a MinHash signature, and an LSH index over those
+signatures (form_fingerprints / form_fingerprint_buckets) finds near-duplicates
+with a few indexed lookups, without a crawl or a Kendra query.
+
+Texts are compared as sets of word shingles (FORM_FINGERPRINT_SHINGLE_SIZE
+consecutive words): sister forms in a series share most of their words but far
+fewer word sequences. Each signature is split into FORM_FINGERPRINT_BANDS bands;
+URLs sharing any band bucket are candidates, ranked by the Jaccard similarity
+their signatures estimate.
+
+Uses:
+- Duplicates: a URL whose text matches an older URL's above
+  FORM_FINGERPRINT_DUPLICATE_THRESHOLD is flagged as its duplicate (the same
+  form monitored under several URLs, e.g. after a bulk import)
+- Similar forms: suggestions for /api/urls/{id}/similar when Kendra is off
+- Relocation: PDFs on the site that are monitored as other forms are not downloaded
+"""
+
+import re
+import zlib
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Optional, Set
+from urllib.parse import urlparse
+
+import numpy as np
+import structlog
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from config import settings
+from db.models import FormFingerprint, FormFingerprintBucket, MonitoredURL, PDFVersion
+from pdf_similarity_search.similarity import minhash_signature
+
+if TYPE_CHECKING:
+    from storage.file_store import FileStore
+
+logger = structlog.get_logger()
+
+
+WORD_PATTERN = re.compile(r"\w+")
+
+# Near-duplicates considered when flagging a URL's duplicates
+MAX_DUPLICATES = 20
+
+# Versions indexed per commit during a rebuild
+REBUILD_BATCH_SIZE = 200
+
+
+def shingles(text: str, size: int) -> Set[str]:
+    """Distinct runs of `size` consecutive lowercase words (the whole text if shorter)."""
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+@dataclass
+class FingerprintMatch:
+    """A monitored URL whose latest version is similar to the query."""
+    monitored_url_id: int
+    version_id: int
+    similarity: float  # Estimated Jaccard similarity of the shingle sets, 0.0-1.0
+
+
+@dataclass
+class DuplicateForm:
+    """A monitored URL whose latest version is the same form as another URL's."""
+    monitored_url_id: int
+    url: str
+    duplicate_of_url_id: int
+    duplicate_of_url: str
+    similarity: float
+    import_batch_id: Optional[str] = None
+
+
+class FormFingerprintIndex:
+    """
+    MinHash LSH index of the latest version text of every monitored URL.
+    """
+    
+    def __init__(
+        self,
+        num_perm: Optional[int] = None,
+        bands: Optional[int] = None,
+        shingle_size: Optional[int] = None,
+        file_store: Optional["FileStore"] = None
+    ):
+        """
+        Initialize the index.
+        
+        Args:
+            num_perm: MinHash permutations (default: FORM_FINGERPRINT_PERMUTATIONS)
+            bands: LSH bands; must divide num_perm (default: FORM_FINGERPRINT_BANDS)
+            shingle_size: Words per shingle (default: FORM_FINGERPRINT_SHINGLE_SIZE)
+            file_store: FileStore for reading stored version text during a rebuild
+        """
+        self.num_perm = num_perm or settings.FORM_FINGERPRINT_PERMUTATIONS
+        self.bands = bands or settings.FORM_FINGERPRINT_BANDS
+        if self.num_perm % self.bands:
+            raise ValueError(f"{self.num_perm} permutations cannot be split into {self.bands} bands")
+        self.rows = self.num_perm // self.bands
+        self.shingle_size = shingle_size or settings.FORM_FINGERPRINT_SHINGLE_SIZE
+        self._file_store = file_store
+    
+    @property
+    def file_store(self) -> "FileStore":
+        if self._file_store is None:
+            # Imported here: storage.version_manager imports this module
+            from storage.file_store import FileStore
+            self._file_store = FileStore()
+        return self._file_store
+    
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """MinHash signature (uint32) of a text's shingles, or None for a text without words."""
+        text_shingles = shingles(text or "", self.shingle_size)
+        if not text_shingles:
+            return None
+        return minhash_signature(text_shingles, self.num_perm).astype(np.uint32)
+    
+    def buckets(self, signature: np.ndarray) -> List[int]:
+        """LSH bucket of each band: (band << 32) | CRC32 of the band's values."""
+        return [
+            (band << 32) | zlib.crc32(signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+    
+    def _similarities(self, signature: np.ndarray, stored: List[bytes]) -> np.ndarray:
+        """Estimated Jaccard similarity of a signature to each stored one (-1 for another format)."""
+        width = self.num_perm * 4
+        similarities = np.full(len(stored), -1.0)
+        usable = [i for i, value in enumerate(stored) if len(value) == width]
+        if usable:
+            matrix = np.frombuffer(b"".join(stored[i] for i in usable), dtype=np.uint32).reshape(-1, self.num_perm)
+            similarities[usable] = (matrix == signature).mean(axis=1)
+        return similarities
+    
+    def query(
+        self,
+        db: Session,
+        text: Optional[str] = None,
+        signature: Optional[np.ndarray] = None,
+        min_similarity: float = 0.0,
+        limit: int = 10,
+        exclude_url_id: Optional[int] = None
+    ) -> List[FingerprintMatch]:
+        """
+        Find monitored URLs whose latest version is similar to a text.
+        
+        Args:
+            db: Database session
+            text: Text to look up (or pass its signature)
+            signature: Signature from self.signature()
+            min_similarity: Minimum estimated Jaccard similarity (0.0-1.0)
+            limit: Maximum matches
+            exclude_url_id: URL to leave out (the one being looked up)
+        
+        Returns:
+            Matches, most similar first
+        """
+        if signature is None:
+            signature = self.signature(text or "")
+            if signature is None:
+                return []
+        
+        candidate_ids = {
+            url_id for (url_id,) in db.query(FormFingerprintBucket.monitored_url_id).filter(
+                FormFingerprintBucket.bucket.in_(self.buckets(signature))
+            ).distinct()
+        }
+        candidate_ids.discard(exclude_url_id)
+        if not candidate_ids:
+            return []
+        
+        rows = db.query(
+            FormFingerprint.monitored_url_id, FormFingerprint.version_id, FormFingerprint.signature
+        ).filter(FormFingerprint.monitored_url_id.in_(candidate_ids)).all()
+        similarities = self._similarities(signature, [row.signature for row in rows])
+        
+        matches = [
+            FingerprintMatch(
+                monitored_url_id=row.monitored_url_id,
+                version_id=row.version_id,
+                similarity=round(float(similarity), 3)
+            )
+            for row, similarity in zip(rows, similarities)
+            if similarity >= min_similarity
+        ]
+        matches.sort(key=lambda m: (-m.similarity, m.monitored_url_id))
+        return matches[:limit]
+    
+    def index_version(self, db: Session, version: PDFVersion, text: str) -> Optional[FormFingerprint]:
+        """
+        Fingerprint a version's text as its URL's latest (call before committing it).
+        
+        A URL holding the same form as an older URL (lower ID) is flagged as
+        its duplicate; newer URLs found holding this form are flagged as
+        duplicates of this one. A version older than the one already indexed
+        is ignored.
+        
+        Returns:
+            The URL's fingerprint, or None if the text has no words
+        """
+        url_id = version.monitored_url_id
+        fingerprint = db.get(FormFingerprint, url_id)
+        if fingerprint is not None and fingerprint.version_id > version.id:
+            return fingerprint
+        
+        signature = self.signature(text)
+        db.query(FormFingerprintBucket).filter(
+            FormFingerprintBucket.monitored_url_id == url_id
+        ).delete(synchronize_session=False)
+        if signature is None:
+            if fingerprint is not None:
+                db.delete(fingerprint)
+            return None
+        
+        duplicates = self.query(
+            db,
+            signature=signature,
+            min_similarity=settings.FORM_FINGERPRINT_DUPLICATE_THRESHOLD,
+            limit=MAX_DUPLICATES,
+            exclude_url_id=url_id
+        )
+        original = next((m for m in duplicates if m.monitored_url_id < url_id), None)
+        
+        if fingerprint is None:
+            fingerprint = FormFingerprint(monitored_url_id=url_id)
+            db.add(fingerprint)
+        fingerprint.version_id = version.id
+        fingerprint.signature = signature.tobytes()
+        fingerprint.shingle_count = len(shingles(text, self.shingle_size))
+        fingerprint.duplicate_of_url_id = original.monitored_url_id if original else None
+        fingerprint.duplicate_similarity = original.similarity if original else None
+        db.add_all(
+            FormFingerprintBucket(monitored_url_id=url_id, bucket=bucket)
+            for bucket in self.buckets(signature)
+        )
+        newer = {m.monitored_url_id: m.similarity for m in duplicates if m.monitored_url_id > url_id}
+        if newer:
+            for other in db.query(FormFingerprint).filter(
+                FormFingerprint.monitored_url_id.in_(newer),
+                FormFingerprint.duplicate_of_url_id.is_(None)
+            ):
+                other.duplicate_of_url_id = url_id
+                other.duplicate_similarity = newer[other.monitored_url_id]
+        db.flush()
+        
+        if original:
+            logger.warning(
+                "Form is already monitored under another URL",
+                url_id=url_id,
+                duplicate_of_url_id=original.monitored_url_id,
+                similarity=original.similarity
+            )
+        return fingerprint
+    
+    def similar_to_url(
+        self,
+        db: Session,
+        url_id: int,
+        min_similarity: Optional[float] = None,
+        limit: int = 10
+    ) -> List[FingerprintMatch]:
+        """
+        Find forms similar to a monitored URL's latest version.
+        
+        Args:
+            db: Database session
+            url_id: Monitored URL ID
+            min_similarity: Minimum similarity (default: FORM_FINGERPRINT_SIMILAR_THRESHOLD)
+            limit: Maximum matches
+        
+        Returns:
+            Matches, most similar first (empty if the URL is not indexed)
+        """
+        fingerprint = db.get(FormFingerprint, url_id)
+        if fingerprint is None:
+            return []
+        return self.query(
+            db,
+            signature=np.frombuffer(fingerprint.signature, dtype=np.uint32),
+            min_similarity=(
+                min_similarity if min_similarity is not None else settings.FORM_FINGERPRINT_SIMILAR_THRESHOLD
+            ),
+            limit=limit,
+            exclude_url_id=url_id
+        )
+    
+    def known_other_forms(
+        self,
+        db: Session,
+        monitored_url: MonitoredURL,
+        max_similarity: Optional[float] = None
+    ) -> Set[str]:
+        """
+        URLs on a monitored URL's site that are monitored as other forms.
+        
+        Relocation does not need to download these: their stored text is not
+        similar to the form being looked for.
+        
+        Args:
+            db: Database session
+            monitored_url: URL whose form is being relocated
+            max_similarity: Similarity below which a URL holds another form
+                (default: FORM_FINGERPRINT_RELOCATION_SKIP_BELOW)
+        
+        Returns:
+            Set of URLs (empty if the URL is not indexed)
+        """
+        fingerprint = db.get(FormFingerprint, monitored_url.id)
+        if fingerprint is None or len(fingerprint.signature) != self.num_perm * 4:
+            return set()
+        max_similarity = (
+            max_similarity if max_similarity is not None else settings.FORM_FINGERPRINT_RELOCATION_SKIP_BELOW
+        )
+        
+        parsed = urlparse(monitored_url.url)
+        site = f"{parsed.scheme}://{parsed.netloc}/"
+        rows = db.query(MonitoredURL.url, FormFingerprint.signature).join(
+            FormFingerprint, FormFingerprint.monitored_url_id == MonitoredURL.id
+        ).filter(
+            MonitoredURL.url.like(site + "%"),
+            MonitoredURL.id != monitored_url.id
+        ).all()
+        rows = [row for row in rows if row.url.startswith(site)]  # LIKE treats "_" as a wildcard
+        
+        similarities = self._similarities(
+            np.frombuffer(fingerprint.signature, dtype=np.uint32), [row.signature for row in rows]
+        )
+        return {row.url for row, similarity in zip(rows, similarities) if 0 <= similarity < max_similarity}
+    
+    def duplicates(self, db: Session, import_batch_id: Optional[str] = None) -> List[DuplicateForm]:
+        """
+        Monitored URLs flagged as holding the same form as another URL.
+        
+        Args:
+            db: Database session
+            import_batch_id: Only URLs from this bulk import
+        
+        Returns:
+            Flagged URLs, most similar first
+        """
+        query = db.query(FormFingerprint, MonitoredURL).join(
+            MonitoredURL, MonitoredURL.id == FormFingerprint.monitored_url_id
+        ).filter(FormFingerprint.duplicate_of_url_id.isnot(None))
+        if import_batch_id:
+            query = query.filter(MonitoredURL.import_batch_id == import_batch_id)
+        rows = query.all()
+        
+        other_urls = dict(
+            db.query(MonitoredURL.id, MonitoredURL.url).filter(
+                MonitoredURL.id.in_({fingerprint.duplicate_of_url_id for fingerprint, _ in rows})
+            ).all()
+        ) if rows else {}
+        
+        duplicates = [
+            DuplicateForm(
+                monitored_url_id=monitored_url.id,
+                url=monitored_url.url,
+                duplicate_of_url_id=fingerprint.duplicate_of_url_id,
+                duplicate_of_url=other_urls[fingerprint.duplicate_of_url_id],
+                similarity=fingerprint.duplicate_similarity,
+                import_batch_id=monitored_url.import_batch_id
+            )
+            for fingerprint, monitored_url in rows
+            if fingerprint.duplicate_of_url_id in other_urls
+        ]
+        duplicates.sort(key=lambda d: (-d.similarity, d.monitored_url_id))
+        return duplicates
+    
+    def rebuild(self, db: Session) -> Dict[str, int]:
+        """
+        Index the latest version of every monitored URL from its stored text.
+        
+        Needed once for versions created before the index existed, or after
+        changing the permutation, band or shingle settings.
+        
+        Returns:
+            Stats: indexed, skipped (no stored text or no words), duplicates
+        """
+        stats = {"indexed": 0, "skipped": 0, "duplicates": 0}
+        
+        latest_ids = [
+            version_id for (version_id,) in db.query(func.max(PDFVersion.id)).group_by(
+                PDFVersion.monitored_url_id
+            ).order_by(func.max(PDFVersion.id))
+        ]
+        
+        for start in range(0, len(latest_ids), REBUILD_BATCH_SIZE):
+            versions = db.query(PDFVersion).filter(
+                PDFVersion.id.in_(latest_ids[start:start + REBUILD_BATCH_SIZE])
+            ).order_by(PDFVersion.id).all()
+            for version in versions:
+                text = self.file_store.get_extracted_text(version.monitored_url_id, version.id)
+                fingerprint = self.index_version(db, version, text) if text else None
+                if fingerprint is None:
+                    stats["skipped"] += 1
+                    continue
+                stats["indexed"] += 1
+                if fingerprint.duplicate_of_url_id:
+                    stats["duplicates"] += 1
+            db.commit()
+        
+        logger.info("Form fingerprint index rebuilt", **stats)
+        return stats
+
+
+# Global instance
+form_fingerprint_index = FormFingerprintIndex()
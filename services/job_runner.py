@@ -0,0 +1,603 @@
+"""
+Monitoring Job Runner
+
+One path for every monitoring cycle, whether the API, the scheduler or the
+CLI starts it:
+
+1. enqueue() persists a MonitoringJob with status "queued"
+2. A bounded pool (JOB_RUNNER_CONCURRENCY threads) executes queued jobs:
+   it creates the job's MonitoringCycle, runs
+   MonitoringOrchestrator.run_cycle and records the totals on the job and
+   the cycle
+3. Progress and per-URL outcomes are published as events, which
+   /api/jobs/{id}/events streams to the UI, and the job's counts are saved
+   every JOB_PROGRESS_PERSIST_SECONDS
+
+A running job can be cancelled: URLs that haven't started are skipped and
+the cycle is recorded as partial. Cancelled, failed and interrupted jobs
+can be resumed; the resumed run reuses the job's cycle and skips URLs that
+already have a result in it.
+
+Statuses: queued -> running -> completed | cancelled | failed | interrupted
+("interrupted": the process running it stopped part-way).
+"""
+
+import os
+import socket
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import structlog
+from sqlalchemy.orm import Session
+
+from config import settings
+from db.database import SessionLocal
+from db.models import CycleURLResult, MonitoringCycle, MonitoringJob
+from db.write_queue import write_queue
+
+logger = structlog.get_logger()
+
+
+FINISHED_STATUSES = ("completed", "cancelled", "failed", "interrupted")
+RESUMABLE_STATUSES = ("cancelled", "failed", "interrupted")
+
+# Cumulative progress counters on MonitoringJob
+COUNT_FIELDS = ("processed_urls", "successful", "failed", "changes", "skipped", "errors")
+
+# Jobs whose events are kept in memory once finished
+MAX_TRACKED_JOBS = 50
+
+# Outcome fields published per URL
+OUTCOME_FIELDS = ("url_id", "name", "success", "error", "change_detected", "tier_reached", "skip_reason")
+
+# Receives (event name, payload) for every event a job publishes
+JobListener = Callable[[str, dict], None]
+
+
+class JobStateError(Exception):
+    """The job's status doesn't allow the requested action."""
+
+
+def job_to_dict(job: MonitoringJob) -> dict:
+    """JSON-ready view of a job."""
+    return {
+        "id": job.id,
+        "status": job.status,
+        "triggered_by": job.triggered_by,
+        "url_id": job.url_id,
+        "cycle_id": job.cycle_id,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "completed_at": job.completed_at.isoformat() if job.completed_at else None,
+        "cancel_requested": bool(job.cancel_requested),
+        "attempts": job.attempts or 0,
+        "error": job.error,
+        "total_urls": job.total_urls or 0,
+        **{field: getattr(job, field) or 0 for field in COUNT_FIELDS}
+    }
+
+
+def _runner_alive(runner_id: Optional[str]) -> bool:
+    """Whether the process that claimed a job (host:pid) is still running on this host."""
+    if not runner_id or ":" not in runner_id:
+        return False
+    host, _, pid = runner_id.rpartition(":")
+    if host != socket.gethostname():
+        return True  # Can't tell for another host; leave its jobs alone
+    try:
+        os.kill(int(pid), 0)
+    except (ValueError, ProcessLookupError):
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobRunner:
+    """
+    Persists, executes, cancels and resumes monitoring jobs.
+    """
+    
+    def __init__(self, session_factory: Optional[Callable[[], Session]] = None, concurrency: Optional[int] = None):
+        """
+        Initialize the runner (the worker pool starts on first submit).
+        
+        Args:
+            session_factory: Creates sessions for job execution (default: SessionLocal)
+            concurrency: Jobs run at once (default: JOB_RUNNER_CONCURRENCY)
+        """
+        self._session_factory = session_factory or SessionLocal
+        self.concurrency = max(1, concurrency or settings.JOB_RUNNER_CONCURRENCY)
+        self.runner_id = f"{socket.gethostname()}:{os.getpid()}"
+        
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._stopping = threading.Event()
+        self._cancel_events: Dict[int, threading.Event] = {}
+        self._events: "OrderedDict[int, deque]" = OrderedDict()
+        self._seq = 0
+    
+    # ------------------------------------------------------------------
+    # Queueing
+    # ------------------------------------------------------------------
+    
+    def enqueue(
+        self,
+        db: Session,
+        triggered_by: str = "manual",
+        url_id: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        schedule_config_snapshot: Optional[dict] = None,
+        start: bool = True
+    ) -> MonitoringJob:
+        """
+        Persist a new job and hand it to the worker pool.
+        
+        Args:
+            db: Database session (committed)
+            triggered_by: scheduled, manual, api or cli
+            url_id: Only check this URL (default: all enabled URLs)
+            max_workers: Parallel URL workers (default: MAX_WORKERS)
+            schedule_config_snapshot: Schedule settings to record on the cycle
+            start: Submit to the pool; False leaves it for execute() (CLI)
+        
+        Returns:
+            The queued job
+        """
+        job = MonitoringJob(
+            status="queued",
+            triggered_by=triggered_by,
+            url_id=url_id,
+            max_workers=max_workers,
+            schedule_config_snapshot=schedule_config_snapshot,
+            created_at=datetime.utcnow()
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        
+        logger.info("Monitoring job queued", job_id=job.id, triggered_by=triggered_by, url_id=url_id)
+        self._publish(job.id, "status", job_to_dict(job))
+        if start:
+            self.submit(job.id)
+        return job
+    
+    def submit(self, job_id: int) -> None:
+        """Queue a persisted job on the worker pool."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.concurrency, thread_name_prefix="monitoring-job"
+                )
+            executor = self._executor
+        executor.submit(self._execute_logged, job_id)
+    
+    def _execute_logged(self, job_id: int) -> None:
+        try:
+            self.execute(job_id)
+        except Exception as e:
+            logger.error("Monitoring job crashed", job_id=job_id, error=str(e), exc_info=True)
+    
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+    
+    def execute(self, job_id: int, listener: Optional[JobListener] = None) -> Optional[dict]:
+        """
+        Run a queued job to completion on the calling thread.
+        
+        Args:
+            job_id: Job to run (must be queued; otherwise nothing happens)
+            listener: Also receives every published event (used by the CLI)
+        
+        Returns:
+            Final job dict, or None if the job wasn't queued
+        """
+        from cli import MonitoringOrchestrator  # Import here to avoid circular imports
+        
+        db = self._session_factory()
+        try:
+            job = db.get(MonitoringJob, job_id)
+            if job is None or job.status != "queued":
+                return None
+            
+            # Conditional update, so two processes never run the same job
+            now = datetime.utcnow()
+            claimed = db.query(MonitoringJob).filter(
+                MonitoringJob.id == job_id,
+                MonitoringJob.status == "queued"
+            ).update({
+                "status": "running",
+                "started_at": job.started_at or now,
+                "completed_at": None,
+                "cancel_requested": False,
+                "attempts": (job.attempts or 0) + 1,
+                "runner_id": self.runner_id
+            }, synchronize_session=False)
+            db.commit()
+            if not claimed:
+                return None
+            db.refresh(job)
+            
+            cancel_event = threading.Event()
+            with self._lock:
+                self._cancel_events[job_id] = cancel_event
+            
+            def emit(event: str, data: dict) -> None:
+                self._publish(job_id, event, data)
+                if listener:
+                    listener(event, data)
+            
+            cycle = db.get(MonitoringCycle, job.cycle_id) if job.cycle_id else None
+            done_url_ids = set()
+            base = dict.fromkeys(COUNT_FIELDS, 0)
+            if cycle is None:
+                cycle = MonitoringCycle(
+                    started_at=now,
+                    status="running",
+                    triggered_by=job.triggered_by,
+                    schedule_config_snapshot=job.schedule_config_snapshot
+                )
+                db.add(cycle)
+                db.flush()
+                job.cycle_id = cycle.id
+            else:
+                # Resuming: skip URLs the earlier run already checked, and count
+                # from their stored results (a crashed run's last counts may be stale)
+                cycle.status = "running"
+                cycle.completed_at = None
+                done_url_ids, base = self._cycle_progress(db, cycle.id)
+            db.commit()
+            
+            logger.info("Monitoring job started", job_id=job_id, cycle_id=cycle.id, attempt=job.attempts)
+            emit("status", job_to_dict(job))
+            
+            live = dict.fromkeys(COUNT_FIELDS, 0)
+            totals = {"total_urls": base["processed_urls"]}
+            last_persist = [time.monotonic()]
+            
+            def counts() -> dict:
+                return {**totals, **{field: base[field] + live[field] for field in COUNT_FIELDS}}
+            
+            def progress(kind: str, data: dict) -> None:
+                if kind == "start":
+                    totals["total_urls"] = base["processed_urls"] + data["total"]
+                    write_queue.update(MonitoringJob, job_id, counts())
+                    emit("progress", counts())
+                    return
+                
+                live["processed_urls"] += 1
+                live["successful" if data["success"] else "failed"] += 1
+                live["changes"] += 1 if data.get("change_detected") else 0
+                live["skipped"] += 1 if data.get("skip_reason") else 0
+                live["errors"] += 1 if data.get("error") else 0
+                emit("outcome", {
+                    **{field: data.get(field) for field in OUTCOME_FIELDS},
+                    **counts()
+                })
+                if time.monotonic() - last_persist[0] >= settings.JOB_PROGRESS_PERSIST_SECONDS:
+                    last_persist[0] = time.monotonic()
+                    write_queue.update(MonitoringJob, job_id, counts())
+            
+            should_cancel = self._cancel_check(job_id, cancel_event)
+            
+            try:
+                results = MonitoringOrchestrator().run_cycle(
+                    db,
+                    url_id=job.url_id,
+                    max_workers=job.max_workers,
+                    cycle_id=cycle.id,
+                    skip_url_ids=done_url_ids,
+                    progress=progress,
+                    should_cancel=should_cancel
+                )
+            except Exception as e:
+                db.rollback()
+                logger.error("Monitoring job failed", job_id=job_id, error=str(e), exc_info=True)
+                return self._finish(db, job_id, "failed", counts(), error=str(e), emit=emit)
+            
+            if results.get("cancelled"):
+                status = "interrupted" if self._stopping.is_set() else "cancelled"
+            else:
+                status = "completed"
+            final = {**totals, **{
+                "processed_urls": base["processed_urls"] + results["successful"] + results["failed"],
+                "successful": base["successful"] + results["successful"],
+                "failed": base["failed"] + results["failed"],
+                "changes": base["changes"] + results["changes"],
+                "skipped": base["skipped"] + results["skipped"],
+                "errors": base["errors"] + results["errors"],
+            }}
+            return self._finish(db, job_id, status, final, error_log=results.get("error_log"), emit=emit)
+        
+        finally:
+            with self._lock:
+                self._cancel_events.pop(job_id, None)
+            db.close()
+    
+    def _cycle_progress(self, db: Session, cycle_id: int) -> Tuple[set, dict]:
+        """URL IDs already checked in a cycle, and COUNT_FIELDS totals over their results."""
+        done_url_ids = set()
+        counts = dict.fromkeys(COUNT_FIELDS, 0)
+        for url_id, status, change_detected, skip_reason, error_message in db.query(
+            CycleURLResult.monitored_url_id,
+            CycleURLResult.status,
+            CycleURLResult.change_detected,
+            CycleURLResult.skip_reason,
+            CycleURLResult.error_message
+        ).filter(CycleURLResult.cycle_id == cycle_id).all():
+            done_url_ids.add(url_id)
+            counts["processed_urls"] += 1
+            counts["successful" if status == "success" else "failed"] += 1
+            counts["changes"] += 1 if change_detected else 0
+            counts["skipped"] += 1 if skip_reason else 0
+            counts["errors"] += 1 if error_message else 0
+        return done_url_ids, counts
+    
+    def _cancel_check(self, job_id: int, cancel_event: threading.Event) -> Callable[[], bool]:
+        """
+        Build the should_cancel callback for a running job.
+        
+        True once cancel() was called in this process, the runner is shutting
+        down, or (polled every JOB_CANCEL_POLL_SECONDS) another process set
+        cancel_requested on the job.
+        """
+        poll_lock = threading.Lock()
+        last_poll = [time.monotonic()]
+        
+        def should_cancel() -> bool:
+            if cancel_event.is_set() or self._stopping.is_set():
+                return True
+            with poll_lock:
+                if time.monotonic() - last_poll[0] < settings.JOB_CANCEL_POLL_SECONDS:
+                    return False
+                last_poll[0] = time.monotonic()
+                db = self._session_factory()
+                try:
+                    requested = db.query(MonitoringJob.cancel_requested).filter(
+                        MonitoringJob.id == job_id
+                    ).scalar()
+                finally:
+                    db.close()
+            if requested:
+                cancel_event.set()
+            return bool(requested)
+        
+        return should_cancel
+    
+    def _finish(
+        self,
+        db: Session,
+        job_id: int,
+        status: str,
+        counts: dict,
+        error: Optional[str] = None,
+        error_log: Optional[str] = None,
+        emit: Optional[JobListener] = None
+    ) -> dict:
+        """Record the job's final status and counts, and close out its cycle."""
+        write_queue.flush()  # Progress updates must not land after the final counts
+        
+        job = db.get(MonitoringJob, job_id)
+        now = datetime.utcnow()
+        job.status = status
+        job.completed_at = now
+        job.cancel_requested = False
+        job.error = error
+        for field, value in counts.items():
+            setattr(job, field, value)
+        
+        cycle = db.get(MonitoringCycle, job.cycle_id) if job.cycle_id else None
+        if cycle is not None:
+            cycle.completed_at = now
+            cycle.duration_seconds = (now - cycle.started_at).total_seconds()
+            cycle.status = {"completed": "completed", "failed": "failed"}.get(status, "partial")
+            cycle.total_urls_checked = job.processed_urls
+            cycle.successful_checks = job.successful
+            cycle.failed_checks = job.failed
+            cycle.changes_detected = job.changes
+            cycle.skipped_unchanged = job.skipped
+            cycle.error_count = job.errors
+            log = error_log or error
+            if log:
+                cycle.error_log = f"{cycle.error_log}{log}" if cycle.error_log else log
+        db.commit()
+        
+        logger.info(
+            "Monitoring job finished",
+            job_id=job_id,
+            status=status,
+            cycle_id=job.cycle_id,
+            processed=job.processed_urls,
+            changes=job.changes
+        )
+        snapshot = job_to_dict(job)
+        if emit:
+            emit("status", snapshot)
+        else:
+            self._publish(job_id, "status", snapshot)
+        return snapshot
+    
+    # ------------------------------------------------------------------
+    # Control
+    # ------------------------------------------------------------------
+    
+    def cancel(self, db: Session, job_id: int) -> Optional[MonitoringJob]:
+        """
+        Cancel a job: a queued job is cancelled at once, a running one stops
+        starting new URLs and finishes as cancelled.
+        
+        Returns:
+            The job, or None if it doesn't exist
+        
+        Raises:
+            JobStateError: If the job has already finished
+        """
+        job = db.get(MonitoringJob, job_id)
+        if job is None:
+            return None
+        
+        if job.status == "queued":
+            # Conditional so a worker that just claimed the job keeps it
+            cancelled = db.query(MonitoringJob).filter(
+                MonitoringJob.id == job_id,
+                MonitoringJob.status == "queued"
+            ).update(
+                {"status": "cancelled", "completed_at": datetime.utcnow()},
+                synchronize_session=False
+            )
+            db.commit()
+            db.refresh(job)
+            if not cancelled:
+                # Picked up in the meantime; cancel it as a running job
+                return self.cancel(db, job_id)
+        elif job.status == "running":
+            job.cancel_requested = True
+            with self._lock:
+                event = self._cancel_events.get(job_id)
+            if event:
+                event.set()
+        else:
+            raise JobStateError(f"Job {job_id} is already {job.status}")
+        
+        db.commit()
+        logger.info("Monitoring job cancel requested", job_id=job_id, status=job.status)
+        self._publish(job_id, "status", job_to_dict(job))
+        return job
+    
+    def resume(self, db: Session, job_id: int, start: bool = True) -> Optional[MonitoringJob]:
+        """
+        Re-queue a cancelled, failed or interrupted job. The resumed run only
+        checks URLs its cycle has no result for yet.
+        
+        Args:
+            db: Database session (committed)
+            job_id: Job to resume
+            start: Submit to the pool; False leaves it for execute() (CLI)
+        
+        Returns:
+            The job, or None if it doesn't exist
+        
+        Raises:
+            JobStateError: If the job isn't resumable
+        """
+        job = db.get(MonitoringJob, job_id)
+        if job is None:
+            return None
+        if job.status not in RESUMABLE_STATUSES:
+            raise JobStateError(f"Job {job_id} is {job.status}; only {', '.join(RESUMABLE_STATUSES)} jobs can be resumed")
+        
+        job.status = "queued"
+        job.cancel_requested = False
+        job.completed_at = None
+        job.error = None
+        db.commit()
+        
+        logger.info("Monitoring job resumed", job_id=job_id, cycle_id=job.cycle_id)
+        self._publish(job_id, "status", job_to_dict(job))
+        if start:
+            self.submit(job_id)
+        return job
+    
+    def recover(self, db: Session) -> dict:
+        """
+        Pick up jobs left behind by a previous process (application startup).
+        
+        Queued jobs are submitted again. Running jobs whose process is gone
+        are marked interrupted so they can be resumed.
+        
+        Returns:
+            Dict with requeued and interrupted counts
+        """
+        requeued = interrupted = 0
+        for job in db.query(MonitoringJob).filter(
+            MonitoringJob.status.in_(("queued", "running"))
+        ).order_by(MonitoringJob.created_at).all():
+            if job.status == "queued":
+                self.submit(job.id)
+                requeued += 1
+            elif job.runner_id != self.runner_id and not _runner_alive(job.runner_id):
+                job.status = "interrupted"
+                job.completed_at = datetime.utcnow()
+                if job.cycle:
+                    job.cycle.status = "partial"
+                interrupted += 1
+        db.commit()
+        
+        if requeued or interrupted:
+            logger.info("Recovered monitoring jobs", requeued=requeued, interrupted=interrupted)
+        return {"requeued": requeued, "interrupted": interrupted}
+    
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop the runner: running jobs stop starting new URLs and finish as
+        interrupted; jobs still queued stay queued for recover().
+        """
+        self._stopping.set()
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+        logger.info("Job runner shut down")
+    
+    # ------------------------------------------------------------------
+    # Lookup and events
+    # ------------------------------------------------------------------
+    
+    def list_jobs(self, db: Session, limit: int = 50, status: Optional[str] = None) -> List[MonitoringJob]:
+        """Most recent jobs first, optionally filtered by status."""
+        query = db.query(MonitoringJob)
+        if status:
+            query = query.filter(MonitoringJob.status == status)
+        return query.order_by(MonitoringJob.created_at.desc(), MonitoringJob.id.desc()).limit(limit).all()
+    
+    def snapshot(self, job_id: int) -> Optional[dict]:
+        """Current job dict from the database, on a short-lived session."""
+        db = self._session_factory()
+        try:
+            job = db.get(MonitoringJob, job_id)
+            return job_to_dict(job) if job else None
+        finally:
+            db.close()
+    
+    def is_active(self, job_id: int) -> bool:
+        """Whether this process is running the job right now."""
+        with self._lock:
+            return job_id in self._cancel_events
+    
+    def events_since(self, job_id: int, after: int = 0) -> List[Tuple[int, str, dict]]:
+        """
+        Buffered events for a job with a sequence number above after.
+        
+        Returns:
+            List of (seq, event, data), oldest first
+        """
+        with self._lock:
+            buffer = self._events.get(job_id)
+            if not buffer:
+                return []
+            return [entry for entry in buffer if entry[0] > after]
+    
+    def _publish(self, job_id: int, event: str, data: dict) -> None:
+        """Append an event to the job's buffer, evicting old finished jobs."""
+        with self._lock:
+            self._seq += 1
+            buffer = self._events.get(job_id)
+            if buffer is None:
+                buffer = self._events[job_id] = deque(maxlen=settings.JOB_EVENT_BUFFER)
+            self._events.move_to_end(job_id)
+            buffer.append((self._seq, event, data))
+            
+            while len(self._events) > MAX_TRACKED_JOBS:
+                oldest = next(iter(self._events))
+                if oldest in self._cancel_events:
+                    break
+                del self._events[oldest]
+
+
+# Global instance
+job_runner = JobRunner()
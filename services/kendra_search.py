@@ -6,7 +6,7 @@ Provides natural language search with filtering and result formatting.
 """
 
 from dataclasses import dataclass
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 import structlog
 
 from sqlalchemy.orm import Session
@@ -31,6 +31,7 @@ class FormSearchResult:
     relevance_score: float
     state: Optional[str]
     domain_category: Optional[str]
+    highlights: Optional[List[List[int]]] = None  # [start, end) of matched terms in excerpt
 
 
 @dataclass
@@ -40,6 +41,7 @@ class SearchServiceResponse:
     results: List[FormSearchResult] = None
     total_results: int = 0
     error: Optional[str] = None
+    facets: Optional[Dict[str, Dict[str, int]]] = None  # Facet -> value -> matching forms
 
 
 class KendraSearchService:
@@ -64,6 +66,72 @@ class KendraSearchService:
             self.client.is_available()
         )
     
+    def _document_url_id(self, result: SearchResult) -> Optional[int]:
+        """URL ID encoded in a url_<id>_version_<id> document ID, if any."""
+        if not result.document_id:
+            return None
+        parts = result.document_id.split('_')
+        if len(parts) >= 4 and parts[0] == 'url' and parts[2] == 'version':
+            try:
+                return int(parts[1])
+            except ValueError:
+                return None
+        return None
+    
+    def _load_hit_records(
+        self,
+        db: Session,
+        results: List[SearchResult]
+    ) -> Tuple[Dict[int, MonitoredURL], Dict[str, MonitoredURL], Dict[int, PDFVersion]]:
+        """
+        Load the URLs and versions for a batch of hits in three queries.
+        
+        Args:
+            db: Database session
+            results: Kendra search results
+            
+        Returns:
+            Tuple of (urls by id, urls by source URI, versions by id)
+        """
+        url_ids = set()
+        for result in results:
+            if result.url_id:
+                url_ids.add(result.url_id)
+            document_url_id = self._document_url_id(result)
+            if document_url_id:
+                url_ids.add(document_url_id)
+        
+        urls_by_id = {}
+        if url_ids:
+            urls_by_id = {
+                url.id: url for url in
+                db.query(MonitoredURL).filter(MonitoredURL.id.in_(url_ids)).all()
+            }
+        
+        # Source URIs are only needed for hits whose IDs didn't resolve
+        source_uris = {
+            result.source_uri for result in results
+            if result.source_uri
+            and result.url_id not in urls_by_id
+            and self._document_url_id(result) not in urls_by_id
+        }
+        urls_by_uri = {}
+        if source_uris:
+            urls_by_uri = {
+                url.url: url for url in
+                db.query(MonitoredURL).filter(MonitoredURL.url.in_(source_uris)).all()
+            }
+        
+        version_ids = {result.version_id for result in results if result.version_id}
+        versions_by_id = {}
+        if version_ids:
+            versions_by_id = {
+                version.id: version for version in
+                db.query(PDFVersion).filter(PDFVersion.id.in_(version_ids)).all()
+            }
+        
+        return urls_by_id, urls_by_uri, versions_by_id
+    
     def search(
         self,
         db: Session,
@@ -122,47 +190,35 @@ class KendraSearchService:
         skipped_count = 0
         skipped_reasons = {}
         
+        urls_by_id, urls_by_uri, versions_by_id = self._load_hit_records(
+            db, kendra_response.results
+        )
+        
         for result in kendra_response.results:
-            # Get URL and version from database
-            url = None
-            version = None
-            
-            # Try to get URL by ID
-            if result.url_id:
-                url = db.query(MonitoredURL).filter(
-                    MonitoredURL.id == result.url_id
-                ).first()
+            # Get URL by ID
+            url = urls_by_id.get(result.url_id) if result.url_id else None
             
-            # If URL lookup failed, try to extract from document_id as fallback
-            if not url and result.document_id:
-                parts = result.document_id.split('_')
-                if len(parts) >= 4 and parts[0] == 'url' and parts[2] == 'version':
-                    try:
-                        extracted_url_id = int(parts[1])
-                        url = db.query(MonitoredURL).filter(
-                            MonitoredURL.id == extracted_url_id
-                        ).first()
-                        # Update result.url_id if we found it
-                        if url and not result.url_id:
-                            result.url_id = extracted_url_id
-                    except (ValueError, IndexError):
-                        pass
+            # If URL lookup failed, try the ID encoded in document_id as fallback
+            if not url:
+                extracted_url_id = self._document_url_id(result)
+                url = urls_by_id.get(extracted_url_id)
+                # Update result.url_id if we found it
+                if url and not result.url_id:
+                    result.url_id = extracted_url_id
             
-            # Final fallback: try to look up by actual URL from source_uri
+            # Final fallback: look up by actual URL from source_uri
             if not url and result.source_uri:
-                url = db.query(MonitoredURL).filter(
-                    MonitoredURL.url == result.source_uri
-                ).first()
+                url = urls_by_uri.get(result.source_uri)
                 # Update result.url_id if we found it
                 if url and not result.url_id:
                     result.url_id = url.id
             
-            # Get version if we have URL
+            # Get version if it belongs to the URL
+            version = None
             if url and result.version_id:
-                version = db.query(PDFVersion).filter(
-                    PDFVersion.id == result.version_id,
-                    PDFVersion.monitored_url_id == url.id
-                ).first()
+                version = versions_by_id.get(result.version_id)
+                if version and version.monitored_url_id != url.id:
+                    version = None
             
             # Skip if URL not found
             if not url:
@@ -292,27 +348,28 @@ class KendraSearchService:
         
         # Enrich results with database information
         formatted_results = []
+        urls_by_id, _, versions_by_id = self._load_hit_records(
+            db, [result for result in kendra_response.results if result.url_id != url_id]
+        )
+        
         for result in kendra_response.results:
             # Skip the original form
             if result.url_id == url_id:
                 continue
             
-            # Get URL from database
-            url = db.query(MonitoredURL).filter(
-                MonitoredURL.id == result.url_id
-            ).first()
+            # Get URL from the batch
+            url = urls_by_id.get(result.url_id)
             
             # Skip if URL is disabled or not found
             if not url or not url.enabled:
                 continue
             
-            # Get version
+            # Get version if it belongs to the URL
             version_result = None
             if result.version_id:
-                version_result = db.query(PDFVersion).filter(
-                    PDFVersion.id == result.version_id,
-                    PDFVersion.monitored_url_id == url.id
-                ).first()
+                version_result = versions_by_id.get(result.version_id)
+                if version_result and version_result.monitored_url_id != url.id:
+                    version_result = None
             
             # Use metadata from Kendra or database
             form_number = result.metadata.get('form_number') if result.metadata else None
@@ -0,0 +1,185 @@
+"""
+Landing Page Cache
+
+A monitored URL that doesn't end in .pdf is a web page linking to the form.
+Resolving it means a scrape (a Lambda invocation, or a full HTML fetch) before
+any tier check can run, on every check. The link found is cached per page
+with the page's ETag, Last-Modified and a hash of its HTML:
+
+1. The page is re-checked with a conditional GET; a 304, or a 200 whose HTML
+   hashes the same as when the link was scraped, serves the cached link
+2. A new or changed page is scraped again. Without Lambda the HTML from step 1
+   is parsed directly, so a changed page still costs one fetch
+
+Unchanged pages are scraped again after LANDING_PAGE_RESCRAPE_DAYS anyway,
+and a cached link whose PDF can't be downloaded is dropped by invalidate().
+"""
+
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+import structlog
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from config import settings
+from db.models import LandingPage
+from db.write_queue import write_queue
+from fetcher.aws_web_scraper import AWSWebScraper, ScrapeResult
+from services.link_crawler import LinkCrawler
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class LandingPageResolution:
+    """PDF link of a landing page."""
+    success: bool
+    url: str
+    pdf_url: Optional[str] = None
+    cached: bool = False  # Served from the cache, without a scrape
+    error: Optional[str] = None
+
+
+def content_hash(html: str) -> str:
+    """SHA-256 of a page's HTML."""
+    return hashlib.sha256(html.encode("utf-8", errors="replace")).hexdigest()
+
+
+class LandingPageCache:
+    """
+    Resolves landing pages to their PDF link, scraping only pages that changed.
+    """
+    
+    def __init__(self, crawler: Optional[LinkCrawler] = None):
+        """
+        Initialize the cache.
+        
+        Args:
+            crawler: Makes the conditional page fetches (default: LinkCrawler())
+        """
+        self._crawler = crawler
+    
+    @property
+    def crawler(self) -> LinkCrawler:
+        if self._crawler is None:
+            self._crawler = LinkCrawler()
+        return self._crawler
+    
+    def _is_stale(self, page: LandingPage, now: datetime) -> bool:
+        """Whether an unchanged page is due for a scrape anyway."""
+        days = settings.LANDING_PAGE_RESCRAPE_DAYS
+        return bool(days) and (
+            page.last_scraped_at is None or page.last_scraped_at < now - timedelta(days=days)
+        )
+    
+    def resolve(self, db: Session, url: str, scraper: AWSWebScraper) -> LandingPageResolution:
+        """
+        Find the PDF link of a landing page.
+        
+        Cache hits only queue a last_checked_at update; a scrape commits.
+        
+        Args:
+            db: Database session
+            url: Landing page URL
+            scraper: Scrapes the page when it is new or changed
+        
+        Returns:
+            LandingPageResolution (success with pdf_url None: no PDF link on the page)
+        """
+        if not settings.LANDING_PAGE_CACHE_ENABLED:
+            return self._resolution(scraper.scrape_url(url))
+        
+        now = datetime.utcnow()
+        page = db.query(LandingPage).filter(LandingPage.url == url).first()
+        cached = page is not None and page.resolved_pdf_url is not None and not self._is_stale(page, now)
+        
+        # Validators only for a cached link: otherwise the page is scraped either way
+        fetch = self.crawler.fetch_page_conditional(
+            url,
+            page.etag if cached else None,
+            page.last_modified_header if cached else None
+        )
+        html_hash = content_hash(fetch.html) if fetch.html is not None else None
+        
+        if cached and (fetch.not_modified or (fetch.html is not None and html_hash == page.content_hash)):
+            logger.info(
+                "Landing page unchanged - using cached PDF link",
+                url=url,
+                pdf_url=page.resolved_pdf_url,
+                status_code=fetch.status_code
+            )
+            write_queue.update(LandingPage, page.id, {
+                "etag": fetch.etag,
+                "last_modified_header": fetch.last_modified,
+                "last_checked_at": now
+            })
+            return LandingPageResolution(success=True, url=url, pdf_url=page.resolved_pdf_url, cached=True)
+        
+        # New, changed or stale page (or the check failed): scrape it
+        if fetch.html is not None and scraper.lambda_client is None:
+            scrape_result = scraper.scrape_html(url, fetch.html, final_url=fetch.final_url)
+        else:
+            scrape_result = scraper.scrape_url(url)
+        
+        if scrape_result.success:
+            self._store(db, page, url, scrape_result.pdf_url, fetch if fetch.html is not None else None,
+                        html_hash, now)
+        return self._resolution(scrape_result)
+    
+    def _store(
+        self,
+        db: Session,
+        page: Optional[LandingPage],
+        url: str,
+        pdf_url: Optional[str],
+        fetch,
+        html_hash: Optional[str],
+        now: datetime
+    ) -> None:
+        """Record a scrape's link with the validators of the fetch it matches (commits)."""
+        if page is None:
+            page = LandingPage(url=url)
+            db.add(page)
+        page.resolved_pdf_url = pdf_url
+        # No validators without a fetch: the next check scrapes again
+        page.etag = fetch.etag if fetch else None
+        page.last_modified_header = fetch.last_modified if fetch else None
+        page.content_hash = html_hash
+        page.last_checked_at = now
+        page.last_scraped_at = now
+        try:
+            db.commit()
+        except IntegrityError:
+            # Another worker cached the same page meanwhile
+            db.rollback()
+    
+    def _resolution(self, scrape_result: ScrapeResult) -> LandingPageResolution:
+        return LandingPageResolution(
+            success=scrape_result.success,
+            url=scrape_result.url,
+            pdf_url=scrape_result.pdf_url,
+            error=scrape_result.error
+        )
+    
+    def invalidate(self, url: str) -> None:
+        """
+        Drop a page's cached link and validators (queued), so its next check
+        scrapes it again.
+        
+        Called when the cached link's PDF can't be downloaded.
+        """
+        write_queue.submit(
+            lambda session: session.query(LandingPage).filter(LandingPage.url == url).update({
+                "resolved_pdf_url": None,
+                "etag": None,
+                "last_modified_header": None,
+                "content_hash": None
+            }, synchronize_session=False)
+        )
+
+
+# Global instance
+landing_page_cache = LandingPageCache()
@@ -41,6 +41,21 @@ class PDFLinkInfo:
     found_on_page: str = ""  # URL where this link was found
 
 
+@dataclass
+class PageFetch:
+    """Result of a conditional page fetch."""
+    status_code: Optional[int]  # None when the request failed
+    html: Optional[str] = None  # Only for 200 responses
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    error: Optional[str] = None
+    final_url: Optional[str] = None  # After redirects
+    
+    @property
+    def not_modified(self) -> bool:
+        return self.status_code == 304
+
+
 @dataclass
 class PageInfo:
     """Information about a crawled page."""
@@ -329,6 +344,22 @@ class LinkCrawler:
         
         return pdf_links, navigation_links
     
+    def extract_pdf_links(self, html: str, page_url: str) -> List[PDFLinkInfo]:
+        """
+        Extract the PDF links on a page, with link text, filename and form number.
+        
+        Args:
+            html: HTML content
+            page_url: URL of the page (for resolving relative links)
+            
+        Returns:
+            PDF links in page order, one per URL
+        """
+        parsed = urlparse(page_url)
+        base_path = parsed.path.rsplit('/', 1)[0] + '/'
+        pdf_links, _ = self._extract_links_from_html(html, page_url, parsed.netloc, base_path)
+        return pdf_links
+    
     def _fetch_page(self, url: str) -> Optional[str]:
         """
         Fetch a page's HTML content.
@@ -361,6 +392,56 @@ class LinkCrawler:
             logger.warning("Error fetching page", url=url, error=str(e))
             return None
     
+    def fetch_page_conditional(
+        self,
+        url: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ) -> PageFetch:
+        """
+        Fetch a page only if it changed since the validators were recorded.
+        
+        Sends If-None-Match / If-Modified-Since; an unchanged page answers
+        304 with no body.
+        
+        Args:
+            url: URL to fetch
+            etag: ETag from the previous fetch
+            last_modified: Last-Modified from the previous fetch
+            
+        Returns:
+            PageFetch with the status, HTML (200 only) and new validators
+        """
+        headers = dict(self.headers)
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        
+        try:
+            with httpx.Client(timeout=self.timeout, follow_redirects=True, headers=headers) as client:
+                response = client.get(url)
+        except Exception as e:
+            if "Transfer-Encoding" in str(e) or "header" in str(e).lower():
+                # Same lenient fallback as _fetch_page (unconditional)
+                html = self._fetch_page_urllib(url)
+                if html is not None:
+                    return PageFetch(status_code=200, html=html)
+            logger.warning("Error fetching page", url=url, error=str(e))
+            return PageFetch(status_code=None, error=str(e))
+        
+        fetch = PageFetch(
+            status_code=response.status_code,
+            etag=response.headers.get("etag") or etag,
+            last_modified=response.headers.get("last-modified") or last_modified,
+            final_url=str(response.url)
+        )
+        if response.status_code == 200:
+            fetch.html = response.text
+        elif response.status_code != 304:
+            fetch.error = f"HTTP {response.status_code}"
+        return fetch
+    
     def _fetch_page_urllib(self, url: str) -> Optional[str]:
         """
         Fallback fetch using urllib for servers with non-standard headers.
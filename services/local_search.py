@@ -0,0 +1,434 @@
+"""
+Local Search Service
+
+Full-text search over the monitored forms without Kendra: an SQLite FTS5
+table (form_search) holds the latest version of every monitored URL (form
+number, title, URL name and extracted text), kept current from
+VersionManager.create_version. Queries are ranked with BM25, excerpts come
+from FTS5 snippets with the matched terms marked, and state / domain facet
+counts come with every response.
+
+Results have the same shape as KendraSearchService's (SearchServiceResponse
+of FormSearchResult), so the search page and /api/search can use either.
+Everything is answered by one indexed query plus one facet query, without
+network calls or per-hit lookups.
+"""
+
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+import structlog
+from sqlalchemy import func, text as sql_text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from config import settings
+from db.models import MonitoredURL, PDFVersion
+from services.kendra_search import FormSearchResult, SearchServiceResponse
+
+logger = structlog.get_logger()
+
+
+TABLE_NAME = "form_search"
+
+# Porter stemming over unicode61 tokens: "custody" also finds "custodial",
+# "FL-300" is the phrase "fl 300"
+CREATE_TABLE_SQL = f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE_NAME} USING fts5(
+        form_number, title, name, body, version_id UNINDEXED,
+        tokenize = 'porter unicode61 remove_diacritics 2'
+    )
+"""
+
+# BM25 weights of form_number, title, name and body: a form number or title
+# hit outranks the same words somewhere in the text
+COLUMN_WEIGHTS = (10.0, 5.0, 3.0, 1.0)
+BODY_COLUMN = 3
+
+# Markers around matched terms in snippets (control characters never in form text)
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_END = "\x03"
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Words left out of queries (unless the query has nothing else): with OR'ed
+# terms they would match nearly every form
+STOP_WORDS = frozenset("""
+    a an and are as at be by for from has have how i in is it of on or that the
+    this to was what when where which who with form forms
+""".split())
+
+# Versions indexed per commit during a rebuild
+REBUILD_BATCH_SIZE = 200
+
+
+def match_expression(query: str) -> Optional[str]:
+    """
+    FTS5 MATCH expression for a user query, or None if it has no words.
+    
+    Each whitespace-separated chunk becomes a quoted phrase of its words, so
+    FTS5 syntax in user input (quotes, NEAR, column filters, -, *) is never
+    interpreted; phrases are OR'ed and BM25 ranks forms matching more of them
+    first.
+    """
+    phrases = []
+    for chunk in (query or "").split():
+        words = TOKEN_PATTERN.findall(chunk.lower())
+        if words:
+            phrase = '"' + " ".join(words) + '"'
+            if phrase not in phrases:
+                phrases.append(phrase)
+    if not phrases:
+        return None
+    
+    significant = [p for p in phrases if p.strip('"') not in STOP_WORDS]
+    return " OR ".join(significant or phrases)
+
+
+def split_highlights(snippet: str) -> Tuple[str, List[List[int]]]:
+    """
+    Plain excerpt and [start, end) offsets of the marked terms in a snippet.
+    """
+    excerpt = []
+    highlights = []
+    length = 0
+    start = None
+    for part in re.split(f"([{HIGHLIGHT_START}{HIGHLIGHT_END}])", snippet or ""):
+        if part == HIGHLIGHT_START:
+            start = length
+        elif part == HIGHLIGHT_END:
+            if start is not None and length > start:
+                highlights.append([start, length])
+            start = None
+        else:
+            excerpt.append(part)
+            length += len(part)
+    return "".join(excerpt), highlights
+
+
+class LocalSearchService:
+    """
+    BM25 full-text search of the latest version of every monitored URL.
+    """
+    
+    def __init__(self, snippet_tokens: Optional[int] = None):
+        """
+        Initialize search service.
+        
+        Args:
+            snippet_tokens: Words per excerpt (default: LOCAL_SEARCH_SNIPPET_TOKENS)
+        """
+        self.snippet_tokens = snippet_tokens or settings.LOCAL_SEARCH_SNIPPET_TOKENS
+        # Database URL -> whether it has the search table (False: not SQLite or no FTS5)
+        self._tables: Dict[str, bool] = {}
+    
+    def _file_store(self):
+        # Imported here: storage.version_manager imports this module
+        from storage.file_store import FileStore
+        return FileStore()
+    
+    def ensure_table(self, db: Session) -> bool:
+        """
+        Create the search table if needed.
+        
+        Returns:
+            False if the database cannot hold it (not SQLite, or no FTS5)
+        """
+        bind = db.get_bind()
+        key = str(bind.url)
+        if key in self._tables:
+            return self._tables[key]
+        if bind.dialect.name != "sqlite":
+            self._tables[key] = False
+            return False
+        
+        exists = db.execute(
+            sql_text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": TABLE_NAME}
+        ).first() is not None
+        if exists:
+            self._tables[key] = True
+            return True
+        try:
+            # Through the session (a second connection would wait on its write
+            # lock); not remembered until committed, in case it is rolled back
+            db.execute(sql_text(CREATE_TABLE_SQL))
+        except OperationalError as e:
+            logger.warning("Local search unavailable", error=str(e))
+            self._tables[key] = False
+            return False
+        return True
+    
+    def is_enabled(self, db: Session) -> bool:
+        """Check if local search is enabled and the database supports it."""
+        return settings.LOCAL_SEARCH_ENABLED and self.ensure_table(db)
+    
+    def index_version(self, db: Session, version: PDFVersion, text: str) -> bool:
+        """
+        Index a version's text as its URL's latest (call before committing it).
+        
+        A version older than the one already indexed is ignored.
+        
+        Returns:
+            True if the version was indexed
+        """
+        if not self.ensure_table(db):
+            return False
+        
+        url_id = version.monitored_url_id
+        indexed = db.execute(
+            sql_text(f"SELECT version_id FROM {TABLE_NAME} WHERE rowid = :url_id"),
+            {"url_id": url_id}
+        ).scalar()
+        if indexed is not None and int(indexed) > version.id:
+            return False
+        
+        monitored_url = version.monitored_url or db.get(MonitoredURL, url_id)
+        db.execute(sql_text(f"DELETE FROM {TABLE_NAME} WHERE rowid = :url_id"), {"url_id": url_id})
+        db.execute(
+            sql_text(f"""
+                INSERT INTO {TABLE_NAME} (rowid, form_number, title, name, body, version_id)
+                VALUES (:url_id, :form_number, :title, :name, :body, :version_id)
+            """),
+            {
+                "url_id": url_id,
+                "form_number": version.form_number or "",
+                "title": version.formatted_title or "",
+                "name": monitored_url.name if monitored_url else "",
+                "body": text or "",
+                "version_id": version.id,
+            }
+        )
+        return True
+    
+    def update_title(self, db: Session, version: PDFVersion) -> None:
+        """Re-index a version's form number and title after title extraction."""
+        if not self.ensure_table(db):
+            return
+        db.execute(
+            sql_text(f"""
+                UPDATE {TABLE_NAME} SET form_number = :form_number, title = :title
+                WHERE rowid = :url_id AND version_id = :version_id
+            """),
+            {
+                "form_number": version.form_number or "",
+                "title": version.formatted_title or "",
+                "url_id": version.monitored_url_id,
+                "version_id": version.id,
+            }
+        )
+    
+    def _filters(self, state: Optional[str], domain: Optional[str]) -> Tuple[str, dict]:
+        clauses = []
+        params = {}
+        if state:
+            clauses.append("AND m.state = :state")
+            params["state"] = state
+        if domain:
+            clauses.append("AND m.domain_category = :domain")
+            params["domain"] = domain
+        return " ".join(clauses), params
+    
+    def _facets(
+        self,
+        db: Session,
+        expression: str,
+        state: Optional[str],
+        domain: Optional[str]
+    ) -> Tuple[int, Dict[str, Dict[str, int]]]:
+        """
+        Total matches and facet counts for a query.
+        
+        Each facet is counted with the other facet's filter only, so its
+        counts show what selecting another value would return.
+        """
+        rows = db.execute(
+            sql_text(f"""
+                SELECT m.state, m.domain_category, COUNT(*)
+                FROM {TABLE_NAME} CROSS JOIN monitored_urls m ON m.id = {TABLE_NAME}.rowid
+                WHERE {TABLE_NAME} MATCH :expression AND m.enabled = 1
+                GROUP BY m.state, m.domain_category
+            """),
+            {"expression": expression}
+        ).all()
+        
+        total = 0
+        states: Dict[str, int] = {}
+        domains: Dict[str, int] = {}
+        for row_state, row_domain, count in rows:
+            state_matches = not state or row_state == state
+            domain_matches = not domain or row_domain == domain
+            if state_matches and domain_matches:
+                total += count
+            if domain_matches and row_state:
+                states[row_state] = states.get(row_state, 0) + count
+            if state_matches and row_domain:
+                domains[row_domain] = domains.get(row_domain, 0) + count
+        
+        def by_count(counts: Dict[str, int]) -> Dict[str, int]:
+            return dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+        
+        return total, {"state": by_count(states), "domain_category": by_count(domains)}
+    
+    def search(
+        self,
+        db: Session,
+        query: str,
+        state: Optional[str] = None,
+        domain: Optional[str] = None,
+        max_results: int = 20
+    ) -> SearchServiceResponse:
+        """
+        Full-text search across all forms.
+        
+        Args:
+            db: Database session
+            query: Search query (words; form numbers like FL-300 match as phrases)
+            state: Optional state filter
+            domain: Optional domain category filter
+            max_results: Maximum number of results
+        
+        Returns:
+            SearchServiceResponse with formatted results and facet counts;
+            relevance scores are relative to the best match (1.0)
+        """
+        if not self.is_enabled(db):
+            return SearchServiceResponse(
+                success=False,
+                error="Local search is not enabled or not available"
+            )
+        
+        expression = match_expression(query)
+        if expression is None:
+            return SearchServiceResponse(
+                success=False,
+                error="Search query cannot be empty"
+            )
+        
+        filters, params = self._filters(state, domain)
+        weights = ", ".join(str(weight) for weight in COLUMN_WEIGHTS)
+        # Rank first, then build snippets (which read the whole text) for the top
+        # rows only. CROSS JOIN keeps the full-text match as the outer loop: SQLite
+        # would otherwise scan monitored_urls and run the match once per URL.
+        rows = db.execute(
+            sql_text(f"""
+                WITH top AS (
+                    SELECT {TABLE_NAME}.rowid AS url_id, bm25({TABLE_NAME}, {weights}) AS rank
+                    FROM {TABLE_NAME}
+                    CROSS JOIN monitored_urls m ON m.id = {TABLE_NAME}.rowid
+                    WHERE {TABLE_NAME} MATCH :expression AND m.enabled = 1 {filters}
+                    ORDER BY rank
+                    LIMIT :limit
+                )
+                SELECT
+                    top.url_id, {TABLE_NAME}.version_id, top.rank,
+                    snippet({TABLE_NAME}, {BODY_COLUMN}, :start, :end, '...', :tokens),
+                    m.name, m.url, m.state, m.domain_category,
+                    v.monitored_url_id, v.form_number, v.formatted_title
+                FROM top
+                JOIN {TABLE_NAME} ON {TABLE_NAME}.rowid = top.url_id
+                JOIN monitored_urls m ON m.id = top.url_id
+                LEFT JOIN pdf_versions v ON v.id = {TABLE_NAME}.version_id
+                WHERE {TABLE_NAME} MATCH :expression
+                ORDER BY top.rank
+            """),
+            {
+                "expression": expression,
+                "start": HIGHLIGHT_START,
+                "end": HIGHLIGHT_END,
+                "tokens": self.snippet_tokens,
+                "limit": max_results,
+                **params,
+            }
+        ).all()
+        total_results, facets = self._facets(db, expression, state, domain)
+        
+        best = rows[0].rank if rows else None
+        results = []
+        for (url_id, version_id, rank, snippet, name, url, url_state, url_domain,
+             version_url_id, form_number, formatted_title) in rows:
+            if version_url_id != url_id:
+                # Version deleted since it was indexed
+                form_number = formatted_title = None
+            title = formatted_title
+            if formatted_title and form_number:
+                title = f"{formatted_title} {{{form_number}}}"
+            excerpt, highlights = split_highlights(snippet)
+            
+            results.append(FormSearchResult(
+                url_id=url_id,
+                version_id=int(version_id),
+                url_name=name,
+                url=url,
+                form_number=form_number,
+                title=title or name,
+                excerpt=excerpt.strip() or None,
+                relevance_score=float(rank / best) if best else 0.0,
+                state=url_state,
+                domain_category=url_domain,
+                highlights=highlights
+            ))
+        
+        logger.info(
+            "Local search completed",
+            query=query,
+            results=len(results),
+            total_results=total_results
+        )
+        
+        return SearchServiceResponse(
+            success=True,
+            results=results,
+            total_results=total_results,
+            facets=facets
+        )
+    
+    def indexed_url_ids(self, db: Session) -> Set[int]:
+        """IDs of the URLs in the search table."""
+        if not self.ensure_table(db):
+            return set()
+        return {row[0] for row in db.execute(sql_text(f"SELECT rowid FROM {TABLE_NAME}"))}
+    
+    def rebuild(self, db: Session) -> Dict[str, int]:
+        """
+        Index the latest version of every monitored URL from its stored text.
+        
+        Needed once for versions created before the search table existed;
+        also drops URLs that were deleted.
+        
+        Returns:
+            Stats: indexed, skipped (no stored text)
+        """
+        stats = {"indexed": 0, "skipped": 0}
+        if not self.ensure_table(db):
+            return stats
+        
+        db.execute(sql_text(f"DELETE FROM {TABLE_NAME}"))
+        latest_ids = [
+            version_id for (version_id,) in db.query(func.max(PDFVersion.id)).group_by(
+                PDFVersion.monitored_url_id
+            ).order_by(func.max(PDFVersion.id))
+        ]
+        
+        file_store = self._file_store()
+        for start in range(0, len(latest_ids), REBUILD_BATCH_SIZE):
+            versions = db.query(PDFVersion).filter(
+                PDFVersion.id.in_(latest_ids[start:start + REBUILD_BATCH_SIZE])
+            ).order_by(PDFVersion.id).all()
+            for version in versions:
+                text = file_store.get_extracted_text(version.monitored_url_id, version.id)
+                if text is None:
+                    stats["skipped"] += 1
+                    continue
+                self.index_version(db, version, text)
+                stats["indexed"] += 1
+            db.commit()
+        db.execute(sql_text(f"INSERT INTO {TABLE_NAME} ({TABLE_NAME}) VALUES ('optimize')"))
+        db.commit()
+        
+        logger.info("Local search index rebuilt", **stats)
+        return stats
+
+
+# Global instance
+local_search_service = LocalSearchService()
@@ -13,13 +13,14 @@ Key Metrics Tracked:
 """
 
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from datetime import date, datetime, timedelta
+from typing import Optional, List, Dict, Any, Iterable
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
+from sqlalchemy import func, and_, or_, case
 import structlog
 
-from db.models import MonitoredURL, PDFVersion, ChangeLog
+from db.models import MonitoredURL, ChangeLog, MetricsDailyRollup
+from services.url_state import url_state_tracker
 
 logger = structlog.get_logger()
 
@@ -184,74 +185,227 @@ class DashboardMetrics:
         }
 
 
+# Change types counted as updates (vs. new forms)
+UPDATE_CHANGE_TYPES = ["text_changed", "format_only", "relocated"]
+
+# Overlap when picking dirty days, so changes committed while a refresh
+# was running are picked up by the next one
+ROLLUP_REFRESH_OVERLAP = timedelta(minutes=5)
+
+
+def _month_range(year: int, month: int) -> tuple[date, date]:
+    """First day of the month and first day of the next month."""
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start, end
+
+
+def _as_date(value: Any) -> date:
+    """Normalize func.date() results (str on SQLite, date elsewhere)."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
 class MetricsTracker:
     """
     Tracks and reports workflow metrics.
     
     Replaces manual spreadsheet tracking (Forms Monitoring Spreadsheet)
     with automated, real-time metrics calculation.
+    
+    Period metrics read the metrics_daily_rollups table; refresh_rollups()
+    recomputes only the days touched since the previous refresh and runs
+    at the end of each monitoring cycle and before each report.
     """
     
     def __init__(self):
         logger.info("MetricsTracker initialized")
     
-    def get_monthly_stats(self, db: Session, year: int, month: int) -> MonthlyStats:
+    # ------------------------------------------------------------------
+    # Rollup maintenance
+    # ------------------------------------------------------------------
+    
+    def _rollup_columns(self) -> list:
+        """Aggregate expressions over ChangeLog, in MetricsDailyRollup column order."""
+        not_auto_system = ChangeLog.reviewed_by != "auto_approve_system"
+        
+        def count_if(*conditions):
+            return func.coalesce(func.sum(case((and_(*conditions), 1), else_=0)), 0)
+        
+        return [
+            func.count(ChangeLog.id),
+            count_if(ChangeLog.change_type.in_(UPDATE_CHANGE_TYPES)),
+            count_if(ChangeLog.change_type == "new"),
+            count_if(ChangeLog.reviewed == True),
+            count_if(ChangeLog.review_status == "pending"),
+            count_if(ChangeLog.review_status == "auto_approved"),
+            count_if(
+                ChangeLog.review_status == "auto_approved",
+                ChangeLog.recommended_action.in_(["auto_approve", "false_positive"])
+            ),
+            count_if(ChangeLog.review_status == "approved", not_auto_system),
+            count_if(ChangeLog.review_status.in_(["approved", "rejected"]), not_auto_system),
+            count_if(ChangeLog.review_status == "rejected"),
+        ]
+    
+    _ROLLUP_FIELDS = [
+        "total_changes", "updates_detected", "new_forms_added", "reviewed", "pending",
+        "auto_approved", "auto_approved_recommended", "manual_approved",
+        "manual_reviewed", "rejected",
+    ]
+    
+    def refresh_rollup_days(self, db: Session, days: Iterable[date]) -> int:
         """
-        Get statistics for a specific month.
+        Recompute rollup rows for specific days from change_logs and commit.
+        
+        Days with no remaining changes lose their row.
+        
+        Returns:
+            Number of days recomputed
+        """
+        days = sorted(set(days))
+        if not days:
+            return 0
+        
+        day_expr = func.date(ChangeLog.detected_at)
+        rows = db.query(day_expr, *self._rollup_columns()).filter(
+            ChangeLog.detected_at >= datetime.combine(days[0], datetime.min.time()),
+            ChangeLog.detected_at < datetime.combine(days[-1] + timedelta(days=1), datetime.min.time())
+        ).group_by(day_expr).all()
+        
+        wanted = set(days)
+        now = datetime.utcnow()
+        values = {}
+        for row in rows:
+            day = _as_date(row[0])
+            if day in wanted:
+                values[day] = dict(zip(self._ROLLUP_FIELDS, (int(v) for v in row[1:])))
+        
+        db.query(MetricsDailyRollup).filter(
+            MetricsDailyRollup.day.in_(days)
+        ).delete(synchronize_session=False)
+        if values:
+            db.bulk_insert_mappings(MetricsDailyRollup, [
+                {"day": day, "refreshed_at": now, **counts}
+                for day, counts in values.items()
+            ])
+        db.commit()
+        return len(days)
+    
+    def change_days(self, db: Session, url_ids: Optional[Iterable[int]] = None) -> set:
+        """
+        Days with changes of the given URLs (every URL when None).
+        
+        refresh_rollups() only finds days from changes that still exist: call
+        this before deleting changes and pass the result to
+        refresh_rollup_days() after the delete is committed.
+        """
+        day_expr = func.date(ChangeLog.detected_at)
+        query = db.query(day_expr).distinct()
+        if url_ids is not None:
+            query = query.filter(ChangeLog.monitored_url_id.in_(list(url_ids)))
+        return {_as_date(day) for (day,) in query.all() if day is not None}
+    
+    def refresh_rollups(self, db: Session, full: bool = False) -> int:
+        """
+        Bring the daily rollups up to date and commit.
+        
+        Incremental by default: only days with changes detected or reviewed
+        since the last refresh are recomputed, so this is cheap enough to run
+        after every cycle and before every report.
         
         Args:
             db: Database session
-            year: Year (e.g., 2025)
-            month: Month (1-12)
+            full: Recompute every day that has changes
             
         Returns:
-            MonthlyStats with all metrics for that month
+            Number of days recomputed
         """
-        # Calculate date range for the month
-        start_date = datetime(year, month, 1)
-        if month == 12:
-            end_date = datetime(year + 1, 1, 1)
-        else:
-            end_date = datetime(year, month + 1, 1)
-        
-        stats = MonthlyStats(year=year, month=month)
-        
-        # Count forms monitored (enabled URLs)
-        stats.forms_monitored = db.query(MonitoredURL).filter(
-            MonitoredURL.enabled == True
-        ).count()
-        
-        # Count changes detected in this month
-        month_changes = db.query(ChangeLog).filter(
-            ChangeLog.detected_at >= start_date,
-            ChangeLog.detected_at < end_date
-        )
+        started = datetime.utcnow()
+        day_expr = func.date(ChangeLog.detected_at)
+        
+        if full:
+            db.query(MetricsDailyRollup).delete(synchronize_session=False)
+            db.commit()
         
-        stats.updates_detected = month_changes.filter(
-            ChangeLog.change_type.in_(["text_changed", "format_only", "relocated"])
-        ).count()
+        last_refresh = None if full else db.query(func.max(MetricsDailyRollup.refreshed_at)).scalar()
         
-        stats.new_forms_added = month_changes.filter(
-            ChangeLog.change_type == "new"
-        ).count()
+        query = db.query(day_expr).distinct()
+        if last_refresh is not None:
+            since = last_refresh - ROLLUP_REFRESH_OVERLAP
+            query = query.filter(or_(
+                ChangeLog.detected_at >= since,
+                ChangeLog.reviewed_at >= since
+            ))
         
-        # Review status counts
-        stats.auto_approved = month_changes.filter(
-            ChangeLog.review_status.in_(["auto_approved"])
-        ).count()
+        dirty = {_as_date(day) for (day,) in query.all() if day is not None}
+        if not dirty:
+            return 0
         
-        stats.manual_reviewed = month_changes.filter(
-            ChangeLog.review_status == "approved",
-            ChangeLog.reviewed_by != "auto_approve_system"
-        ).count()
+        refreshed = self.refresh_rollup_days(db, dirty)
+        logger.info(
+            "Metrics rollups refreshed",
+            days=refreshed,
+            full=full or last_refresh is None,
+            duration_ms=int((datetime.utcnow() - started).total_seconds() * 1000)
+        )
+        return refreshed
+    
+    def _sum_rollups(self, db: Session, start: Optional[date] = None, end: Optional[date] = None) -> Dict[str, int]:
+        """Sum rollup columns over [start, end) (all days when unbounded)."""
+        query = db.query(*[
+            func.coalesce(func.sum(getattr(MetricsDailyRollup, name)), 0)
+            for name in self._ROLLUP_FIELDS
+        ])
+        if start is not None:
+            query = query.filter(MetricsDailyRollup.day >= start)
+        if end is not None:
+            query = query.filter(MetricsDailyRollup.day < end)
+        return dict(zip(self._ROLLUP_FIELDS, (int(v) for v in query.one())))
+    
+    def _monthly_from_sums(self, year: int, month: int, sums: Dict[str, int], forms_monitored: int) -> MonthlyStats:
+        return MonthlyStats(
+            year=year,
+            month=month,
+            forms_monitored=forms_monitored,
+            updates_detected=sums["updates_detected"],
+            new_forms_added=sums["new_forms_added"],
+            auto_approved=sums["auto_approved"],
+            manual_reviewed=sums["manual_approved"],
+            rejected=sums["rejected"],
+            pending=sums["pending"],
+        )
+    
+    def _enabled_url_count(self, db: Session) -> int:
+        return db.query(func.count(MonitoredURL.id)).filter(MonitoredURL.enabled == True).scalar()
+    
+    # ------------------------------------------------------------------
+    # Reports
+    # ------------------------------------------------------------------
+    
+    def get_monthly_stats(self, db: Session, year: int, month: int) -> MonthlyStats:
+        """
+        Get statistics for a specific month.
         
-        stats.rejected = month_changes.filter(
-            ChangeLog.review_status == "rejected"
-        ).count()
+        Args:
+            db: Database session
+            year: Year (e.g., 2025)
+            month: Month (1-12)
+            
+        Returns:
+            MonthlyStats with all metrics for that month
+        """
+        self.refresh_rollups(db)
         
-        stats.pending = month_changes.filter(
-            ChangeLog.review_status == "pending"
-        ).count()
+        start_date, end_date = _month_range(year, month)
+        stats = self._monthly_from_sums(
+            year, month,
+            self._sum_rollups(db, start_date, end_date),
+            self._enabled_url_count(db)
+        )
         
         logger.info(
             "Monthly stats calculated",
@@ -281,14 +435,19 @@ class MetricsTracker:
         
         cutoff = datetime.utcnow() - timedelta(days=days)
         
-        # Get all reviewed changes with recommendations
-        reviewed = db.query(ChangeLog).filter(
+        # One grouped query over reviewed changes with recommendations
+        groups = db.query(
+            ChangeLog.recommended_action,
+            ChangeLog.review_status,
+            func.count(ChangeLog.id),
+            func.count(ChangeLog.classification_override)
+        ).filter(
             ChangeLog.detected_at >= cutoff,
             ChangeLog.reviewed == True,
             ChangeLog.recommended_action.isnot(None)
-        ).all()
+        ).group_by(ChangeLog.recommended_action, ChangeLog.review_status).all()
         
-        report.total_predictions = len(reviewed)
+        report.total_predictions = sum(count for _, _, count, _ in groups)
         
         if report.total_predictions == 0:
             return report
@@ -300,32 +459,28 @@ class MetricsTracker:
         action_correct = {"auto_approve": 0, "review_suggested": 0, "manual_required": 0}
         action_total = {"auto_approve": 0, "review_suggested": 0, "manual_required": 0}
         
-        for change in reviewed:
-            action = change.recommended_action
-            status = change.review_status
-            
+        for action, status, count, overrides in groups:
             # Count totals per action
             if action in action_total:
-                action_total[action] += 1
+                action_total[action] += count
             
             # Check if AI was correct
             if action == "auto_approve" and status in ["approved", "auto_approved"]:
-                correct += 1
-                action_correct["auto_approve"] += 1
+                correct += count
+                action_correct["auto_approve"] += count
             elif action == "review_suggested" and status == "approved":
-                correct += 1
-                action_correct["review_suggested"] += 1
+                correct += count
+                action_correct["review_suggested"] += count
             elif action == "manual_required" and status in ["approved", "rejected"]:
-                correct += 1
-                action_correct["manual_required"] += 1
+                correct += count
+                action_correct["manual_required"] += count
             elif action == "false_positive" and status in ["approved", "auto_approved"]:
-                correct += 1
+                correct += count
             elif action == "new_form" and status == "approved":
-                correct += 1
+                correct += count
             
             # Check for overrides
-            if change.classification_override:
-                overridden += 1
+            overridden += overrides
         
         report.correct_predictions = correct
         report.overridden_predictions = overridden
@@ -357,110 +512,73 @@ class MetricsTracker:
         Returns:
             DashboardMetrics with current status and trends
         """
+        self.refresh_rollups(db)
         metrics = DashboardMetrics()
         
         # Basic counts
-        metrics.total_monitored_urls = db.query(MonitoredURL).count()
-        metrics.enabled_urls = db.query(MonitoredURL).filter(
-            MonitoredURL.enabled == True
-        ).count()
-        metrics.total_versions = db.query(PDFVersion).count()
-        metrics.total_changes = db.query(ChangeLog).count()
-        
-        # Queue status
-        metrics.pending_review = db.query(ChangeLog).filter(
-            ChangeLog.review_status == "pending"
-        ).count()
-        
-        metrics.auto_approvable = db.query(ChangeLog).filter(
-            ChangeLog.review_status == "pending",
-            ChangeLog.recommended_action == "auto_approve"
-        ).count()
-        
-        metrics.requires_manual = db.query(ChangeLog).filter(
-            ChangeLog.review_status == "pending",
-            ChangeLog.recommended_action.in_(["manual_required", "new_form"])
-        ).count()
-        
-        # Calculate current rates
-        total_processed = db.query(ChangeLog).filter(
-            ChangeLog.reviewed == True
-        ).count()
-        
-        auto_approved = db.query(ChangeLog).filter(
-            ChangeLog.review_status.in_(["auto_approved"]),
-            ChangeLog.recommended_action.in_(["auto_approve", "false_positive"])
-        ).count()
-        
-        manual_reviewed = db.query(ChangeLog).filter(
-            ChangeLog.review_status.in_(["approved", "rejected"]),
-            ChangeLog.reviewed_by != "auto_approve_system"
-        ).count()
+        total_urls, enabled_urls = db.query(
+            func.count(MonitoredURL.id),
+            func.coalesce(func.sum(case((MonitoredURL.enabled == True, 1), else_=0)), 0)
+        ).one()
+        metrics.total_monitored_urls = int(total_urls)
+        metrics.enabled_urls = int(enabled_urls)
+        
+        totals = url_state_tracker.get_totals(db)
+        metrics.total_versions = totals["total_versions"]
+        metrics.total_changes = totals["total_changes"]
+        
+        # Queue status: pending changes grouped by recommendation
+        pending_by_action = dict(
+            db.query(ChangeLog.recommended_action, func.count(ChangeLog.id))
+            .filter(ChangeLog.review_status == "pending")
+            .group_by(ChangeLog.recommended_action)
+            .all()
+        )
+        metrics.pending_review = sum(pending_by_action.values())
+        metrics.auto_approvable = pending_by_action.get("auto_approve", 0)
+        metrics.requires_manual = (
+            pending_by_action.get("manual_required", 0) + pending_by_action.get("new_form", 0)
+        )
         
+        # Calculate current rates from all-time rollups
+        all_time = self._sum_rollups(db)
+        total_processed = all_time["reviewed"]
         if total_processed > 0:
-            metrics.current_automation_rate = auto_approved / total_processed
-            metrics.current_review_rate = manual_reviewed / total_processed
+            metrics.current_automation_rate = all_time["auto_approved_recommended"] / total_processed
+            metrics.current_review_rate = all_time["manual_reviewed"] / total_processed
         
-        # Get monthly trend (last 6 months) - optimized batch calculation
+        # Monthly trend (last 6 months): one grouped query over the rollups
         now = datetime.utcnow()
-        month_ranges = []
+        months = []
         for i in range(5, -1, -1):
             month = now.month - i
             year = now.year
             if month <= 0:
                 month += 12
                 year -= 1
-            
-            start_date = datetime(year, month, 1)
-            if month == 12:
-                end_date = datetime(year + 1, 1, 1)
-            else:
-                end_date = datetime(year, month + 1, 1)
-            
-            month_ranges.append((year, month, start_date, end_date))
+            months.append((year, month))
         
-        # Count forms monitored once (same for all months)
-        forms_monitored = db.query(MonitoredURL).filter(
-            MonitoredURL.enabled == True
-        ).count()
+        trend_start, _ = _month_range(*months[0])
+        _, trend_end = _month_range(*months[-1])
         
-        # Process each month with optimized queries
-        for year, month, start_date, end_date in month_ranges:
-            stats = MonthlyStats(year=year, month=month)
-            stats.forms_monitored = forms_monitored
-            
-            # Use single query with conditional aggregation for efficiency
-            month_changes_query = db.query(ChangeLog).filter(
-                ChangeLog.detected_at >= start_date,
-                ChangeLog.detected_at < end_date
+        # At most ~186 day rows; fold them into months here
+        day_rows = db.query(MetricsDailyRollup).filter(
+            MetricsDailyRollup.day >= trend_start,
+            MetricsDailyRollup.day < trend_end
+        ).all()
+        
+        empty = dict.fromkeys(self._ROLLUP_FIELDS, 0)
+        sums_by_month = {}
+        for row in day_rows:
+            sums = sums_by_month.setdefault(f"{row.day.year}-{row.day.month:02d}", dict(empty))
+            for name in self._ROLLUP_FIELDS:
+                sums[name] += getattr(row, name)
+        
+        for year, month in months:
+            sums = sums_by_month.get(f"{year}-{month:02d}", empty)
+            metrics.monthly_trend.append(
+                self._monthly_from_sums(year, month, sums, metrics.enabled_urls)
             )
-            
-            stats.updates_detected = month_changes_query.filter(
-                ChangeLog.change_type.in_(["text_changed", "format_only", "relocated"])
-            ).count()
-            
-            stats.new_forms_added = month_changes_query.filter(
-                ChangeLog.change_type == "new"
-            ).count()
-            
-            stats.auto_approved = month_changes_query.filter(
-                ChangeLog.review_status.in_(["auto_approved"])
-            ).count()
-            
-            stats.manual_reviewed = month_changes_query.filter(
-                ChangeLog.review_status == "approved",
-                ChangeLog.reviewed_by != "auto_approve_system"
-            ).count()
-            
-            stats.rejected = month_changes_query.filter(
-                ChangeLog.review_status == "rejected"
-            ).count()
-            
-            stats.pending = month_changes_query.filter(
-                ChangeLog.review_status == "pending"
-            ).count()
-            
-            metrics.monthly_trend.append(stats)
         
         return metrics
     
@@ -485,20 +603,35 @@ class MetricsTracker:
             Dictionary mapping jurisdiction names to their metrics
         """
         # Calculate date range
-        start_date = datetime(year, month, 1)
-        if month == 12:
-            end_date = datetime(year + 1, 1, 1)
-        else:
-            end_date = datetime(year, month + 1, 1)
-        
-        # Get all URLs with their changes this month
-        urls = db.query(MonitoredURL).filter(MonitoredURL.enabled == True).all()
+        start_day, end_day = _month_range(year, month)
+        start_date = datetime.combine(start_day, datetime.min.time())
+        end_date = datetime.combine(end_day, datetime.min.time())
+        
+        # Per-name URL counts, and per-name change counts for the month
+        url_counts = db.query(
+            MonitoredURL.name, func.count(MonitoredURL.id)
+        ).filter(MonitoredURL.enabled == True).group_by(MonitoredURL.name).all()
+        
+        change_counts = {
+            name: (int(updated or 0), int(reviewed or 0))
+            for name, updated, reviewed in db.query(
+                MonitoredURL.name,
+                func.sum(case((ChangeLog.change_type != "new", 1), else_=0)),
+                func.sum(case((ChangeLog.reviewed == True, 1), else_=0))
+            ).join(
+                ChangeLog, ChangeLog.monitored_url_id == MonitoredURL.id
+            ).filter(
+                MonitoredURL.enabled == True,
+                ChangeLog.detected_at >= start_date,
+                ChangeLog.detected_at < end_date
+            ).group_by(MonitoredURL.name).all()
+        }
         
         breakdown = {}
         
-        for url in urls:
+        for name, count in url_counts:
             # Use URL name as jurisdiction identifier
-            jurisdiction = url.name.split(" - ")[0] if " - " in url.name else url.name
+            jurisdiction = name.split(" - ")[0] if " - " in name else name
             
             if jurisdiction not in breakdown:
                 breakdown[jurisdiction] = {
@@ -508,20 +641,10 @@ class MetricsTracker:
                     "tagged": 0,  # Placeholder for future tagging integration
                 }
             
-            breakdown[jurisdiction]["monitored"] += 1
-            
-            # Count changes for this URL this month
-            changes = db.query(ChangeLog).filter(
-                ChangeLog.monitored_url_id == url.id,
-                ChangeLog.detected_at >= start_date,
-                ChangeLog.detected_at < end_date
-            ).all()
-            
-            for change in changes:
-                if change.change_type != "new":
-                    breakdown[jurisdiction]["updated"] += 1
-                if change.reviewed:
-                    breakdown[jurisdiction]["reviewed"] += 1
+            updated, reviewed = change_counts.get(name, (0, 0))
+            breakdown[jurisdiction]["monitored"] += count
+            breakdown[jurisdiction]["updated"] += updated
+            breakdown[jurisdiction]["reviewed"] += reviewed
         
         return breakdown
 
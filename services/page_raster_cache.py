@@ -0,0 +1,432 @@
+"""
+Page Raster Cache
+
+Shared cache of rendered PDF pages used by the visual diff, preview and
+title extraction renderers.
+
+Entries are keyed by (pdf hash, page, dpi) so a version's pages are rendered
+once and reused wherever the same bytes are rendered again (e.g. the old side
+of a diff was already rendered when that version was new).
+
+Rasters are stored compactly as zlib-compressed RGB samples in two tiers:
+- Memory: LRU bounded by total compressed bytes
+- Disk: LRU (by access time) bounded by total bytes, survives restarts
+"""
+
+import hashlib
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Tuple
+
+import structlog
+
+from config import settings
+
+logger = structlog.get_logger()
+
+# Cache key: (pdf_hash, page_num, dpi)
+RasterKey = Tuple[str, int, int]
+
+
+@dataclass
+class PageRaster:
+    """A rendered PDF page as raw 8-bit samples (no alpha)."""
+    width: int
+    height: int
+    channels: int  # 3 = RGB, 1 = gray
+    samples: bytes
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the uncompressed samples."""
+        return len(self.samples)
+
+    def as_array(self):
+        """
+        View the samples as a (height, width, channels) uint8 numpy array.
+
+        This is a zero-copy, read-only view over the sample bytes.
+        """
+        import numpy as np
+
+        return np.frombuffer(self.samples, dtype=np.uint8).reshape(
+            self.height, self.width, self.channels
+        )
+
+    def to_png(self) -> bytes:
+        """Encode the raster as PNG bytes."""
+        import fitz  # PyMuPDF
+
+        colorspace = fitz.csRGB if self.channels == 3 else fitz.csGRAY
+        pix = fitz.Pixmap(colorspace, self.width, self.height, self.samples, False)
+        return pix.tobytes("png")
+
+
+@dataclass
+class _CacheEntry:
+    """Compressed raster held by the cache."""
+    width: int
+    height: int
+    channels: int
+    compressed: bytes
+
+    @property
+    def size(self) -> int:
+        return len(self.compressed)
+
+    def to_raster(self) -> PageRaster:
+        return PageRaster(
+            width=self.width,
+            height=self.height,
+            channels=self.channels,
+            samples=zlib.decompress(self.compressed)
+        )
+
+
+class PageRasterCache:
+    """
+    Thread-safe, size-bounded LRU cache of rendered PDF pages.
+    """
+
+    # Disk file header: width, height, channels as fixed-width ints
+    _HEADER_SIZE = 12
+
+    def __init__(
+        self,
+        max_memory_bytes: Optional[int] = None,
+        disk_path: Optional[Path] = None,
+        max_disk_bytes: Optional[int] = None,
+        compress_level: int = 1
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_memory_bytes: Memory tier budget (compressed bytes). 0 disables the tier.
+            disk_path: Directory for the disk tier. None uses config default.
+            max_disk_bytes: Disk tier budget in bytes. 0 disables the tier.
+            compress_level: zlib level (1 is fast; page rasters are mostly white)
+        """
+        self.max_memory_bytes = (
+            max_memory_bytes if max_memory_bytes is not None
+            else settings.RASTER_CACHE_MEMORY_MB * 1024 * 1024
+        )
+        self.max_disk_bytes = (
+            max_disk_bytes if max_disk_bytes is not None
+            else settings.RASTER_CACHE_DISK_MB * 1024 * 1024
+        )
+        self.disk_path = disk_path or settings.RASTER_CACHE_PATH
+        self.compress_level = compress_level
+
+        self._entries: "OrderedDict[RasterKey, _CacheEntry]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes: Optional[int] = None  # Lazily computed
+        self._lock = threading.Lock()
+
+        # Memo of file hashes keyed by (path, mtime_ns, size)
+        self._path_hashes: "OrderedDict[tuple, str]" = OrderedDict()
+
+        self._hits = 0
+        self._misses = 0
+        self._renders = 0
+
+    # ------------------------------------------------------------------
+    # Key helpers
+    # ------------------------------------------------------------------
+
+    def hash_pdf(self, pdf_path: Path) -> str:
+        """
+        Get the SHA-256 of a PDF file (same hash as PDFVersion.pdf_hash).
+        Memoized by path, mtime and size so repeated renders don't re-hash.
+        """
+        stat = os.stat(pdf_path)
+        memo_key = (str(Path(pdf_path).resolve()), stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            cached = self._path_hashes.get(memo_key)
+            if cached:
+                self._path_hashes.move_to_end(memo_key)
+                return cached
+
+        sha256 = hashlib.sha256()
+        with open(pdf_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(65536), b''):
+                sha256.update(chunk)
+        pdf_hash = sha256.hexdigest()
+
+        with self._lock:
+            self._path_hashes[memo_key] = pdf_hash
+            while len(self._path_hashes) > 1024:
+                self._path_hashes.popitem(last=False)
+
+        return pdf_hash
+
+    def _disk_file(self, key: RasterKey) -> Path:
+        pdf_hash, page_num, dpi = key
+        return self.disk_path / pdf_hash[:2] / f"{pdf_hash}_p{page_num}_{dpi}dpi.raster"
+
+    # ------------------------------------------------------------------
+    # Get / put
+    # ------------------------------------------------------------------
+
+    def get(self, key: RasterKey) -> Optional[PageRaster]:
+        """Look up a raster in memory, then on disk."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry.to_raster()
+
+        entry = self._read_disk(key)
+        if entry is not None:
+            with self._lock:
+                self._hits += 1
+                self._store_memory(key, entry)
+            return entry.to_raster()
+
+        with self._lock:
+            self._misses += 1
+        return None
+
+    def put(self, key: RasterKey, raster: PageRaster) -> None:
+        """Store a raster in both tiers."""
+        entry = _CacheEntry(
+            width=raster.width,
+            height=raster.height,
+            channels=raster.channels,
+            compressed=zlib.compress(raster.samples, self.compress_level)
+        )
+        with self._lock:
+            self._store_memory(key, entry)
+        self._write_disk(key, entry)
+
+    def _store_memory(self, key: RasterKey, entry: _CacheEntry) -> None:
+        """Insert into the memory tier and evict LRU entries. Caller holds the lock."""
+        if self.max_memory_bytes <= 0 or entry.size > self.max_memory_bytes:
+            return
+
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= previous.size
+
+        self._entries[key] = entry
+        self._memory_bytes += entry.size
+
+        while self._memory_bytes > self.max_memory_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._memory_bytes -= evicted.size
+
+    def _read_disk(self, key: RasterKey) -> Optional[_CacheEntry]:
+        if self.max_disk_bytes <= 0:
+            return None
+
+        path = self._disk_file(key)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+
+        if len(data) <= self._HEADER_SIZE:
+            return None
+
+        # Touch so disk eviction is least-recently-used
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+        header = data[:self._HEADER_SIZE]
+        return _CacheEntry(
+            width=int.from_bytes(header[0:4], "little"),
+            height=int.from_bytes(header[4:8], "little"),
+            channels=int.from_bytes(header[8:12], "little"),
+            compressed=data[self._HEADER_SIZE:]
+        )
+
+    def _write_disk(self, key: RasterKey, entry: _CacheEntry) -> None:
+        if self.max_disk_bytes <= 0 or entry.size > self.max_disk_bytes:
+            return
+
+        path = self._disk_file(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            header = (
+                entry.width.to_bytes(4, "little") +
+                entry.height.to_bytes(4, "little") +
+                entry.channels.to_bytes(4, "little")
+            )
+            # Write to a temp file and rename so readers never see partial data
+            tmp_path = path.with_suffix(f".tmp{os.getpid()}_{threading.get_ident()}")
+            tmp_path.write_bytes(header + entry.compressed)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Failed to write raster to disk cache", path=str(path), error=str(e))
+            return
+
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = self._scan_disk_usage()
+            else:
+                self._disk_bytes += self._HEADER_SIZE + entry.size
+            over_budget = self._disk_bytes > self.max_disk_bytes
+
+        if over_budget:
+            self._evict_disk()
+
+    def _scan_disk_usage(self) -> int:
+        total = 0
+        if self.disk_path.exists():
+            for path in self.disk_path.rglob("*.raster"):
+                try:
+                    total += path.stat().st_size
+                except OSError:
+                    pass
+        return total
+
+    def _evict_disk(self) -> None:
+        """Delete least-recently-used disk entries down to 90% of the budget."""
+        files = []
+        for path in self.disk_path.rglob("*.raster"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((max(stat.st_atime, stat.st_mtime), stat.st_size, path))
+
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        target = int(self.max_disk_bytes * 0.9)
+        removed = 0
+
+        for _, size, path in files:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+                total -= size
+                removed += 1
+            except OSError:
+                pass
+
+        with self._lock:
+            self._disk_bytes = total
+
+        logger.debug("Evicted rasters from disk cache", removed=removed, remaining_bytes=total)
+
+    # ------------------------------------------------------------------
+    # Rendering
+    # ------------------------------------------------------------------
+
+    def render(
+        self,
+        pdf_path: Path,
+        page_num: int = 0,
+        dpi: int = 150,
+        pdf_hash: Optional[str] = None
+    ) -> Optional[PageRaster]:
+        """
+        Get a rendered page, rendering with PyMuPDF only on a cache miss.
+
+        Args:
+            pdf_path: Path to the PDF file
+            page_num: Page number (0-indexed)
+            dpi: Resolution for rendering
+            pdf_hash: SHA-256 of the PDF if already known (skips hashing)
+
+        Returns:
+            PageRaster or None if the page could not be rendered
+        """
+        try:
+            key = (pdf_hash or self.hash_pdf(pdf_path), page_num, dpi)
+        except OSError as e:
+            logger.error("Failed to hash PDF for raster cache", path=str(pdf_path), error=str(e))
+            return None
+
+        raster = self.get(key)
+        if raster is not None:
+            return raster
+
+        try:
+            import fitz  # PyMuPDF
+
+            doc = fitz.open(pdf_path)
+            try:
+                if page_num >= len(doc):
+                    logger.warning("Page number out of range", page=page_num, total=len(doc))
+                    return None
+
+                mat = fitz.Matrix(dpi / 72, dpi / 72)
+                pix = doc[page_num].get_pixmap(matrix=mat, alpha=False)
+                raster = PageRaster(
+                    width=pix.width,
+                    height=pix.height,
+                    channels=pix.n,
+                    samples=bytes(pix.samples)
+                )
+            finally:
+                doc.close()
+        except Exception as e:
+            logger.error("Failed to render PDF page", path=str(pdf_path), page=page_num, error=str(e))
+            return None
+
+        with self._lock:
+            self._renders += 1
+        self.put(key, raster)
+        return raster
+
+    def render_png(
+        self,
+        pdf_path: Path,
+        page_num: int = 0,
+        dpi: int = 150,
+        pdf_hash: Optional[str] = None
+    ) -> Optional[bytes]:
+        """Get a rendered page as PNG bytes (see render())."""
+        raster = self.render(pdf_path, page_num, dpi, pdf_hash)
+        if raster is None:
+            return None
+        return raster.to_png()
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def clear(self, include_disk: bool = False) -> None:
+        """Drop all memory entries (and optionally the disk tier)."""
+        with self._lock:
+            self._entries.clear()
+            self._memory_bytes = 0
+
+        if include_disk and self.disk_path.exists():
+            for path in self.disk_path.rglob("*.raster"):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            with self._lock:
+                self._disk_bytes = 0
+
+    def get_stats(self) -> dict:
+        """Get cache statistics."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "memory_bytes": self._memory_bytes,
+                "max_memory_bytes": self.max_memory_bytes,
+                "disk_bytes": self._disk_bytes,
+                "max_disk_bytes": self.max_disk_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "renders": self._renders,
+                "hit_rate": self._hits / lookups if lookups else 0.0
+            }
+
+
+# Global instance
+page_raster_cache = PageRasterCache()
@@ -0,0 +1,671 @@
+"""
+Relocation Queue
+
+Relocation searches run outside the monitoring cycle. A URL whose PDF
+returns 404 is recorded by the cycle as a RelocationTask in a few
+milliseconds; the crawl that looks for the moved form (up to
+RELOCATION_MAX_PAGES pages, often minutes) runs here, so a site
+reorganizing doesn't hold cycle workers and their database sessions.
+
+The queue runs on its own thread and event loop:
+
+1. RELOCATION_QUEUE_CONCURRENCY async workers claim queued tasks, at most
+   RELOCATION_DOMAIN_CONCURRENCY per domain (searches of one site share its
+   crawl index, so they'd mostly wait on each other anyway)
+2. Each domain has a budget of RELOCATION_DOMAIN_PAGE_BUDGET fetched pages
+   per RELOCATION_BUDGET_WINDOW_MINUTES; a claimed task reserves up to
+   RELOCATION_MAX_PAGES of what is left and gives back what its search
+   didn't fetch, and a task whose domain has spent its budget waits
+   (not_before)
+3. A task tries the site inventory, then the similarity search
+   (pdf_similarity_search.run_search, awaited on the queue's loop). A match
+   is processed like any check of the URL, which records the 'relocated'
+   change; otherwise the candidates are kept as near-misses and a
+   'relocation_failed' change is logged, as before
+
+Database and PDF work runs in threads off the loop. Tasks queued by another
+process (e.g. 'cli.py run') are picked up every RELOCATION_QUEUE_POLL_SECONDS.
+
+Statuses: queued -> running -> relocated | failed | cancelled
+"""
+
+import asyncio
+import os
+import socket
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import structlog
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from config import settings
+from db.database import SessionLocal
+from db.models import MonitoredURL, PDFVersion, RelocationTask
+from services.form_fingerprints import form_fingerprint_index
+from services.job_runner import _runner_alive
+from services.site_inventory import site_inventory
+
+logger = structlog.get_logger()
+
+
+OPEN_STATUSES = ("queued", "running")
+FINISHED_STATUSES = ("relocated", "failed", "cancelled")
+
+# Relocation search settings (same as the inline search used)
+SIMILARITY_THRESHOLD = 85.0
+MAX_MATCHES = 3
+
+
+class RelocationStateError(Exception):
+    """The task's status doesn't allow the requested action."""
+
+
+def task_to_dict(task: RelocationTask) -> dict:
+    """JSON-ready view of a task."""
+    return {
+        "id": task.id,
+        "monitored_url_id": task.monitored_url_id,
+        "status": task.status,
+        "failed_url": task.failed_url,
+        "domain": task.domain,
+        "new_url": task.new_url,
+        "change_log_id": task.change_log_id,
+        "pages_crawled": task.pages_crawled or 0,
+        "attempts": task.attempts or 0,
+        "error": task.error,
+        "created_at": task.created_at.isoformat() if task.created_at else None,
+        "not_before": task.not_before.isoformat() if task.not_before else None,
+        "started_at": task.started_at.isoformat() if task.started_at else None,
+        "completed_at": task.completed_at.isoformat() if task.completed_at else None,
+    }
+
+
+def relocation_search_options(db: Session, monitored_url: MonitoredURL, previous_version: PDFVersion) -> dict:
+    """
+    Keyword arguments of pdf_similarity_search.run_search / search_pdf for a
+    URL's relocation search (also used by the inline search in cli.py).
+    """
+    # PDFs on the site monitored as other forms need no download
+    known_other_forms = set()
+    if settings.FORM_FINGERPRINT_ENABLED:
+        known_other_forms = form_fingerprint_index.known_other_forms(db, monitored_url)
+    return {
+        "similarity_threshold": SIMILARITY_THRESHOLD,
+        "max_results": MAX_MATCHES,
+        "max_pages": settings.RELOCATION_MAX_PAGES,
+        "max_depth": settings.RELOCATION_MAX_DEPTH,
+        "form_number": previous_version.form_number,
+        "exclude_urls": known_other_forms,
+    }
+
+
+@dataclass
+class RelocationPlan:
+    """What a claimed task will try, read from the database before the search."""
+    task_id: int
+    failed_url: str
+    domain: str
+    reference_pdf_path: Optional[str] = None
+    inventory_url: Optional[str] = None
+    options: dict = field(default_factory=dict)
+
+
+class DomainBudget:
+    """Pages fetched per domain over a sliding window (callers hold the queue's lock)."""
+    
+    def __init__(self, pages: int, window_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.pages = pages
+        self.window_seconds = window_seconds
+        self._clock = clock
+        self._spent: Dict[str, Deque[List]] = defaultdict(deque)  # [time, pages] entries
+    
+    def _expire(self, domain: str) -> Deque[List]:
+        spent = self._spent[domain]
+        cutoff = self._clock() - self.window_seconds
+        while spent and (spent[0][0] <= cutoff or spent[0][1] == 0):
+            spent.popleft()
+        return spent
+    
+    def remaining(self, domain: str) -> int:
+        """Pages the domain can still fetch in the current window."""
+        return max(0, self.pages - sum(pages for _, pages in self._expire(domain)))
+    
+    def charge(self, domain: str, pages: int) -> Optional[List]:
+        """
+        Spend pages now.
+        
+        Returns:
+            The spending entry (to refund unused pages from), or None if nothing was spent
+        """
+        if pages <= 0:
+            return None
+        entry = [self._clock(), pages]
+        self._spent[domain].append(entry)
+        return entry
+    
+    def refund(self, entry: Optional[List], pages: int) -> None:
+        """Give back pages of a charge that weren't used."""
+        if entry is not None and pages > 0:
+            entry[1] = max(0, entry[1] - pages)
+    
+    def available_in(self, domain: str) -> float:
+        """Seconds until the domain's oldest spending leaves the window (0 if it has budget)."""
+        spent = self._expire(domain)
+        if not spent or self.remaining(domain) > 0:
+            return 0.0
+        return max(0.0, spent[0][0] + self.window_seconds - self._clock())
+
+
+class RelocationQueue:
+    """
+    Persists and runs relocation searches for URLs that returned 404.
+    """
+    
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        concurrency: Optional[int] = None,
+        domain_concurrency: Optional[int] = None,
+        domain_page_budget: Optional[int] = None,
+        budget_window_seconds: Optional[float] = None
+    ):
+        """
+        Initialize the queue (its thread starts on first enqueue).
+        
+        Args:
+            session_factory: Creates sessions for task execution (default: SessionLocal)
+            concurrency: Searches at once (default: RELOCATION_QUEUE_CONCURRENCY)
+            domain_concurrency: Searches at once per domain (default: RELOCATION_DOMAIN_CONCURRENCY)
+            domain_page_budget: Pages per domain per window (default: RELOCATION_DOMAIN_PAGE_BUDGET)
+            budget_window_seconds: Budget window (default: RELOCATION_BUDGET_WINDOW_MINUTES)
+        """
+        self._session_factory = session_factory or SessionLocal
+        self.concurrency = max(1, concurrency or settings.RELOCATION_QUEUE_CONCURRENCY)
+        self.domain_concurrency = max(1, domain_concurrency or settings.RELOCATION_DOMAIN_CONCURRENCY)
+        self.budget = DomainBudget(
+            domain_page_budget or settings.RELOCATION_DOMAIN_PAGE_BUDGET,
+            budget_window_seconds or settings.RELOCATION_BUDGET_WINDOW_MINUTES * 60
+        )
+        self.runner_id = f"{socket.gethostname()}:{os.getpid()}"
+        
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake_event: Optional[asyncio.Event] = None
+        self._stopping = threading.Event()
+        self._draining = threading.Event()
+        self._running_domains: Counter = Counter()
+        self._orchestrator = None
+    
+    # ------------------------------------------------------------------
+    # Queueing
+    # ------------------------------------------------------------------
+    
+    def enqueue(
+        self,
+        db: Session,
+        monitored_url: MonitoredURL,
+        failed_url: str,
+        start: bool = True
+    ) -> RelocationTask:
+        """
+        Queue a relocation search for a URL (committed). A URL with a task
+        already queued or running keeps that task.
+        
+        Args:
+            db: Database session
+            monitored_url: URL whose PDF returned 404
+            failed_url: The PDF URL that returned 404
+            start: Start the queue's workers in this process
+        
+        Returns:
+            The URL's open task
+        """
+        task = db.query(RelocationTask).filter(
+            RelocationTask.monitored_url_id == monitored_url.id,
+            RelocationTask.status.in_(OPEN_STATUSES)
+        ).first()
+        if task is None:
+            task = RelocationTask(
+                monitored_url_id=monitored_url.id,
+                failed_url=failed_url,
+                domain=(urlparse(failed_url).hostname or "").lower(),
+                status="queued",
+                created_at=datetime.utcnow()
+            )
+            db.add(task)
+            db.commit()
+            logger.info(
+                "Relocation search queued",
+                task_id=task.id,
+                url_id=monitored_url.id,
+                failed_url=failed_url
+            )
+        if start:
+            self.start()
+        return task
+    
+    def start(self) -> None:
+        """Start the queue's thread and workers if they aren't running, and wake them."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                self._wake()
+                return
+            self._stopping.clear()
+            self._draining.clear()
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._run_loop, name="relocation-queue", daemon=True)
+            self._thread.start()
+    
+    def _wake(self) -> None:
+        """Wake idle workers (from any thread)."""
+        loop, event = self._loop, self._wake_event
+        if loop is not None and event is not None and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass  # Loop closed meanwhile
+    
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._serve(stop_when_idle=False))
+        except asyncio.CancelledError:
+            pass  # shutdown()
+        finally:
+            self._loop.close()
+    
+    async def _serve(self, stop_when_idle: bool) -> None:
+        self._wake_event = asyncio.Event()
+        workers = [
+            asyncio.create_task(self._worker(stop_when_idle)) for _ in range(self.concurrency)
+        ]
+        await asyncio.gather(*workers, return_exceptions=True)
+    
+    async def _worker(self, stop_when_idle: bool) -> None:
+        while not self._stopping.is_set():
+            claimed = await asyncio.to_thread(self._claim)
+            if claimed is None:
+                if stop_when_idle or self._draining.is_set():
+                    return
+                try:
+                    await asyncio.wait_for(self._wake_event.wait(), settings.RELOCATION_QUEUE_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                if not self._draining.is_set():
+                    self._wake_event.clear()  # Left set while draining, so every worker sees it
+                continue
+            
+            task_id, domain, reservation = claimed
+            try:
+                await self._run_task(task_id, domain, reservation)
+            finally:
+                with self._lock:
+                    self._running_domains[domain] -= 1
+            self._wake_event.set()  # A domain slot is free again
+    
+    def drain(self) -> int:
+        """
+        Run tasks until none can run now, then stop the workers (used by the
+        CLI after a cycle). Tasks deferred by a domain budget stay queued for
+        the next process that runs the queue.
+        
+        Returns:
+            Number of tasks finished meanwhile
+        """
+        db = self._session_factory()
+        try:
+            before = db.query(RelocationTask).filter(RelocationTask.status.in_(FINISHED_STATUSES)).count()
+        finally:
+            db.close()
+        
+        with self._lock:
+            thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._draining.set()
+            self._wake()
+            thread.join()
+        else:
+            asyncio.run(self._serve(stop_when_idle=True))
+        
+        db = self._session_factory()
+        try:
+            return db.query(RelocationTask).filter(RelocationTask.status.in_(FINISHED_STATUSES)).count() - before
+        finally:
+            db.close()
+    
+    # ------------------------------------------------------------------
+    # Claiming
+    # ------------------------------------------------------------------
+    
+    def _claim(self) -> Optional[Tuple[int, str, Optional[List]]]:
+        """
+        Mark the oldest runnable task as running in this process.
+        
+        Runnable: queued, not deferred, and its domain has a free slot and
+        pages left in its budget. The task's domain slot and up to
+        RELOCATION_MAX_PAGES of the budget are reserved while it is claimed,
+        so concurrent claims can't overspend the domain. A task whose domain
+        has spent its budget is deferred until the budget frees up.
+        
+        Returns:
+            (task id, domain, budget reservation), or None if no task can run now
+        """
+        db = self._session_factory()
+        try:
+            now = datetime.utcnow()
+            candidates = db.query(RelocationTask).filter(
+                RelocationTask.status == "queued",
+                or_(RelocationTask.not_before.is_(None), RelocationTask.not_before <= now)
+            ).order_by(RelocationTask.created_at, RelocationTask.id).limit(100).all()
+            
+            for task in candidates:
+                reservation = None
+                with self._lock:
+                    if self._running_domains[task.domain] >= self.domain_concurrency:
+                        continue
+                    wait = self.budget.available_in(task.domain)
+                    if wait <= 0:
+                        self._running_domains[task.domain] += 1
+                        reservation = self.budget.charge(
+                            task.domain, min(settings.RELOCATION_MAX_PAGES, self.budget.remaining(task.domain))
+                        )
+                
+                # Commits happen outside the lock, which other workers' claims need
+                if wait > 0:
+                    task.not_before = now + timedelta(seconds=wait)
+                    db.commit()
+                    logger.info(
+                        "Relocation search deferred by domain budget",
+                        task_id=task.id,
+                        domain=task.domain,
+                        not_before=task.not_before.isoformat()
+                    )
+                    continue
+                
+                # Conditional update, so two processes never claim the same task
+                claimed = db.query(RelocationTask).filter(
+                    RelocationTask.id == task.id,
+                    RelocationTask.status == "queued"
+                ).update({
+                    "status": "running",
+                    "started_at": now,
+                    "completed_at": None,
+                    "attempts": (task.attempts or 0) + 1,
+                    "runner_id": self.runner_id,
+                    "error": None
+                }, synchronize_session=False)
+                db.commit()
+                if claimed:
+                    return task.id, task.domain, reservation
+                
+                with self._lock:
+                    self._running_domains[task.domain] -= 1
+                    if reservation is not None:
+                        self.budget.refund(reservation, reservation[1])
+            return None
+        finally:
+            db.close()
+    
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+    
+    def _get_orchestrator(self):
+        if self._orchestrator is None:
+            from cli import MonitoringOrchestrator  # Import here to avoid circular imports
+            self._orchestrator = MonitoringOrchestrator()
+        return self._orchestrator
+    
+    async def _run_task(self, task_id: int, domain: str, reservation: Optional[List] = None) -> None:
+        """
+        Inventory lookup, then similarity search, then record the outcome.
+        
+        Args:
+            task_id: Claimed task
+            domain: The task's domain
+            reservation: Budget charge made by the claim; the search fetches at
+                most its pages and what it doesn't fetch is refunded
+        """
+        with self._lock:
+            reserved = reservation[1] if reservation else 0
+        pages = 0
+        try:
+            plan = await asyncio.to_thread(self._prepare, task_id)
+            if plan is None:
+                return
+            
+            if plan.inventory_url and await asyncio.to_thread(
+                self._relocate, task_id, plan.inventory_url, "site_inventory"
+            ):
+                return
+            
+            matches: list = []
+            if plan.reference_pdf_path:
+                max_pages = min(plan.options.pop("max_pages"), reserved)
+                try:
+                    from pdf_similarity_search import run_search
+                    
+                    matches, _near_misses, stats = await run_search(
+                        plan.failed_url,
+                        plan.reference_pdf_path,
+                        max_pages=max(1, max_pages),
+                        **plan.options
+                    )
+                    pages = stats.pages_fetched
+                except Exception as e:
+                    logger.warning("Similarity search failed", task_id=task_id, error=str(e), exc_info=True)
+            
+            exact_match = next((m for m in matches if m.similarity_score == 100), None)
+            if exact_match and await asyncio.to_thread(
+                self._relocate, task_id, exact_match.pdf_url, "similarity_search", pages
+            ):
+                return
+            await asyncio.to_thread(self._record_failure, task_id, matches, pages)
+        
+        except asyncio.CancelledError:
+            # Queue shutting down: leave the task for the next run
+            self._finish(task_id, "queued", error="Interrupted by shutdown")
+            raise
+        except Exception as e:
+            logger.error("Relocation task crashed", task_id=task_id, error=str(e), exc_info=True)
+            self._finish(task_id, "failed", error=str(e))
+        finally:
+            with self._lock:
+                self.budget.refund(reservation, reserved - pages)
+                self.budget.charge(domain, pages - reserved)  # No-op unless it fetched more
+    
+    def _prepare(self, task_id: int) -> Optional[RelocationPlan]:
+        """Read what the search needs; finish the task at once if the URL no longer needs it."""
+        db = self._session_factory()
+        try:
+            task = db.get(RelocationTask, task_id)
+            monitored_url = task.monitored_url
+            if not monitored_url.enabled or monitored_url.url != task.failed_url:
+                self._finish(task_id, "cancelled", error="URL was disabled or changed since the 404", db=db)
+                return None
+            
+            orchestrator = self._get_orchestrator()
+            previous_version = orchestrator.version_manager.get_latest_version(db, monitored_url.id)
+            if previous_version is None:
+                self._finish(task_id, "cancelled", error="URL has no stored version to search for", db=db)
+                return None
+            
+            plan = RelocationPlan(
+                task_id=task_id,
+                failed_url=task.failed_url,
+                domain=task.domain,
+                options=relocation_search_options(db, monitored_url, previous_version)
+            )
+            reference_pdf_path = orchestrator.version_manager.get_original_pdf_path(db, previous_version.id)
+            if reference_pdf_path and reference_pdf_path.exists():
+                plan.reference_pdf_path = str(reference_pdf_path)
+            else:
+                logger.warning("No reference PDF path for similarity search", url_id=monitored_url.id)
+            
+            # Site inventory first: a fingerprint match on the site's index
+            # pages relocates the form without a crawl (weaker matches are
+            # only recorded as near-misses)
+            if settings.SITE_INVENTORY_ENABLED:
+                try:
+                    match = site_inventory.find_relocated(db, monitored_url)
+                    plan.inventory_url = match.pdf_url if match else None
+                except Exception as e:
+                    db.rollback()
+                    logger.warning("Site inventory lookup failed", url_id=monitored_url.id, error=str(e))
+            return plan
+        finally:
+            db.close()
+    
+    def _relocate(self, task_id: int, new_url: str, found_by: str, pages: int = 0) -> bool:
+        """
+        Check the URL at its new location, which records the 'relocated' change.
+        
+        Returns:
+            False if the new URL couldn't be processed (nothing is changed)
+        """
+        db = self._session_factory()
+        try:
+            task = db.get(RelocationTask, task_id)
+            monitored_url = task.monitored_url
+            monitored_url.url = new_url
+            outcome = self._get_orchestrator().process_url(db, monitored_url, relocated_from_url=task.failed_url)
+            if not outcome.success:
+                db.rollback()
+                logger.warning("Relocated form could not be processed", task_id=task_id, new_url=new_url,
+                               error=outcome.error)
+                return False
+            db.commit()
+            
+            logger.info(
+                "Relocated form found",
+                task_id=task_id,
+                url_id=task.monitored_url_id,
+                new_url=new_url,
+                found_by=found_by
+            )
+            self._finish(
+                task_id, "relocated", db=db,
+                new_url=new_url, change_log_id=outcome.change_log_id, pages_crawled=pages
+            )
+            return True
+        finally:
+            db.close()
+    
+    def _record_failure(self, task_id: int, matches: list, pages: int) -> None:
+        """Keep the candidates for review and log 'relocation_failed'."""
+        db = self._session_factory()
+        try:
+            task = db.get(RelocationTask, task_id)
+            monitored_url = task.monitored_url
+            orchestrator = self._get_orchestrator()
+            previous_version = orchestrator.version_manager.get_latest_version(db, monitored_url.id)
+            change_log = orchestrator.record_relocation_failure(
+                db, monitored_url, previous_version, task.failed_url, matches
+            )
+            self._finish(
+                task_id, "failed", db=db,
+                change_log_id=change_log.id if change_log else None, pages_crawled=pages
+            )
+        finally:
+            db.close()
+    
+    def _finish(self, task_id: int, status: str, db: Optional[Session] = None, **values) -> None:
+        """Record a task's final status (or put it back in the queue, with status 'queued')."""
+        own_db = db is None
+        if own_db:
+            db = self._session_factory()
+        try:
+            task = db.get(RelocationTask, task_id)
+            task.status = status
+            task.completed_at = datetime.utcnow() if status in FINISHED_STATUSES else None
+            for name, value in values.items():
+                setattr(task, name, value)
+            db.commit()
+            logger.info("Relocation task finished", task_id=task_id, status=status, url_id=task.monitored_url_id)
+        finally:
+            if own_db:
+                db.close()
+    
+    # ------------------------------------------------------------------
+    # Control and lookup
+    # ------------------------------------------------------------------
+    
+    def cancel(self, db: Session, task_id: int) -> Optional[RelocationTask]:
+        """
+        Cancel a queued task.
+        
+        Returns:
+            The task, or None if it doesn't exist
+        
+        Raises:
+            RelocationStateError: If the task isn't queued
+        """
+        task = db.get(RelocationTask, task_id)
+        if task is None:
+            return None
+        if task.status != "queued":
+            raise RelocationStateError(f"Relocation task {task_id} is {task.status}; only queued tasks can be cancelled")
+        task.status = "cancelled"
+        task.completed_at = datetime.utcnow()
+        db.commit()
+        return task
+    
+    def recover(self, db: Session) -> int:
+        """
+        Requeue tasks whose process stopped while running them (application
+        startup), and start the workers if anything is queued.
+        
+        Returns:
+            Number of tasks requeued
+        """
+        requeued = 0
+        for task in db.query(RelocationTask).filter(RelocationTask.status == "running").all():
+            if task.runner_id != self.runner_id and not _runner_alive(task.runner_id):
+                task.status = "queued"
+                requeued += 1
+        db.commit()
+        
+        if requeued:
+            logger.info("Requeued interrupted relocation searches", count=requeued)
+        if db.query(RelocationTask.id).filter(RelocationTask.status == "queued").first():
+            self.start()
+        return requeued
+    
+    def list_tasks(self, db: Session, limit: int = 50, status: Optional[str] = None) -> List[RelocationTask]:
+        """Most recent tasks first, optionally filtered by status."""
+        query = db.query(RelocationTask)
+        if status:
+            query = query.filter(RelocationTask.status == status)
+        return query.order_by(RelocationTask.created_at.desc(), RelocationTask.id.desc()).limit(limit).all()
+    
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop the workers: searches in progress are abandoned and their tasks
+        go back to the queue.
+        """
+        self._stopping.set()
+        with self._lock:
+            thread, loop = self._thread, self._loop
+            self._thread = None
+        if thread is not None and loop is not None and not loop.is_closed():
+            def cancel_all() -> None:
+                for task in asyncio.all_tasks(loop):
+                    task.cancel()
+            try:
+                loop.call_soon_threadsafe(cancel_all)
+            except RuntimeError:
+                pass
+            if wait:
+                thread.join(timeout=30)
+        logger.info("Relocation queue shut down")
+
+
+# Global instance
+relocation_queue = RelocationQueue()
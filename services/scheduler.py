@@ -8,13 +8,14 @@ from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, Callable
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.jobstores.memory import MemoryJobStore
 from apscheduler.executors.pool import ThreadPoolExecutor
 from sqlalchemy.orm import Session
 
 from config import settings
 from db.database import SessionLocal
-from db.models import ScheduleConfig, MonitoringCycle
+from db.models import ScheduleConfig
 
 logger = structlog.get_logger()
 
@@ -24,6 +25,9 @@ scheduler: Optional[BackgroundScheduler] = None
 # Job ID for the monitoring job
 MONITORING_JOB_ID = "monitoring_cycle"
 
+# Job ID for the site inventory refresh
+SITE_INVENTORY_JOB_ID = "site_inventory_refresh"
+
 
 def get_scheduler() -> Optional[BackgroundScheduler]:
     """Get the global scheduler instance."""
@@ -107,27 +111,21 @@ def build_cron_trigger(config: ScheduleConfig) -> Optional[CronTrigger]:
 
 def run_scheduled_monitoring_cycle():
     """
-    Execute a scheduled monitoring cycle.
-    This is the job function called by APScheduler.
+    Queue a scheduled monitoring cycle.
+    This is the job function called by APScheduler; the cycle itself runs
+    on the job runner, like manual and CLI cycles.
     """
-    logger.info("Starting scheduled monitoring cycle")
+    logger.info("Queueing scheduled monitoring cycle")
     
-    # Import here to avoid circular imports
-    from cli import MonitoringOrchestrator
+    from services.job_runner import job_runner
     
     db = SessionLocal()
     try:
-        # Create cycle record
-        cycle = MonitoringCycle(
-            started_at=datetime.utcnow(),
-            status="running",
-            triggered_by="scheduled"
-        )
-        
         # Get and snapshot schedule config
+        snapshot = None
         config = get_schedule_config(db)
         if config:
-            cycle.schedule_config_snapshot = {
+            snapshot = {
                 "schedule_type": config.schedule_type,
                 "daily_time": config.daily_time,
                 "weekly_days": config.weekly_days,
@@ -137,64 +135,34 @@ def run_scheduled_monitoring_cycle():
             }
             # Update last run time
             config.last_run_at = datetime.utcnow()
+            db.commit()
         
-        db.add(cycle)
-        db.commit()
-        db.refresh(cycle)
-        
-        cycle_id = cycle.id
-        logger.info("Created monitoring cycle record", cycle_id=cycle_id)
-        
+        job = job_runner.enqueue(db, triggered_by="scheduled", schedule_config_snapshot=snapshot)
+        logger.info("Queued scheduled monitoring job", job_id=job.id)
+    
     except Exception as e:
-        logger.error("Failed to create cycle record", error=str(e))
+        logger.error("Failed to queue scheduled monitoring cycle", error=str(e))
         db.rollback()
-        cycle_id = None
     finally:
         db.close()
+
+
+def run_site_inventory_refresh():
+    """
+    Refresh the site inventory.
+    This is the job function called by APScheduler between monitoring cycles,
+    so relocated forms are usually found before their old URL 404s.
+    """
+    from services.site_inventory import site_inventory
     
-    # Run the actual monitoring cycle
+    db = SessionLocal()
     try:
-        orchestrator = MonitoringOrchestrator()
-        stats = orchestrator.run_cycle(cycle_id=cycle_id)
-        
-        # Update cycle with results
-        db = SessionLocal()
-        try:
-            cycle = db.query(MonitoringCycle).filter_by(id=cycle_id).first()
-            if cycle:
-                cycle.completed_at = datetime.utcnow()
-                cycle.duration_seconds = (cycle.completed_at - cycle.started_at).total_seconds()
-                cycle.status = "completed"
-                cycle.total_urls_checked = stats.get("total", 0)
-                cycle.successful_checks = stats.get("successful", 0)
-                cycle.failed_checks = stats.get("failed", 0)
-                cycle.changes_detected = stats.get("changes", 0)
-                cycle.skipped_unchanged = stats.get("skipped", 0)
-                cycle.error_count = stats.get("errors", 0)
-                if stats.get("error_log"):
-                    cycle.error_log = stats["error_log"]
-                db.commit()
-                logger.info("Completed scheduled monitoring cycle", 
-                           cycle_id=cycle_id,
-                           duration=cycle.duration_seconds,
-                           changes=cycle.changes_detected)
-        finally:
-            db.close()
-            
+        site_inventory.refresh(db)
     except Exception as e:
-        logger.error("Scheduled monitoring cycle failed", error=str(e))
-        # Update cycle status to failed
-        db = SessionLocal()
-        try:
-            cycle = db.query(MonitoringCycle).filter_by(id=cycle_id).first()
-            if cycle:
-                cycle.completed_at = datetime.utcnow()
-                cycle.duration_seconds = (cycle.completed_at - cycle.started_at).total_seconds()
-                cycle.status = "failed"
-                cycle.error_log = str(e)
-                db.commit()
-        finally:
-            db.close()
+        logger.error("Site inventory refresh failed", error=str(e))
+        db.rollback()
+    finally:
+        db.close()
 
 
 def update_scheduler_job(config: Optional[ScheduleConfig] = None):
@@ -280,79 +248,19 @@ def get_next_run_time() -> Optional[datetime]:
 
 def trigger_manual_cycle(triggered_by: str = "manual") -> int:
     """
-    Trigger a monitoring cycle manually.
-    Returns the cycle ID.
+    Queue a monitoring cycle manually.
+    Returns the monitoring job ID.
     """
     logger.info("Triggering manual monitoring cycle", triggered_by=triggered_by)
     
-    # Import here to avoid circular imports
-    from cli import MonitoringOrchestrator
+    from services.job_runner import job_runner
     
     db = SessionLocal()
     try:
-        # Create cycle record
-        cycle = MonitoringCycle(
-            started_at=datetime.utcnow(),
-            status="running",
-            triggered_by=triggered_by
-        )
-        db.add(cycle)
-        db.commit()
-        db.refresh(cycle)
-        cycle_id = cycle.id
-        logger.info("Created manual monitoring cycle", cycle_id=cycle_id)
+        job = job_runner.enqueue(db, triggered_by=triggered_by)
+        return job.id
     finally:
         db.close()
-    
-    # Run in background thread to not block
-    import threading
-    
-    def run_cycle():
-        try:
-            orchestrator = MonitoringOrchestrator()
-            stats = orchestrator.run_cycle(cycle_id=cycle_id)
-            
-            # Update cycle with results
-            db = SessionLocal()
-            try:
-                cycle = db.query(MonitoringCycle).filter_by(id=cycle_id).first()
-                if cycle:
-                    cycle.completed_at = datetime.utcnow()
-                    cycle.duration_seconds = (cycle.completed_at - cycle.started_at).total_seconds()
-                    cycle.status = "completed"
-                    cycle.total_urls_checked = stats.get("total", 0)
-                    cycle.successful_checks = stats.get("successful", 0)
-                    cycle.failed_checks = stats.get("failed", 0)
-                    cycle.changes_detected = stats.get("changes", 0)
-                    cycle.skipped_unchanged = stats.get("skipped", 0)
-                    cycle.error_count = stats.get("errors", 0)
-                    if stats.get("error_log"):
-                        cycle.error_log = stats["error_log"]
-                    db.commit()
-                    logger.info("Completed manual monitoring cycle",
-                               cycle_id=cycle_id,
-                               duration=cycle.duration_seconds)
-            finally:
-                db.close()
-                
-        except Exception as e:
-            logger.error("Manual monitoring cycle failed", error=str(e))
-            db = SessionLocal()
-            try:
-                cycle = db.query(MonitoringCycle).filter_by(id=cycle_id).first()
-                if cycle:
-                    cycle.completed_at = datetime.utcnow()
-                    cycle.duration_seconds = (cycle.completed_at - cycle.started_at).total_seconds()
-                    cycle.status = "failed"
-                    cycle.error_log = str(e)
-                    db.commit()
-            finally:
-                db.close()
-    
-    thread = threading.Thread(target=run_cycle, daemon=True)
-    thread.start()
-    
-    return cycle_id
 
 
 def init_scheduler(app=None):
@@ -400,6 +308,19 @@ def init_scheduler(app=None):
     
     # Add monitoring job based on config
     update_scheduler_job()
+    
+    if settings.SITE_INVENTORY_ENABLED:
+        scheduler.add_job(
+            run_site_inventory_refresh,
+            trigger=IntervalTrigger(minutes=settings.SITE_INVENTORY_REFRESH_MINUTES),
+            id=SITE_INVENTORY_JOB_ID,
+            name="Site Inventory Refresh",
+            replace_existing=True
+        )
+        logger.info(
+            "Scheduled site inventory refresh",
+            interval_minutes=settings.SITE_INVENTORY_REFRESH_MINUTES
+        )
 
 
 def shutdown_scheduler():
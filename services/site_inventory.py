@@ -0,0 +1,485 @@
+"""
+Site Inventory Service
+
+Keeps a persistent map of the PDF links on monitored sites, so finding a
+relocated form is a database lookup instead of a live crawl.
+
+Index pages are the distinct MonitoredURL.parent_page_url values. A refresh
+re-fetches each one with a conditional GET: a 304, or a 200 whose HTML hashes
+the same as last time, costs no parsing and no writes. A changed page is
+diffed against its stored links; new links are added and links that
+disappeared get removed_at. New links are fingerprinted with the same 64KB
+quick hash the monitor stores in MonitoredURL.quick_hash.
+
+Relocation candidates for a monitored URL are, best first:
+1. fingerprint: a link whose quick hash equals the URL's (any domain)
+2. form_number: same form number on the URL's domain
+3. filename: same file name (ignoring case and separators) on the domain
+
+Only a fingerprint match relocates a URL. Form numbers and file names also
+match companion files (instructions, schedules): such candidates are
+quick-hashed first if they have no fingerprint yet, and the ones whose
+content doesn't match are recorded as relocation near-misses for review.
+
+When a monitored URL's link disappears from its page and candidates exist,
+they are recorded as near-misses too, so a move shows up before the old URL
+starts returning 404.
+"""
+
+import hashlib
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import unquote, urlparse
+
+import structlog
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, joinedload
+
+from config import settings
+from db.models import MonitoredURL, PDFVersion, SiteInventoryLink, SiteInventoryPage
+from diffing.quick_hasher import QuickHasher
+from services.link_crawler import LinkCrawler, PDFLinkInfo
+from services.url_state import url_state_tracker
+
+logger = structlog.get_logger()
+
+
+# Match kinds, strongest first
+MATCH_FINGERPRINT = "fingerprint"
+MATCH_FORM_NUMBER = "form_number"
+MATCH_FILENAME = "filename"
+MATCH_RANK = {MATCH_FINGERPRINT: 3, MATCH_FORM_NUMBER: 2, MATCH_FILENAME: 1}
+
+# Matches trusted to relocate a URL without a content comparison (a form
+# number also matches e.g. dr-314-instructions.pdf next to dr-314.pdf)
+STRONG_MATCHES = (MATCH_FINGERPRINT,)
+
+# Candidates recorded per moved URL
+MAX_RECORDED_CANDIDATES = 3
+
+
+def filename_key(url: str) -> Optional[str]:
+    """Lowercase file stem without extension or separators ("CIV-775 a.pdf" -> "civ775a")."""
+    name = unquote(urlparse(url).path.rsplit("/", 1)[-1]).lower()
+    if name.endswith(".pdf"):
+        name = name[:-4]
+    return re.sub(r"[-_.\s]", "", name) or None
+
+
+def url_domain(url: str) -> str:
+    """Lowercase host of a URL."""
+    return urlparse(url).netloc.lower()
+
+
+@dataclass
+class InventoryCandidate:
+    """A PDF link in the inventory that may be a monitored URL's new location."""
+    pdf_url: str
+    match: str  # fingerprint, form_number or filename
+    link_text: Optional[str] = None
+    page_url: Optional[str] = None
+    
+    @property
+    def strong(self) -> bool:
+        return self.match in STRONG_MATCHES
+
+
+class SiteInventory:
+    """
+    Persistent, incrementally refreshed inventory of PDF links on monitored sites.
+    """
+    
+    def __init__(
+        self,
+        crawler: Optional[LinkCrawler] = None,
+        quick_hasher: Optional[QuickHasher] = None
+    ):
+        """
+        Initialize the inventory.
+        
+        Args:
+            crawler: Fetches pages and extracts links (default: LinkCrawler())
+            quick_hasher: Fingerprints PDF links (default: QuickHasher())
+        """
+        self._crawler = crawler
+        self._quick_hasher = quick_hasher
+    
+    @property
+    def crawler(self) -> LinkCrawler:
+        if self._crawler is None:
+            self._crawler = LinkCrawler()
+        return self._crawler
+    
+    @property
+    def quick_hasher(self) -> QuickHasher:
+        if self._quick_hasher is None:
+            self._quick_hasher = QuickHasher()
+        return self._quick_hasher
+    
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+    
+    def index_page_urls(self, db: Session) -> List[str]:
+        """Distinct parent pages of enabled monitored URLs."""
+        rows = db.query(MonitoredURL.parent_page_url).filter(
+            MonitoredURL.enabled == True,
+            MonitoredURL.parent_page_url.isnot(None),
+            MonitoredURL.parent_page_url != ""
+        ).distinct().all()
+        return sorted(url for (url,) in rows)
+    
+    def refresh(
+        self,
+        db: Session,
+        page_urls: Optional[List[str]] = None,
+        fingerprint_limit: Optional[int] = None
+    ) -> Dict[str, int]:
+        """
+        Refresh index pages, fingerprint new links and flag moved URLs.
+        
+        Commits after each page.
+        
+        Args:
+            db: Database session
+            page_urls: Pages to refresh (default: all index pages)
+            fingerprint_limit: Links to fingerprint (default: SITE_INVENTORY_FINGERPRINTS_PER_REFRESH)
+        
+        Returns:
+            Dict of counts: pages, not_modified, changed, failed, links_added,
+            links_removed, fingerprinted, moves_detected
+        """
+        if page_urls is None:
+            page_urls = self.index_page_urls(db)
+        if fingerprint_limit is None:
+            fingerprint_limit = settings.SITE_INVENTORY_FINGERPRINTS_PER_REFRESH
+        
+        stats = dict.fromkeys(
+            ("pages", "not_modified", "changed", "failed", "links_added", "links_removed"), 0
+        )
+        last_request: Dict[str, float] = {}
+        
+        for page_url in page_urls:
+            # Be polite to each site; different sites don't wait on each other
+            domain = url_domain(page_url)
+            wait = settings.SITE_INVENTORY_REQUEST_DELAY - (time.monotonic() - last_request.get(domain, 0.0))
+            if wait > 0:
+                time.sleep(wait)
+            
+            try:
+                result = self.refresh_page(db, page_url)
+            except Exception as e:
+                db.rollback()
+                logger.warning("Site inventory page refresh failed", url=page_url, error=str(e))
+                result = {"failed": 1}
+            last_request[domain] = time.monotonic()
+            
+            stats["pages"] += 1
+            for key, value in result.items():
+                stats[key] += value
+        
+        stats["fingerprinted"] = self.fingerprint_links(db, limit=fingerprint_limit)
+        stats["moves_detected"] = self.detect_moves(db)
+        
+        logger.info("Site inventory refreshed", **stats)
+        return stats
+    
+    def refresh_page(self, db: Session, page_url: str) -> Dict[str, int]:
+        """
+        Conditionally re-fetch one index page and sync its PDF links.
+        
+        Commits.
+        
+        Args:
+            db: Database session
+            page_url: Index page URL
+        
+        Returns:
+            Counts for this page: one of not_modified/changed/failed, plus
+            links_added and links_removed for a changed page
+        """
+        page = db.query(SiteInventoryPage).filter(SiteInventoryPage.url == page_url).first()
+        if page is None:
+            page = SiteInventoryPage(url=page_url, domain=url_domain(page_url))
+            db.add(page)
+        
+        fetch = self.crawler.fetch_page_conditional(page_url, page.etag, page.last_modified_header)
+        now = datetime.utcnow()
+        page.last_checked_at = now
+        page.last_status_code = fetch.status_code
+        
+        if fetch.not_modified:
+            db.commit()
+            return {"not_modified": 1}
+        if fetch.html is None:
+            page.error = fetch.error
+            db.commit()
+            return {"failed": 1}
+        
+        page.etag = fetch.etag
+        page.last_modified_header = fetch.last_modified
+        page.error = None
+        
+        # Servers without validators still answer 200; skip parsing an identical body
+        content_hash = hashlib.sha256(fetch.html.encode("utf-8", errors="replace")).hexdigest()
+        if content_hash == page.content_hash:
+            db.commit()
+            return {"not_modified": 1}
+        page.content_hash = content_hash
+        
+        added, removed = self._sync_links(db, page, self.crawler.extract_pdf_links(fetch.html, page_url), now)
+        if added or removed:
+            page.last_changed_at = now
+        db.commit()
+        
+        logger.info("Site inventory page changed", url=page_url, links_added=added, links_removed=removed)
+        return {"changed": 1, "links_added": added, "links_removed": removed}
+    
+    def _sync_links(
+        self,
+        db: Session,
+        page: SiteInventoryPage,
+        pdf_links: List[PDFLinkInfo],
+        now: datetime
+    ) -> tuple:
+        """Bring a page's stored links in line with the links now on it. Returns (added, removed)."""
+        existing = {link.pdf_url: link for link in page.links}
+        seen = set()
+        added = removed = 0
+        
+        for info in pdf_links:
+            if info.url in seen:
+                continue
+            seen.add(info.url)
+            
+            link = existing.get(info.url)
+            if link is None:
+                link = SiteInventoryLink(page=page, domain=page.domain, pdf_url=info.url, first_seen_at=now)
+                db.add(link)
+                added += 1
+            elif link.removed_at is not None:
+                link.removed_at = None  # Linked again
+                added += 1
+            
+            link.last_seen_at = now
+            link.link_text = info.text or link.link_text
+            link.filename_key = filename_key(info.url)
+            link.form_number = info.form_number.upper() if info.form_number else None
+        
+        for pdf_url, link in existing.items():
+            if pdf_url not in seen and link.removed_at is None:
+                link.removed_at = now
+                removed += 1
+        
+        return added, removed
+    
+    def fingerprint_links(self, db: Session, limit: int) -> int:
+        """
+        Quick-hash current links that have no fingerprint yet, newest first.
+        
+        Commits. Links that fail to hash are retried on a later refresh.
+        
+        Returns:
+            Number of links fingerprinted
+        """
+        if limit <= 0:
+            return 0
+        
+        links = db.query(SiteInventoryLink).filter(
+            SiteInventoryLink.removed_at.is_(None),
+            SiteInventoryLink.quick_hash.is_(None)
+        ).order_by(SiteInventoryLink.first_seen_at.desc(), SiteInventoryLink.id.desc()).limit(limit).all()
+        
+        return self._fingerprint(db, links)
+    
+    def _fingerprint(self, db: Session, links: List[SiteInventoryLink]) -> int:
+        """Quick-hash links, committing after each. Returns the number hashed."""
+        fingerprinted = 0
+        for link in links:
+            result = self.quick_hasher.compute_quick_hash(link.pdf_url)
+            link.quick_hashed_at = datetime.utcnow()
+            if result.success:
+                link.quick_hash = result.quick_hash
+                fingerprinted += 1
+            db.commit()
+        return fingerprinted
+    
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+    
+    def lookup(self, db: Session, monitored_url: MonitoredURL) -> List[InventoryCandidate]:
+        """
+        Current inventory links that may be monitored_url's new location.
+        
+        Args:
+            db: Database session
+            monitored_url: URL whose form is being looked for
+        
+        Returns:
+            Candidates, strongest match first (then most recently seen)
+        """
+        # Form number from the latest extracted title, else from the file name
+        extracted = db.query(PDFVersion.form_number).filter(
+            PDFVersion.monitored_url_id == monitored_url.id,
+            PDFVersion.form_number.isnot(None)
+        ).order_by(PDFVersion.version_number.desc()).limit(1).scalar()
+        form_number = (
+            self.crawler.extract_form_number(extracted or "")
+            or self.crawler.extract_form_number(monitored_url.url.rsplit("/", 1)[-1])
+        )
+        form_number = form_number.upper() if form_number else None
+        key = filename_key(monitored_url.url)
+        domain = url_domain(monitored_url.url)
+        
+        on_domain = []
+        if form_number:
+            on_domain.append(SiteInventoryLink.form_number == form_number)
+        if key:
+            on_domain.append(SiteInventoryLink.filename_key == key)
+        conditions = []
+        if monitored_url.quick_hash:
+            conditions.append(SiteInventoryLink.quick_hash == monitored_url.quick_hash)
+        if on_domain:
+            conditions.append(and_(SiteInventoryLink.domain == domain, or_(*on_domain)))
+        if not conditions:
+            return []
+        
+        links = db.query(SiteInventoryLink).options(joinedload(SiteInventoryLink.page)).filter(
+            SiteInventoryLink.removed_at.is_(None),
+            SiteInventoryLink.pdf_url != monitored_url.url,
+            or_(*conditions)
+        ).all()
+        
+        best: Dict[str, tuple] = {}
+        for link in links:
+            if monitored_url.quick_hash and link.quick_hash == monitored_url.quick_hash:
+                match = MATCH_FINGERPRINT
+            elif form_number and link.domain == domain and link.form_number == form_number:
+                match = MATCH_FORM_NUMBER
+            else:
+                match = MATCH_FILENAME
+            
+            ranked = (MATCH_RANK[match], link.last_seen_at or datetime.min)
+            if link.pdf_url not in best or ranked > best[link.pdf_url][0]:
+                best[link.pdf_url] = (ranked, InventoryCandidate(
+                    pdf_url=link.pdf_url,
+                    match=match,
+                    link_text=link.link_text,
+                    page_url=link.page.url if link.page else None
+                ))
+        
+        return [candidate for _, candidate in sorted(best.values(), key=lambda item: item[0], reverse=True)]
+    
+    def find_relocated(self, db: Session, monitored_url: MonitoredURL) -> Optional[InventoryCandidate]:
+        """
+        Best strong candidate for a URL that stopped resolving.
+        
+        Re-checks the URL's parent page first (a conditional GET, so cheap
+        when it hasn't changed). Weaker candidates (form number, file name)
+        without a fingerprint are quick-hashed to compare their content;
+        those that don't match are recorded as near-misses. Commits.
+        
+        Returns:
+            Fingerprint match, or None (left to the similarity search)
+        """
+        if monitored_url.parent_page_url:
+            try:
+                self.refresh_page(db, monitored_url.parent_page_url)
+            except Exception as e:
+                db.rollback()
+                logger.warning(
+                    "Parent page refresh failed",
+                    url=monitored_url.parent_page_url,
+                    error=str(e)
+                )
+        
+        candidates = self.lookup(db, monitored_url)
+        if candidates and not candidates[0].strong and monitored_url.quick_hash:
+            unhashed = db.query(SiteInventoryLink).filter(
+                SiteInventoryLink.pdf_url.in_([c.pdf_url for c in candidates[:MAX_RECORDED_CANDIDATES]]),
+                SiteInventoryLink.removed_at.is_(None),
+                SiteInventoryLink.quick_hash.is_(None)
+            ).all()
+            if self._fingerprint(db, unhashed):
+                candidates = self.lookup(db, monitored_url)
+        
+        if candidates and candidates[0].strong:
+            return candidates[0]
+        if candidates:
+            self._record_candidates(db, monitored_url, candidates)
+            db.commit()
+        return None
+    
+    def _record_candidates(
+        self,
+        db: Session,
+        monitored_url: MonitoredURL,
+        candidates: List[InventoryCandidate]
+    ) -> bool:
+        """
+        Record candidates as monitored_url's relocation near-misses (not committed).
+        
+        Returns:
+            False if the same candidates were already recorded
+        """
+        candidates = candidates[:MAX_RECORDED_CANDIDATES]
+        previous = url_state_tracker.get_near_misses(db, monitored_url.id) or {}
+        candidate_urls = [c.pdf_url for c in candidates]
+        if previous.get("original_url") == monitored_url.url and \
+                [c.get("pdf_url") for c in previous.get("candidates", [])] == candidate_urls:
+            return False
+        
+        url_state_tracker.record_near_misses(db, monitored_url.id, {
+            "monitored_url_id": monitored_url.id,
+            "original_url": monitored_url.url,
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "source": "site_inventory",
+            "candidates": [
+                {"pdf_url": c.pdf_url, "match": c.match, "link_text": c.link_text}
+                for c in candidates
+            ],
+        })
+        return True
+    
+    def detect_moves(self, db: Session) -> int:
+        """
+        Record relocation candidates for monitored URLs no longer linked from their pages.
+        
+        Commits.
+        
+        Returns:
+            Number of URLs with newly recorded candidates
+        """
+        removed = db.query(SiteInventoryLink.pdf_url).filter(SiteInventoryLink.removed_at.isnot(None))
+        current = db.query(SiteInventoryLink.pdf_url).filter(SiteInventoryLink.removed_at.is_(None))
+        moved_urls = db.query(MonitoredURL).filter(
+            MonitoredURL.enabled == True,
+            MonitoredURL.url.in_(removed),
+            MonitoredURL.url.notin_(current)
+        ).all()
+        
+        recorded = 0
+        for monitored_url in moved_urls:
+            candidates = self.lookup(db, monitored_url)
+            if not candidates or not self._record_candidates(db, monitored_url, candidates):
+                continue
+            
+            recorded += 1
+            logger.info(
+                "Monitored URL no longer linked from its page",
+                url_id=monitored_url.id,
+                url=monitored_url.url,
+                best_candidate=candidates[0].pdf_url,
+                match=candidates[0].match
+            )
+        
+        db.commit()
+        return recorded
+
+
+# Global instance
+site_inventory = SiteInventory()
@@ -129,6 +129,9 @@ class TitleExtractor:
         """
         Convert the first page of a PDF to a PNG image.
         
+        Rendered through the shared page raster cache (150 DPI), so the visual
+        diff for this version can reuse the same raster later.
+        
         Args:
             pdf_path: Path to the PDF file
             output_path: Optional path to save the preview image
@@ -136,23 +139,14 @@ class TitleExtractor:
         Returns:
             PNG image bytes, or None if conversion fails
         """
+        from services.page_raster_cache import page_raster_cache
+        
         try:
-            import fitz  # PyMuPDF
-            
-            doc = fitz.open(pdf_path)
-            if len(doc) == 0:
-                logger.warning("PDF has no pages", path=str(pdf_path))
-                return None
-            
-            # Get first page
-            page = doc[0]
-            
             # Render at 150 DPI for good quality without huge file size
-            mat = fitz.Matrix(150/72, 150/72)
-            pix = page.get_pixmap(matrix=mat)
-            
-            # Convert to PNG bytes
-            img_bytes = pix.tobytes("png")
+            img_bytes = page_raster_cache.render_png(pdf_path, page_num=0, dpi=150)
+            if not img_bytes:
+                logger.warning("PDF has no renderable first page", path=str(pdf_path))
+                return None
             
             # Save to file if output path provided
             if output_path:
@@ -161,7 +155,6 @@ class TitleExtractor:
                     f.write(img_bytes)
                 logger.debug("Saved preview image", path=str(output_path))
             
-            doc.close()
             return img_bytes
             
         except Exception as e:
@@ -0,0 +1,237 @@
+"""
+URL Listing Service
+
+Keyset-paginated, server-filtered listing of monitored URLs for the
+dashboard and URL management views (and the /api/urls/page endpoint that
+loads further pages into them).
+
+Pages are ordered by (sort column, id) and continued from an opaque cursor
+holding the last row's sort value and id, so fetching page N costs the same
+as page 1 regardless of how many URLs exist.
+"""
+
+import base64
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+import structlog
+from sqlalchemy import and_, case, func, or_
+from sqlalchemy.orm import Query, Session
+
+from config import settings
+from db.models import MonitoredURL, URLCurrentState
+from services.url_state import url_state_tracker
+
+logger = structlog.get_logger()
+
+
+# Sortable columns: name -> (column, sentinel used in place of NULL)
+SORT_COLUMNS = {
+    "name": (MonitoredURL.name, ""),
+    "url": (MonitoredURL.url, ""),
+    "state": (MonitoredURL.state, ""),
+    "domain": (MonitoredURL.domain_category, ""),
+    "last_checked": (MonitoredURL.last_checked_at, datetime(1970, 1, 1)),
+    "last_change": (MonitoredURL.last_change_at, datetime(1970, 1, 1)),
+}
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor can't be decoded for the requested sort."""
+    pass
+
+
+@dataclass
+class URLFilters:
+    """Server-side filters shared by a page request and its summary."""
+    state: Optional[str] = None
+    domain: Optional[str] = None
+    search: Optional[str] = None
+    enabled_only: bool = False
+
+
+@dataclass
+class URLPage:
+    """One page of URL list items."""
+    items: List[dict] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+    limit: int = 0
+    sort: str = "name"
+    order: str = "asc"
+
+
+class URLListing:
+    """
+    Builds filtered, keyset-paginated URL lists joined with current state.
+    """
+    
+    def filtered_query(self, db: Session, filters: URLFilters) -> Query:
+        """MonitoredURL query with the filters applied."""
+        query = db.query(MonitoredURL)
+        
+        if filters.enabled_only:
+            query = query.filter(MonitoredURL.enabled == True)
+        
+        if filters.state:
+            query = query.filter(MonitoredURL.state == filters.state)
+        
+        if filters.domain:
+            query = query.filter(MonitoredURL.domain_category == filters.domain)
+        
+        search = (filters.search or "").strip()
+        if search:
+            query = query.filter(or_(
+                MonitoredURL.name.icontains(search, autoescape=True),
+                MonitoredURL.url.icontains(search, autoescape=True),
+                MonitoredURL.state.icontains(search, autoescape=True),
+                MonitoredURL.domain_category.icontains(search, autoescape=True)
+            ))
+        
+        return query
+    
+    def get_page(
+        self,
+        db: Session,
+        filters: URLFilters,
+        sort: str = "name",
+        order: str = "asc",
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        with_latest: bool = True
+    ) -> URLPage:
+        """
+        Fetch one page of URLs with their current state.
+        
+        Args:
+            db: Database session
+            filters: Server-side filters
+            sort: Key of SORT_COLUMNS
+            order: "asc" or "desc"
+            cursor: next_cursor from the previous page (None for the first page)
+            limit: Page size (defaults to URL_LIST_PAGE_SIZE, capped at URL_LIST_MAX_PAGE_SIZE)
+            with_latest: Eager-load each URL's latest version and change
+        
+        Returns:
+            URLPage whose items have url, version_count, pending_changes,
+            latest_version, recent_change and relocation_near_misses
+        """
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"Invalid sort. Must be one of: {list(SORT_COLUMNS)}")
+        if order not in ("asc", "desc"):
+            raise ValueError("Invalid order. Must be 'asc' or 'desc'")
+        
+        limit = max(1, min(limit or settings.URL_LIST_PAGE_SIZE, settings.URL_LIST_MAX_PAGE_SIZE))
+        column, sentinel = SORT_COLUMNS[sort]
+        sort_expr = func.coalesce(column, sentinel)
+        descending = order == "desc"
+        
+        query = self.filtered_query(db, filters)
+        
+        if cursor:
+            last_value, last_id = self.decode_cursor(cursor, sort)
+            if descending:
+                query = query.filter(or_(
+                    sort_expr < last_value,
+                    and_(sort_expr == last_value, MonitoredURL.id < last_id)
+                ))
+            else:
+                query = query.filter(or_(
+                    sort_expr > last_value,
+                    and_(sort_expr == last_value, MonitoredURL.id > last_id)
+                ))
+        
+        if descending:
+            query = query.order_by(sort_expr.desc(), MonitoredURL.id.desc())
+        else:
+            query = query.order_by(sort_expr.asc(), MonitoredURL.id.asc())
+        
+        # One extra row tells us whether another page exists
+        urls = query.limit(limit + 1).all()
+        has_more = len(urls) > limit
+        urls = urls[:limit]
+        
+        state_map = url_state_tracker.get_states(db, [url.id for url in urls], with_latest=with_latest)
+        
+        items = []
+        for url in urls:
+            url_state = state_map.get(url.id)
+            recent_change = url_state.latest_change if url_state and with_latest else None
+            items.append({
+                "url": url,
+                "version_count": url_state.version_count if url_state else 0,
+                "pending_changes": url_state.pending_review_count if url_state else 0,
+                "latest_version": url_state.latest_version if url_state and with_latest else None,
+                "recent_change": recent_change,
+                "relocation_near_misses": (
+                    url_state.relocation_near_misses
+                    if recent_change and recent_change.change_type == "relocation_failed"
+                    else None
+                )
+            })
+        
+        next_cursor = None
+        if has_more and urls:
+            last = urls[-1]
+            next_cursor = self.encode_cursor(getattr(last, column.key), last.id, sort, sentinel)
+        
+        return URLPage(items=items, next_cursor=next_cursor, limit=limit, sort=sort, order=order)
+    
+    def summarize(self, db: Session, filters: URLFilters) -> dict:
+        """
+        Totals over every URL matching the filters (not just one page).
+        
+        Returns:
+            Dict with total, enabled, total_versions and with_changes
+        """
+        matching = self.filtered_query(db, filters).with_entities(MonitoredURL.id).subquery()
+        total, enabled, versions, with_changes = db.query(
+            func.count(MonitoredURL.id),
+            func.coalesce(func.sum(case((MonitoredURL.enabled == True, 1), else_=0)), 0),
+            func.coalesce(func.sum(URLCurrentState.version_count), 0),
+            func.count(URLCurrentState.latest_change_id)
+        ).select_from(MonitoredURL).join(
+            matching, matching.c.id == MonitoredURL.id
+        ).outerjoin(
+            URLCurrentState, URLCurrentState.monitored_url_id == MonitoredURL.id
+        ).one()
+        
+        return {
+            "total": int(total),
+            "enabled": int(enabled),
+            "total_versions": int(versions),
+            "with_changes": int(with_changes)
+        }
+    
+    def encode_cursor(self, value: Any, url_id: int, sort: str, sentinel: Any = None) -> str:
+        """Opaque cursor for the row (value, url_id) under the given sort."""
+        if value is None:
+            value = sentinel
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        raw = json.dumps([sort, value, url_id]).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii")
+    
+    def decode_cursor(self, cursor: str, sort: str) -> Tuple[Any, int]:
+        """
+        Decode a cursor produced by encode_cursor.
+        
+        Raises:
+            InvalidCursorError: If the cursor is malformed or from another sort
+        """
+        try:
+            cursor_sort, value, url_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            if cursor_sort != sort:
+                raise InvalidCursorError("Cursor was issued for a different sort")
+            if isinstance(SORT_COLUMNS[sort][1], datetime):
+                value = datetime.fromisoformat(value)
+            return value, int(url_id)
+        except InvalidCursorError:
+            raise
+        except (ValueError, TypeError, KeyError) as e:
+            raise InvalidCursorError(f"Invalid cursor: {e}")
+
+
+# Global instance
+url_listing = URLListing()
@@ -0,0 +1,285 @@
+"""
+URL Current State Service
+
+Maintains the url_current_state table: one row per monitored URL with its
+latest version/change, counts, pending-review flag and last monitoring
+outcome. Writers update it incrementally so the dashboard, URL management
+and status views read a single table instead of aggregating over
+pdf_versions and change_logs.
+"""
+
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+import structlog
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload
+
+from db.models import ChangeLog, MonitoredURL, PDFVersion, URLCurrentState
+from db.upsert import dialect_insert, upsert
+
+logger = structlog.get_logger()
+
+_state_table = URLCurrentState.__table__
+
+
+class URLStateTracker:
+    """
+    Incremental maintenance and lookup of per-URL current state.
+    
+    Update methods execute on the caller's session and don't commit, so the
+    state change lands in the same transaction as the record that caused it.
+    """
+    
+    def _upsert(self, db: Session, url_id: int, values: dict, updates: Optional[dict] = None) -> None:
+        """Insert the URL's row with values, or apply updates if it exists."""
+        now = datetime.utcnow()
+        stmt = dialect_insert(db, URLCurrentState).values(monitored_url_id=url_id, updated_at=now, **values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["monitored_url_id"],
+            set_={**(updates if updates is not None else values), "updated_at": now}
+        )
+        db.execute(stmt)
+    
+    def record_version(self, db: Session, version: PDFVersion) -> None:
+        """A new version was created (call before committing it)."""
+        self._upsert(
+            db,
+            version.monitored_url_id,
+            {"latest_version_id": version.id, "version_count": 1},
+            {
+                "latest_version_id": version.id,
+                "version_count": _state_table.c.version_count + 1
+            }
+        )
+    
+    def record_change(self, db: Session, change_log: ChangeLog) -> None:
+        """A new change log was created (call after it has an ID)."""
+        pending = 1 if (change_log.review_status or "pending") == "pending" else 0
+        self._upsert(
+            db,
+            change_log.monitored_url_id,
+            {
+                "latest_change_id": change_log.id,
+                "change_count": 1,
+                "pending_review_count": pending,
+                "has_pending_review": bool(pending)
+            },
+            {
+                "latest_change_id": change_log.id,
+                "change_count": _state_table.c.change_count + 1,
+                "pending_review_count": _state_table.c.pending_review_count + pending,
+                "has_pending_review": (_state_table.c.pending_review_count + pending) > 0
+            }
+        )
+    
+    def refresh_pending(self, db: Session, url_ids: Iterable[int]) -> None:
+        """
+        Recompute pending-review counts for URLs whose changes were reviewed.
+        
+        Call after changing review_status; pending edits are flushed first.
+        """
+        url_ids = sorted(set(url_ids))
+        if not url_ids:
+            return
+        
+        db.flush()
+        counts = dict(
+            db.query(ChangeLog.monitored_url_id, func.count(ChangeLog.id))
+            .filter(
+                ChangeLog.monitored_url_id.in_(url_ids),
+                ChangeLog.review_status == "pending"
+            )
+            .group_by(ChangeLog.monitored_url_id)
+            .all()
+        )
+        for url_id in url_ids:
+            pending = counts.get(url_id, 0)
+            self._upsert(db, url_id, {
+                "pending_review_count": pending,
+                "has_pending_review": pending > 0
+            })
+    
+    def refresh_url(self, db: Session, url_id: int) -> None:
+        """
+        Recompute latest records and counts for one URL from history.
+        
+        Call after deleting versions or changes for the URL.
+        """
+        db.flush()
+        version_count, latest_version_id = db.query(
+            func.count(PDFVersion.id), func.max(PDFVersion.id)
+        ).filter(PDFVersion.monitored_url_id == url_id).one()
+        change_count, latest_change_id = db.query(
+            func.count(ChangeLog.id), func.max(ChangeLog.id)
+        ).filter(ChangeLog.monitored_url_id == url_id).one()
+        pending = db.query(func.count(ChangeLog.id)).filter(
+            ChangeLog.monitored_url_id == url_id,
+            ChangeLog.review_status == "pending"
+        ).scalar()
+        
+        self._upsert(db, url_id, {
+            "latest_version_id": latest_version_id,
+            "latest_change_id": latest_change_id,
+            "version_count": version_count,
+            "change_count": change_count,
+            "pending_review_count": pending,
+            "has_pending_review": pending > 0
+        })
+    
+    def record_outcome(
+        self,
+        db: Session,
+        url_id: int,
+        success: bool,
+        tier_reached: Optional[int] = None,
+        skip_reason: Optional[str] = None
+    ) -> None:
+        """Store the result of the URL's latest monitoring check."""
+        self.record_outcomes(db, [{
+            "monitored_url_id": url_id,
+            "success": success,
+            "tier_reached": tier_reached,
+            "skip_reason": skip_reason
+        }])
+    
+    def record_outcomes(self, db: Session, outcomes: Iterable[dict]) -> None:
+        """
+        Store the latest check results for many URLs in one upsert.
+        
+        Args:
+            db: Database session
+            outcomes: Dicts with monitored_url_id, success, tier_reached and skip_reason
+        """
+        now = datetime.utcnow()
+        latest = {}
+        for outcome in outcomes:
+            # One row per URL; a later outcome for the same URL wins
+            latest[outcome["monitored_url_id"]] = {
+                "monitored_url_id": outcome["monitored_url_id"],
+                "last_outcome": "success" if outcome["success"] else "failed",
+                "last_tier_reached": outcome.get("tier_reached"),
+                "last_skip_reason": outcome.get("skip_reason"),
+                "updated_at": now
+            }
+        upsert(db, URLCurrentState, list(latest.values()), index_elements=["monitored_url_id"])
+    
+    def record_near_misses(self, db: Session, url_id: int, payload: Optional[dict]) -> None:
+        """Store (or clear, with None) similarity candidates from a failed relocation."""
+        self._upsert(db, url_id, {"relocation_near_misses": payload})
+    
+    def get_near_misses(self, db: Session, url_id: int) -> Optional[dict]:
+        """Relocation near-misses for one URL, if any were recorded."""
+        return db.query(URLCurrentState.relocation_near_misses).filter(
+            URLCurrentState.monitored_url_id == url_id
+        ).scalar()
+    
+    def rebuild(self, db: Session) -> int:
+        """
+        Recompute every row from pdf_versions and change_logs.
+        
+        Used to backfill the table and to repair it after out-of-band edits
+        (scripts that delete changes or versions directly). Commits.
+        
+        Returns:
+            Number of URLs rebuilt
+        """
+        version_stats = {
+            url_id: (count, latest)
+            for url_id, count, latest in db.query(
+                PDFVersion.monitored_url_id,
+                func.count(PDFVersion.id),
+                func.max(PDFVersion.id)
+            ).group_by(PDFVersion.monitored_url_id).all()
+        }
+        change_stats = {
+            url_id: (count, latest)
+            for url_id, count, latest in db.query(
+                ChangeLog.monitored_url_id,
+                func.count(ChangeLog.id),
+                func.max(ChangeLog.id)
+            ).group_by(ChangeLog.monitored_url_id).all()
+        }
+        pending_counts = dict(
+            db.query(ChangeLog.monitored_url_id, func.count(ChangeLog.id))
+            .filter(ChangeLog.review_status == "pending")
+            .group_by(ChangeLog.monitored_url_id)
+            .all()
+        )
+        previous = {
+            row.monitored_url_id: row
+            for row in db.query(URLCurrentState).all()
+        }
+        
+        now = datetime.utcnow()
+        rows = []
+        for (url_id,) in db.query(MonitoredURL.id).all():
+            version_count, latest_version_id = version_stats.get(url_id, (0, None))
+            change_count, latest_change_id = change_stats.get(url_id, (0, None))
+            pending = pending_counts.get(url_id, 0)
+            old = previous.get(url_id)
+            rows.append({
+                "monitored_url_id": url_id,
+                "latest_version_id": latest_version_id,
+                "latest_change_id": latest_change_id,
+                "version_count": version_count,
+                "change_count": change_count,
+                "pending_review_count": pending,
+                "has_pending_review": pending > 0,
+                "last_tier_reached": old.last_tier_reached if old else None,
+                "last_outcome": old.last_outcome if old else None,
+                "last_skip_reason": old.last_skip_reason if old else None,
+                "relocation_near_misses": old.relocation_near_misses if old else None,
+                "updated_at": now
+            })
+        
+        db.query(URLCurrentState).delete(synchronize_session=False)
+        if rows:
+            db.bulk_insert_mappings(URLCurrentState, rows)
+        db.commit()
+        
+        logger.info("Rebuilt URL current state", urls=len(rows))
+        return len(rows)
+    
+    def get_states(
+        self,
+        db: Session,
+        url_ids: Iterable[int],
+        with_latest: bool = True
+    ) -> Dict[int, URLCurrentState]:
+        """
+        Load state rows for the given URLs.
+        
+        Args:
+            db: Database session
+            url_ids: URL IDs to load
+            with_latest: Eager-load latest_version and latest_change
+        
+        Returns:
+            Dict of url_id -> URLCurrentState (URLs without a row are absent)
+        """
+        url_ids = list(url_ids)
+        if not url_ids:
+            return {}
+        
+        query = db.query(URLCurrentState).filter(URLCurrentState.monitored_url_id.in_(url_ids))
+        if with_latest:
+            query = query.options(
+                joinedload(URLCurrentState.latest_version),
+                joinedload(URLCurrentState.latest_change)
+            )
+        states = query.all()
+        
+        return {state.monitored_url_id: state for state in states}
+    
+    def get_totals(self, db: Session) -> dict:
+        """Sum of version and change counts across all URLs."""
+        versions, changes = db.query(
+            func.coalesce(func.sum(URLCurrentState.version_count), 0),
+            func.coalesce(func.sum(URLCurrentState.change_count), 0)
+        ).one()
+        return {"total_versions": int(versions), "total_changes": int(changes)}
+
+
+# Global instance
+url_state_tracker = URLStateTracker()
@@ -5,15 +5,72 @@ Generates visual comparisons between PDF versions with yellow highlighting
 on changed areas.
 """
 
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, List, Tuple
-import io
+from typing import Callable, Dict, Iterable, Optional, List, Tuple
+import math
+import multiprocessing
+import threading
+import time
 
 import structlog
 
+from config import settings
+from services.page_raster_cache import PageRaster, page_raster_cache
+
 logger = structlog.get_logger()
 
+# Shared process pool for multi-page diffs (created on first use)
+_diff_pool: Optional[ProcessPoolExecutor] = None
+_diff_pool_lock = threading.Lock()
+
+
+def _get_diff_pool() -> Optional[ProcessPoolExecutor]:
+    """Get the shared diff process pool, or None if disabled."""
+    global _diff_pool
+    if settings.VISUAL_DIFF_WORKERS <= 0:
+        return None
+    with _diff_pool_lock:
+        if _diff_pool is None:
+            # spawn: the monitoring cycle is multi-threaded, forking it is unsafe
+            _diff_pool = ProcessPoolExecutor(
+                max_workers=settings.VISUAL_DIFF_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _diff_pool
+
+
+def _reset_diff_pool() -> None:
+    """Drop a broken pool so the next call creates a fresh one."""
+    global _diff_pool
+    with _diff_pool_lock:
+        if _diff_pool is not None:
+            _diff_pool.shutdown(wait=False, cancel_futures=True)
+            _diff_pool = None
+
+
+def _diff_page_worker(
+    old_pdf_path: Path,
+    new_pdf_path: Path,
+    output_path: Path,
+    page_num: int,
+    old_pdf_hash: Optional[str],
+    new_pdf_hash: Optional[str],
+    mode: str = "raster"
+) -> "VisualDiffResult":
+    """Process pool entry point: diff a single page."""
+    return VisualDiff().generate_page_diff(
+        old_pdf_path=old_pdf_path,
+        new_pdf_path=new_pdf_path,
+        output_path=output_path,
+        page_num=page_num,
+        old_pdf_hash=old_pdf_hash,
+        new_pdf_hash=new_pdf_hash,
+        mode=mode
+    )
+
 
 @dataclass
 class DiffRegion:
@@ -43,43 +100,39 @@ class VisualDiff:
     
     # Yellow highlight color (RGBA)
     HIGHLIGHT_COLOR = (255, 255, 0, 128)  # Semi-transparent yellow
+    # Orange-yellow outline around changed regions (RGB)
+    OUTLINE_COLOR = (255, 200, 0)
+    # Change mask is computed at 1/MASK_SCALE resolution
+    MASK_SCALE = 2
     
     def __init__(self):
         """Initialize the visual diff generator."""
+        self._text_extractor = None  # Created on first text diff
         logger.info("VisualDiff initialized")
     
-    def render_pdf_page(self, pdf_path: Path, page_num: int = 0, dpi: int = 150) -> Optional[bytes]:
+    def render_pdf_page(
+        self,
+        pdf_path: Path,
+        page_num: int = 0,
+        dpi: int = 150,
+        pdf_hash: Optional[str] = None
+    ) -> Optional[bytes]:
         """
         Render a PDF page to PNG image bytes.
         
+        Uses the shared page raster cache, so a page already rendered for a
+        preview, title extraction or an earlier diff is not rendered again.
+        
         Args:
             pdf_path: Path to the PDF file
             page_num: Page number (0-indexed)
             dpi: Resolution for rendering
+            pdf_hash: SHA-256 of the PDF if already known
             
         Returns:
             PNG image bytes or None if failed
         """
-        try:
-            import fitz  # PyMuPDF
-            
-            doc = fitz.open(pdf_path)
-            if page_num >= len(doc):
-                logger.warning("Page number out of range", page=page_num, total=len(doc))
-                return None
-            
-            page = doc[page_num]
-            mat = fitz.Matrix(dpi/72, dpi/72)
-            pix = page.get_pixmap(matrix=mat)
-            
-            img_bytes = pix.tobytes("png")
-            doc.close()
-            
-            return img_bytes
-            
-        except Exception as e:
-            logger.error("Failed to render PDF page", error=str(e))
-            return None
+        return page_raster_cache.render_png(pdf_path, page_num, dpi, pdf_hash)
     
     def compare_images(
         self, 
@@ -98,89 +151,179 @@ class VisualDiff:
         Returns:
             Tuple of (diff_image_bytes, changed_regions, change_percentage)
         """
-        try:
-            from PIL import Image, ImageDraw, ImageFilter
-            import numpy as np
-        except ImportError:
-            logger.error("PIL/numpy not available for image comparison")
-            raise ImportError("Pillow and numpy required for visual diff")
+        import cv2
+        import numpy as np
         
-        # Load images
-        img1 = Image.open(io.BytesIO(img1_bytes)).convert('RGB')
-        img2 = Image.open(io.BytesIO(img2_bytes)).convert('RGB')
+        old_arr = cv2.cvtColor(
+            cv2.imdecode(np.frombuffer(img1_bytes, np.uint8), cv2.IMREAD_COLOR),
+            cv2.COLOR_BGR2RGB
+        )
+        new_arr = cv2.cvtColor(
+            cv2.imdecode(np.frombuffer(img2_bytes, np.uint8), cv2.IMREAD_COLOR),
+            cv2.COLOR_BGR2RGB
+        )
         
-        # Resize to same dimensions if needed
-        if img1.size != img2.size:
-            # Use the larger dimensions
-            max_width = max(img1.width, img2.width)
-            max_height = max(img1.height, img2.height)
+        output, regions, change_percentage = self._diff_arrays(old_arr, new_arr, threshold)
+        return self._encode_png(output), regions, change_percentage
+    
+    def compare_rasters(
+        self,
+        old_raster: PageRaster,
+        new_raster: PageRaster,
+        threshold: int = 30
+    ) -> Tuple[bytes, List[DiffRegion], float]:
+        """
+        Compare two cached page rasters without a PNG round trip.
+        
+        Args:
+            old_raster: Rendered old page
+            new_raster: Rendered new page
+            threshold: Pixel difference threshold (0-255)
             
-            img1 = img1.resize((max_width, max_height), Image.Resampling.LANCZOS)
-            img2 = img2.resize((max_width, max_height), Image.Resampling.LANCZOS)
+        Returns:
+            Tuple of (diff_image_bytes, changed_regions, change_percentage)
+        """
+        output, regions, change_percentage = self._diff_arrays(
+            old_raster.as_array(),
+            new_raster.as_array(),
+            threshold
+        )
+        return self._encode_png(output), regions, change_percentage
+    
+    def _diff_arrays(
+        self,
+        old_arr: 'np.ndarray',
+        new_arr: 'np.ndarray',
+        threshold: int = 30
+    ) -> Tuple['np.ndarray', List[DiffRegion], float]:
+        """
+        Diff two uint8 page images and draw highlights on a copy of the new one.
         
-        # Convert to numpy arrays
-        arr1 = np.array(img1, dtype=np.int16)
-        arr2 = np.array(img2, dtype=np.int16)
+        The change mask and region search run at 1/MASK_SCALE resolution
+        (max-pooled, so thin strokes survive); only the overlay is drawn at
+        full resolution, and only inside the changed area.
         
-        # Calculate absolute difference
-        diff = np.abs(arr1 - arr2)
+        Returns:
+            Tuple of (RGB overlay array, changed_regions, change_percentage)
+        """
+        import cv2
+        import numpy as np
         
-        # Create mask of changed pixels (any channel exceeds threshold)
-        changed_mask = np.any(diff > threshold, axis=2)
+        old_arr = self._to_rgb(old_arr)
+        new_arr = self._to_rgb(new_arr)
         
-        # Calculate change percentage
-        total_pixels = changed_mask.size
-        changed_pixels = np.sum(changed_mask)
-        change_percentage = changed_pixels / total_pixels
+        # Resize to same dimensions if needed (use the larger dimensions)
+        if old_arr.shape != new_arr.shape:
+            height = max(old_arr.shape[0], new_arr.shape[0])
+            width = max(old_arr.shape[1], new_arr.shape[1])
+            old_arr = cv2.resize(old_arr, (width, height), interpolation=cv2.INTER_LINEAR)
+            new_arr = cv2.resize(new_arr, (width, height), interpolation=cv2.INTER_LINEAR)
         
-        # Create output image (copy of new version)
-        output = img2.copy().convert('RGBA')
+        height, width = new_arr.shape[:2]
         
-        # Create yellow highlight overlay
-        overlay = Image.new('RGBA', output.size, (0, 0, 0, 0))
-        overlay_arr = np.array(overlay)
+        # Per-pixel difference, max over channels (uint8 throughout)
+        channels = cv2.split(cv2.absdiff(old_arr, new_arr))
+        diff = cv2.max(cv2.max(channels[0], channels[1]), channels[2])
         
-        # Apply yellow highlight to changed areas
-        overlay_arr[changed_mask] = self.HIGHLIGHT_COLOR
+        change_percentage = cv2.countNonZero(
+            cv2.threshold(diff, threshold, 255, cv2.THRESH_BINARY)[1]
+        ) / diff.size
         
-        # Apply slight blur to smooth the highlights
-        overlay = Image.fromarray(overlay_arr, 'RGBA')
-        overlay = overlay.filter(ImageFilter.GaussianBlur(radius=2))
+        # Reduced-resolution mask: max-pool the difference in SCALE x SCALE blocks
+        scale = self.MASK_SCALE
+        pooled = cv2.dilate(
+            diff, np.ones((scale, scale), np.uint8), anchor=(0, 0)
+        )[::scale, ::scale]
+        mask = pooled > threshold
         
-        # Composite the highlight onto the image
-        output = Image.alpha_composite(output, overlay)
+        output = np.array(new_arr)  # Writable full-resolution copy
         
-        # Find bounding boxes of changed regions
-        changed_regions = self._find_changed_regions(changed_mask)
+        if change_percentage > 0 and mask.any():
+            self._highlight(output, mask, scale)
+        
+        # Find bounding boxes of changed regions (mapped back to full resolution)
+        changed_regions = self._find_changed_regions(mask, scale=scale)
         
         # Draw rectangles around significant changed regions
-        if changed_regions:
-            draw = ImageDraw.Draw(output)
-            for region in changed_regions:
-                draw.rectangle(
-                    [region.x, region.y, region.x + region.width, region.y + region.height],
-                    outline=(255, 200, 0, 255),  # Orange-yellow outline
-                    width=2
-                )
+        for region in changed_regions:
+            cv2.rectangle(
+                output,
+                (region.x, region.y),
+                (region.x + region.width, region.y + region.height),
+                self.OUTLINE_COLOR,
+                2
+            )
+        
+        return output, changed_regions, change_percentage
+    
+    def _highlight(self, output: 'np.ndarray', mask: 'np.ndarray', scale: int) -> None:
+        """Blend the yellow highlight into output where mask is set (in place)."""
+        import cv2
+        import numpy as np
         
-        # Convert back to PNG bytes
-        output_buffer = io.BytesIO()
-        output.save(output_buffer, format='PNG')
-        output_buffer.seek(0)
+        height, width = output.shape[:2]
+        rows = np.flatnonzero(mask.any(axis=1))
+        cols = np.flatnonzero(mask.any(axis=0))
+        
+        # Bounding box of all changes (full resolution) plus a margin for the blur
+        margin = 4
+        y0 = max(0, rows[0] * scale - margin)
+        y1 = min(height, (rows[-1] + 1) * scale + margin)
+        x0 = max(0, cols[0] * scale - margin)
+        x1 = min(width, (cols[-1] + 1) * scale + margin)
+        
+        # Upscale only the affected part of the mask, then soften the edges
+        small = mask[y0 // scale:-(-y1 // scale), x0 // scale:-(-x1 // scale)]
+        alpha = cv2.resize(
+            small.astype(np.uint8) * self.HIGHLIGHT_COLOR[3],
+            (small.shape[1] * scale, small.shape[0] * scale),
+            interpolation=cv2.INTER_NEAREST
+        )
+        alpha = alpha[y0 % scale:y0 % scale + (y1 - y0), x0 % scale:x0 % scale + (x1 - x0)]
+        alpha = cv2.GaussianBlur(alpha, (0, 0), 2)
         
-        return output_buffer.read(), changed_regions, change_percentage
+        # Blend in row strips so float temporaries stay small
+        highlight = np.array(self.HIGHLIGHT_COLOR[:3], dtype=np.float32)
+        strip = 128
+        for top in range(0, y1 - y0, strip):
+            roi = output[y0 + top:min(y1, y0 + top + strip), x0:x1]
+            weight = alpha[top:top + strip].astype(np.float32)[..., None] * (1.0 / 255.0)
+            roi[:] = (roi + (highlight - roi) * weight).astype(np.uint8)
+    
+    @staticmethod
+    def _to_rgb(arr: 'np.ndarray') -> 'np.ndarray':
+        """Ensure an (h, w, 3) RGB array."""
+        import cv2
+        
+        if arr.ndim == 2 or arr.shape[2] == 1:
+            return cv2.cvtColor(arr.reshape(arr.shape[0], arr.shape[1]), cv2.COLOR_GRAY2RGB)
+        if arr.shape[2] == 4:
+            return cv2.cvtColor(arr, cv2.COLOR_RGBA2RGB)
+        return arr
+    
+    @staticmethod
+    def _encode_png(arr: 'np.ndarray') -> bytes:
+        """Encode an RGB array as PNG bytes."""
+        import cv2
+        
+        ok, buffer = cv2.imencode('.png', cv2.cvtColor(arr, cv2.COLOR_RGB2BGR))
+        if not ok:
+            raise ValueError("Failed to encode diff image")
+        return buffer.tobytes()
     
     def _find_changed_regions(
         self, 
         mask: 'np.ndarray', 
-        min_area: int = 100
+        min_area: int = 100,
+        scale: int = 1
     ) -> List[DiffRegion]:
         """
         Find bounding boxes of changed regions in the mask.
         
         Args:
             mask: Boolean mask of changed pixels
-            min_area: Minimum area for a region to be reported
+            min_area: Minimum area (full-resolution pixels) for a region to be reported
+            scale: Downscale factor of the mask; regions are mapped back to full size
             
         Returns:
             List of DiffRegion objects
@@ -196,7 +339,8 @@ class VisualDiff:
         mask_uint8 = (mask.astype(np.uint8) * 255)
         
         # Apply morphological operations to clean up
-        kernel = np.ones((5, 5), np.uint8)
+        kernel_size = max(3, 5 // scale)
+        kernel = np.ones((kernel_size, kernel_size), np.uint8)
         mask_uint8 = cv2.dilate(mask_uint8, kernel, iterations=2)
         mask_uint8 = cv2.erode(mask_uint8, kernel, iterations=1)
         
@@ -210,6 +354,7 @@ class VisualDiff:
         regions = []
         for contour in contours:
             x, y, w, h = cv2.boundingRect(contour)
+            x, y, w, h = x * scale, y * scale, w * scale, h * scale
             area = w * h
             
             if area >= min_area:
@@ -227,7 +372,9 @@ class VisualDiff:
         old_pdf_path: Path,
         new_pdf_path: Path,
         output_path: Path,
-        page_num: int = 0
+        page_num: int = 0,
+        old_pdf_hash: Optional[str] = None,
+        new_pdf_hash: Optional[str] = None
     ) -> VisualDiffResult:
         """
         Generate a visual diff image comparing two PDF versions.
@@ -237,6 +384,8 @@ class VisualDiff:
             new_pdf_path: Path to the new PDF version
             output_path: Path to save the diff image
             page_num: Page number to compare (0-indexed)
+            old_pdf_hash: SHA-256 of the old PDF if known (raster cache key)
+            new_pdf_hash: SHA-256 of the new PDF if known (raster cache key)
             
         Returns:
             VisualDiffResult with diff details
@@ -250,8 +399,8 @@ class VisualDiff:
             )
             
             # Render both pages
-            old_img = self.render_pdf_page(old_pdf_path, page_num)
-            new_img = self.render_pdf_page(new_pdf_path, page_num)
+            old_img = page_raster_cache.render(old_pdf_path, page_num, pdf_hash=old_pdf_hash)
+            new_img = page_raster_cache.render(new_pdf_path, page_num, pdf_hash=new_pdf_hash)
             
             if not old_img:
                 return VisualDiffResult(
@@ -266,7 +415,9 @@ class VisualDiff:
                 )
             
             # Compare and generate diff
-            diff_bytes, regions, change_pct = self.compare_images(old_img, new_img)
+            diff_bytes, regions, change_pct = self.compare_rasters(old_img, new_img)
+            for region in regions:
+                region.page = page_num
             
             # Save diff image
             output_path.parent.mkdir(parents=True, exist_ok=True)
@@ -294,12 +445,371 @@ class VisualDiff:
                 error=str(e)
             )
     
+    def generate_page_diff(
+        self,
+        old_pdf_path: Path,
+        new_pdf_path: Path,
+        output_path: Path,
+        page_num: int = 0,
+        old_pdf_hash: Optional[str] = None,
+        new_pdf_hash: Optional[str] = None,
+        mode: Optional[str] = None
+    ) -> VisualDiffResult:
+        """
+        Generate an overlay diff for one page using the configured mode.
+        
+        Args:
+            mode: "text" (word alignment) or "raster" (pixels); None uses
+                  VISUAL_DIFF_MODE. Other args as in generate_diff().
+        """
+        mode = mode or settings.VISUAL_DIFF_MODE
+        if mode == "text":
+            return self.generate_text_diff(
+                old_pdf_path, new_pdf_path, output_path, page_num,
+                old_pdf_hash, new_pdf_hash
+            )
+        return self.generate_diff(
+            old_pdf_path, new_pdf_path, output_path, page_num,
+            old_pdf_hash, new_pdf_hash
+        )
+    
+    def generate_text_diff(
+        self,
+        old_pdf_path: Path,
+        new_pdf_path: Path,
+        output_path: Optional[Path] = None,
+        page_num: int = 0,
+        old_pdf_hash: Optional[str] = None,
+        new_pdf_hash: Optional[str] = None,
+        dpi: int = 150
+    ) -> VisualDiffResult:
+        """
+        Diff a page by aligning its words instead of comparing pixels.
+        
+        Anti-aliasing and one-pixel font shifts never show up as changes.
+        Changed regions are reported in pixels of the page rendered at dpi
+        (origin top-left), like the raster diff's.
+        Highlights are drawn on the cached raster of the new page; with no
+        output_path nothing is rendered. Pages without extractable words
+        (scans) fall back to the raster diff.
+        
+        Args:
+            old_pdf_path: Path to the old PDF version
+            new_pdf_path: Path to the new PDF version
+            output_path: Path to save the diff image (None = regions only)
+            page_num: Page number to compare (0-indexed)
+            old_pdf_hash: SHA-256 of the old PDF if known (raster cache key)
+            new_pdf_hash: SHA-256 of the new PDF if known (raster cache key)
+            dpi: Resolution of the highlighted image and of the reported regions
+            
+        Returns:
+            VisualDiffResult with diff details
+        """
+        from pdf_processing.text_extractor import TextExtractor
+        
+        try:
+            extractor = self._text_extractor or TextExtractor()
+            self._text_extractor = extractor
+            
+            old_words = extractor.extract_words(old_pdf_path, page_num + 1)
+            new_words = extractor.extract_words(new_pdf_path, page_num + 1)
+            
+            if not old_words or not new_words:
+                if output_path is None:
+                    return VisualDiffResult(
+                        success=False,
+                        error="No words on page for text diff"
+                    )
+                logger.info("No words on page, using raster diff", page=page_num)
+                return self.generate_diff(
+                    old_pdf_path, new_pdf_path, output_path, page_num,
+                    old_pdf_hash, new_pdf_hash
+                )
+            
+            regions, changed_words = self._diff_words(old_words, new_words, page_num, dpi / 72)
+            change_pct = changed_words / max(len(old_words), len(new_words))
+            
+            if output_path is None:
+                return VisualDiffResult(
+                    success=True,
+                    changed_regions=regions,
+                    change_percentage=change_pct
+                )
+            
+            raster = page_raster_cache.render(new_pdf_path, page_num, dpi, pdf_hash=new_pdf_hash)
+            if raster is None:
+                return VisualDiffResult(
+                    success=False,
+                    error="Failed to render new PDF"
+                )
+            
+            output = self._draw_regions(raster.as_array(), regions)
+            
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(output_path, 'wb') as f:
+                f.write(self._encode_png(output))
+            
+            logger.info(
+                "Text diff generated",
+                output=str(output_path),
+                change_percentage=f"{change_pct:.1%}",
+                regions=len(regions)
+            )
+            
+            return VisualDiffResult(
+                success=True,
+                diff_image_path=output_path,
+                changed_regions=regions,
+                change_percentage=change_pct
+            )
+            
+        except Exception as e:
+            logger.exception("Failed to generate text diff", error=str(e))
+            return VisualDiffResult(
+                success=False,
+                error=str(e)
+            )
+    
+    def _diff_words(
+        self,
+        old_words: list,
+        new_words: list,
+        page_num: int,
+        scale: float
+    ) -> Tuple[List[DiffRegion], int]:
+        """
+        Align two word sequences and box the words that differ.
+        
+        Inserted/replaced words are boxed where they are on the new page;
+        deleted words are boxed where they were on the old page. Runs of
+        changed words on the same line are merged into one region.
+        
+        Args:
+            old_words: Words of the old page (boxes in PDF points)
+            new_words: Words of the new page (boxes in PDF points)
+            page_num: Page number for the regions
+            scale: Pixels per PDF point of the rendered page (dpi / 72)
+        
+        Returns:
+            Tuple of (regions in pixels, number of changed words)
+        """
+        import difflib
+        
+        matcher = difflib.SequenceMatcher(
+            None,
+            [w.text for w in old_words],
+            [w.text for w in new_words],
+            autojunk=False
+        )
+        
+        boxes = []
+        changed_words = 0
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == 'equal':
+                continue
+            changed = new_words[j1:j2] if j2 > j1 else old_words[i1:i2]
+            changed_words += max(i2 - i1, j2 - j1)
+            boxes.extend(self._merge_line_boxes(changed))
+        
+        regions = []
+        for box in boxes:
+            x0, top, x1, bottom = (value * scale for value in box)
+            regions.append(DiffRegion(
+                x=math.floor(x0),
+                y=math.floor(top),
+                width=math.ceil(x1) - math.floor(x0),
+                height=math.ceil(bottom) - math.floor(top),
+                page=page_num
+            ))
+        
+        return regions, changed_words
+    
+    @staticmethod
+    def _merge_line_boxes(words: list) -> List[Tuple[float, float, float, float]]:
+        """Union consecutive words that sit on the same line."""
+        boxes: List[List[float]] = []
+        for word in words:
+            if boxes:
+                last = boxes[-1]
+                line_height = last[3] - last[1]
+                same_line = abs(word.top - last[1]) <= line_height * 0.5
+                if same_line and word.x0 >= last[0]:
+                    last[1] = min(last[1], word.top)
+                    last[2] = max(last[2], word.x1)
+                    last[3] = max(last[3], word.bottom)
+                    continue
+            boxes.append([word.x0, word.top, word.x1, word.bottom])
+        return [tuple(box) for box in boxes]
+    
+    def _draw_regions(
+        self,
+        page_arr: 'np.ndarray',
+        regions: List[DiffRegion]
+    ) -> 'np.ndarray':
+        """Highlight regions given in pixels on a copy of a page raster."""
+        import cv2
+        import numpy as np
+        
+        output = np.array(self._to_rgb(page_arr))
+        if not regions:
+            return output
+        
+        height, width = output.shape[:2]
+        pad = 2
+        boxes = []
+        for region in regions:
+            x0 = max(0, region.x - pad)
+            y0 = max(0, region.y - pad)
+            x1 = min(width, region.x + region.width + pad)
+            y1 = min(height, region.y + region.height + pad)
+            if x1 > x0 and y1 > y0:
+                boxes.append((x0, y0, x1, y1))
+        
+        if not boxes:
+            return output
+        
+        mask_scale = self.MASK_SCALE
+        mask = np.zeros((-(-height // mask_scale), -(-width // mask_scale)), dtype=bool)
+        for x0, y0, x1, y1 in boxes:
+            mask[y0 // mask_scale:-(-y1 // mask_scale), x0 // mask_scale:-(-x1 // mask_scale)] = True
+        self._highlight(output, mask, mask_scale)
+        
+        for x0, y0, x1, y1 in boxes:
+            cv2.rectangle(output, (x0, y0), (x1, y1), self.OUTLINE_COLOR, 2)
+        
+        return output
+    
+    def generate_page_diffs(
+        self,
+        old_pdf_path: Path,
+        new_pdf_path: Path,
+        pages: Iterable[int],
+        output_path_for: Callable[[int], Path],
+        old_pdf_hash: Optional[str] = None,
+        new_pdf_hash: Optional[str] = None,
+        max_pages: Optional[int] = None,
+        time_budget: Optional[float] = None,
+        mode: Optional[str] = None
+    ) -> Dict[int, VisualDiffResult]:
+        """
+        Generate overlay diffs for several pages, in parallel in the shared
+        process pool.
+        
+        Pages beyond max_pages are skipped and pages not finished within the
+        time budget are left to be rendered on demand by the preview endpoint.
+        
+        Args:
+            old_pdf_path: Path to the old PDF version
+            new_pdf_path: Path to the new PDF version
+            pages: Page numbers to compare (0-indexed)
+            output_path_for: Maps a page number to its diff image path
+            old_pdf_hash: SHA-256 of the old PDF if known (raster cache key)
+            new_pdf_hash: SHA-256 of the new PDF if known (raster cache key)
+            max_pages: Maximum pages to diff (None uses config default)
+            time_budget: Seconds to wait for all pages (None uses config default)
+            mode: "text" or "raster" (None uses VISUAL_DIFF_MODE)
+            
+        Returns:
+            Dict of page number -> VisualDiffResult for the pages that finished
+        """
+        if max_pages is None:
+            max_pages = settings.VISUAL_DIFF_MAX_PAGES
+        if time_budget is None:
+            time_budget = settings.VISUAL_DIFF_TIME_BUDGET_SECONDS
+        mode = mode or settings.VISUAL_DIFF_MODE
+        
+        page_list = sorted(set(pages))
+        if max_pages > 0 and len(page_list) > max_pages:
+            logger.info(
+                "Limiting visual diff pages",
+                requested=len(page_list),
+                max_pages=max_pages
+            )
+            page_list = page_list[:max_pages]
+        
+        if not page_list:
+            return {}
+        
+        jobs = {
+            page: (old_pdf_path, new_pdf_path, output_path_for(page), page, old_pdf_hash, new_pdf_hash, mode)
+            for page in page_list
+        }
+        
+        # A single page isn't worth the round trip to another process
+        pool = _get_diff_pool() if len(page_list) > 1 else None
+        if pool is None:
+            return self._generate_page_diffs_serial(jobs, time_budget)
+        
+        deadline = time.monotonic() + time_budget if time_budget > 0 else None
+        results: Dict[int, VisualDiffResult] = {}
+        
+        try:
+            futures = {pool.submit(_diff_page_worker, *args): page for page, args in jobs.items()}
+        except (BrokenProcessPool, RuntimeError) as e:
+            logger.warning("Diff process pool unavailable, diffing in-process", error=str(e))
+            _reset_diff_pool()
+            return self._generate_page_diffs_serial(jobs, time_budget)
+        
+        pending = set(futures)
+        while pending:
+            timeout = None
+            if deadline is not None:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                page = futures[future]
+                try:
+                    results[page] = future.result()
+                except BrokenProcessPool as e:
+                    _reset_diff_pool()
+                    results[page] = VisualDiffResult(success=False, error=str(e))
+                except Exception as e:
+                    results[page] = VisualDiffResult(success=False, error=str(e))
+        
+        if pending:
+            for future in pending:
+                future.cancel()
+            logger.warning(
+                "Visual diff time budget exceeded",
+                budget_seconds=time_budget,
+                finished=len(results),
+                skipped_pages=sorted(futures[f] for f in pending)
+            )
+        
+        return results
+    
+    def _generate_page_diffs_serial(
+        self,
+        jobs: Dict[int, tuple],
+        time_budget: float
+    ) -> Dict[int, VisualDiffResult]:
+        """In-process fallback for generate_page_diffs()."""
+        deadline = time.monotonic() + time_budget if time_budget > 0 else None
+        results: Dict[int, VisualDiffResult] = {}
+        
+        for page, args in jobs.items():
+            if deadline is not None and time.monotonic() >= deadline:
+                logger.warning(
+                    "Visual diff time budget exceeded",
+                    budget_seconds=time_budget,
+                    finished=len(results),
+                    skipped_pages=[p for p in jobs if p not in results]
+                )
+                break
+            results[page] = self.generate_page_diff(*args)
+        
+        return results
+    
     def generate_side_by_side(
         self,
         old_pdf_path: Path,
         new_pdf_path: Path,
         output_path: Path,
-        page_num: int = 0
+        page_num: int = 0,
+        old_pdf_hash: Optional[str] = None,
+        new_pdf_hash: Optional[str] = None
     ) -> VisualDiffResult:
         """
         Generate a side-by-side comparison image with highlights.
@@ -309,6 +819,8 @@ class VisualDiff:
             new_pdf_path: Path to the new PDF version
             output_path: Path to save the comparison image
             page_num: Page number to compare
+            old_pdf_hash: SHA-256 of the old PDF if known (raster cache key)
+            new_pdf_hash: SHA-256 of the new PDF if known (raster cache key)
             
         Returns:
             VisualDiffResult with comparison details
@@ -323,24 +835,26 @@ class VisualDiff:
         
         try:
             # Render both pages
-            old_img_bytes = self.render_pdf_page(old_pdf_path, page_num)
-            new_img_bytes = self.render_pdf_page(new_pdf_path, page_num)
+            old_raster = page_raster_cache.render(old_pdf_path, page_num, pdf_hash=old_pdf_hash)
+            new_raster = page_raster_cache.render(new_pdf_path, page_num, pdf_hash=new_pdf_hash)
             
-            if not old_img_bytes or not new_img_bytes:
+            if not old_raster or not new_raster:
                 return VisualDiffResult(
                     success=False,
                     error="Failed to render PDF pages"
                 )
             
             # Generate diff overlay for the new image
-            diff_bytes, regions, change_pct = self.compare_images(
-                old_img_bytes, 
-                new_img_bytes
+            diff_arr, regions, change_pct = self._diff_arrays(
+                old_raster.as_array(),
+                new_raster.as_array()
             )
+            for region in regions:
+                region.page = page_num
             
-            # Load images
-            old_img = Image.open(io.BytesIO(old_img_bytes)).convert('RGB')
-            diff_img = Image.open(io.BytesIO(diff_bytes)).convert('RGB')
+            # Wrap arrays as images (no PNG round trip)
+            old_img = Image.fromarray(self._to_rgb(old_raster.as_array()))
+            diff_img = Image.fromarray(diff_arr)
             
             # Create side-by-side image
             gap = 20
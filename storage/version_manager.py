@@ -10,9 +10,13 @@ from typing import Optional
 from sqlalchemy.orm import Session
 import structlog
 
+from config import settings
 from db.models import MonitoredURL, PDFVersion, ChangeLog
 from diffing.hasher import HashResult
 from diffing.change_detector import ChangeResult
+from services.form_fingerprints import form_fingerprint_index
+from services.local_search import local_search_service
+from services.url_state import url_state_tracker
 from storage.file_store import FileStore
 
 logger = structlog.get_logger()
@@ -138,6 +142,28 @@ class VersionManager:
         version.normalized_pdf_path = str(stored_normalized.relative_to(self.file_store.storage_path))
         version.extracted_text_path = str(stored_text.relative_to(self.file_store.storage_path))
         
+        url_state_tracker.record_version(db, version)
+        
+        if settings.FORM_FINGERPRINT_ENABLED:
+            try:
+                # Savepoint, so a failure only rolls back the fingerprint rows
+                with db.begin_nested():
+                    form_fingerprint_index.index_version(db, version, extracted_text)
+            except Exception as e:
+                # The index can be rebuilt later; never lose the version over it
+                logger.warning("Form fingerprinting failed", version_id=version.id, error=str(e))
+        
+        if settings.LOCAL_SEARCH_ENABLED:
+            try:
+                # Table first: SQLite can't roll back to a savepoint that
+                # created a virtual table without failing the commit
+                local_search_service.ensure_table(db)
+                with db.begin_nested():
+                    local_search_service.index_version(db, version, extracted_text)
+            except Exception as e:
+                # The search table can be rebuilt later
+                logger.warning("Local search indexing failed", version_id=version.id, error=str(e))
+        
         db.commit()
         
         logger.info(
@@ -183,6 +209,8 @@ class VersionManager:
         )
         
         db.add(change_log)
+        db.flush()  # Get the ID
+        url_state_tracker.record_change(db, change_log)
         
         # Update monitored URL last change timestamp
         monitored_url.last_change_at = datetime.utcnow()
@@ -413,6 +441,7 @@ class VersionManager:
             db.delete(version)
             deleted += 1
         
+        url_state_tracker.refresh_url(db, url_id)
         db.commit()
         
         logger.info(
@@ -0,0 +1,36 @@
+"""
+Shared test fixtures.
+"""
+
+import pytest
+
+# Test imports
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """Sessions on a throwaway SQLite file configured like the app database."""
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.orm import sessionmaker
+    from db.database import Base, _configure_sqlite
+    from db import models  # noqa: F401 - Import to register models
+    
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'test.db'}",
+        connect_args={"check_same_thread": False}
+    )
+    event.listen(engine, "connect", _configure_sqlite)
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def db(session_factory):
+    """Session on a throwaway SQLite database."""
+    session = session_factory()
+    yield session
+    session.close()
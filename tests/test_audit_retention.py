@@ -0,0 +1,121 @@
+"""
+Tests for compacting old per-URL cycle results into daily rollups.
+"""
+
+import asyncio
+import pytest
+from datetime import datetime, timedelta
+
+# Test imports
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+URLS = [("Alaska", 3), ("Texas", 2), (None, 1)]
+
+
+@pytest.fixture(autouse=True)
+def cycles(db):
+    """6 URLs and one cycle a day for the last 10 days."""
+    from db.models import MonitoredURL, MonitoringCycle, CycleURLResult
+    
+    urls = []
+    for state, count in URLS:
+        for i in range(count):
+            urls.append(MonitoredURL(name=f"{state} {i}", url=f"https://example.com/{state}/{i}.pdf", state=state))
+    db.add_all(urls)
+    db.flush()
+    
+    now = datetime.utcnow()
+    for days_ago in range(10):
+        cycle = MonitoringCycle(
+            started_at=now - timedelta(days=days_ago, hours=1),
+            status="completed",
+            triggered_by="scheduled",
+            total_urls_checked=len(urls),
+            successful_checks=len(urls) - 1,
+            failed_checks=1,
+            changes_detected=1,
+            duration_seconds=30.0 + days_ago
+        )
+        db.add(cycle)
+        db.flush()
+        for n, url in enumerate(urls):
+            db.add(CycleURLResult(
+                cycle_id=cycle.id,
+                monitored_url_id=url.id,
+                status="failed" if n == 0 else "success",
+                skip_reason="headers_match" if n % 2 else None,
+                change_detected=n == 1,
+                bytes_fetched=100,
+                duration_ms=10
+            ))
+    db.commit()
+
+
+class TestAuditRetention:
+    """Tests for AuditRetention."""
+    
+    def test_compacts_only_cycles_past_retention(self, db):
+        """Old cycles' detail is folded into per-state rollups and deleted."""
+        from db.models import CycleResultRollup, CycleURLResult, MonitoringCycle
+        from services.audit_retention import AuditRetention
+        
+        summary = AuditRetention().compact(db, retention_days=5, batch_size=4)
+        
+        # Cycles 5..9 days old are past a 5-day window
+        assert summary == {"cycles_compacted": 5, "results_folded": 30, "results_deleted": 30}
+        assert db.query(CycleURLResult).count() == 30
+        assert db.query(MonitoringCycle).count() == 10
+        assert db.query(MonitoringCycle).filter(MonitoringCycle.results_compacted_at.isnot(None)).count() == 5
+        
+        alaska = db.query(CycleResultRollup).filter(CycleResultRollup.state == "Alaska").all()
+        assert len(alaska) == 5
+        assert sum(r.url_checks for r in alaska) == 15
+        assert sum(r.failed_checks for r in alaska) == 5
+        assert sum(r.bytes_fetched for r in alaska) == 1500
+        assert {r.state for r in db.query(CycleResultRollup).all()} == {"Alaska", "Texas", ""}
+    
+    def test_rerun_does_not_double_count(self, db):
+        """A cycle folded before a crash is not folded again."""
+        from db.models import CycleResultRollup, CycleURLResult, MonitoringCycle
+        from services.audit_retention import AuditRetention
+        
+        retention = AuditRetention()
+        oldest = db.query(MonitoringCycle).order_by(MonitoringCycle.started_at).first()
+        retention.compact_cycle(db, oldest)  # Crash before the detail is deleted
+        
+        summary = retention.compact(db, retention_days=8)
+        again = retention.compact(db, retention_days=8)
+        
+        assert summary["cycles_compacted"] == 1
+        assert summary["results_deleted"] == 12
+        assert again == {"cycles_compacted": 0, "results_folded": 0, "results_deleted": 0}
+        assert sum(r.url_checks for r in db.query(CycleResultRollup).all()) == 12
+        assert db.query(CycleURLResult).count() == 48
+    
+    def test_disabled_with_zero_days(self, db):
+        """A zero retention window keeps everything."""
+        from db.models import CycleURLResult
+        from services.audit_retention import AuditRetention
+        
+        assert AuditRetention().compact(db, retention_days=0)["cycles_compacted"] == 0
+        assert db.query(CycleURLResult).count() == 60
+    
+    def test_audit_numbers_unchanged(self, db):
+        """Audit stats, trends and daily results read the same after compaction."""
+        from api import routes
+        from services.audit_retention import AuditRetention
+        
+        retention = AuditRetention()
+        stats_before = asyncio.run(routes.get_audit_stats(db=db))
+        trends_before = asyncio.run(routes.get_audit_trends(period="daily", days=30, db=db))["data"]
+        daily_before = retention.get_daily_results(db, days=30)
+        
+        retention.compact(db, retention_days=3)
+        
+        assert asyncio.run(routes.get_audit_stats(db=db)) == stats_before
+        assert asyncio.run(routes.get_audit_trends(period="daily", days=30, db=db))["data"] == trends_before
+        assert retention.get_daily_results(db, days=30) == daily_before
+        assert len(daily_before) == 30  # 10 days x 3 states
@@ -0,0 +1,164 @@
+"""
+Tests for best-first candidate ranking in the similarity relocation search.
+"""
+
+import asyncio
+from unittest.mock import patch
+
+# Test imports
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+FAILED_URL = "https://courts.example.gov/forms/civil/civ-775.pdf"
+REFERENCE = b"%PDF-reference"
+
+
+class TestCandidateQueue:
+    """Tests for cheap-signal scoring."""
+    
+    def test_same_file_in_new_folder_ranks_first(self):
+        from pdf_similarity_search.ranking import EAGER_SCORE, CandidateQueue
+        
+        queue = CandidateQueue(FAILED_URL)
+        assert queue.form_number == "CIV-775"
+        for url, text in [
+            ("https://courts.example.gov/forms/civil/civ-100.pdf", "Complaint"),
+            ("https://courts.example.gov/news/annual-report.pdf", ""),
+            ("https://courts.example.gov/forms/2026/CIV_775.pdf", ""),
+            ("https://courts.example.gov/forms/civil/motion.pdf", "Motion (CIV-775)"),
+        ]:
+            queue.add(url, text)
+        assert queue.add("https://courts.example.gov/forms/2026/CIV_775.pdf") is None  # Seen
+        
+        ranked = [queue.pop() for _ in range(len(queue))]
+        assert [c.url.rsplit("/", 1)[-1] for c in ranked] == [
+            "CIV_775.pdf", "motion.pdf", "civ-100.pdf", "annual-report.pdf"
+        ]
+        assert [c.score >= EAGER_SCORE for c in ranked] == [True, True, False, False]
+        assert queue.discovered == 4
+    
+    def test_pop_respects_min_score(self):
+        from pdf_similarity_search.ranking import CandidateQueue
+        
+        queue = CandidateQueue(FAILED_URL, form_number="Form No. CIV-775")
+        queue.add("https://courts.example.gov/other/report.pdf")
+        assert queue.pop(min_score=35) is None
+        assert queue.pop().url.endswith("report.pdf")
+    
+    def test_form_number_rules(self):
+        from pdf_similarity_search.ranking import extract_form_number
+        
+        assert extract_form_number("Form No. civ 775") is None
+        assert extract_form_number("Form Number: CIV775") == "CIV-775"
+        assert extract_form_number("dr-314a instructions") == "DR-314A"
+        assert extract_form_number("civ775") == "CIV-775"
+        assert extract_form_number("") is None
+
+
+def run(site, texts, max_results=1, concurrent_downloads=2, **kwargs):
+    """run_search over a fake crawl; returns (matches, near misses, stats, downloaded urls)."""
+    from pdf_similarity_search import search_service
+    from pdf_similarity_search.config import get_settings
+    
+    downloaded = []
+    
+    async def fake_crawl(start_url, **kwargs):
+        for page_url, pdf_links in site:
+            await asyncio.sleep(0.01)
+            yield page_url, pdf_links
+    
+    async def fake_download(client, url, timeout=None, max_size_bytes=None):
+        downloaded.append(url)
+        await asyncio.sleep(0.01)
+        return (REFERENCE if texts[url] is None else url.encode()), 100
+    
+    def fake_extract(data):
+        return "reference text" if data == REFERENCE else texts[data.decode()]
+    
+    with patch.object(search_service, "crawl_website", fake_crawl), \
+            patch.object(search_service, "download_pdf_stream", fake_download), \
+            patch.object(search_service, "read_reference_pdf", return_value=REFERENCE), \
+            patch.object(search_service, "extract_text_from_pdf_bytes", side_effect=fake_extract), \
+            patch.object(search_service.ReferenceScorer, "score",
+                         lambda self, text: 90.0 if text == "close" else 10.0), \
+            patch.object(get_settings(), "concurrent_downloads", concurrent_downloads):
+        matches, near_misses, stats = search_service.search_pdf(
+            FAILED_URL, "/unused.pdf", similarity_threshold=85, max_results=max_results, shared_index=False,
+            **kwargs
+        )
+    return matches, near_misses, stats, downloaded
+
+
+class TestBestFirstSearch:
+    """Tests for best-first downloads and the early stop."""
+    
+    def test_exact_relocation_found_in_one_download(self):
+        unrelated = {f"https://courts.example.gov/forms/civil/form-{i}.pdf": "" for i in range(40)}
+        moved = "https://courts.example.gov/forms/2026/civ-775.pdf"
+        site = [
+            ("https://courts.example.gov/forms/civil", unrelated),
+            ("https://courts.example.gov/forms/2026", {moved: "Civil Cover Sheet"}),
+            ("https://courts.example.gov/forms/more", {"https://courts.example.gov/x.pdf": ""}),
+        ]
+        texts = {url: "other" for url in unrelated}
+        texts[moved] = None  # Byte-identical to the reference
+        
+        matches, _, stats, downloaded = run(site, texts, max_results=3)
+        
+        assert downloaded == [moved]
+        assert matches[0].pdf_url == moved
+        assert (matches[0].similarity_score, matches[0].content_hash_match) == (100.0, True)
+        assert stats.search_stopped_reason == "exact_match"
+        assert stats.pdfs_analyzed == 1
+    
+    def test_weak_candidates_downloaded_best_first_after_crawl(self):
+        site = [
+            ("https://courts.example.gov/a", {
+                "https://courts.example.gov/news/report.pdf": "",
+                "https://courts.example.gov/forms/civil/fee-waiver.pdf": "",
+            }),
+            ("https://courts.example.gov/b", {"https://courts.example.gov/forms/civil/notice.pdf": ""}),
+        ]
+        texts = {
+            "https://courts.example.gov/news/report.pdf": "other",
+            "https://courts.example.gov/forms/civil/fee-waiver.pdf": "other",
+            "https://courts.example.gov/forms/civil/notice.pdf": "close",
+        }
+        
+        matches, _, stats, downloaded = run(site, texts, concurrent_downloads=1)
+        
+        # Same folder before the unrelated one; stops at the first match
+        assert downloaded[-1] == "https://courts.example.gov/forms/civil/notice.pdf"
+        assert "https://courts.example.gov/news/report.pdf" not in downloaded
+        assert [m.similarity_score for m in matches] == [90.0]
+        assert stats.search_stopped_reason == "match_found"
+        assert stats.pdfs_discovered == 3
+    
+    def test_exhausted_search_reports_near_misses(self):
+        site = [("https://courts.example.gov/a", {"https://courts.example.gov/forms/civil/civ-775a.pdf": ""})]
+        texts = {"https://courts.example.gov/forms/civil/civ-775a.pdf": "other"}
+        
+        matches, near_misses, stats, downloaded = run(site, texts)
+        
+        assert matches == [] and near_misses == []
+        assert downloaded == ["https://courts.example.gov/forms/civil/civ-775a.pdf"]
+        assert stats.search_stopped_reason == "crawl_exhausted"
+    
+    def test_known_other_forms_are_not_downloaded(self):
+        site = [("https://courts.example.gov/a", {
+            "https://courts.example.gov/forms/civil/civ-775a.pdf": "",
+            "https://courts.example.gov/forms/civil/civ-100.pdf": "",
+        })]
+        texts = {
+            "https://courts.example.gov/forms/civil/civ-775a.pdf": "other",
+            "https://courts.example.gov/forms/civil/civ-100.pdf": "other",
+        }
+        
+        _, _, stats, downloaded = run(
+            site, texts, exclude_urls={"https://COURTS.example.gov/forms/civil/civ-775a.pdf"}
+        )
+        
+        assert downloaded == ["https://courts.example.gov/forms/civil/civ-100.pdf"]
+        assert (stats.pdfs_discovered, stats.pdfs_skipped_known) == (1, 1)
@@ -0,0 +1,180 @@
+"""
+Tests for the eager-loaded change listing and batched search enrichment.
+"""
+
+import pytest
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+# Test imports
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def changes(db):
+    """6 URLs with 5 versions and changes each."""
+    from db.models import MonitoredURL, PDFVersion, ChangeLog
+    
+    statuses = ["pending", "approved", "auto_approved", "rejected", "pending"]
+    actions = ["auto_approve", "manual_required", "new_form", "false_positive", None]
+    base_time = datetime(2024, 1, 1)
+    for i in range(6):
+        url = MonitoredURL(
+            name=f"Form {i}",
+            url=f"https://example.com/{i}.pdf",
+            state="Alaska" if i % 2 else "California",
+            enabled=i != 5
+        )
+        db.add(url)
+        db.flush()
+        for n in range(5):
+            version = PDFVersion(
+                monitored_url_id=url.id,
+                version_number=n + 1,
+                original_pdf_path=f"{i}-{n}.pdf",
+                normalized_pdf_path=f"{i}-{n}.pdf",
+                extracted_text_path=f"{i}-{n}.txt",
+                pdf_hash=f"pdf{i}-{n}",
+                text_hash=f"text{i}-{n}",
+                extraction_method="pdfplumber",
+                form_number=f"F-{i}",
+                formatted_title=f"Title {i}-{n}"
+            )
+            db.add(version)
+            db.flush()
+            db.add(ChangeLog(
+                monitored_url_id=url.id,
+                new_version_id=version.id,
+                change_type="relocation_failed" if (i, n) == (0, 4) else "modified",
+                review_status=statuses[n],
+                recommended_action=actions[n],
+                detected_at=base_time + timedelta(hours=i * 5 + n)
+            ))
+    db.commit()
+
+
+@contextmanager
+def count_queries(session):
+    """Count the SQL statements issued on the session's engine."""
+    from sqlalchemy import event
+    
+    statements = []
+    
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+    
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+class TestChangeListing:
+    """Tests for ChangeListing."""
+    
+    def test_listing_query_count_is_constant(self, db):
+        """URL, version and near-misses come from a fixed number of queries."""
+        from services.change_listing import change_listing
+        
+        with count_queries(db) as statements:
+            items = change_listing.list_changes(db, limit=100)
+            rendered = [
+                (item["url"].name, item["version"].formatted_title, item["change"].recommended_action)
+                for item in items
+            ]
+        
+        # Disabled URL's changes are left out, newest first
+        assert len(rendered) == 25
+        assert items[0]["change"].detected_at > items[-1]["change"].detected_at
+        # One listing query plus one near-miss state query
+        assert len(statements) <= 2
+    
+    def test_filters(self, db):
+        """Status, action and state filters narrow the listing."""
+        from services.change_listing import change_listing
+        
+        pending = change_listing.list_changes(db, status="pending")
+        assert len(pending) == 10
+        assert all(item["change"].review_status == "pending" for item in pending)
+        
+        alaska_new = change_listing.list_changes(db, state="Alaska", action="new_form")
+        assert {item["url"].state for item in alaska_new} == {"Alaska"}
+        assert len(alaska_new) == 2
+        
+        everything = change_listing.list_changes(db, status="all", enabled_only=False)
+        assert len(everything) == 30
+    
+    def test_relocation_near_misses_attached(self, db):
+        """relocation_failed rows carry the URL's stored near-misses."""
+        from services.change_listing import change_listing
+        from services.url_state import url_state_tracker
+        
+        url_state_tracker.record_near_misses(db, 1, {"candidates": [{"url": "https://example.com/x.pdf"}]})
+        db.commit()
+        
+        items = change_listing.list_changes(db, limit=100)
+        relocation = [item for item in items if item["change"].change_type == "relocation_failed"]
+        others = [item for item in items if item["change"].change_type != "relocation_failed"]
+        
+        assert relocation[0]["relocation_near_misses"]["candidates"][0]["url"] == "https://example.com/x.pdf"
+        assert all(item["relocation_near_misses"] is None for item in others)
+    
+    def test_status_counts_match_individual_counts(self, db):
+        """The grouped counts agree with per-status count queries."""
+        from db.models import ChangeLog, MonitoredURL
+        from services.change_listing import change_listing
+        
+        counts = change_listing.status_counts(db)
+        enabled = db.query(ChangeLog).join(MonitoredURL).filter(MonitoredURL.enabled == True)
+        
+        assert counts["total"] == enabled.count() == 25
+        assert counts["pending"] == enabled.filter(ChangeLog.review_status == "pending").count()
+        assert counts["approved"] == enabled.filter(
+            ChangeLog.review_status.in_(["approved", "auto_approved"])
+        ).count()
+        assert counts["automated"] == enabled.filter(
+            ChangeLog.recommended_action.in_(["auto_approve", "false_positive"])
+        ).count()
+        assert counts["manual"] == enabled.filter(
+            ChangeLog.recommended_action.in_(["manual_required", "new_form"])
+        ).count()
+        
+        assert change_listing.status_counts(db, enabled_only=False)["total"] == 30
+
+
+class TestSearchEnrichment:
+    """Tests for batched URL/version lookups on search hits."""
+    
+    def test_hits_resolved_in_batch(self, db):
+        """Hits resolve by id, document id or source URI without per-hit queries."""
+        from unittest.mock import MagicMock
+        from services.kendra_client import SearchResponse, SearchResult
+        from services.kendra_search import KendraSearchService
+        
+        hits = [
+            SearchResult(document_id="url_1_version_1", url_id=1, version_id=1),
+            SearchResult(document_id="url_2_version_6"),
+            SearchResult(document_id="other", source_uri="https://example.com/2.pdf"),
+            SearchResult(document_id="url_4_version_1", url_id=4, version_id=1),  # version of another URL
+            SearchResult(document_id="url_6_version_26", url_id=6),  # disabled URL
+            SearchResult(document_id="missing", url_id=999),
+        ]
+        
+        service = KendraSearchService.__new__(KendraSearchService)
+        service.client = MagicMock()
+        service.client.search.return_value = SearchResponse(success=True, results=hits)
+        service.is_enabled = lambda: True
+        
+        with count_queries(db) as statements:
+            response = service.search(db, "form")
+        
+        assert response.success
+        assert [r.url_id for r in response.results] == [1, 2, 3, 4]
+        assert response.results[0].form_number == "F-0"
+        assert response.results[1].url_name == "Form 1"
+        assert response.results[3].form_number is None
+        assert len(statements) <= 3
@@ -0,0 +1,248 @@
+"""
+Tests for the shared per-domain crawl index used by relocation searches.
+"""
+
+import asyncio
+import time
+import pytest
+from unittest.mock import patch
+
+# Test imports
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+SITE = {
+    "https://courts.example.gov/": '<a href="/forms">Forms</a> <a href="/about">About</a>',
+    "https://courts.example.gov/forms": (
+        '<a href="/forms/family">Family</a>'
+        '<a href="/files/fl-100.pdf">Petition - Marriage (FL-100)</a>'
+        '<a href="https://other.example.com/x">Elsewhere</a>'
+    ),
+    "https://courts.example.gov/about": '<a href="/">Home</a>',
+    "https://courts.example.gov/forms/family": (
+        '<a href="/files/fl-100.pdf"></a>'
+        '<iframe src="/files/fl-105.pdf" title="Declaration (FL-105)"></iframe>'
+    ),
+}
+
+
+def crawl(start_url, index=None, stop_after=None, **kwargs):
+    """Run crawl_website against SITE; returns (pages yielded, urls fetched, counters)."""
+    from pdf_similarity_search.crawler import crawl_website
+    
+    fetched = []
+    
+    async def fake_fetch(client, url, timeout):
+        fetched.append(url)
+        return SITE.get(url)
+    
+    async def run():
+        pages = []
+        async for page_url, pdf_urls in crawl_website(
+            start_url, index=index, counters=counters, rate_limit_delay=0, **kwargs
+        ):
+            pages.append((page_url, sorted(pdf_urls)))
+            if stop_after and len(pages) >= stop_after:
+                break
+        return pages
+    
+    counters = {}
+    with patch("pdf_similarity_search.crawler.fetch_page", side_effect=fake_fetch):
+        pages = asyncio.run(run())
+    return pages, fetched, counters
+
+
+@pytest.fixture
+def cache():
+    from pdf_similarity_search.crawl_index import CrawlIndexCache
+    
+    return CrawlIndexCache(ttl_seconds=60, max_domains=2)
+
+
+class TestSharedCrawl:
+    """Tests for crawling through a shared index."""
+    
+    def test_second_search_fetches_nothing(self, cache):
+        start = "https://courts.example.gov/old/fl-100.pdf"
+        first, first_fetched, _ = crawl(start, index=cache.get(start, 5))
+        
+        other = "https://courts.example.gov/old/fl-105.pdf"
+        second, second_fetched, counters = crawl(other, index=cache.get(other, 5))
+        
+        assert len(first_fetched) == 5  # 404 start URL + four site pages
+        assert "https://courts.example.gov/files/fl-100.pdf" in dict(first)["https://courts.example.gov/forms"]
+        # Only the new start URL is fetched; the site comes from the index
+        assert second_fetched == [other]
+        assert [p for p in second if p[0] != start] == first
+        assert counters == {"pages_fetched": 1, "pages_from_index": 5}
+    
+    def test_stopped_search_leaves_frontier_for_the_next(self, cache):
+        start = "https://courts.example.gov/old/fl-100.pdf"
+        _, first_fetched, _ = crawl(start, index=cache.get(start, 5), stop_after=1)
+        _, second_fetched, _ = crawl(start, index=cache.get(start, 5))
+        
+        assert len(first_fetched) == 2
+        assert not set(first_fetched) & set(second_fetched)
+        assert len(first_fetched) + len(second_fetched) == 5
+    
+    def test_max_pages_and_depth_respected_on_replay(self, cache):
+        start = "https://courts.example.gov"
+        crawl(start, index=cache.get(start, 5))
+        
+        pages, fetched, _ = crawl(start, index=cache.get(start, 1), max_depth=1)
+        assert fetched == []
+        assert "https://courts.example.gov/forms/family" not in dict(pages)
+        
+        pages, _, _ = crawl(start, index=cache.get(start, 5), max_pages=2)
+        assert len(pages) == 2
+    
+    def test_without_index_crawls_privately(self):
+        start = "https://courts.example.gov"
+        _, first_fetched, _ = crawl(start)
+        _, second_fetched, _ = crawl(start)
+        
+        assert first_fetched == second_fetched
+        assert len(first_fetched) == 4
+
+
+WIDE_SITE = {"https://wide.example.gov/": "".join(f'<a href="/p{i}">Page {i}</a>' for i in range(20))}
+WIDE_SITE.update({
+    f"https://wide.example.gov/p{i}": f'<a href="/files/form-{i}.pdf">Form {i}</a>' for i in range(20)
+})
+
+
+def crawl_slowly(start_url, index=None, stop_after=None, latency=0.05, **kwargs):
+    """Crawl WIDE_SITE with a fixed per-request latency; returns (pages, fetched, peak in-flight, seconds)."""
+    from pdf_similarity_search.crawler import crawl_website
+    
+    fetched = []
+    in_flight = [0, 0]  # current, peak
+    
+    async def fake_fetch(client, url, timeout):
+        in_flight[0] += 1
+        in_flight[1] = max(in_flight)
+        try:
+            await asyncio.sleep(latency)
+            fetched.append(url)
+            return WIDE_SITE.get(url)
+        finally:
+            in_flight[0] -= 1
+    
+    async def run():
+        pages = []
+        async for page_url, pdf_urls in crawl_website(start_url, index=index, rate_limit_delay=0, **kwargs):
+            pages.append(page_url)
+            if stop_after and len(pages) >= stop_after:
+                break
+        return pages
+    
+    started = time.monotonic()
+    with patch("pdf_similarity_search.crawler.fetch_page", side_effect=fake_fetch):
+        pages = asyncio.run(run())
+    return pages, fetched, in_flight[1], time.monotonic() - started
+
+
+class TestConcurrentFrontier:
+    """Tests for concurrent fetching within the politeness budget."""
+    
+    def test_fetches_overlap_within_budget(self):
+        pages, fetched, peak, elapsed = crawl_slowly("https://wide.example.gov", concurrency=4)
+        
+        assert len(pages) == len(fetched) == 21
+        assert peak == 4
+        assert elapsed < 21 * 0.05 / 2  # Sequential would take 21 latencies
+    
+    def test_budget_shared_by_searches_on_a_domain(self, cache):
+        from pdf_similarity_search.crawler import crawl_website
+        
+        index = cache.get("https://wide.example.gov", 5)
+        in_flight = [0, 0]
+        
+        async def fake_fetch(client, url, timeout):
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight)
+            await asyncio.sleep(0.02)
+            in_flight[0] -= 1
+            return WIDE_SITE.get(url)
+        
+        async def search(url):
+            return [p async for p, _ in crawl_website(url, index=index, rate_limit_delay=0, concurrency=3)]
+        
+        async def run():
+            return await asyncio.gather(
+                search("https://wide.example.gov/old/a.pdf"), search("https://wide.example.gov/old/b.pdf")
+            )
+        
+        with patch("pdf_similarity_search.crawler.fetch_page", side_effect=fake_fetch):
+            first, second = asyncio.run(run())
+        
+        assert in_flight[1] == 3
+        assert len(first) == len(second) == 21
+        assert index.exhausted and index.in_flight == 0
+    
+    def test_abandoned_fetches_return_to_frontier(self, cache):
+        start = "https://wide.example.gov"
+        index = cache.get(start, 5)
+        _, first_fetched, _, _ = crawl_slowly(start, index=index, stop_after=2, concurrency=4)
+        
+        assert index.in_flight == 0
+        pages, second_fetched, _, _ = crawl_slowly(start, index=index, concurrency=4)
+        assert len(set(pages)) == 21 and index.exhausted
+        # Only fetches cut off mid-flight are repeated
+        assert len(first_fetched) + len(second_fetched) <= 21 + 4
+        assert "https://wide.example.gov/" not in second_fetched
+    
+    def test_request_starts_spaced(self):
+        from pdf_similarity_search.crawl_index import CrawlIndex
+        
+        index = CrawlIndex(domain="x.gov", max_depth=1)
+        with patch("pdf_similarity_search.crawl_index.time.monotonic", return_value=100.0):
+            waits = [index.reserve_request(0.25) for _ in range(3)]
+        assert waits == [0.0, 0.25, 0.5]
+    
+    def test_frontier_is_breadth_first(self):
+        from pdf_similarity_search.crawl_index import CrawlIndex
+        
+        index = CrawlIndex(domain="x.gov", max_depth=2)
+        index.seed("deep", 2)
+        index.seed("shallow", 1)
+        index.seed("start", 1, first=True)
+        index.seed("shallow", 1)  # Already queued
+        
+        assert [index.pop(), index.pop()] == [("start", 1), ("shallow", 1)]
+        assert index.pop(max_depth=1) is None
+        assert index.pop() == ("deep", 2)
+
+
+class TestCrawlIndexCache:
+    """Tests for CrawlIndexCache."""
+    
+    def test_ttl_and_depth_replace_index(self, cache):
+        start = "https://courts.example.gov/a.pdf"
+        index = cache.get(start, 5)
+        
+        assert cache.get("https://courts.example.gov/b.pdf", 3) is index
+        assert cache.get(start, 8) is not index  # Needs a deeper crawl
+        
+        cache.ttl_seconds = 0
+        index = cache.get(start, 5)
+        with patch("pdf_similarity_search.crawl_index.time.monotonic", return_value=index.created_at + 1):
+            assert cache.get(start, 5) is not index
+    
+    def test_domains_bounded(self, cache):
+        for host in ("a.example.gov", "b.example.gov", "c.example.gov"):
+            cache.get(f"https://{host}/x.pdf", 5)
+        assert len(cache) == 2
+    
+    def test_pdf_link_text_collected(self, cache):
+        start = "https://courts.example.gov"
+        index = cache.get(start, 5)
+        crawl(start, index=index)
+        
+        assert index.exhausted
+        assert index.pdf_links() == {
+            "https://courts.example.gov/files/fl-100.pdf": {"Petition - Marriage (FL-100)"},
+            "https://courts.example.gov/files/fl-105.pdf": {"Declaration (FL-105)"},
+        }
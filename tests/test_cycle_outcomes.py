@@ -0,0 +1,100 @@
+"""
+Tests for structured per-URL outcomes and cycle result recording.
+"""
+
+from unittest.mock import patch
+
+# Test imports
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestURLOutcome:
+    """Tests for URLOutcome."""
+    
+    def test_truthiness_follows_success(self):
+        """Outcomes can still be used as a success flag."""
+        from cli import URLOutcome
+        
+        assert not URLOutcome(url_id=1)
+        assert URLOutcome(url_id=1, success=True)
+    
+    def test_stage_timings_accumulate(self):
+        """Repeated stages add up."""
+        from cli import URLOutcome
+        
+        outcome = URLOutcome(url_id=1)
+        with outcome.timed("download"):
+            pass
+        with outcome.timed("download"):
+            pass
+        
+        assert "download" in outcome.stage_timings
+        assert outcome.stage_timings["download"] >= 0
+    
+    def test_cycle_result_row(self):
+        """Outcome maps onto CycleURLResult columns."""
+        from datetime import datetime
+        from cli import URLOutcome
+        
+        outcome = URLOutcome(
+            url_id=7, success=True, tier_reached=1, skip_reason="headers_match",
+            started_at=datetime(2026, 1, 1, 0, 0, 0)
+        )
+        outcome.completed_at = datetime(2026, 1, 1, 0, 0, 2)
+        row = outcome.to_cycle_result(cycle_id=3)
+        
+        assert row["cycle_id"] == 3
+        assert row["monitored_url_id"] == 7
+        assert row["status"] == "success"
+        assert row["tier_reached"] == 1
+        assert row["duration_ms"] == 2000
+        assert row["change_detected"] is False
+        assert outcome.skipped_unchanged
+
+
+class TestRunCycleRecording:
+    """Tests for how run_cycle records outcomes."""
+    
+    def test_outcomes_written_in_bulk(self, session_factory):
+        """Each URL gets a CycleURLResult with tier and skip fields filled in."""
+        from cli import MonitoringOrchestrator, URLOutcome
+        from db.models import MonitoredURL, MonitoringCycle, CycleURLResult
+        from db.write_queue import WriteQueue
+        
+        db = session_factory()
+        urls = [MonitoredURL(name=f"u{i}", url=f"https://example.com/{i}.pdf") for i in range(3)]
+        cycle = MonitoringCycle()
+        db.add_all(urls + [cycle])
+        db.commit()
+        
+        def fake_process_url(session, monitored_url):
+            outcome = URLOutcome(url_id=monitored_url.id, success=True)
+            if monitored_url.name == "u0":
+                outcome.tier_reached = 1
+                outcome.skip_reason = "headers_match"
+            else:
+                outcome.tier_reached = 3
+                outcome.bytes_fetched = 1234
+            outcome.completed_at = outcome.started_at
+            return outcome
+        
+        orchestrator = MonitoringOrchestrator.__new__(MonitoringOrchestrator)
+        orchestrator.process_url = fake_process_url
+        wq = WriteQueue(session_factory=session_factory, flush_interval=0.01)
+        
+        with patch("cli.write_queue", wq):
+            results = orchestrator.run_cycle(db, max_workers=1, cycle_id=cycle.id)
+        
+        assert results["successful"] == 3
+        assert results["skipped"] == 1
+        
+        rows = db.query(CycleURLResult).order_by(CycleURLResult.monitored_url_id).all()
+        assert len(rows) == 3
+        assert [r.tier_reached for r in rows] == [1, 3, 3]
+        assert rows[0].skip_reason == "headers_match"
+        assert rows[1].bytes_fetched == 1234
+        # One bulk write for the whole cycle
+        assert wq.get_stats()["submitted"] == 1
+        db.close()
@@ -0,0 +1,243 @@
+"""
+Tests for the partial-download first-page prefilter of relocation candidates.
+"""
+
+import asyncio
+import pytest
+
+# Test imports
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+PDF_URL = "https://courts.example.gov/forms/civ-775.pdf"
+
+REFERENCE_FIRST_PAGE = (
+    "Request for Order to change child custody visitation and support. The petitioner "
+    "requests that the court order the respondent to pay child support and attorney fees."
+)
+OTHER_FIRST_PAGE = (
+    "Notice of appeal in a small claims case. The plaintiff appeals the judgment entered "
+    "by the clerk in the limited civil action described below."
+)
+FILLER_PAGE = "Continuation page with instructions. " * 4
+
+
+def make_pdf(pages, linearized=False, padding=20_000):
+    """
+    A PDF with one line of text per page; later pages are padded to make the file large.
+    
+    A linearized PDF starts with a linearization dictionary (/O first page object,
+    /E end of the first-page section).
+    """
+    # Objects: 1 linearization dict, 2 catalog, 3 page tree, 4 font, then (page, content) pairs
+    kids = " ".join(f"{5 + 2 * i} 0 R" for i in range(len(pages)))
+    objects = {
+        2: b"<< /Type /Catalog /Pages 3 0 R >>",
+        3: f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode(),
+        4: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    for i, text in enumerate(pages):
+        page, content = 5 + 2 * i, 6 + 2 * i
+        objects[page] = (
+            f"<< /Type /Page /Parent 3 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 4 0 R >> >> /Contents {content} 0 R >>"
+        ).encode()
+        stream = f"BT /F1 10 Tf 20 700 Td ({text}) Tj ET".encode()
+        if i:
+            stream += b"\n%" + b"x" * padding
+        objects[content] = b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+    
+    # Linearized: the first page's objects first, so they end up in the first-page
+    # section. Otherwise the page tree comes last, as many writers do.
+    pages_objects = list(range(5, 5 + 2 * len(pages)))
+    order = [5, 6, 4, 2, 3] + pages_objects[2:] if linearized else [4] + pages_objects + [2, 3]
+    placeholder = b"<< /Linearized 1 /O 5 /E %010d >>"
+    body = b"%PDF-1.4\n"
+    offsets = {}
+    if linearized:
+        offsets[1] = len(body)
+        body += b"1 0 obj\n" + placeholder % 0 + b"\nendobj\n"
+    first_page_end = None
+    for number in order:
+        offsets[number] = len(body)
+        body += b"%d 0 obj\n" % number + objects[number] + b"\nendobj\n"
+        if number == 3:
+            first_page_end = len(body)
+    if linearized:
+        body = body.replace(placeholder % 0, placeholder % first_page_end, 1)
+    
+    size = max(offsets) + 1
+    xref = b"xref\n0 %d\n0000000000 65535 f \n" % size
+    for number in range(1, size):
+        xref += b"%010d 00000 n \n" % offsets[number] if number in offsets else b"0000000000 65535 f \n"
+    return body + xref + b"trailer\n<< /Size %d /Root 2 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, len(body))
+
+
+class Server:
+    """httpx.MockTransport serving one PDF, with or without byte-range support."""
+    
+    def __init__(self, pdf, ranges=True):
+        self.pdf = pdf
+        self.ranges = ranges
+        self.requests = []
+    
+    def handler(self, request):
+        import httpx
+        
+        byte_range = request.headers.get("range")
+        self.requests.append(byte_range)
+        if byte_range and self.ranges:
+            start, end = byte_range.removeprefix("bytes=").split("-")
+            end = min(int(end), len(self.pdf) - 1)
+            return httpx.Response(206, content=self.pdf[int(start):end + 1], headers={
+                "Content-Range": f"bytes {start}-{end}/{len(self.pdf)}",
+            })
+        
+        async def chunks():
+            for start in range(0, len(self.pdf), 1024):
+                yield self.pdf[start:start + 1024]
+        
+        return httpx.Response(200, content=chunks(), headers={"Content-Length": str(len(self.pdf))})
+    
+    def client(self):
+        import httpx
+        
+        return httpx.AsyncClient(transport=httpx.MockTransport(self.handler))
+
+
+def fetch_prefix(server, max_bytes):
+    from pdf_similarity_search.pdf_processor import download_pdf_prefix
+    
+    async def fetch():
+        async with server.client() as client:
+            return await download_pdf_prefix(client, PDF_URL, max_bytes=max_bytes)
+    
+    return asyncio.run(fetch())
+
+
+class TestFirstPageText:
+    """Tests for reading the first page from the start of a PDF."""
+    
+    def test_linearized_first_page_section(self):
+        from pdf_similarity_search.pdf_processor import extract_first_page_text, linearization_params
+        
+        pdf = make_pdf([REFERENCE_FIRST_PAGE, FILLER_PAGE, FILLER_PAGE], linearized=True)
+        first_page_end = linearization_params(pdf)["E"]
+        assert first_page_end < len(pdf) // 10
+        
+        assert extract_first_page_text(pdf) == REFERENCE_FIRST_PAGE
+        assert extract_first_page_text(pdf[:first_page_end], complete=False) == REFERENCE_FIRST_PAGE
+    
+    def test_repair_warnings_are_muted_only_while_reading(self, caplog):
+        import logging
+        from pdf_similarity_search.pdf_processor import extract_first_page_text
+        
+        pdf = make_pdf([REFERENCE_FIRST_PAGE, FILLER_PAGE], linearized=True)
+        pypdf_logger = logging.getLogger("pypdf")
+        pypdf_logger.setLevel(logging.WARNING)
+        try:
+            with caplog.at_level(logging.WARNING):
+                assert extract_first_page_text(pdf[:4096], complete=False) == REFERENCE_FIRST_PAGE
+                assert not [r for r in caplog.records if r.name.startswith("pypdf")]
+                
+                logging.getLogger("pypdf._reader").warning("not muted")
+            assert "not muted" in caplog.text
+            assert pypdf_logger.level == logging.WARNING
+        finally:
+            pypdf_logger.setLevel(logging.NOTSET)
+    
+    def test_unreadable_prefix_is_unknown(self):
+        from pdf_similarity_search.pdf_processor import extract_first_page_text
+        
+        # Not linearized: the page tree is past the prefix
+        pdf = make_pdf([FILLER_PAGE, FILLER_PAGE, REFERENCE_FIRST_PAGE])
+        assert extract_first_page_text(pdf[:2048], complete=False) is None
+        assert extract_first_page_text(b"%PDF-1.4\n", complete=False) is None
+
+
+class TestDownloadPrefix:
+    """Tests for download_pdf_prefix."""
+    
+    def test_range_request_stops_at_first_page_section(self):
+        from pdf_similarity_search.pdf_processor import linearization_params
+        
+        pdf = make_pdf([REFERENCE_FIRST_PAGE, FILLER_PAGE, FILLER_PAGE], linearized=True)
+        server = Server(pdf)
+        
+        prefix = fetch_prefix(server, max_bytes=16_384)
+        
+        assert server.requests == ["bytes=0-16383"]
+        assert prefix.data == pdf[:linearization_params(pdf)["E"]]
+        assert (prefix.total_size, prefix.complete) == (len(pdf), False)
+    
+    def test_server_ignoring_range_is_read_up_to_the_limit(self):
+        pdf = make_pdf([FILLER_PAGE, FILLER_PAGE, FILLER_PAGE])
+        
+        prefix = fetch_prefix(Server(pdf, ranges=False), max_bytes=4096)
+        assert (len(prefix.data), prefix.complete) == (4096, False)
+        
+        # A file smaller than the limit arrives whole
+        prefix = fetch_prefix(Server(pdf, ranges=False), max_bytes=len(pdf) + 1)
+        assert (prefix.data, prefix.complete) == (pdf, True)
+    
+    def test_rejects_non_pdf(self):
+        with pytest.raises(ValueError, match="magic"):
+            fetch_prefix(Server(b"<html>moved</html>" * 100), max_bytes=4096)
+
+
+def process(server, first_page_min=50.0):
+    """_process_one_pdf against the reference's first page; returns (result, state)."""
+    from pdf_similarity_search.search_service import SearchRunState, _process_one_pdf
+    from pdf_similarity_search.similarity import ReferenceScorer
+    
+    state = SearchRunState()
+    
+    async def check():
+        async with server.client() as client:
+            return await _process_one_pdf(
+                client, PDF_URL, ReferenceScorer(REFERENCE_FIRST_PAGE + FILLER_PAGE * 2), "unused",
+                85.0, 80.0, 89.99, state, 10.0, 10_000_000,
+                ReferenceScorer(REFERENCE_FIRST_PAGE, prefilter_min_jaccard=0), first_page_min, 16_384,
+            )
+    
+    return asyncio.run(check()), state
+
+
+class TestStagedCheck:
+    """Tests for the staged candidate check in the search."""
+    
+    def test_different_first_page_is_not_downloaded(self):
+        server = Server(make_pdf([OTHER_FIRST_PAGE, FILLER_PAGE, FILLER_PAGE], linearized=True))
+        
+        result, state = process(server)
+        
+        assert result is None
+        assert server.requests == ["bytes=0-16383"]
+        assert (state.pdfs_first_page_rejected, state.pdfs_analyzed) == (1, 0)
+    
+    def test_similar_first_page_is_downloaded_and_scored(self):
+        server = Server(make_pdf([REFERENCE_FIRST_PAGE, FILLER_PAGE, FILLER_PAGE], linearized=True))
+        
+        result, state = process(server)
+        
+        assert result is not None and result.similarity_score >= 85
+        assert server.requests == ["bytes=0-16383", None]
+        assert (state.pdfs_first_page_rejected, state.pdfs_analyzed) == (0, 1)
+    
+    def test_unreadable_prefix_falls_back_to_full_download(self):
+        # Not linearized and larger than the prefix: the first page cannot be checked
+        server = Server(make_pdf([FILLER_PAGE, OTHER_FIRST_PAGE, REFERENCE_FIRST_PAGE]))
+        
+        result, state = process(server)
+        
+        assert server.requests == ["bytes=0-16383", None]
+        assert (state.pdfs_first_page_rejected, state.pdfs_analyzed) == (0, 1)
+    
+    def test_small_pdf_is_not_fetched_twice(self):
+        server = Server(make_pdf([OTHER_FIRST_PAGE], padding=0))
+        
+        process(server, first_page_min=100.0)
+        
+        assert server.requests == ["bytes=0-16383"]
@@ -0,0 +1,222 @@
+"""
+Tests for the form fingerprint (MinHash LSH) index: near-duplicate lookup,
+duplicate flagging, relocation exclusions and rebuilds.
+"""
+
+import random
+import pytest
+
+# Test imports
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+SITE = "https://courts.example.gov/forms"
+
+VOCABULARY = [f"word{i}" for i in range(400)]
+
+
+def form_text(seed, words=600):
+    """A form-like text of random words."""
+    rng = random.Random(seed)
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words))
+
+
+def revise(text, fraction, seed=0):
+    """Replace a fraction of the words, like a revision of the same form."""
+    rng = random.Random(seed)
+    return " ".join(word if rng.random() >= fraction else rng.choice(VOCABULARY) for word in text.split())
+
+
+@pytest.fixture
+def index(tmp_path):
+    from services.form_fingerprints import FormFingerprintIndex
+    from storage.file_store import FileStore
+    
+    return FormFingerprintIndex(num_perm=128, bands=64, shingle_size=3, file_store=FileStore(tmp_path / "pdfs"))
+
+
+def add_version(db, index, name, text, url=None):
+    """A monitored URL with one version whose text is indexed."""
+    from db.models import MonitoredURL, PDFVersion
+    
+    monitored_url = db.query(MonitoredURL).filter(MonitoredURL.name == name).first()
+    if monitored_url is None:
+        monitored_url = MonitoredURL(name=name, url=url or f"{SITE}/{name}.pdf")
+        db.add(monitored_url)
+        db.flush()
+    version = PDFVersion(
+        monitored_url_id=monitored_url.id, version_number=len(monitored_url.versions) + 1,
+        original_pdf_path="", normalized_pdf_path="", extracted_text_path="",
+        pdf_hash="x", text_hash="x", extraction_method="test"
+    )
+    db.add(version)
+    db.flush()
+    index.file_store.store_extracted_text(monitored_url.id, version.id, text)
+    index.index_version(db, version, text)
+    db.commit()
+    return monitored_url, version
+
+
+class TestQuery:
+    """Tests for near-duplicate lookup."""
+    
+    def test_finds_revisions_not_other_forms(self, db, index):
+        base = form_text(1)
+        original, _ = add_version(db, index, "civ-100", base)
+        add_version(db, index, "civ-200", form_text(2))
+        add_version(db, index, "civ-300", form_text(3))
+        
+        matches = index.query(db, text=revise(base, 0.05), min_similarity=0.3)
+        
+        assert [m.monitored_url_id for m in matches] == [original.id]
+        assert matches[0].similarity > 0.6
+        assert index.query(db, text=form_text(4), min_similarity=0.3) == []
+        assert index.query(db, text="   ") == []
+    
+    def test_similar_to_url_excludes_itself(self, db, index):
+        base = form_text(1)
+        first, _ = add_version(db, index, "civ-100", base)
+        second, _ = add_version(db, index, "civ-100-info", revise(base, 0.05))
+        
+        matches = index.similar_to_url(db, first.id, min_similarity=0.3)
+        assert [m.monitored_url_id for m in matches] == [second.id]
+        assert index.similar_to_url(db, 999) == []
+    
+    def test_new_version_replaces_fingerprint(self, db, index):
+        from db.models import FormFingerprintBucket
+        
+        monitored_url, _ = add_version(db, index, "civ-100", form_text(1))
+        _, latest = add_version(db, index, "civ-100", form_text(2))
+        
+        assert index.query(db, text=form_text(1), min_similarity=0.3) == []
+        assert [m.version_id for m in index.query(db, text=form_text(2))] == [latest.id]
+        assert db.query(FormFingerprintBucket).count() == 64
+        
+        # An older version indexed late does not overwrite the latest
+        older = monitored_url.versions[0]
+        index.index_version(db, older, form_text(1))
+        assert monitored_url.fingerprint.version_id == latest.id
+
+
+class TestDuplicates:
+    """Tests for flagging the same form under several URLs."""
+    
+    def test_newer_url_is_flagged_as_duplicate_of_older(self, db, index):
+        base = form_text(1)
+        original, _ = add_version(db, index, "civ-100", base)
+        sister, _ = add_version(db, index, "civ-101", revise(base, 0.3))
+        copy, _ = add_version(db, index, "civ-100-copy", base, url="https://mirror.example.gov/civ-100.pdf")
+        copy.import_batch_id = "batch-1"
+        db.commit()
+        
+        assert copy.fingerprint.duplicate_of_url_id == original.id
+        assert copy.fingerprint.duplicate_similarity == 1.0
+        assert sister.fingerprint.duplicate_of_url_id is None
+        assert original.fingerprint.duplicate_of_url_id is None
+        
+        duplicates = index.duplicates(db)
+        assert [(d.url, d.duplicate_of_url) for d in duplicates] == [(copy.url, original.url)]
+        assert [d.monitored_url_id for d in index.duplicates(db, import_batch_id="batch-1")] == [copy.id]
+        assert index.duplicates(db, import_batch_id="batch-2") == []
+    
+    def test_older_url_changing_into_a_newer_form_flags_the_newer(self, db, index):
+        older, _ = add_version(db, index, "civ-100", form_text(1))
+        newer, _ = add_version(db, index, "civ-200", form_text(2))
+        
+        add_version(db, index, "civ-100", form_text(2))
+        
+        db.refresh(newer.fingerprint)
+        assert newer.fingerprint.duplicate_of_url_id == older.id
+        assert older.fingerprint.duplicate_of_url_id is None
+
+
+class TestRelocation:
+    """Tests for the PDFs relocation does not need to download."""
+    
+    def test_known_other_forms_on_the_same_site(self, db, index):
+        base = form_text(1)
+        moved, _ = add_version(db, index, "civ-100", base)
+        add_version(db, index, "civ-200", form_text(2))
+        add_version(db, index, "civ-100-copy", revise(base, 0.05))
+        add_version(db, index, "civ-300", form_text(3), url="https://other.example.gov/civ-300.pdf")
+        
+        assert index.known_other_forms(db, moved) == {f"{SITE}/civ-200.pdf"}
+
+
+class TestRebuild:
+    """Tests for indexing stored versions."""
+    
+    def test_rebuild_indexes_latest_versions_from_stored_text(self, db, index):
+        from db.models import FormFingerprint
+        
+        base = form_text(1)
+        add_version(db, index, "civ-100", form_text(5))
+        first, latest = add_version(db, index, "civ-100", base)
+        copy, _ = add_version(db, index, "civ-100-copy", base)
+        add_version(db, index, "blank", " ")
+        db.query(FormFingerprint).delete()
+        db.commit()
+        
+        stats = index.rebuild(db)
+        
+        assert stats == {"indexed": 2, "skipped": 1, "duplicates": 1}
+        assert db.get(FormFingerprint, first.id).version_id == latest.id
+        assert db.get(FormFingerprint, copy.id).duplicate_of_url_id == first.id
+    
+    def test_migration_indexes_existing_versions(self, db, index):
+        from unittest.mock import patch
+        from sqlalchemy.orm import sessionmaker
+        from db.migrations import migrate_form_fingerprints
+        from db.models import FormFingerprint, FormFingerprintBucket
+        
+        monitored_url, version = add_version(db, index, "civ-100", form_text(1))
+        url_id, version_id = monitored_url.id, version.id
+        db.close()
+        engine = db.get_bind()
+        FormFingerprintBucket.__table__.drop(engine)
+        FormFingerprint.__table__.drop(engine)
+        
+        with patch("db.migrations.engine", engine), \
+                patch("db.database.SessionLocal", sessionmaker(bind=engine)), \
+                patch("services.form_fingerprints.form_fingerprint_index", index):
+            migrate_form_fingerprints()
+        
+        assert db.get(FormFingerprint, url_id).version_id == version_id
+
+
+class TestVersionCreation:
+    """Tests for fingerprinting as part of creating a version."""
+    
+    def test_failed_fingerprint_keeps_version_and_drops_partial_rows(self, db, tmp_path):
+        from unittest.mock import patch
+        from db.models import FormFingerprint, MonitoredURL, PDFVersion
+        from diffing.hasher import HashResult
+        from storage.file_store import FileStore
+        from storage.version_manager import VersionManager
+        
+        monitored_url = MonitoredURL(name="civ-100", url=f"{SITE}/civ-100.pdf")
+        db.add(monitored_url)
+        db.commit()
+        pdf = tmp_path / "civ-100.pdf"
+        pdf.write_bytes(b"%PDF-1.4")
+        
+        def index_then_fail(session, version, text):
+            session.add(FormFingerprint(monitored_url_id=version.monitored_url_id, version_id=version.id,
+                                        signature=b"", shingle_count=0))
+            session.flush()
+            raise RuntimeError("index unavailable")
+        
+        manager = VersionManager(file_store=FileStore(tmp_path / "pdfs"))
+        with patch("storage.version_manager.settings.FORM_FINGERPRINT_ENABLED", True), \
+                patch("storage.version_manager.settings.LOCAL_SEARCH_ENABLED", False), \
+                patch("storage.version_manager.form_fingerprint_index.index_version", index_then_fail):
+            version = manager.create_version(
+                db, monitored_url, pdf, form_text(1), [form_text(1)],
+                HashResult(pdf_hash="a", text_hash="b"), "test"
+            )
+        
+        db.expire_all()
+        assert db.get(PDFVersion, version.id) is not None
+        assert db.query(FormFingerprint).count() == 0
@@ -0,0 +1,343 @@
+"""
+Tests for background monitoring jobs: execution, cancel/resume, recovery
+and the job API with its event stream.
+"""
+
+import asyncio
+import json
+import time
+import pytest
+from unittest.mock import patch
+
+# Test imports
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def urls(session_factory):
+    """Four enabled URLs on the test database."""
+    from db.models import MonitoredURL
+    
+    db = session_factory()
+    db.add_all([MonitoredURL(name=f"u{i}", url=f"https://example.com/{i}.pdf") for i in range(4)])
+    db.commit()
+    db.close()
+
+
+@pytest.fixture
+def runner(session_factory):
+    """JobRunner on the test database, with its own write queue."""
+    from db.write_queue import WriteQueue
+    from services.job_runner import JobRunner
+    
+    wq = WriteQueue(session_factory=session_factory, flush_interval=0.01)
+    runner = JobRunner(session_factory=session_factory, concurrency=1)
+    with patch("cli.write_queue", wq), patch("services.job_runner.write_queue", wq):
+        yield runner
+    runner.shutdown()
+    wq.flush()
+
+
+def fake_orchestrator(on_url=None):
+    """Patch MonitoringOrchestrator so URLs are 'checked' without network access."""
+    from cli import MonitoringOrchestrator, URLOutcome
+    
+    checked = []
+    
+    def fake_process_url(self, session, monitored_url):
+        checked.append(monitored_url.name)
+        if on_url:
+            on_url(monitored_url)
+        outcome = URLOutcome(url_id=monitored_url.id, success=True)
+        if monitored_url.name == "u1":
+            outcome.change_log_id = 1
+        outcome.completed_at = outcome.started_at
+        return outcome
+    
+    patcher = patch.multiple(
+        MonitoringOrchestrator,
+        __init__=lambda self: None,
+        process_url=fake_process_url
+    )
+    return patcher, checked
+
+
+class TestJobExecution:
+    """Tests for enqueue and execute."""
+    
+    def test_execute_records_job_and_cycle(self, runner, session_factory):
+        from db.models import MonitoringCycle, MonitoringJob
+        
+        db = session_factory()
+        job = runner.enqueue(db, triggered_by="api", max_workers=1, start=False)
+        assert job.status == "queued"
+        
+        events = []
+        patcher, checked = fake_orchestrator()
+        with patcher:
+            final = runner.execute(job.id, listener=lambda event, data: events.append(event))
+        
+        assert checked == ["u0", "u1", "u2", "u3"]
+        assert final["status"] == "completed"
+        assert (final["total_urls"], final["processed_urls"], final["changes"]) == (4, 4, 1)
+        assert events.count("outcome") == 4
+        assert events[0] == "status" and events[-1] == "status"
+        
+        db.expire_all()
+        cycle = db.get(MonitoringCycle, final["cycle_id"])
+        assert (cycle.status, cycle.triggered_by, cycle.total_urls_checked) == ("completed", "api", 4)
+        assert db.get(MonitoringJob, job.id).attempts == 1
+        # A finished job isn't run again
+        assert runner.execute(job.id) is None
+        db.close()
+    
+    def test_job_claimed_by_another_process_is_not_run(self, runner, session_factory):
+        from db.models import MonitoringJob
+        
+        db = session_factory()
+        job = runner.enqueue(db, start=False)
+        
+        def racing_session():
+            # Another runner claims the job right after this one reads it
+            session = session_factory()
+            get = session.get
+            
+            def get_then_claim(model, ident):
+                found = get(model, ident)
+                other = session_factory()
+                other.query(MonitoringJob).filter(MonitoringJob.id == ident).update({"status": "running"})
+                other.commit()
+                other.close()
+                return found
+            
+            session.get = get_then_claim
+            return session
+        
+        runner._session_factory = racing_session
+        patcher, checked = fake_orchestrator()
+        with patcher:
+            assert runner.execute(job.id) is None
+        
+        assert checked == []
+        db.expire_all()
+        assert db.get(MonitoringJob, job.id).attempts == 0
+        db.close()
+    
+    def test_enqueue_runs_on_pool(self, runner, session_factory):
+        from db.models import MonitoringJob
+        
+        db = session_factory()
+        patcher, checked = fake_orchestrator()
+        with patcher:
+            job = runner.enqueue(db, max_workers=1)
+            deadline = time.monotonic() + 5
+            while runner.snapshot(job.id)["status"] != "completed" and time.monotonic() < deadline:
+                time.sleep(0.02)
+        
+        db.expire_all()
+        assert db.get(MonitoringJob, job.id).status == "completed"
+        assert len(checked) == 4
+        db.close()
+
+
+class TestCancelAndResume:
+    """Tests for cancelling a running job and resuming it."""
+    
+    def test_resume_skips_checked_urls(self, runner, session_factory):
+        from db.models import CycleURLResult, MonitoringCycle
+        from services.job_runner import JobStateError
+        
+        db = session_factory()
+        job = runner.enqueue(db, max_workers=1, start=False)
+        
+        def cancel_after_second(monitored_url):
+            if monitored_url.name == "u1":
+                control = session_factory()
+                runner.cancel(control, job.id)
+                control.close()
+        
+        patcher, checked = fake_orchestrator(on_url=cancel_after_second)
+        with patcher:
+            cancelled = runner.execute(job.id)
+        
+        assert checked == ["u0", "u1"]
+        assert cancelled["status"] == "cancelled"
+        assert cancelled["processed_urls"] == 2
+        db.expire_all()
+        assert db.get(MonitoringCycle, cancelled["cycle_id"]).status == "partial"
+        with pytest.raises(JobStateError):
+            runner.cancel(db, job.id)
+        
+        runner.resume(db, job.id, start=False)
+        patcher, checked = fake_orchestrator()
+        with patcher:
+            resumed = runner.execute(job.id)
+        
+        assert checked == ["u2", "u3"]
+        assert resumed["status"] == "completed"
+        assert resumed["cycle_id"] == cancelled["cycle_id"]
+        assert (resumed["total_urls"], resumed["processed_urls"], resumed["successful"]) == (4, 4, 4)
+        assert resumed["changes"] == 1
+        assert resumed["attempts"] == 2
+        assert db.query(CycleURLResult).filter(CycleURLResult.cycle_id == resumed["cycle_id"]).count() == 4
+        
+        with pytest.raises(JobStateError):
+            runner.resume(db, job.id)
+        db.close()
+    
+    def test_cancel_queued_job(self, runner, session_factory):
+        db = session_factory()
+        job = runner.enqueue(db, start=False)
+        
+        assert runner.cancel(db, job.id).status == "cancelled"
+        assert runner.execute(job.id) is None
+        assert runner.cancel(db, 999) is None
+        db.close()
+    
+    def test_cancel_of_job_claimed_meanwhile_requests_stop(self, runner, session_factory):
+        from db.models import MonitoringJob
+        
+        db = session_factory()
+        job = runner.enqueue(db, start=False)
+        
+        # A worker claims the job after this session read it as queued
+        other = session_factory()
+        other.query(MonitoringJob).filter(MonitoringJob.id == job.id).update({"status": "running"})
+        other.commit()
+        other.close()
+        
+        cancelled = runner.cancel(db, job.id)
+        assert (cancelled.status, cancelled.cancel_requested) == ("running", True)
+        assert cancelled.completed_at is None
+        db.close()
+
+
+class TestRecovery:
+    """Tests for picking up jobs left by a previous process."""
+    
+    def test_dead_runner_marked_interrupted(self, runner, session_factory):
+        import socket
+        from datetime import datetime
+        from db.models import MonitoringCycle, MonitoringJob
+        
+        db = session_factory()
+        cycle = MonitoringCycle(started_at=datetime.utcnow(), status="running")
+        db.add(cycle)
+        db.flush()
+        dead = MonitoringJob(
+            status="running", cycle_id=cycle.id, created_at=datetime.utcnow(),
+            runner_id=f"{socket.gethostname()}:99999999"
+        )
+        remote = MonitoringJob(
+            status="running", created_at=datetime.utcnow(), runner_id="other-host:1"
+        )
+        queued = MonitoringJob(status="queued", created_at=datetime.utcnow())
+        db.add_all([dead, remote, queued])
+        db.commit()
+        
+        with patch.object(runner, "submit") as submit:
+            counts = runner.recover(db)
+        
+        assert counts == {"requeued": 1, "interrupted": 1}
+        submit.assert_called_once_with(queued.id)
+        db.expire_all()
+        assert db.get(MonitoringJob, dead.id).status == "interrupted"
+        assert db.get(MonitoringCycle, cycle.id).status == "partial"
+        assert db.get(MonitoringJob, remote.id).status == "running"
+        db.close()
+
+
+@pytest.fixture
+def app(session_factory, runner):
+    """App with the routes on the test database and runner."""
+    from fastapi import FastAPI
+    from api import routes
+    from db.database import get_db
+    
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+    
+    app = FastAPI()
+    app.include_router(routes.router)
+    app.dependency_overrides[get_db] = override_get_db
+    with patch.object(routes, "job_runner", runner):
+        yield app
+
+
+def request(app, method, path, **kwargs):
+    """Make one request against the app."""
+    import httpx
+    
+    async def send():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.request(method, path, **kwargs)
+    
+    return asyncio.run(send())
+
+
+def parse_sse(body):
+    """Split an event stream into (id, event, data) tuples."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields.get("id"), fields["event"], json.loads(fields["data"])))
+    return events
+
+
+class TestJobAPI:
+    """Tests for the job routes."""
+    
+    def test_run_returns_queued_job(self, app, runner):
+        with patch.object(runner, "submit") as submit:
+            response = request(app, "POST", "/api/monitor/run", json={"max_workers": 2})
+        
+        assert response.status_code == 202
+        job = response.json()
+        assert (job["status"], job["triggered_by"]) == ("queued", "api")
+        submit.assert_called_once_with(job["id"])
+        
+        assert request(app, "GET", f"/api/jobs/{job['id']}").json()["status"] == "queued"
+        assert [j["id"] for j in request(app, "GET", "/api/jobs").json()] == [job["id"]]
+        assert request(app, "POST", "/api/monitor/run", json={"url_id": 999}).status_code == 404
+    
+    def test_cancel_and_resume_conflicts(self, app, runner):
+        with patch.object(runner, "submit"):
+            job = request(app, "POST", "/api/monitor/run", json={}).json()
+            
+            assert request(app, "POST", f"/api/jobs/{job['id']}/resume").status_code == 409
+            assert request(app, "POST", f"/api/jobs/{job['id']}/cancel").json()["status"] == "cancelled"
+            assert request(app, "POST", f"/api/jobs/{job['id']}/cancel").status_code == 409
+            assert request(app, "POST", f"/api/jobs/{job['id']}/resume").json()["status"] == "queued"
+        assert request(app, "GET", "/api/jobs/999").status_code == 404
+    
+    def test_event_stream(self, app, runner, session_factory):
+        db = session_factory()
+        job = runner.enqueue(db, max_workers=1, start=False)
+        db.close()
+        patcher, _ = fake_orchestrator()
+        with patcher:
+            runner.execute(job.id)
+        
+        response = request(app, "GET", f"/api/jobs/{job.id}/events")
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = parse_sse(response.text)
+        
+        assert [e for _, e, _ in events].count("outcome") == 4
+        assert events[-1][1] == "status" and events[-1][2]["status"] == "completed"
+        outcome = next(data for _, event, data in events if event == "outcome")
+        assert outcome["name"] == "u0" and outcome["processed_urls"] == 1
+        
+        # A reconnecting client only gets what it missed
+        last_outcome_id = [seq for seq, event, _ in events if event == "outcome"][-1]
+        replay = parse_sse(request(
+            app, "GET", f"/api/jobs/{job.id}/events", headers={"Last-Event-ID": last_outcome_id}
+        ).text)
+        assert [e for _, e, _ in replay] == ["status", "status"]
+        assert request(app, "GET", "/api/jobs/999/events").status_code == 404
@@ -0,0 +1,208 @@
+"""
+Tests for the landing page cache: resolved PDF links served from a
+conditional GET, re-scrapes of changed pages and invalidation.
+"""
+
+from datetime import datetime, timedelta
+import pytest
+from unittest.mock import MagicMock, patch
+
+# Test imports
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+PAGE_URL = "https://courts.example.gov/forms/fl-100"
+
+PAGE_V1 = '<h1>Petition</h1><a href="/files/fl-100.pdf">Download</a>'
+PAGE_V2 = '<h1>Petition</h1><a href="/files/2026/fl-100.pdf">Download</a>'
+
+
+@pytest.fixture
+def wq(session_factory):
+    """The cache's write queue, on the test database."""
+    from db.write_queue import WriteQueue
+    
+    wq = WriteQueue(session_factory=session_factory, flush_interval=0.01)
+    with patch("services.landing_pages.write_queue", wq):
+        yield wq
+    wq.flush()
+
+
+@pytest.fixture
+def cache(wq):
+    """LandingPageCache with a scripted conditional fetch."""
+    from services.link_crawler import LinkCrawler
+    from services.landing_pages import LandingPageCache
+    
+    crawler = LinkCrawler()
+    crawler.responses = []
+    crawler.requests = []
+    
+    def fetch(url, etag=None, last_modified=None):
+        crawler.requests.append((etag, last_modified))
+        return crawler.responses.pop(0)
+    
+    crawler.fetch_page_conditional = fetch
+    return LandingPageCache(crawler=crawler)
+
+
+@pytest.fixture
+def scraper():
+    """Scraper without Lambda whose own HTTP scrape must not be used."""
+    from fetcher.aws_web_scraper import AWSWebScraper
+    
+    scraper = AWSWebScraper(lambda_function_name="")
+    scraper.lambda_client = None
+    scraper.scrape_url = MagicMock(side_effect=AssertionError("page fetched twice"))
+    return scraper
+
+
+def page(html, etag=None):
+    from services.link_crawler import PageFetch
+    
+    return PageFetch(status_code=200, html=html, etag=etag, final_url=PAGE_URL)
+
+
+def not_modified(etag):
+    from services.link_crawler import PageFetch
+    
+    return PageFetch(status_code=304, etag=etag)
+
+
+class TestResolve:
+    """Tests for LandingPageCache.resolve."""
+    
+    def test_first_check_parses_fetched_page(self, session_factory, cache, scraper):
+        from db.models import LandingPage
+        
+        db = session_factory()
+        cache.crawler.responses = [page(PAGE_V1, etag='"v1"')]
+        
+        resolution = cache.resolve(db, PAGE_URL, scraper)
+        
+        assert resolution.success and not resolution.cached
+        assert resolution.pdf_url == "https://courts.example.gov/files/fl-100.pdf"
+        stored = db.query(LandingPage).one()
+        assert (stored.resolved_pdf_url, stored.etag) == (resolution.pdf_url, '"v1"')
+        assert stored.content_hash and stored.last_scraped_at
+        assert cache.crawler.requests == [(None, None)]
+        db.close()
+    
+    def test_unchanged_page_serves_cached_link(self, session_factory, cache, scraper, wq):
+        from db.models import LandingPage
+        
+        db = session_factory()
+        cache.crawler.responses = [page(PAGE_V1, etag='"v1"'), not_modified('"v1"'), page(PAGE_V1, etag='"v2"')]
+        first = cache.resolve(db, PAGE_URL, scraper)
+        
+        # 304, then a 200 with the same HTML (new ETag)
+        assert cache.resolve(db, PAGE_URL, scraper).cached
+        resolution = cache.resolve(db, PAGE_URL, scraper)
+        
+        assert resolution.cached and resolution.pdf_url == first.pdf_url
+        assert cache.crawler.requests[1:] == [('"v1"', None), ('"v1"', None)]
+        wq.flush()
+        db.expire_all()
+        assert db.query(LandingPage).one().etag == '"v2"'
+        db.close()
+    
+    def test_changed_page_is_scraped_again(self, session_factory, cache):
+        from db.models import LandingPage
+        from fetcher.aws_web_scraper import ScrapeResult
+        
+        db = session_factory()
+        lambda_scraper = MagicMock()
+        lambda_scraper.scrape_url.side_effect = lambda url: ScrapeResult(
+            success=True, url=url, pdf_url=f"{url}/{lambda_scraper.scrape_url.call_count}.pdf"
+        )
+        cache.crawler.responses = [page(PAGE_V1), page(PAGE_V1), page(PAGE_V2)]
+        
+        assert cache.resolve(db, PAGE_URL, lambda_scraper).pdf_url.endswith("/1.pdf")
+        assert cache.resolve(db, PAGE_URL, lambda_scraper).cached
+        resolution = cache.resolve(db, PAGE_URL, lambda_scraper)
+        
+        assert not resolution.cached and resolution.pdf_url.endswith("/2.pdf")
+        assert lambda_scraper.scrape_url.call_count == 2
+        assert db.query(LandingPage).one().resolved_pdf_url == resolution.pdf_url
+        db.close()
+    
+    def test_failed_check_falls_back_to_scrape(self, session_factory, cache):
+        from fetcher.aws_web_scraper import ScrapeResult
+        from services.link_crawler import PageFetch
+        
+        db = session_factory()
+        http_scraper = MagicMock(lambda_client=None)
+        http_scraper.scrape_url.return_value = ScrapeResult(success=False, url=PAGE_URL, error="HTTP error: 503")
+        cache.crawler.responses = [PageFetch(status_code=503, error="HTTP 503")]
+        
+        resolution = cache.resolve(db, PAGE_URL, http_scraper)
+        
+        assert not resolution.success and resolution.error == "HTTP error: 503"
+        db.close()
+    
+    def test_disabled_cache_scrapes_every_time(self, session_factory, cache):
+        from fetcher.aws_web_scraper import ScrapeResult
+        
+        db = session_factory()
+        lambda_scraper = MagicMock()
+        lambda_scraper.scrape_url.return_value = ScrapeResult(success=True, url=PAGE_URL, pdf_url="https://x/a.pdf")
+        
+        with patch("services.landing_pages.settings.LANDING_PAGE_CACHE_ENABLED", False):
+            cache.resolve(db, PAGE_URL, lambda_scraper)
+            cache.resolve(db, PAGE_URL, lambda_scraper)
+        
+        assert lambda_scraper.scrape_url.call_count == 2 and cache.crawler.requests == []
+        db.close()
+
+
+class TestExpiry:
+    """Tests for dropping cached links."""
+    
+    def test_invalidated_link_is_scraped_again(self, session_factory, cache, scraper, wq):
+        db = session_factory()
+        cache.crawler.responses = [page(PAGE_V1, etag='"v1"'), page(PAGE_V1, etag='"v1"')]
+        cache.resolve(db, PAGE_URL, scraper)
+        
+        cache.invalidate(PAGE_URL)
+        wq.flush()
+        db.expire_all()
+        resolution = cache.resolve(db, PAGE_URL, scraper)
+        
+        assert not resolution.cached
+        assert cache.crawler.requests[1] == (None, None)
+        db.close()
+    
+    def test_failed_check_after_invalidation_is_not_a_cache_hit(self, session_factory, cache, scraper, wq):
+        from fetcher.aws_web_scraper import ScrapeResult
+        from services.link_crawler import PageFetch
+        
+        db = session_factory()
+        cache.crawler.responses = [page(PAGE_V1, etag='"v1"'), PageFetch(status_code=None, error="Timeout")]
+        cache.resolve(db, PAGE_URL, scraper)
+        
+        cache.invalidate(PAGE_URL)
+        wq.flush()
+        db.expire_all()
+        scraper.scrape_url = MagicMock(return_value=ScrapeResult(success=False, url=PAGE_URL, error="Timeout"))
+        resolution = cache.resolve(db, PAGE_URL, scraper)
+        
+        assert not resolution.success and not resolution.cached
+        scraper.scrape_url.assert_called_once_with(PAGE_URL)
+        db.close()
+    
+    def test_stale_link_is_scraped_again(self, session_factory, cache, scraper):
+        from db.models import LandingPage
+        
+        db = session_factory()
+        cache.crawler.responses = [page(PAGE_V1, etag='"v1"'), page(PAGE_V1, etag='"v1"')]
+        cache.resolve(db, PAGE_URL, scraper)
+        db.query(LandingPage).one().last_scraped_at = datetime.utcnow() - timedelta(days=31)
+        db.commit()
+        
+        resolution = cache.resolve(db, PAGE_URL, scraper)
+        
+        assert not resolution.cached
+        assert db.query(LandingPage).one().last_scraped_at > datetime.utcnow() - timedelta(minutes=1)
+        db.close()
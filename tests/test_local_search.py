@@ -0,0 +1,221 @@
+"""
+Tests for the local full-text (SQLite FTS5) search: ranking, snippets,
+facets, query sanitizing and incremental indexing.
+"""
+
+import pytest
+
+# Test imports
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+CUSTODY_TEXT = (
+    "Request for Order. The petitioner asks the court to change child custody and "
+    "visitation orders and to order the respondent to pay child support."
+)
+APPEAL_TEXT = (
+    "Notice of Appeal in a small claims case. The plaintiff appeals the judgment "
+    "entered by the clerk; custody of exhibits stays with the court."
+)
+SUMMONS_TEXT = "Summons. Notice to defendant: you are being sued by the plaintiff."
+
+
+@pytest.fixture
+def service():
+    from services.local_search import LocalSearchService
+    
+    return LocalSearchService(snippet_tokens=8)
+
+
+def add_version(db, service, name, text, state="CA", domain="family", form_number=None, title=None):
+    """A monitored URL with a new version whose text is indexed."""
+    from db.models import MonitoredURL, PDFVersion
+    
+    monitored_url = db.query(MonitoredURL).filter(MonitoredURL.name == name).first()
+    if monitored_url is None:
+        monitored_url = MonitoredURL(
+            name=name, url=f"https://courts.example.gov/forms/{name}.pdf",
+            state=state, domain_category=domain
+        )
+        db.add(monitored_url)
+        db.flush()
+    version = PDFVersion(
+        monitored_url_id=monitored_url.id, version_number=len(monitored_url.versions) + 1,
+        original_pdf_path="", normalized_pdf_path="", extracted_text_path="",
+        pdf_hash="x", text_hash="x", extraction_method="test",
+        form_number=form_number, formatted_title=title
+    )
+    db.add(version)
+    db.flush()
+    service.index_version(db, version, text)
+    db.commit()
+    return monitored_url, version
+
+
+class TestMatchExpression:
+    """Tests for turning user input into an FTS5 query."""
+    
+    def test_user_syntax_is_quoted(self):
+        from services.local_search import match_expression
+        
+        assert match_expression('FL-300 "custody" NEAR(x) body:foo*') == (
+            '"fl 300" OR "custody" OR "near x" OR "body foo"'
+        )
+        assert match_expression("the custody form") == '"custody"'
+        assert match_expression("the form") == '"the" OR "form"'
+        assert match_expression(' "" -- ') is None
+
+
+class TestSearch:
+    """Tests for LocalSearchService.search."""
+    
+    def test_ranks_snippets_and_facets(self, db, service):
+        custody, custody_version = add_version(db, service, "fl-300", CUSTODY_TEXT, form_number="FL-300",
+                                               title="Request For Order")
+        add_version(db, service, "sc-140", APPEAL_TEXT, state="NV", domain="civil")
+        add_version(db, service, "sum-100", SUMMONS_TEXT, domain="civil")
+        
+        response = service.search(db, "child custody")
+        
+        assert response.success and response.total_results == 2
+        first, second = response.results
+        assert (first.url_id, first.version_id) == (custody.id, custody_version.id)
+        assert first.title == "Request For Order {FL-300}" and first.form_number == "FL-300"
+        assert first.relevance_score == 1.0 and 0 < second.relevance_score < 1.0
+        assert [first.excerpt[start:end] for start, end in first.highlights] == ["child", "custody"]
+        assert second.title == "sc-140" and second.state == "NV"
+        assert response.facets == {"state": {"CA": 1, "NV": 1}, "domain_category": {"civil": 1, "family": 1}}
+    
+    def test_filters_keep_other_facet_counts(self, db, service):
+        add_version(db, service, "fl-300", CUSTODY_TEXT)
+        add_version(db, service, "sc-140", APPEAL_TEXT, state="NV", domain="civil")
+        add_version(db, service, "sum-100", SUMMONS_TEXT, domain="civil")
+        
+        response = service.search(db, "plaintiff", state="CA")
+        
+        assert [r.url_name for r in response.results] == ["sum-100"]
+        assert response.total_results == 1
+        assert response.facets == {"state": {"CA": 1, "NV": 1}, "domain_category": {"civil": 1}}
+    
+    def test_form_number_and_stemming(self, db, service):
+        add_version(db, service, "request", CUSTODY_TEXT, form_number="FL-300")
+        add_version(db, service, "appeal", APPEAL_TEXT, form_number="SC-300")
+        
+        assert [r.url_name for r in service.search(db, "fl-300").results] == ["request"]
+        assert [r.url_name for r in service.search(db, "appealing").results] == ["appeal"]
+    
+    def test_disabled_urls_and_empty_queries(self, db, service):
+        monitored_url, _ = add_version(db, service, "fl-300", CUSTODY_TEXT)
+        monitored_url.enabled = False
+        db.commit()
+        
+        assert service.search(db, "custody").results == []
+        assert not service.search(db, " -- ").success
+
+
+class TestIndexing:
+    """Tests for keeping the index on each URL's latest version."""
+    
+    def test_new_version_replaces_old_text(self, db, service):
+        monitored_url, old = add_version(db, service, "fl-300", CUSTODY_TEXT)
+        _, latest = add_version(db, service, "fl-300", SUMMONS_TEXT)
+        
+        assert service.search(db, "custody").results == []
+        assert [r.version_id for r in service.search(db, "summons").results] == [latest.id]
+        
+        # An older version indexed late does not overwrite the latest
+        assert not service.index_version(db, old, CUSTODY_TEXT)
+        assert service.search(db, "custody").results == []
+    
+    def test_title_extracted_after_indexing(self, db, service):
+        _, version = add_version(db, service, "fl-300", CUSTODY_TEXT)
+        version.formatted_title = "Request For Order"
+        service.update_title(db, version)
+        db.commit()
+        
+        assert [r.title for r in service.search(db, "request order").results] == ["Request For Order"]
+    
+    def test_rebuild_from_stored_text(self, db, tmp_path, monkeypatch):
+        from services.local_search import LocalSearchService
+        from storage.file_store import FileStore
+        
+        service = LocalSearchService()
+        file_store = FileStore(tmp_path / "pdfs")
+        monkeypatch.setattr(service, "_file_store", lambda: file_store)
+        _, old = add_version(db, service, "fl-300", CUSTODY_TEXT)
+        _, latest = add_version(db, service, "fl-300", APPEAL_TEXT)
+        add_version(db, service, "sum-100", SUMMONS_TEXT)
+        file_store.store_extracted_text(old.monitored_url_id, old.id, CUSTODY_TEXT)
+        file_store.store_extracted_text(latest.monitored_url_id, latest.id, APPEAL_TEXT)
+        
+        assert service.rebuild(db) == {"indexed": 1, "skipped": 1}
+        assert [r.version_id for r in service.search(db, "appeal").results] == [latest.id]
+        assert service.indexed_url_ids(db) == {latest.monitored_url_id}
+    
+    def test_failed_indexing_keeps_version(self, db, service, tmp_path):
+        from unittest.mock import patch
+        from db.models import MonitoredURL, PDFVersion
+        from diffing.hasher import HashResult
+        from storage.file_store import FileStore
+        from storage.version_manager import VersionManager
+        
+        monitored_url = MonitoredURL(name="fl-300", url="https://courts.example.gov/forms/fl-300.pdf")
+        db.add(monitored_url)
+        db.commit()
+        pdf = tmp_path / "fl-300.pdf"
+        pdf.write_bytes(b"%PDF-1.4")
+        
+        def index_then_fail(session, version, text):
+            service.index_version(session, version, text)
+            raise RuntimeError("index unavailable")
+        
+        manager = VersionManager(file_store=FileStore(tmp_path / "pdfs"))
+        with patch("storage.version_manager.settings.FORM_FINGERPRINT_ENABLED", False), \
+                patch("storage.version_manager.settings.LOCAL_SEARCH_ENABLED", True), \
+                patch("storage.version_manager.local_search_service.index_version", index_then_fail):
+            version = manager.create_version(
+                db, monitored_url, pdf, CUSTODY_TEXT, [CUSTODY_TEXT],
+                HashResult(pdf_hash="a", text_hash="b"), "test"
+            )
+        
+        db.expire_all()
+        assert db.get(PDFVersion, version.id) is not None
+        assert service.search(db, "custody").results == []
+
+
+class TestMigration:
+    """Tests for creating the search table on an existing database."""
+    
+    def test_migration_indexes_existing_versions(self, db, tmp_path, monkeypatch):
+        from unittest.mock import patch
+        from sqlalchemy.orm import sessionmaker
+        from db.migrations import migrate_local_search
+        from db.models import MonitoredURL, PDFVersion
+        from services.local_search import LocalSearchService
+        from storage.file_store import FileStore
+        
+        monitored_url = MonitoredURL(name="fl-300", url="https://courts.example.gov/forms/fl-300.pdf")
+        db.add(monitored_url)
+        db.flush()
+        version = PDFVersion(
+            monitored_url_id=monitored_url.id, version_number=1,
+            original_pdf_path="", normalized_pdf_path="", extracted_text_path="",
+            pdf_hash="x", text_hash="x", extraction_method="test"
+        )
+        db.add(version)
+        db.commit()
+        file_store = FileStore(tmp_path / "pdfs")
+        file_store.store_extracted_text(monitored_url.id, version.id, CUSTODY_TEXT)
+        
+        service = LocalSearchService()
+        monkeypatch.setattr(service, "_file_store", lambda: file_store)
+        engine = db.get_bind()
+        with patch("db.migrations.engine", engine), \
+                patch("db.migrations.settings.LOCAL_SEARCH_ENABLED", True), \
+                patch("db.database.SessionLocal", sessionmaker(bind=engine)), \
+                patch("services.local_search.local_search_service", service):
+            migrate_local_search()
+        
+        assert [r.version_id for r in service.search(db, "custody").results] == [version.id]
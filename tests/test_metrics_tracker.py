@@ -0,0 +1,139 @@
+"""
+Tests for rollup-backed metrics.
+"""
+
+import pytest
+from datetime import datetime, timedelta
+
+# Test imports
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def versions(db):
+    """Two URLs with one version each."""
+    from db.models import MonitoredURL, PDFVersion
+    
+    for url_id, name in ((1, "Alaska - Form A"), (2, "Alaska - Form B")):
+        db.add(MonitoredURL(id=url_id, name=name, url=f"https://example.com/{url_id}.pdf"))
+        db.add(PDFVersion(
+            id=url_id, monitored_url_id=url_id, version_number=1,
+            original_pdf_path="a.pdf", normalized_pdf_path="a.pdf", extracted_text_path="a.txt",
+            pdf_hash="p", text_hash="t", extraction_method="pdfplumber"
+        ))
+    db.commit()
+
+
+def add_change(db, detected_at, change_type="text_changed", review_status="pending", url_id=1, **kwargs):
+    from db.models import ChangeLog
+    
+    change = ChangeLog(
+        monitored_url_id=url_id,
+        new_version_id=url_id,
+        change_type=change_type,
+        review_status=review_status,
+        reviewed=review_status != "pending",
+        detected_at=detected_at,
+        **kwargs
+    )
+    db.add(change)
+    db.commit()
+    return change
+
+
+class TestMetricsRollups:
+    """Tests for MetricsTracker rollups."""
+    
+    def test_month_boundaries(self, db):
+        """Changes on either side of midnight at month end land in the right month."""
+        from services.metrics_tracker import MetricsTracker
+        
+        add_change(db, datetime(2025, 1, 31, 23, 59, 59))
+        add_change(db, datetime(2025, 2, 1, 0, 0, 0), change_type="new")
+        add_change(db, datetime(2025, 12, 31, 23, 0, 0), review_status="rejected")
+        add_change(db, datetime(2026, 1, 1, 1, 0, 0), review_status="auto_approved")
+        
+        tracker = MetricsTracker()
+        january = tracker.get_monthly_stats(db, 2025, 1)
+        february = tracker.get_monthly_stats(db, 2025, 2)
+        december = tracker.get_monthly_stats(db, 2025, 12)
+        next_january = tracker.get_monthly_stats(db, 2026, 1)
+        
+        assert (january.updates_detected, january.new_forms_added, january.pending) == (1, 0, 1)
+        assert (february.updates_detected, february.new_forms_added) == (0, 1)
+        assert december.rejected == 1
+        assert next_january.auto_approved == 1
+        assert january.forms_monitored == 2
+    
+    def test_incremental_refresh_sees_reviews(self, db):
+        """Reviewing an old change updates its day on the next refresh."""
+        from services.metrics_tracker import MetricsTracker
+        
+        tracker = MetricsTracker()
+        change = add_change(db, datetime(2025, 3, 10, 12, 0, 0))
+        assert tracker.get_monthly_stats(db, 2025, 3).pending == 1
+        
+        change.review_status = "approved"
+        change.reviewed = True
+        change.reviewed_by = "alice"
+        change.reviewed_at = datetime.utcnow()
+        db.commit()
+        
+        stats = tracker.get_monthly_stats(db, 2025, 3)
+        assert stats.pending == 0
+        assert stats.manual_reviewed == 1
+    
+    def test_deleted_changes_leave_their_days(self, db):
+        """Days collected before a delete drop the deleted changes from the rollups."""
+        from db.models import MonitoredURL
+        from services.metrics_tracker import MetricsTracker
+        
+        tracker = MetricsTracker()
+        add_change(db, datetime(2025, 4, 2, 9, 0, 0), url_id=1)
+        add_change(db, datetime(2025, 4, 3, 9, 0, 0), url_id=2)
+        assert tracker.get_monthly_stats(db, 2025, 4).updates_detected == 2
+        
+        days = tracker.change_days(db, [2])
+        db.delete(db.get(MonitoredURL, 2))
+        db.commit()
+        tracker.refresh_rollup_days(db, days)
+        
+        assert [d.isoformat() for d in days] == ["2025-04-03"]
+        assert tracker.get_monthly_stats(db, 2025, 4).updates_detected == 1
+    
+    def test_dashboard_metrics(self, db):
+        """Queue counts and all-time rates come from grouped queries and rollups."""
+        from services.metrics_tracker import MetricsTracker
+        
+        now = datetime.utcnow()
+        add_change(db, now, recommended_action="auto_approve")
+        add_change(db, now, recommended_action="manual_required")
+        add_change(db, now - timedelta(days=1), review_status="auto_approved",
+                   recommended_action="auto_approve", reviewed_by="auto_approve_system")
+        add_change(db, now - timedelta(days=2), review_status="approved", reviewed_by="alice")
+        
+        metrics = MetricsTracker().get_dashboard_metrics(db)
+        
+        assert metrics.total_monitored_urls == 2
+        assert metrics.pending_review == 2
+        assert metrics.auto_approvable == 1
+        assert metrics.requires_manual == 1
+        assert metrics.current_automation_rate == 0.5
+        assert metrics.current_review_rate == 0.5
+        assert len(metrics.monthly_trend) == 6
+        assert sum(m.pending for m in metrics.monthly_trend) == 2
+    
+    def test_jurisdiction_breakdown(self, db):
+        """Jurisdictions group URLs by name prefix with per-month change counts."""
+        from services.metrics_tracker import MetricsTracker
+        
+        add_change(db, datetime(2025, 5, 2), url_id=1)
+        add_change(db, datetime(2025, 5, 3), url_id=2, review_status="approved")
+        add_change(db, datetime(2025, 5, 4), url_id=2, change_type="new")
+        add_change(db, datetime(2025, 6, 1), url_id=2)
+        
+        breakdown = MetricsTracker().get_jurisdiction_breakdown(db, 2025, 5)
+        
+        assert breakdown == {"Alaska": {"monitored": 2, "updated": 2, "reviewed": 1, "tagged": 0}}
@@ -0,0 +1,91 @@
+"""
+Tests for the shared page raster cache.
+"""
+
+# Test imports
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _make_pdf(path, text="Form ABC-100", pages=1):
+    import fitz
+
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page(width=200, height=200)
+        page.insert_text((20, 50), f"{text} page {i + 1}")
+    doc.save(path)
+    doc.close()
+    return path
+
+
+class TestPageRasterCache:
+    """Tests for PageRasterCache."""
+    
+    def test_second_render_is_cache_hit(self, tmp_path):
+        """Rendering the same page twice only renders once."""
+        from services.page_raster_cache import PageRasterCache
+        
+        pdf = _make_pdf(tmp_path / "a.pdf")
+        cache = PageRasterCache(disk_path=tmp_path / "cache")
+        
+        first = cache.render(pdf, page_num=0, dpi=72)
+        second = cache.render(pdf, page_num=0, dpi=72)
+        
+        assert first is not None
+        assert first.samples == second.samples
+        stats = cache.get_stats()
+        assert stats["renders"] == 1
+        assert stats["hits"] == 1
+    
+    def test_key_uses_content_hash(self, tmp_path):
+        """Identical bytes at different paths share one entry."""
+        from services.page_raster_cache import PageRasterCache
+        
+        pdf = _make_pdf(tmp_path / "a.pdf")
+        copy = tmp_path / "b.pdf"
+        copy.write_bytes(pdf.read_bytes())
+        cache = PageRasterCache(disk_path=tmp_path / "cache")
+        
+        cache.render(pdf, dpi=72)
+        cache.render(copy, dpi=72)
+        
+        assert cache.get_stats()["renders"] == 1
+    
+    def test_memory_tier_is_bounded(self, tmp_path):
+        """The memory tier evicts least-recently-used entries over budget."""
+        from services.page_raster_cache import PageRasterCache
+        
+        pdf = _make_pdf(tmp_path / "a.pdf", pages=4)
+        cache = PageRasterCache(max_memory_bytes=1, max_disk_bytes=0)
+        cache.max_memory_bytes = len(cache.render(pdf, page_num=0, dpi=72).samples)
+        
+        for page in range(4):
+            cache.render(pdf, page_num=page, dpi=72)
+        
+        stats = cache.get_stats()
+        assert stats["memory_bytes"] <= stats["max_memory_bytes"]
+    
+    def test_disk_tier_survives_new_instance(self, tmp_path):
+        """A fresh cache over the same directory reuses rendered pages."""
+        from services.page_raster_cache import PageRasterCache
+        
+        pdf = _make_pdf(tmp_path / "a.pdf")
+        PageRasterCache(disk_path=tmp_path / "cache").render(pdf, dpi=72)
+        
+        cache = PageRasterCache(disk_path=tmp_path / "cache")
+        raster = cache.render(pdf, dpi=72)
+        
+        assert raster is not None
+        assert cache.get_stats()["renders"] == 0
+        assert raster.to_png().startswith(b"\x89PNG")
+    
+    def test_out_of_range_page_returns_none(self, tmp_path):
+        """Pages past the end of the document are not rendered."""
+        from services.page_raster_cache import PageRasterCache
+        
+        pdf = _make_pdf(tmp_path / "a.pdf")
+        cache = PageRasterCache(disk_path=tmp_path / "cache")
+        
+        assert cache.render(pdf, page_num=5, dpi=72) is None
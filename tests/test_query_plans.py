@@ -0,0 +1,299 @@
+"""
+Query-plan regression tests.
+
+Seeds a large synthetic database, runs the hot queries from VersionManager,
+MetricsTracker, the listing services and the API routes, and checks with
+EXPLAIN QUERY PLAN that none of them falls back to a full scan of a large
+table.
+"""
+
+import asyncio
+import re
+import pytest
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+# Test imports
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+URL_COUNT = 2000
+VERSIONS_PER_URL = 5
+CYCLE_COUNT = 10
+
+# Tables that must never be scanned in full by a hot query
+LARGE_TABLES = {"monitored_urls", "pdf_versions", "change_logs", "cycle_url_results", "monitoring_cycles"}
+
+FULL_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$")
+
+
+@pytest.fixture(scope="module")
+def engine(tmp_path_factory):
+    """Engine on a synthetic database with thousands of URLs, versions and changes."""
+    from sqlalchemy import create_engine, insert
+    from db.database import Base
+    from db.models import MonitoredURL, PDFVersion, ChangeLog, MonitoringCycle, CycleURLResult
+    
+    path = tmp_path_factory.mktemp("plans") / "large.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    
+    now = datetime.utcnow()
+    states = ["Alaska", "California", "Texas", "Ohio", "Maine"]
+    statuses = ["pending", "approved", "auto_approved", "rejected", "deferred"]
+    
+    urls, versions, changes, cycles, results = [], [], [], [], []
+    for url_id in range(1, URL_COUNT + 1):
+        state = states[url_id % len(states)]
+        urls.append({
+            "id": url_id,
+            "name": f"Form {url_id}",
+            "url": f"https://example.com/{url_id}.pdf",
+            "state": state,
+            "domain_category": f"courts.{state.lower()}.gov",
+            "enabled": url_id % 10 != 0,
+        })
+        for n in range(1, VERSIONS_PER_URL + 1):
+            version_id = (url_id - 1) * VERSIONS_PER_URL + n
+            detected = now - timedelta(hours=url_id + n * 24)
+            versions.append({
+                "id": version_id,
+                "monitored_url_id": url_id,
+                "version_number": n,
+                "original_pdf_path": f"{version_id}.pdf",
+                "normalized_pdf_path": f"{version_id}.pdf",
+                "extracted_text_path": f"{version_id}.txt",
+                "pdf_hash": f"pdf{version_id}",
+                "text_hash": f"text{version_id}",
+                "extraction_method": "pdfplumber",
+                "fetched_at": detected,
+            })
+            status = statuses[version_id % len(statuses)]
+            changes.append({
+                "id": version_id,
+                "monitored_url_id": url_id,
+                "previous_version_id": version_id - 1 if n > 1 else None,
+                "new_version_id": version_id,
+                "change_type": "modified",
+                "review_status": status,
+                "reviewed": status != "pending",
+                "reviewed_at": detected + timedelta(hours=1) if status != "pending" else None,
+                "recommended_action": "auto_approve" if n % 2 else "manual_required",
+                "detected_at": detected,
+            })
+    for cycle_id in range(1, CYCLE_COUNT + 1):
+        cycles.append({"id": cycle_id, "started_at": now - timedelta(days=cycle_id), "status": "completed"})
+        for url_id in range(1, URL_COUNT + 1):
+            results.append({"cycle_id": cycle_id, "monitored_url_id": url_id, "status": "success"})
+    
+    with engine.begin() as conn:
+        conn.execute(insert(MonitoredURL), urls)
+        conn.execute(insert(PDFVersion), versions)
+        conn.execute(insert(ChangeLog), changes)
+        conn.execute(insert(MonitoringCycle), cycles)
+        conn.execute(insert(CycleURLResult), results)
+    
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    """Session on the synthetic database; changes are rolled back afterwards."""
+    from sqlalchemy.orm import sessionmaker
+    
+    session = sessionmaker(bind=engine, autoflush=False)()
+    yield session
+    session.rollback()
+    session.close()
+
+
+@contextmanager
+def captured_statements(engine):
+    """Collect (statement, parameters) for every SELECT/UPDATE/DELETE issued."""
+    from sqlalchemy import event
+    
+    statements = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            statements.append((statement, parameters))
+    
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def full_scans(engine, statements):
+    """Return (table, statement) for every plan step that scans a large table in full."""
+    scans = []
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        for statement, parameters in statements:
+            cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            for row in cursor.fetchall():
+                match = FULL_SCAN.match(row[-1])
+                if match and match.group(1) in LARGE_TABLES:
+                    scans.append((match.group(1), statement))
+    finally:
+        raw.close()
+    return scans
+
+
+def assert_indexed(engine, statements):
+    """Fail if no statements ran or any of them scans a large table."""
+    assert statements, "No queries were captured"
+    scans = full_scans(engine, statements)
+    assert not scans, "Full table scans:\n" + "\n\n".join(f"[{t}] {s}" for t, s in scans)
+
+
+class TestIndexMigration:
+    """Tests for migrate_indexes."""
+    
+    def test_creates_missing_indexes(self, tmp_path):
+        """Indexes declared on the models are added to an older database."""
+        from unittest.mock import patch
+        from sqlalchemy import create_engine, inspect, text
+        from db.database import Base
+        from db.migrations import migrate_indexes
+        
+        old_engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+        Base.metadata.create_all(bind=old_engine)
+        with old_engine.begin() as conn:
+            conn.execute(text("DROP INDEX ix_change_logs_detected_at"))
+            conn.execute(text("DROP INDEX ix_pdf_versions_url_version"))
+        
+        with patch("db.migrations.engine", old_engine):
+            migrate_indexes()
+            migrate_indexes()  # Idempotent
+        
+        inspector = inspect(old_engine)
+        assert "ix_change_logs_detected_at" in {i["name"] for i in inspector.get_indexes("change_logs")}
+        assert "ix_pdf_versions_url_version" in {i["name"] for i in inspector.get_indexes("pdf_versions")}
+        old_engine.dispose()
+    
+    def test_detects_missing_index(self, tmp_path):
+        """The plan check itself flags a query that has lost its index."""
+        from sqlalchemy import create_engine, text
+        from sqlalchemy.orm import sessionmaker
+        from db.database import Base
+        from storage.version_manager import VersionManager
+        
+        bare_engine = create_engine(f"sqlite:///{tmp_path / 'bare.db'}")
+        Base.metadata.create_all(bind=bare_engine)
+        with bare_engine.begin() as conn:
+            conn.execute(text("DROP INDEX ix_change_logs_url_detected"))
+            conn.execute(text("DROP INDEX ix_change_logs_detected_at"))
+        
+        session = sessionmaker(bind=bare_engine)()
+        with captured_statements(bare_engine) as statements:
+            VersionManager(file_store=None).get_url_changes(session, 1)
+        session.close()
+        
+        assert [table for table, _ in full_scans(bare_engine, statements)] == ["change_logs"]
+        bare_engine.dispose()
+
+
+class TestVersionManagerPlans:
+    """Hot queries in VersionManager."""
+    
+    def test_version_and_change_lookups(self, engine, db):
+        from storage.version_manager import VersionManager
+        
+        manager = VersionManager(file_store=None)
+        with captured_statements(engine) as statements:
+            assert manager.get_latest_version(db, 42).version_number == VERSIONS_PER_URL
+            assert len(manager.get_version_history(db, 42)) == VERSIONS_PER_URL
+            assert len(manager.get_url_changes(db, 42)) == VERSIONS_PER_URL
+        
+        assert_indexed(engine, statements)
+
+
+class TestMetricsTrackerPlans:
+    """Hot queries in MetricsTracker."""
+    
+    def test_rollup_refresh(self, engine, db):
+        from services.metrics_tracker import MetricsTracker
+        
+        tracker = MetricsTracker()
+        tracker.refresh_rollups(db, full=True)
+        
+        with captured_statements(engine) as statements:
+            tracker.refresh_rollups(db)
+            tracker.refresh_rollup_days(db, [datetime.utcnow().date() - timedelta(days=3)])
+        
+        assert_indexed(engine, statements)
+    
+    def test_ai_accuracy(self, engine, db):
+        from services.metrics_tracker import MetricsTracker
+        
+        with captured_statements(engine) as statements:
+            MetricsTracker().get_ai_accuracy(db, days=7)
+        
+        assert_indexed(engine, statements)
+
+
+class TestListingPlans:
+    """Hot queries behind the dashboard, URL management and review pages."""
+    
+    def test_url_state_refresh(self, engine, db):
+        from services.url_state import url_state_tracker
+        
+        with captured_statements(engine) as statements:
+            url_state_tracker.refresh_pending(db, [1, 2, 3])
+            url_state_tracker.refresh_url(db, 4)
+        
+        assert_indexed(engine, statements)
+    
+    def test_url_list_filters(self, engine, db):
+        from services.url_listing import url_listing, URLFilters
+        
+        with captured_statements(engine) as statements:
+            url_listing.get_page(db, URLFilters(state="Texas"), with_latest=False)
+            url_listing.get_page(
+                db, URLFilters(state="Ohio", domain="courts.ohio.gov", enabled_only=True), with_latest=False
+            )
+        
+        assert_indexed(engine, statements)
+    
+    def test_change_listings(self, engine, db):
+        from services.change_listing import change_listing
+        
+        with captured_statements(engine) as statements:
+            assert change_listing.list_changes(db, limit=100)
+            assert change_listing.list_changes(db, limit=100, status="pending")
+        
+        assert_indexed(engine, statements)
+
+
+class TestRoutePlans:
+    """Hot queries issued directly from api/routes.py."""
+    
+    def test_audit_cycle_routes(self, engine, db):
+        from api import routes
+        
+        with captured_statements(engine) as statements:
+            cycles = asyncio.run(routes.list_monitoring_cycles(limit=5, offset=0, status=None, triggered_by=None, db=db))
+            results = asyncio.run(routes.get_cycle_results(cycle_id=cycles[0].id, db=db))
+        
+        assert len(results) == URL_COUNT
+        assert_indexed(engine, statements)
+    
+    def test_dashboard_and_detail_routes(self, engine, db):
+        from types import SimpleNamespace
+        from unittest.mock import patch
+        from api import routes
+        
+        request = SimpleNamespace(query_params={})
+        with patch.object(routes.templates, "TemplateResponse") as render, \
+                captured_statements(engine) as statements:
+            asyncio.run(routes.dashboard(request=request, state="Texas", domain=None, search=None, cursor=None, db=db))
+            asyncio.run(routes.url_detail(request=request, url_id=42, db=db))
+        
+        assert len(render.call_args_list[1].args[1]["changes"]) == VERSIONS_PER_URL
+        assert_indexed(engine, statements)
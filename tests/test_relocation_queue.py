@@ -0,0 +1,278 @@
+"""
+Tests for the relocation queue: enqueueing 404s, running searches off the
+cycle, recording their outcome, per-domain budgets and recovery.
+"""
+
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+import pytest
+from unittest.mock import patch
+
+# Test imports
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def urls(session_factory, tmp_path):
+    """Two URLs with a version each, whose reference PDF exists."""
+    from db.models import MonitoredURL, PDFVersion
+    
+    reference = tmp_path / "reference.pdf"
+    reference.write_bytes(b"%PDF-1.4")
+    db = session_factory()
+    for name, url in (("civ-100", "https://courts.example.gov/civ-100.pdf"),
+                      ("civ-200", "https://courts.example.gov/civ-200.pdf")):
+        monitored_url = MonitoredURL(name=name, url=url)
+        db.add(monitored_url)
+        db.flush()
+        db.add(PDFVersion(
+            monitored_url_id=monitored_url.id, version_number=1,
+            original_pdf_path=str(reference), normalized_pdf_path="", extracted_text_path="",
+            pdf_hash="x", text_hash="x", extraction_method="test", form_number=name.upper()
+        ))
+    db.commit()
+    db.close()
+
+
+class FakeOrchestrator:
+    """Checks relocated URLs without network access; records failures for real."""
+    
+    def __init__(self, reachable=()):
+        from cli import MonitoringOrchestrator
+        from db.models import PDFVersion
+        
+        self.reachable = set(reachable)
+        self.checked = []
+        self.version_manager = SimpleNamespace(
+            get_latest_version=lambda db, url_id: db.query(PDFVersion).filter(
+                PDFVersion.monitored_url_id == url_id
+            ).first(),
+            get_original_pdf_path=lambda db, version_id: Path(db.get(PDFVersion, version_id).original_pdf_path)
+        )
+        self.record_relocation_failure = MonitoringOrchestrator.record_relocation_failure.__get__(self)
+    
+    def process_url(self, db, monitored_url, relocated_from_url=None):
+        from cli import URLOutcome
+        from db.models import ChangeLog
+        
+        self.checked.append((monitored_url.url, relocated_from_url))
+        outcome = URLOutcome(url_id=monitored_url.id)
+        if monitored_url.url in self.reachable:
+            change_log = ChangeLog(
+                monitored_url_id=monitored_url.id, new_version_id=monitored_url.versions[0].id,
+                change_type="relocated",
+                relocated_from_url=relocated_from_url, pdf_hash_changed=False, text_hash_changed=False
+            )
+            db.add(change_log)
+            db.flush()
+            outcome.success, outcome.change_log_id = True, change_log.id
+        return outcome
+
+
+def match(pdf_url, score):
+    return SimpleNamespace(pdf_url=pdf_url, similarity_score=score)
+
+
+def fake_search(results, pages=40):
+    """A run_search stand-in returning canned matches per start URL."""
+    calls = []
+    
+    async def run_search(website_url, reference_pdf_path, **options):
+        calls.append((website_url, options))
+        return results.get(website_url, []), [], SimpleNamespace(pages_fetched=pages, pages_crawled=pages)
+    
+    return run_search, calls
+
+
+@pytest.fixture
+def queue(session_factory):
+    from services.relocation_queue import RelocationQueue
+    
+    queue = RelocationQueue(
+        session_factory=session_factory, concurrency=2, domain_concurrency=1,
+        domain_page_budget=100, budget_window_seconds=3600
+    )
+    with patch("services.relocation_queue.settings.SITE_INVENTORY_ENABLED", False), \
+            patch("services.relocation_queue.settings.FORM_FINGERPRINT_ENABLED", False):
+        yield queue
+    queue.shutdown()
+
+
+def enqueue_all(queue, session_factory):
+    from db.models import MonitoredURL
+    
+    db = session_factory()
+    tasks = [queue.enqueue(db, url, url.url, start=False).id for url in db.query(MonitoredURL).all()]
+    db.close()
+    return tasks
+
+
+class TestEnqueue:
+    """Tests for queueing a 404."""
+    
+    def test_open_task_is_reused(self, queue, session_factory):
+        from db.models import MonitoredURL, RelocationTask
+        
+        db = session_factory()
+        monitored_url = db.query(MonitoredURL).first()
+        first = queue.enqueue(db, monitored_url, monitored_url.url, start=False)
+        second = queue.enqueue(db, monitored_url, monitored_url.url, start=False)
+        
+        assert first.id == second.id
+        assert (first.status, first.domain) == ("queued", "courts.example.gov")
+        assert db.query(RelocationTask).count() == 1
+        db.close()
+
+
+class TestExecution:
+    """Tests for running queued searches and recording their outcome."""
+    
+    def test_exact_match_relocates_and_others_fail(self, queue, session_factory):
+        from db.models import ChangeLog, MonitoredURL, RelocationTask
+        
+        moved, missing = enqueue_all(queue, session_factory)
+        new_url = "https://courts.example.gov/forms/civ-100.pdf"
+        queue._orchestrator = orchestrator = FakeOrchestrator(reachable={new_url})
+        run_search, calls = fake_search({
+            "https://courts.example.gov/civ-100.pdf": [match(new_url, 100)],
+            "https://courts.example.gov/civ-200.pdf": [match("https://courts.example.gov/x.pdf", 91)],
+        })
+        
+        with patch("pdf_similarity_search.run_search", run_search):
+            assert queue.drain() == 2
+        
+        db = session_factory()
+        relocated, failed = db.get(RelocationTask, moved), db.get(RelocationTask, missing)
+        assert (relocated.status, relocated.new_url, relocated.pages_crawled) == ("relocated", new_url, 40)
+        assert db.get(ChangeLog, relocated.change_log_id).change_type == "relocated"
+        assert db.get(MonitoredURL, relocated.monitored_url_id).url == new_url
+        assert orchestrator.checked == [(new_url, "https://courts.example.gov/civ-100.pdf")]
+        
+        assert failed.status == "failed" and failed.completed_at is not None
+        failure_log = db.get(ChangeLog, failed.change_log_id)
+        assert failure_log.change_type == "relocation_failed"
+        assert "1 candidate(s)" in failure_log.diff_summary
+        assert db.get(MonitoredURL, failed.monitored_url_id).url == "https://courts.example.gov/civ-200.pdf"
+        
+        # Search options match the inline search's
+        options = dict(calls)["https://courts.example.gov/civ-100.pdf"]
+        assert options["similarity_threshold"] == 85.0 and options["form_number"] == "CIV-100"
+        db.close()
+    
+    def test_unreachable_match_is_a_failure(self, queue, session_factory):
+        from db.models import MonitoredURL, RelocationTask
+        
+        task_id, _ = enqueue_all(queue, session_factory)
+        queue._orchestrator = FakeOrchestrator()
+        run_search, _ = fake_search({
+            "https://courts.example.gov/civ-100.pdf": [match("https://courts.example.gov/gone.pdf", 100)],
+        })
+        
+        with patch("pdf_similarity_search.run_search", run_search):
+            queue.drain()
+        
+        db = session_factory()
+        task = db.get(RelocationTask, task_id)
+        assert task.status == "failed"
+        assert db.get(MonitoredURL, task.monitored_url_id).url == "https://courts.example.gov/civ-100.pdf"
+        db.close()
+    
+    def test_changed_url_cancels_task(self, queue, session_factory):
+        from db.models import MonitoredURL, RelocationTask
+        
+        task_id, _ = enqueue_all(queue, session_factory)
+        db = session_factory()
+        db.get(MonitoredURL, 1).url = "https://courts.example.gov/fixed-by-hand.pdf"
+        db.commit()
+        queue._orchestrator = FakeOrchestrator()
+        run_search, calls = fake_search({})
+        
+        with patch("pdf_similarity_search.run_search", run_search):
+            queue.drain()
+        
+        db.expire_all()
+        assert db.get(RelocationTask, task_id).status == "cancelled"
+        assert [url for url, _ in calls] == ["https://courts.example.gov/civ-200.pdf"]
+        db.close()
+
+
+class TestDomainBudget:
+    """Tests for per-domain page budgets."""
+    
+    def test_budget_window(self):
+        from services.relocation_queue import DomainBudget
+        
+        now = [0.0]
+        budget = DomainBudget(pages=100, window_seconds=60, clock=lambda: now[0])
+        budget.charge("a.gov", 70)
+        now[0] = 30
+        budget.charge("a.gov", 30)
+        
+        assert budget.remaining("a.gov") == 0 and budget.remaining("b.gov") == 100
+        assert budget.available_in("a.gov") == 30
+        now[0] = 61
+        assert budget.remaining("a.gov") == 70 and budget.available_in("a.gov") == 0
+    
+    def test_spent_budget_defers_and_caps_searches(self, queue, session_factory):
+        from db.models import RelocationTask
+        
+        first, second = enqueue_all(queue, session_factory)
+        queue._orchestrator = FakeOrchestrator()
+        queue.budget.charge("courts.example.gov", 60)
+        run_search, calls = fake_search({})
+        
+        with patch("pdf_similarity_search.run_search", run_search):
+            assert queue.drain() == 1
+        
+        db = session_factory()
+        assert db.get(RelocationTask, first).status == "failed"
+        deferred = db.get(RelocationTask, second)
+        assert deferred.status == "queued" and deferred.not_before > datetime.utcnow()
+        # The search got what was left of the domain's budget
+        assert [options["max_pages"] for _, options in calls] == [40]
+        db.close()
+    
+    def test_claims_reserve_pages_and_refund_unused(self, queue, session_factory):
+        import asyncio
+        
+        enqueue_all(queue, session_factory)
+        queue._orchestrator = FakeOrchestrator()
+        queue.domain_concurrency = 2
+        run_search, calls = fake_search({}, pages=10)
+        
+        with patch("services.relocation_queue.settings.RELOCATION_MAX_PAGES", 70), \
+                patch("pdf_similarity_search.run_search", run_search):
+            first, second = queue._claim(), queue._claim()
+            # Concurrent claims split what is left instead of each seeing all of it
+            assert (first[2][1], second[2][1]) == (70, 30)
+            assert queue.budget.remaining("courts.example.gov") == 0
+            
+            asyncio.run(queue._run_task(*first))
+        
+        assert [options["max_pages"] for _, options in calls] == [70]
+        # The 60 pages the search didn't fetch are back in the budget
+        assert queue.budget.remaining("courts.example.gov") == 60
+
+
+class TestRecovery:
+    """Tests for tasks left running by a stopped process."""
+    
+    def test_dead_runner_task_is_requeued(self, queue, session_factory):
+        from db.models import RelocationTask
+        
+        task_id, _ = enqueue_all(queue, session_factory)
+        db = session_factory()
+        task = db.get(RelocationTask, task_id)
+        task.status, task.runner_id = "running", "gone-host:1"
+        db.commit()
+        
+        with patch("services.relocation_queue._runner_alive", return_value=False), \
+                patch.object(queue, "start") as start:
+            assert queue.recover(db) == 1
+        
+        assert db.get(RelocationTask, task_id).status == "queued"
+        start.assert_called_once()
+        db.close()
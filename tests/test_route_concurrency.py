@@ -0,0 +1,141 @@
+"""
+Tests that blocking route work stays off the event loop.
+"""
+
+import asyncio
+import threading
+import time
+import pytest
+
+# Test imports
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# Seconds a simulated diff render takes
+RENDER_SECONDS = 1.0
+
+
+@pytest.fixture
+def app(tmp_path):
+    """App with the routes on a SQLite database holding one URL with two versions."""
+    from fastapi import FastAPI
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from api.routes import router
+    from db.database import Base, get_db
+    from db.models import MonitoredURL, PDFVersion
+    
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    
+    session = Session()
+    session.add(MonitoredURL(id=1, name="Form", url="https://example.com/form.pdf", state="Texas"))
+    for n in (1, 2):
+        session.add(PDFVersion(
+            id=n, monitored_url_id=1, version_number=n,
+            original_pdf_path=f"{n}.pdf", normalized_pdf_path=f"{n}.pdf",
+            extracted_text_path=f"{n}.txt", pdf_hash=f"pdf{n}", text_hash=f"text{n}",
+            extraction_method="pdfplumber"
+        ))
+    session.commit()
+    session.close()
+    
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+    
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_db] = override_get_db
+    yield app
+    engine.dispose()
+
+
+def slow_render(*args, **kwargs):
+    """Stand-in for a PyMuPDF page diff that holds its thread."""
+    from services.visual_diff import VisualDiffResult
+    
+    time.sleep(RENDER_SECONDS)
+    return VisualDiffResult(success=False, error="simulated")
+
+
+class TestRouteDeclarations:
+    """Every route states whether it blocks."""
+    
+    def test_every_route_declares_blocking(self):
+        from fastapi.routing import APIRoute
+        from api.executors import route_pool
+        from api.routes import router
+        
+        routes = [route for route in router.routes if isinstance(route, APIRoute)]
+        assert routes
+        for route in routes:
+            pool = route_pool(route.endpoint)
+            assert asyncio.iscoroutinefunction(route.endpoint), route.path
+            if pool is not None:
+                # The handler itself is synchronous and runs in the pool
+                assert not asyncio.iscoroutinefunction(route.endpoint.__wrapped__), route.path
+    
+    def test_renders_use_render_pool(self):
+        from api import routes
+        from api.executors import route_pool
+        
+        assert route_pool(routes.get_diff_preview) == "render"
+        assert route_pool(routes.get_version_preview) == "render"
+        assert route_pool(routes.dashboard) == "db"
+    
+    def test_blocking_handler_runs_off_loop_thread(self):
+        from api.executors import blocking
+        
+        @blocking("db")
+        def handler():
+            return threading.current_thread().name
+        
+        assert asyncio.run(handler()).startswith("api-db")
+
+
+class TestDashboardResponsiveness:
+    """The dashboard answers while diffs render."""
+    
+    def test_dashboard_not_stalled_by_diff_renders(self, app):
+        from pathlib import Path
+        from unittest.mock import patch
+        import httpx
+        from fastapi.responses import HTMLResponse
+        from api import routes
+        from services.visual_diff import VisualDiff
+        
+        async def scenario():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                started = time.perf_counter()
+                diffs = [
+                    asyncio.create_task(client.get("/api/urls/1/versions/2/diff-preview", params={"page": page}))
+                    for page in range(3)
+                ]
+                await asyncio.sleep(0.1)  # Renders are now holding their threads
+                
+                dashboard = await client.get("/")
+                dashboard_seconds = time.perf_counter() - started
+                
+                responses = await asyncio.gather(*diffs)
+                return dashboard, dashboard_seconds, responses, time.perf_counter() - started
+        
+        with patch.object(VisualDiff, "generate_page_diff", side_effect=slow_render), \
+                patch.object(routes.version_manager, "get_original_pdf_path", return_value=Path("x.pdf")), \
+                patch.object(routes.templates, "TemplateResponse", return_value=HTMLResponse("dashboard")):
+            dashboard, dashboard_seconds, diffs, total_seconds = asyncio.run(scenario())
+        
+        assert dashboard.status_code == 200
+        assert [r.status_code for r in diffs] == [500, 500, 500]
+        assert total_seconds >= RENDER_SECONDS
+        # Served long before the first render finishes
+        assert dashboard_seconds < RENDER_SECONDS / 2
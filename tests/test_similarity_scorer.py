@@ -0,0 +1,89 @@
+"""
+Tests for the reusable reference scorer and its MinHash prefilter.
+"""
+
+import random
+import pytest
+
+# Test imports
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+REFERENCE = (
+    "Superior Court of California, County of Example. Request for Order to change "
+    "child custody, visitation and support. The petitioner requests that the court "
+    "order the respondent to pay child support and attorney fees. Hearing date, "
+    "department and room. Declaration under penalty of perjury under the laws of "
+    "the State of California that the foregoing is true and correct. "
+) * 3
+
+
+def sklearn_score(ref_text, pdf_text):
+    """The pairwise TfidfVectorizer score the scorer must reproduce."""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.metrics.pairwise import cosine_similarity
+    
+    vectorizer = TfidfVectorizer(max_features=10_000, stop_words="english", ngram_range=(1, 2))
+    matrix = vectorizer.fit_transform([ref_text, pdf_text])
+    return float(min(100.0, max(0.0, cosine_similarity(matrix[0:1], matrix[1:2])[0, 0] * 100.0)))
+
+
+def perturb(text, fraction, seed=0):
+    """Replace a fraction of the words with unrelated ones."""
+    rng = random.Random(seed)
+    return " ".join(
+        word if rng.random() >= fraction else f"filler{rng.randrange(100_000)}" for word in text.split()
+    )
+
+
+class TestReferenceScorer:
+    """Tests for ReferenceScorer."""
+    
+    def test_scores_match_pairwise_vectorizer(self):
+        from pdf_similarity_search.similarity import ReferenceScorer, text_similarity_score
+        
+        rng = random.Random(1)
+        # Over 10,000 distinct terms, so max_features decides what is kept
+        large = " ".join(f"term{rng.randrange(8_000)}" for _ in range(20_000))
+        candidates = [REFERENCE, perturb(REFERENCE, 0.1), perturb(REFERENCE, 0.6), REFERENCE + large, large]
+        
+        for reference in (REFERENCE, REFERENCE + large):
+            scorer = ReferenceScorer(reference, prefilter_min_jaccard=0)
+            for candidate in candidates:
+                expected = sklearn_score(reference, candidate)
+                assert scorer.score(candidate) == pytest.approx(expected, abs=1e-6)
+                assert text_similarity_score(reference, candidate) == pytest.approx(expected, abs=1e-6)
+    
+    def test_blank_and_stop_word_texts(self):
+        from pdf_similarity_search.similarity import ReferenceScorer, text_similarity_score
+        
+        assert ReferenceScorer(REFERENCE).score("   ") == 0.0
+        assert ReferenceScorer("").score(REFERENCE) == 0.0
+        assert text_similarity_score(REFERENCE, "the and of") == 0.0
+    
+    def test_prefilter_rejects_only_clearly_different_texts(self):
+        from pdf_similarity_search.similarity import ReferenceScorer
+        
+        scorer = ReferenceScorer(REFERENCE, prefilter_min_jaccard=0.15)
+        unrelated = " ".join(f"filler{i}" for i in range(300))
+        
+        assert scorer.score(unrelated) < 15
+        assert scorer.prefiltered == 1
+        for fraction in (0.0, 0.1, 0.2):
+            candidate = perturb(REFERENCE, fraction, seed=2)
+            assert scorer.score(candidate) == pytest.approx(sklearn_score(REFERENCE, candidate), abs=1e-6)
+        assert scorer.prefiltered == 1
+    
+    def test_minhash_estimates_jaccard(self):
+        from pdf_similarity_search.similarity import minhash_signature, estimate_jaccard
+        
+        words_a = {f"w{i}" for i in range(400)}
+        words_b = {f"w{i}" for i in range(200, 600)}  # Jaccard 1/3
+        sig_a = minhash_signature(words_a, 256)
+        
+        assert estimate_jaccard(sig_a, minhash_signature(words_b, 256)) == pytest.approx(1 / 3, abs=0.1)
+        assert estimate_jaccard(sig_a, minhash_signature(set(words_a), 256)) == 1.0
+        # Deterministic across calls (and processes: CRC32 and a fixed seed)
+        assert (minhash_signature(words_a, 256) == sig_a).all()
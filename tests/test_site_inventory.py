@@ -0,0 +1,242 @@
+"""
+Tests for the site inventory: conditional refresh, link diffing,
+relocation lookup and move detection.
+"""
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+# Test imports
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+PAGE_URL = "https://courts.example.gov/forms/family.html"
+
+PAGE_V1 = """
+<a href="/files/fl-100.pdf">Petition - Marriage (FL-100)</a>
+<a href="/files/fl-105.pdf">Declaration (FL-105)</a>
+"""
+
+# fl-100 moved to a new folder under a new name; fl-105 unchanged
+PAGE_V2 = """
+<a href="/files/2026/fl100_petition.pdf">Petition - Marriage (FL-100)</a>
+<a href="/files/fl-105.pdf">Declaration (FL-105)</a>
+"""
+
+
+@pytest.fixture
+def inventory():
+    """SiteInventory with a scripted page fetch and quick hasher."""
+    from diffing.quick_hasher import QuickHashResult
+    from services.link_crawler import LinkCrawler, PageFetch
+    from services.site_inventory import SiteInventory
+    
+    crawler = LinkCrawler()
+    crawler.responses = []
+    crawler.requests = []
+    
+    def fetch(url, etag=None, last_modified=None):
+        crawler.requests.append((url, etag, last_modified))
+        return crawler.responses.pop(0)
+    
+    crawler.fetch_page_conditional = fetch
+    crawler.page = lambda html, etag=None: PageFetch(status_code=200, html=html, etag=etag)
+    crawler.not_modified = lambda: PageFetch(status_code=304)
+    
+    hasher = MagicMock()
+    hasher.hashes = {}
+    hasher.compute_quick_hash.side_effect = lambda url: QuickHashResult(
+        url=url, success=url in hasher.hashes, quick_hash=hasher.hashes.get(url)
+    )
+    
+    with patch("services.site_inventory.settings.SITE_INVENTORY_REQUEST_DELAY", 0):
+        yield SiteInventory(crawler=crawler, quick_hasher=hasher)
+
+
+def add_monitored(db, url, **kwargs):
+    from db.models import MonitoredURL
+    
+    monitored_url = MonitoredURL(name=url.rsplit("/", 1)[-1], url=url, parent_page_url=PAGE_URL, **kwargs)
+    db.add(monitored_url)
+    db.commit()
+    return monitored_url
+
+
+def current_links(db):
+    from db.models import SiteInventoryLink
+    
+    return sorted(
+        link.pdf_url for link in db.query(SiteInventoryLink).filter(SiteInventoryLink.removed_at.is_(None))
+    )
+
+
+class TestRefresh:
+    """Tests for refreshing index pages."""
+    
+    def test_conditional_get_and_link_diff(self, db, inventory):
+        from db.models import SiteInventoryLink
+        
+        crawler = inventory.crawler
+        crawler.responses = [crawler.page(PAGE_V1, etag='"v1"'), crawler.not_modified()]
+        
+        first = inventory.refresh_page(db, PAGE_URL)
+        assert first == {"changed": 1, "links_added": 2, "links_removed": 0}
+        assert current_links(db) == [
+            "https://courts.example.gov/files/fl-100.pdf",
+            "https://courts.example.gov/files/fl-105.pdf",
+        ]
+        link = db.query(SiteInventoryLink).filter(SiteInventoryLink.pdf_url.like("%fl-100.pdf")).one()
+        assert (link.form_number, link.filename_key) == ("FL-100", "fl100")
+        
+        # Validators are sent back; a 304 leaves the links alone
+        assert inventory.refresh_page(db, PAGE_URL) == {"not_modified": 1}
+        assert crawler.requests[1] == (PAGE_URL, '"v1"', None)
+        
+        # A 200 with an identical body is not re-parsed either
+        crawler.responses = [crawler.page(PAGE_V1)]
+        assert inventory.refresh_page(db, PAGE_URL) == {"not_modified": 1}
+        
+        crawler.responses = [crawler.page(PAGE_V2, etag='"v2"')]
+        assert inventory.refresh_page(db, PAGE_URL) == {"changed": 1, "links_added": 1, "links_removed": 1}
+        assert current_links(db) == [
+            "https://courts.example.gov/files/2026/fl100_petition.pdf",
+            "https://courts.example.gov/files/fl-105.pdf",
+        ]
+        db.refresh(link)
+        assert link.removed_at is not None
+    
+    def test_failed_fetch_keeps_links(self, db, inventory):
+        from db.models import SiteInventoryPage
+        from services.link_crawler import PageFetch
+        
+        crawler = inventory.crawler
+        crawler.responses = [crawler.page(PAGE_V1), PageFetch(status_code=503, error="HTTP 503")]
+        inventory.refresh_page(db, PAGE_URL)
+        
+        assert inventory.refresh_page(db, PAGE_URL) == {"failed": 1}
+        assert len(current_links(db)) == 2
+        page = db.query(SiteInventoryPage).one()
+        assert (page.last_status_code, page.error) == (503, "HTTP 503")
+    
+    def test_refresh_fingerprints_and_flags_moves(self, db, inventory):
+        from services.url_state import url_state_tracker
+        
+        old_url = "https://courts.example.gov/files/fl-100.pdf"
+        new_url = "https://courts.example.gov/files/2026/fl100_petition.pdf"
+        monitored_url = add_monitored(db, old_url, quick_hash="abc")
+        add_monitored(db, "https://courts.example.gov/files/fl-105.pdf")
+        
+        crawler = inventory.crawler
+        inventory.quick_hasher.hashes = {old_url: "abc"}
+        crawler.responses = [crawler.page(PAGE_V1)]
+        stats = inventory.refresh(db)
+        assert (stats["pages"], stats["fingerprinted"], stats["moves_detected"]) == (1, 1, 0)
+        
+        inventory.quick_hasher.hashes = {new_url: "abc"}
+        crawler.responses = [crawler.page(PAGE_V2)]
+        stats = inventory.refresh(db)
+        assert (stats["links_added"], stats["links_removed"]) == (1, 1)
+        assert (stats["fingerprinted"], stats["moves_detected"]) == (1, 1)
+        
+        near_misses = url_state_tracker.get_near_misses(db, monitored_url.id)
+        assert near_misses["source"] == "site_inventory"
+        assert near_misses["original_url"] == old_url
+        assert near_misses["candidates"][0]["pdf_url"] == new_url
+        assert near_misses["candidates"][0]["match"] == "fingerprint"
+        
+        # Nothing new to record on the next refresh
+        crawler.responses = [crawler.not_modified()]
+        assert inventory.refresh(db)["moves_detected"] == 0
+
+
+class TestLookup:
+    """Tests for relocation lookup."""
+    
+    def seed(self, db, inventory, html):
+        crawler = inventory.crawler
+        crawler.responses = [crawler.page(html)]
+        inventory.refresh_page(db, PAGE_URL)
+    
+    def test_ranks_fingerprint_over_form_number_over_filename(self, db, inventory):
+        from datetime import datetime
+        from db.models import SiteInventoryLink
+        
+        self.seed(db, inventory, """
+            <a href="/archive/fl-100.pdf">Old copy</a>
+            <a href="/files/new/FL-100.pdf">FL-100 (current)</a>
+            <a href="/files/petition-2026.pdf">Petition</a>
+        """)
+        db.query(SiteInventoryLink).filter(
+            SiteInventoryLink.pdf_url.like("%petition-2026.pdf")
+        ).update({"quick_hash": "abc"}, synchronize_session=False)
+        db.query(SiteInventoryLink).filter(
+            SiteInventoryLink.pdf_url.like("%archive%")
+        ).update({"last_seen_at": datetime(2020, 1, 1)}, synchronize_session=False)
+        db.commit()
+        
+        monitored_url = add_monitored(db, "https://courts.example.gov/files/fl-100.pdf", quick_hash="abc")
+        candidates = inventory.lookup(db, monitored_url)
+        
+        assert [(c.pdf_url.rsplit("/", 2)[-2], c.match) for c in candidates] == [
+            ("files", "fingerprint"),
+            ("new", "form_number"),
+            ("archive", "form_number"),
+        ]
+        assert candidates[0].page_url == PAGE_URL
+    
+    def test_filename_only_match_is_not_relocated(self, db, inventory):
+        self.seed(db, inventory, '<a href="/docs/name_change_request.pdf">Request</a>')
+        monitored_url = add_monitored(db, "https://courts.example.gov/files/Name-Change-Request.pdf")
+        monitored_url.parent_page_url = None
+        
+        candidates = inventory.lookup(db, monitored_url)
+        assert [c.match for c in candidates] == ["filename"]
+        assert inventory.find_relocated(db, monitored_url) is None
+    
+    def test_other_domains_need_a_fingerprint(self, db, inventory):
+        self.seed(db, inventory, '<a href="/files/fl-100.pdf">FL-100</a>')
+        monitored_url = add_monitored(db, "https://other.example.gov/fl-100.pdf")
+        monitored_url.parent_page_url = None
+        
+        assert inventory.lookup(db, monitored_url) == []
+    
+    def test_find_relocated_rechecks_parent_page(self, db, inventory):
+        new_url = "https://courts.example.gov/files/2026/fl100_petition.pdf"
+        self.seed(db, inventory, PAGE_V1)
+        monitored_url = add_monitored(db, "https://courts.example.gov/files/fl-100.pdf", quick_hash="abc")
+        
+        crawler = inventory.crawler
+        crawler.responses = [crawler.page(PAGE_V2)]
+        inventory.quick_hasher.hashes = {new_url: "abc"}
+        candidate = inventory.find_relocated(db, monitored_url)
+        
+        # Form number match, confirmed by its fingerprint
+        assert candidate.pdf_url == new_url
+        assert candidate.match == "fingerprint"
+    
+    def test_form_number_match_with_other_content_is_a_near_miss(self, db, inventory):
+        from services.url_state import url_state_tracker
+        
+        self.seed(db, inventory, '<a href="/files/2026/fl-100-instructions.pdf">FL-100 instructions</a>')
+        monitored_url = add_monitored(db, "https://courts.example.gov/files/fl-100.pdf", quick_hash="abc")
+        monitored_url.parent_page_url = None
+        inventory.quick_hasher.hashes = {"https://courts.example.gov/files/2026/fl-100-instructions.pdf": "def"}
+        
+        assert inventory.find_relocated(db, monitored_url) is None
+        
+        near_misses = url_state_tracker.get_near_misses(db, monitored_url.id)
+        assert near_misses["source"] == "site_inventory"
+        assert [c["match"] for c in near_misses["candidates"]] == ["form_number"]
+
+
+class TestFilenameKey:
+    """Tests for filename normalization."""
+    
+    def test_filename_key(self):
+        from services.site_inventory import filename_key
+        
+        assert filename_key("https://x.gov/a/CIV-775%20a.pdf") == "civ775a"
+        assert filename_key("https://x.gov/a/civ_775_a.PDF") == "civ775a"
+        assert filename_key("https://x.gov/") is None
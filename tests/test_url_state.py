@@ -0,0 +1,149 @@
+"""
+Tests for the materialized per-URL current state table.
+"""
+
+import pytest
+
+# Test imports
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def monitored_url(db):
+    """One monitored URL (id 1)."""
+    from db.models import MonitoredURL
+    
+    db.add(MonitoredURL(id=1, name="Form A", url="https://example.com/a.pdf"))
+    db.commit()
+
+
+def add_version(db, number):
+    from db.models import PDFVersion
+    from services.url_state import url_state_tracker
+    
+    version = PDFVersion(
+        monitored_url_id=1,
+        version_number=number,
+        original_pdf_path=f"{number}.pdf",
+        normalized_pdf_path=f"{number}.pdf",
+        extracted_text_path=f"{number}.txt",
+        pdf_hash=f"pdf{number}",
+        text_hash=f"text{number}",
+        extraction_method="pdfplumber"
+    )
+    db.add(version)
+    db.flush()
+    url_state_tracker.record_version(db, version)
+    db.commit()
+    return version
+
+
+def add_change(db, version, review_status="pending"):
+    from db.models import ChangeLog
+    from services.url_state import url_state_tracker
+    
+    change = ChangeLog(
+        monitored_url_id=1,
+        new_version_id=version.id,
+        change_type="text_change",
+        review_status=review_status
+    )
+    db.add(change)
+    db.flush()
+    url_state_tracker.record_change(db, change)
+    db.commit()
+    return change
+
+
+def get_state(db):
+    from services.url_state import url_state_tracker
+    
+    db.expire_all()
+    return url_state_tracker.get_states(db, [1])[1]
+
+
+class TestURLStateTracker:
+    """Tests for URLStateTracker."""
+    
+    def test_versions_and_changes_update_state(self, db):
+        """Each new version and change advances the latest pointers and counts."""
+        v1 = add_version(db, 1)
+        v2 = add_version(db, 2)
+        change = add_change(db, v2)
+        
+        state = get_state(db)
+        assert state.version_count == 2
+        assert state.latest_version.id == v2.id
+        assert state.latest_change.id == change.id
+        assert state.change_count == 1
+        assert state.pending_review_count == 1
+        assert state.has_pending_review
+        assert v1.id != v2.id
+    
+    def test_review_clears_pending(self, db):
+        """Refreshing after a review recomputes the pending count."""
+        from services.url_state import url_state_tracker
+        
+        version = add_version(db, 1)
+        first = add_change(db, version)
+        add_change(db, version)
+        
+        first.review_status = "approved"
+        url_state_tracker.refresh_pending(db, [1])
+        db.commit()
+        
+        state = get_state(db)
+        assert state.pending_review_count == 1
+        assert state.has_pending_review
+    
+    def test_outcome_preserves_counts(self, db):
+        """Recording a cycle outcome doesn't touch version or change counts."""
+        from services.url_state import url_state_tracker
+        
+        add_version(db, 1)
+        url_state_tracker.record_outcome(db, 1, True, tier_reached=1, skip_reason="headers_unchanged")
+        db.commit()
+        
+        state = get_state(db)
+        assert state.version_count == 1
+        assert state.last_outcome == "success"
+        assert state.last_tier_reached == 1
+        assert state.last_skip_reason == "headers_unchanged"
+    
+    def test_rebuild_matches_incremental(self, db):
+        """A full rebuild produces the same state as incremental maintenance."""
+        from services.url_state import url_state_tracker
+        
+        version = add_version(db, 1)
+        add_version(db, 2)
+        add_change(db, version)
+        add_change(db, version, review_status="approved")
+        url_state_tracker.record_outcome(db, 1, False, tier_reached=3)
+        db.commit()
+        
+        before = get_state(db)
+        expected = (
+            before.latest_version_id, before.latest_change_id, before.version_count,
+            before.change_count, before.pending_review_count, before.last_outcome
+        )
+        
+        url_state_tracker.rebuild(db)
+        after = get_state(db)
+        
+        assert (
+            after.latest_version_id, after.latest_change_id, after.version_count,
+            after.change_count, after.pending_review_count, after.last_outcome
+        ) == expected
+    
+    def test_near_misses_survive_rebuild(self, db):
+        """Relocation near-misses are stored on the state row and kept by rebuild."""
+        from services.url_state import url_state_tracker
+        
+        payload = {"original_url": "https://example.com/a.pdf", "candidates": [{"pdf_url": "b", "similarity_score": 88.0}]}
+        url_state_tracker.record_near_misses(db, 1, payload)
+        db.commit()
+        url_state_tracker.rebuild(db)
+        
+        assert url_state_tracker.get_near_misses(db, 1) == payload
@@ -0,0 +1,196 @@
+"""
+Tests for the visual diff service.
+"""
+
+import pytest
+from unittest.mock import patch
+
+# Test imports
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def raster_cache(tmp_path, monkeypatch):
+    """Renders are cached under tmp_path instead of the repo's data/raster_cache."""
+    from services import visual_diff
+    from services.page_raster_cache import PageRasterCache
+    
+    cache_path = tmp_path / "raster_cache"
+    monkeypatch.setattr(visual_diff, "page_raster_cache", PageRasterCache(disk_path=cache_path))
+    # Pool workers are spawned and read the path from the environment
+    monkeypatch.setenv("RASTER_CACHE_PATH", str(cache_path))
+    yield cache_path
+    # Workers keep the path they started with
+    visual_diff._reset_diff_pool()
+
+
+def _make_pdf(path, texts):
+    import fitz
+
+    doc = fitz.open()
+    for text in texts:
+        page = doc.new_page(width=200, height=200)
+        page.insert_text((20, 50), text)
+    doc.save(path)
+    doc.close()
+    return path
+
+
+class TestPageDiffs:
+    """Tests for multi-page diff generation."""
+    
+    def _pdfs(self, tmp_path):
+        old = _make_pdf(tmp_path / "old.pdf", ["Same", "Before", "Same", "Before"])
+        new = _make_pdf(tmp_path / "new.pdf", ["Same", "After", "Same", "After"])
+        return old, new
+    
+    def test_diffs_only_requested_pages(self, tmp_path):
+        """Only the requested pages get diff images."""
+        from services.visual_diff import VisualDiff
+        
+        old, new = self._pdfs(tmp_path)
+        with patch("services.visual_diff.settings.VISUAL_DIFF_WORKERS", 0):
+            results = VisualDiff().generate_page_diffs(
+                old, new, pages=[1, 3],
+                output_path_for=lambda p: tmp_path / f"diff_{p}.png"
+            )
+        
+        assert sorted(results) == [1, 3]
+        assert all(r.success for r in results.values())
+        assert (tmp_path / "diff_1.png").exists()
+        assert not (tmp_path / "diff_0.png").exists()
+        assert all(region.page == 1 for region in results[1].changed_regions)
+    
+    def test_page_cap(self, tmp_path):
+        """Pages beyond the cap are skipped."""
+        from services.visual_diff import VisualDiff
+        
+        old, new = self._pdfs(tmp_path)
+        with patch("services.visual_diff.settings.VISUAL_DIFF_WORKERS", 0):
+            results = VisualDiff().generate_page_diffs(
+                old, new, pages=[0, 1, 2, 3],
+                output_path_for=lambda p: tmp_path / f"diff_{p}.png",
+                max_pages=2
+            )
+        
+        assert sorted(results) == [0, 1]
+    
+    def test_process_pool(self, tmp_path):
+        """Pages are diffed in the process pool and match in-process results."""
+        from services.visual_diff import VisualDiff
+        
+        old, new = self._pdfs(tmp_path)
+        with patch("services.visual_diff.settings.VISUAL_DIFF_WORKERS", 2):
+            results = VisualDiff().generate_page_diffs(
+                old, new, pages=[1, 3],
+                output_path_for=lambda p: tmp_path / f"diff_{p}.png",
+                time_budget=120
+            )
+        
+        assert sorted(results) == [1, 3]
+        assert results[1].success
+        assert results[1].change_percentage > 0
+
+
+class TestCompareRasters:
+    """Tests for raster comparison."""
+    
+    def _raster(self, arr):
+        from services.page_raster_cache import PageRaster
+        
+        return PageRaster(
+            width=arr.shape[1], height=arr.shape[0], channels=3, samples=arr.tobytes()
+        )
+    
+    def test_identical_rasters(self):
+        """Identical pages have no changes and an unmodified overlay."""
+        import numpy as np
+        from services.visual_diff import VisualDiff
+        
+        arr = np.full((101, 77, 3), 255, np.uint8)
+        diff = VisualDiff()
+        output, regions, pct = diff._diff_arrays(arr, arr)
+        
+        assert pct == 0
+        assert regions == []
+        assert np.array_equal(output, arr)
+    
+    def test_changed_block_region_in_full_resolution(self):
+        """A changed block is reported in full-resolution coordinates."""
+        import cv2
+        import numpy as np
+        from services.visual_diff import VisualDiff
+        
+        old = np.full((200, 150, 3), 255, np.uint8)
+        new = old.copy()
+        new[61:101, 31:81] = 0
+        
+        png, regions, pct = VisualDiff().compare_rasters(self._raster(old), self._raster(new))
+        
+        assert pct == pytest.approx(40 * 50 / (200 * 150))
+        assert len(regions) == 1
+        region = regions[0]
+        assert region.x <= 31 and region.x + region.width >= 81
+        assert region.y <= 61 and region.y + region.height >= 101
+        
+        decoded = cv2.imdecode(np.frombuffer(png, np.uint8), cv2.IMREAD_COLOR)
+        assert decoded.shape == (200, 150, 3)
+        # Far corner is untouched
+        assert tuple(decoded[195, 145]) == (255, 255, 255)
+
+
+class TestTextDiff:
+    """Tests for the word-alignment diff."""
+    
+    def test_changed_word_region_in_pixels(self, tmp_path):
+        """Only the changed word is boxed, in pixels at the render dpi."""
+        from services.visual_diff import VisualDiff
+        
+        old = _make_pdf(tmp_path / "old.pdf", ["Form ABC-100 revised 2023"])
+        new = _make_pdf(tmp_path / "new.pdf", ["Form ABC-100 revised 2024"])
+        
+        result = VisualDiff().generate_text_diff(old, new)
+        
+        assert result.success
+        assert result.diff_image_path is None  # Nothing rendered
+        assert len(result.changed_regions) == 1
+        region = result.changed_regions[0]
+        # insert_text baseline is y=50 on a 200pt page; the word is to the right
+        scale = 150 / 72
+        assert 30 * scale <= region.y <= 50 * scale
+        assert region.x > 80 * scale
+        assert result.change_percentage == pytest.approx(0.25)
+    
+    def test_identical_text_has_no_regions(self, tmp_path):
+        """Re-saved pages with the same words report no change."""
+        from services.visual_diff import VisualDiff
+        
+        old = _make_pdf(tmp_path / "old.pdf", ["Same words here"])
+        new = _make_pdf(tmp_path / "new.pdf", ["Same words here"])
+        
+        result = VisualDiff().generate_text_diff(old, new, tmp_path / "diff.png")
+        
+        assert result.success
+        assert result.changed_regions == []
+        assert (tmp_path / "diff.png").exists()
+    
+    def test_pages_without_words_fall_back_to_raster(self, tmp_path):
+        """Image-only pages use the pixel diff."""
+        import fitz
+        from services.visual_diff import VisualDiff
+        
+        for name, color in (("old.pdf", (0, 0, 0)), ("new.pdf", (1, 0, 0))):
+            doc = fitz.open()
+            page = doc.new_page(width=200, height=200)
+            page.draw_rect(fitz.Rect(20, 20, 120, 120), color=color, fill=color)
+            doc.save(tmp_path / name)
+            doc.close()
+        
+        result = VisualDiff().generate_text_diff(
+            tmp_path / "old.pdf", tmp_path / "new.pdf", tmp_path / "diff.png"
+        )
+        
+        assert result.success
+        assert result.change_percentage > 0
@@ -0,0 +1,120 @@
+"""
+Tests for the single-writer commit queue.
+"""
+
+import threading
+
+# Test imports
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestWriteQueue:
+    """Tests for WriteQueue."""
+    
+    def test_wal_mode_enabled(self, session_factory):
+        """Connections use the WAL journal."""
+        from sqlalchemy import text
+        
+        session = session_factory()
+        try:
+            mode = session.execute(text("PRAGMA journal_mode")).scalar()
+        finally:
+            session.close()
+        
+        assert mode.lower() == "wal"
+    
+    def test_concurrent_producers_are_batched(self, session_factory):
+        """Writes from many threads all land, in fewer transactions than writes."""
+        from db.models import MonitoredURL
+        from db.write_queue import WriteQueue
+        
+        wq = WriteQueue(session_factory=session_factory, batch_size=50, flush_interval=0.05)
+        
+        def produce(worker):
+            for i in range(20):
+                wq.add(MonitoredURL(name=f"w{worker}-{i}", url=f"https://example.com/{worker}/{i}.pdf"))
+        
+        threads = [threading.Thread(target=produce, args=(w,)) for w in range(10)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        assert wq.flush(timeout=10)
+        
+        session = session_factory()
+        try:
+            assert session.query(MonitoredURL).count() == 200
+        finally:
+            session.close()
+        
+        stats = wq.get_stats()
+        assert stats["applied"] == 200
+        assert stats["pending"] == 0
+        assert stats["batches"] < 200
+    
+    def test_failed_write_does_not_drop_batch(self, session_factory):
+        """A bad write is isolated; the rest of its batch is committed."""
+        from db.models import MonitoredURL
+        from db.write_queue import WriteQueue
+        
+        wq = WriteQueue(session_factory=session_factory, batch_size=10, flush_interval=0.2)
+        
+        def bad_op(session):
+            raise ValueError("boom")
+        
+        wq.add(MonitoredURL(name="a", url="https://example.com/a.pdf"))
+        wq.submit(bad_op)
+        wq.add(MonitoredURL(name="b", url="https://example.com/b.pdf"))
+        
+        assert wq.flush(timeout=10)
+        
+        session = session_factory()
+        try:
+            names = sorted(u.name for u in session.query(MonitoredURL).all())
+        finally:
+            session.close()
+        
+        assert names == ["a", "b"]
+        assert wq.get_stats()["failed"] == 1
+    
+    def test_update_by_id(self, session_factory):
+        """Queued updates change only the given columns."""
+        from datetime import datetime
+        from db.models import MonitoredURL
+        from db.write_queue import WriteQueue
+        
+        session = session_factory()
+        url = MonitoredURL(name="a", url="https://example.com/a.pdf", etag_header="old")
+        session.add(url)
+        session.commit()
+        url_id = url.id
+        session.close()
+        
+        wq = WriteQueue(session_factory=session_factory, flush_interval=0.01)
+        checked = datetime(2026, 1, 1)
+        wq.update(MonitoredURL, url_id, {"last_checked_at": checked})
+        assert wq.flush(timeout=10)
+        
+        session = session_factory()
+        try:
+            url = session.get(MonitoredURL, url_id)
+            assert url.last_checked_at == checked
+            assert url.etag_header == "old"
+        finally:
+            session.close()
+    
+    def test_session_error_still_completes_flush(self, session_factory):
+        """A batch whose session can't be opened counts as failed instead of hanging flush()."""
+        from db.write_queue import WriteQueue
+        
+        def broken_factory():
+            raise RuntimeError("database is locked")
+        
+        wq = WriteQueue(session_factory=broken_factory, flush_interval=0.01)
+        wq.submit(lambda session: None)
+        
+        assert wq.flush(timeout=10)
+        assert wq.get_stats()["failed"] == 1